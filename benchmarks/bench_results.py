@@ -0,0 +1,61 @@
+# benchmarks/bench_results.py
+#
+# Gemeinsames Ergebnisformat von load_bench.py und micro_bench.py, damit benchmarks/compare.py
+# Läufe verschiedener Commits vergleichen kann:
+#
+#   {"meta": {"commit": ..., "python": ..., ...}, "results": [{"id": ..., <Messwerte>}, ...]}
+#
+# Jede Messung hat eine eindeutige "id"; Messwerte mit Endung _ms/_us sind Zeiten (kleiner ist
+# besser), _rps/_per_s sind Raten (größer ist besser).
+
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values, fraction):
+    """Perzentil nach dem Nearest-Rank-Verfahren über eine sortierte Liste"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def metadata(args):
+    """Commit, Interpreter und Maschine des Laufs, dazu die Argumente des Benchmarks"""
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'args': {key: value for key, value in vars(args).items() if not key.startswith('child')},
+    }
+
+
+def write_results(path, args, results):
+    """Schreibt Metadaten und Messungen als JSON nach path, ohne path auf stdout"""
+    document = {'meta': metadata(args), 'results': results}
+    if path:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(document, f, indent=2)
+            f.write('\n')
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,166 @@
+# benchmarks/build_bench.py
+#
+# Vergleicht die Build-Varianten aus dem Makefile (default, release, pgo): jede Variante wird nach
+# build/<variante> gebaut und in einem eigenen Prozess gemessen, damit nicht mehrere Fassungen der
+# Bibliothek im selben Prozess geladen sind. Gemessen werden Skalar-Aufrufe (Bibliothek und
+# Co-Prozess) sowie Array-Lasten (Batch, Ausdruck, Reduktion, Matrixoperationen), in --rounds Runden
+# abwechselnd über die Varianten mit je --repeat Messungen; berichtet wird der Median der Runden,
+# speedup ist der Faktor gegenüber der ersten Variante. Die Trainingslast der
+# PGO-Variante (pgo_workload.py) verwendet andere Größen und Operanden als diese Messung.
+# Ergebnisse (Format siehe bench_results.py) nach --output bzw. stdout.
+#
+#   make benchmark            (bzw. make benchmark BENCH_VARIANTS="default pgo" OPENMP=1)
+#   python benchmarks/build_bench.py [--variants default release pgo] [--rounds 3] [--output variants.json]
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+
+from bench_results import ROOT, write_results
+
+sys.path.insert(0, ROOT)
+
+VARIANTS = ('default', 'release', 'pgo')
+
+
+def build(variant, make_args):
+    """Baut die Variante nach build/<variante> und liefert das bin-Verzeichnis"""
+    directory = os.path.join('build', variant)
+    dirs = [f'BIN_DIR={directory}/bin', f'OBJ_DIR={directory}/obj']
+    subprocess.run(['make', '-s', variant, *dirs, *make_args], cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+    return os.path.join(ROOT, directory, 'bin')
+
+
+def workloads(bin_dir, n, matrix_size):
+    """(Name, Funktion, Anzahl Elemente bzw. FLOP) der Messungen für die Binärdateien in bin_dir"""
+    from python.api.expression import bind_variables, compile_expression
+    from python.backend import LibraryBackend, PoolBackend
+    from python.backend.base import matrix_flops
+    from python.backend.reduction import reduce_file
+
+    trace = ('bench', 'bench', 'unset')
+    rng = random.Random(7)
+    library = LibraryBackend(os.path.join(bin_dir, 'libmath_operations.so'))
+    pool = PoolBackend(os.path.join(bin_dir, 'calculator'), size=1, log_level='OFF', transport='shm',
+                       batch_timeout=None)
+
+    a = array('d', (rng.uniform(-1e3, 1e3) for _ in range(n)))
+    b = array('d', (rng.uniform(1, 1e3) for _ in range(n)))
+    plan = compile_expression('a * b + c / (a - 2)', 64)
+    slots, length = bind_variables(plan, {'a': list(a), 'b': list(b), 'c': 3.5}, n)
+    m = array('d', (rng.random() for _ in range(matrix_size * matrix_size)))
+    for i in range(matrix_size):
+        m[i * matrix_size + i] += matrix_size
+    shape = (matrix_size,) * 3
+
+    scalar_calls = 2000
+
+    def scalar(backend):
+        def run():
+            for i in range(scalar_calls):
+                backend.calculate('div', 1.5 + i, 3.25, *trace)
+        return run
+
+    def reduce(operation):
+        return lambda: reduce_file(library, operation, path, None, n, None, *trace)
+
+    handle, path = tempfile.mkstemp(suffix='.f64')
+    with os.fdopen(handle, 'wb') as f:
+        a.tofile(f)
+
+    yield 'scalar/library', scalar(library), scalar_calls
+    yield 'scalar/pool', scalar(pool), scalar_calls
+    yield 'batch/library/add', lambda: library.calculate_batch('add', a, b, *trace), n
+    yield 'batch/library/div', lambda: library.calculate_batch('div', a, b, *trace), n
+    yield 'batch/pool/mul', lambda: pool.calculate_batch('mul', a, b, *trace), n
+    yield 'eval/library', lambda: library.evaluate(plan, slots, length, *trace), n
+    yield 'reduce/library/stats', reduce('stats'), n
+    for operation in ('matmul', 'solve'):
+        yield (f'matrix/library/{operation}', lambda operation=operation: library.matrix(operation, m, m, shape, True,
+                                                                                         *trace),
+               matrix_flops(operation, *shape))
+
+    os.unlink(path)
+    pool.close()
+
+
+def measure(bin_dir, args):
+    results = []
+    for name, function, size in workloads(bin_dir, args.size, args.matrix_size):
+        # Erster Aufruf startet den Co-Prozess bzw. legt das Segment an
+        function()
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        results.append({'workload': name, 'seconds': statistics.median(times), 'size': size})
+    return results
+
+
+def run_child(bin_dir, args):
+    with tempfile.NamedTemporaryFile('r', suffix='.json') as result:
+        command = [sys.executable, __file__, '--child-bin', bin_dir, '--child-result', result.name,
+                   '--size', str(args.size), '--matrix-size', str(args.matrix_size), '--repeat', str(args.repeat)]
+        subprocess.run(command, cwd=ROOT, check=True)
+        return json.load(result)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument('--size', type=int, default=1_000_000, help="Elemente der Array-Lasten")
+    parser.add_argument('--matrix-size', type=int, default=512)
+    parser.add_argument('--repeat', type=int, default=5, help="Messungen pro Runde")
+    parser.add_argument('--rounds', type=int, default=3, help="Runden abwechselnd über die Varianten")
+    parser.add_argument('--make-args', nargs='*', default=[], help="z.B. OPENMP=1 MARCH=x86-64-v3")
+    parser.add_argument('--output')
+    parser.add_argument('--child-bin')
+    parser.add_argument('--child-result')
+    args = parser.parse_args()
+
+    if args.child_bin:
+        with open(args.child_result, 'w') as f:
+            json.dump(measure(args.child_bin, args), f)
+        return
+
+    bin_dirs = {}
+    for variant in args.variants:
+        print(f"Baue Variante {variant} ...", file=sys.stderr)
+        bin_dirs[variant] = build(variant, args.make_args)
+
+    # Runden abwechselnd über die Varianten, damit Schwankungen der Maschine alle gleich treffen
+    rounds = {variant: {} for variant in args.variants}
+    sizes = {}
+    for _ in range(args.rounds):
+        for variant, bin_dir in bin_dirs.items():
+            for measurement in run_child(bin_dir, args):
+                rounds[variant].setdefault(measurement['workload'], []).append(measurement['seconds'])
+                sizes[measurement['workload']] = measurement['size']
+
+    results = []
+    for variant in args.variants:
+        for workload, values in rounds[variant].items():
+            median = statistics.median(values)
+            baseline = statistics.median(rounds[args.variants[0]][workload])
+            result = {'id': f'build/{variant}/{workload}', 'variant': variant, 'workload': workload,
+                      'median_ms': round(median * 1000, 4), 'speedup': round(baseline / median, 3)}
+            if workload.startswith('matrix/'):
+                result['gflop_per_s'] = round(sizes[workload] / median / 1e9, 3)
+            else:
+                result['ns_per_element'] = round(median / sizes[workload] * 1e9, 3)
+            results.append(result)
+            print(f"{variant}/{workload}: {result['median_ms']} ms, x{result['speedup']}", file=sys.stderr)
+
+    write_results(args.output, args, results)
+
+
+if __name__ == '__main__':
+    main()
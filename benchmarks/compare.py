@@ -0,0 +1,77 @@
+# benchmarks/compare.py
+#
+# Vergleicht zwei Ergebnisdateien von load_bench.py bzw. micro_bench.py (z.B. vom letzten
+# Release-Commit und vom aktuellen Stand) und meldet Regressionen: Zeiten (_ms, _us), die um
+# mehr als --threshold Prozent gestiegen, und Raten (_rps, _per_s), die um mehr als
+# --threshold Prozent gefallen sind. Exit-Code 1 bei mindestens einer Regression.
+#
+#   python benchmarks/compare.py baseline.json current.json [--threshold 10] [--metrics p99_ms throughput_rps]
+
+import argparse
+import json
+import sys
+
+TIME_SUFFIXES = ('_ms', '_us')
+RATE_SUFFIXES = ('_rps', '_per_s')
+
+
+def load(path):
+    with open(path) as f:
+        document = json.load(f)
+    return document['meta'], {result['id']: result for result in document['results']}
+
+
+def compare(baseline, current, threshold, metrics=None):
+    """Liefert pro gemeinsamer Messung und Messwert die Änderung in Prozent und ob sie eine Regression ist"""
+    rows = []
+    for result_id, old in baseline.items():
+        new = current.get(result_id)
+        if new is None:
+            continue
+        for metric, old_value in old.items():
+            if metrics and metric not in metrics:
+                continue
+            lower_is_better = metric.endswith(TIME_SUFFIXES)
+            if not (lower_is_better or metric.endswith(RATE_SUFFIXES)):
+                continue
+            new_value = new.get(metric)
+            if not old_value or new_value is None:
+                continue
+
+            change = (new_value - old_value) / old_value * 100
+            regression = change > threshold if lower_is_better else change < -threshold
+            rows.append({'id': result_id, 'metric': metric, 'baseline': old_value, 'current': new_value,
+                         'change_pct': round(change, 1), 'regression': regression})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10.0, help="Zulässige Verschlechterung in Prozent")
+    parser.add_argument('--metrics', nargs='+', help="Nur diese Messwerte vergleichen, z.B. p99_ms throughput_rps")
+    parser.add_argument('--json', action='store_true', help="Vergleich als JSON statt als Tabelle ausgeben")
+    args = parser.parse_args()
+
+    baseline_meta, baseline = load(args.baseline)
+    current_meta, current = load(args.current)
+    rows = compare(baseline, current, args.threshold, args.metrics)
+    regressions = [row for row in rows if row['regression']]
+
+    if args.json:
+        json.dump({'baseline': baseline_meta, 'current': current_meta, 'comparison': rows}, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"Basis {baseline_meta.get('commit')}, aktuell {current_meta.get('commit')}, "
+              f"{len(rows)} Messwerte, {len(regressions)} Regressionen (Schwelle {args.threshold} %)")
+        for row in rows:
+            marker = 'REGRESSION' if row['regression'] else ''
+            print(f"{row['id']:60} {row['metric']:14} {row['baseline']:>12.3f} {row['current']:>12.3f} "
+                  f"{row['change_pct']:>+8.1f} % {marker}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
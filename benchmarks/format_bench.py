@@ -0,0 +1,86 @@
+# benchmarks/format_bench.py
+#
+# Misst die Kosten der Ergebnisformate ohne Fortran-Aufruf:
+#   - Parsen der Antwort von bin/calculator im Text- und im Hex-Format (FORTRAN_RESULT_FORMAT)
+#   - Kodieren der HTTP-Antwort als JSON, NDJSON, float64-Binärformat und MessagePack
+#
+# Ergebnisse als JSON auf stdout (Median-Laufzeit und Elemente pro Sekunde).
+#
+#   python benchmarks/format_bench.py [--sizes 1000 100000 1000000] [--repeat 10]
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from array import array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from python.api.batch import encode_binary_result  # noqa: E402
+from python.api.formats import encode_msgpack, encode_ndjson, json_results  # noqa: E402
+from python.backend.base import parse_batch_output  # noqa: E402
+
+
+def calculator_output(results, statuses, result_format):
+    # Nachbau der Ausgabe von write_results in src/calculator.f90
+    lines = [f"OK {len(results)}"]
+    if result_format == 'hex':
+        values = array('d', results)
+        if sys.byteorder == 'little':
+            values.byteswap()
+        lines += [values.tobytes().hex().upper(), statuses.tobytes().hex().upper()]
+    else:
+        lines += [f"OK {value!r}" for value in results]
+    return lines
+
+
+def encoders(context):
+    return {
+        'json': lambda r, s: json.dumps(dict(context, result=json_results(r, s))),
+        'ndjson': lambda r, s: ''.join(encode_ndjson(r, s, context)),
+        'binary': encode_binary_result,
+        'msgpack': lambda r, s: encode_msgpack(dict(context, result=r, status=s)),
+    }
+
+
+def measure(function, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    context = {"trace_id": "bench", "span_id": "bench", "parent_span_id": "unset"}
+    results = []
+    for size in args.sizes:
+        values = array('d', (i / 3.0 for i in range(size)))
+        statuses = array('b', bytes(size))
+
+        for result_format in ('text', 'hex'):
+            lines = calculator_output(values, statuses, result_format)
+            duration = measure(lambda: parse_batch_output(iter(lines), size, result_format), args.repeat)
+            results.append({'stage': 'parse', 'format': result_format, 'size': size,
+                            'median_ms': duration * 1000, 'elements_per_s': size / duration})
+
+        for name, encode in encoders(context).items():
+            duration = measure(lambda: encode(values, statuses), args.repeat)
+            results.append({'stage': 'encode', 'format': name, 'size': size,
+                            'median_ms': duration * 1000, 'elements_per_s': size / duration})
+
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+# benchmarks/load_bench.py
+#
+# Lasttest der HTTP-Endpunkte mit fester Parallelität, pro Backend (subprocess, library, pool)
+# und Ausführungsart:
+#   - testclient: Flask-Test-Client im selben Prozess, misst nur Flask, Anwendung und Backend
+#   - gunicorn:   echter Gunicorn-Server über HTTP, pro Worker-Klasse (sync, gthread, asgi)
+#
+# Szenarien: /add und /div mit wechselnden Operanden, /batch/mul mit --batch-size Elementen,
+# /actuator/health und /actuator/prometheus. Pro Szenario und Parallelität werden Durchsatz
+# sowie p50/p95/p99-Latenz gemessen; der Ergebnis-Cache ist abgeschaltet.
+#
+# Der Lastgenerator läuft mit Threads im Benchmark-Prozess und teilt sich bei gunicorn die CPU
+# mit dem Server; verglichen werden sollten nur Läufe auf derselben Maschine. Die Ergebnisse
+# (Format siehe bench_results.py) gehen nach --output bzw. stdout.
+#
+#   make
+#   python benchmarks/load_bench.py [--modes testclient gunicorn] [--backends subprocess library pool]
+#          [--worker-classes sync gthread asgi] [--concurrency 1 8 32] [--duration 5] [--output load.json]
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from bench_results import ROOT, percentile, write_results
+
+BACKENDS = ('subprocess', 'library', 'pool')
+WORKER_CLASSES = ('sync', 'gthread', 'asgi')
+SCENARIOS = ('add', 'div', 'batch', 'health', 'prometheus')
+
+# Zeit bis zur Bereitschaft von Gunicorn in Sekunden
+STARTUP_TIMEOUT = 30
+
+
+def scenario_requests(name, batch_size):
+    """Liefert eine Funktion i -> (Methode, Pfad, Body, Header) für das Szenario"""
+    if name == 'add':
+        return lambda i: ('GET', f'/add?a={i}&b=2', None, {})
+    if name == 'div':
+        return lambda i: ('GET', f'/div?a={i}&b=3', None, {})
+    if name == 'batch':
+        body = json.dumps({'a': [float(i) for i in range(batch_size)],
+                           'b': [float(i % 7 + 1) for i in range(batch_size)]}).encode()
+        headers = {'Content-Type': 'application/json'}
+        return lambda i: ('POST', '/batch/mul', body, headers)
+    if name == 'health':
+        return lambda i: ('GET', '/actuator/health', None, {})
+    if name == 'prometheus':
+        return lambda i: ('GET', '/actuator/prometheus', None, {})
+    raise ValueError(f"Unbekanntes Szenario: {name}")
+
+
+def bench_environment(backend, multiproc_dir):
+    env = dict(os.environ)
+    env.update({
+        'CALCULATOR_BACKEND': backend,
+        'ENABLE_RESULT_CACHE': 'False',
+        'ENABLE_OPENTELEMETRY': 'False',
+        'ENABLE_JOBS': 'False',
+        'PROMETHEUS_MULTIPROC_DIR': multiproc_dir,
+        'PYTHONPATH': ROOT,
+    })
+    # Überlastschutz würde bei hoher Parallelität mit 429 antworten statt zu messen
+    env.setdefault('ENABLE_ADMISSION_CONTROL', 'False')
+    return env
+
+
+class TestClientSender:
+    """Sendet Requests über den Flask-Test-Client, ein Client pro Thread"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def connect(self):
+        return self.app.test_client()
+
+    def send(self, client, method, path, body, headers):
+        response = client.open(path, method=method, data=body, headers=headers)
+        response.get_data()
+        return response.status_code
+
+    def close(self, client):
+        pass
+
+
+class HttpSender:
+    """Sendet Requests per HTTP/1.1 mit Keep-Alive, eine Verbindung pro Thread"""
+
+    def __init__(self, port):
+        self.port = port
+
+    def connect(self):
+        return http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+
+    def send(self, connection, method, path, body, headers):
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            # Verbindung vom Server geschlossen, beim nächsten Request neu aufbauen
+            connection.close()
+            return None
+
+    def close(self, connection):
+        connection.close()
+
+
+def run_load(sender, make_request, concurrency, duration, warmup):
+    """Lässt concurrency Threads für duration Sekunden Requests senden und wertet die Latenzen aus"""
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    counter = iter(range(1 << 62))
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+    measure_from = measure_until = 0.0
+
+    def worker(slot):
+        client = sender.connect()
+        try:
+            barrier.wait()
+            while True:
+                with lock:
+                    i = next(counter)
+                start = time.perf_counter()
+                if start >= measure_until:
+                    break
+                status = sender.send(client, *make_request(i))
+                end = time.perf_counter()
+                # Nur Requests zählen, die vollständig im Messfenster nach der Aufwärmphase liegen
+                if start >= measure_from and end <= measure_until:
+                    latencies[slot].append(end - start)
+                    if status is None or status >= 500:
+                        errors[slot] += 1
+        finally:
+            sender.close(client)
+
+    threads = [threading.Thread(target=worker, args=(slot,), daemon=True) for slot in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    measure_from = time.perf_counter() + warmup
+    measure_until = measure_from + duration
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+
+    merged = sorted(latency for values in latencies for latency in values)
+    return {
+        'requests': len(merged),
+        'errors': sum(errors),
+        'throughput_rps': len(merged) / duration,
+        'p50_ms': _ms(percentile(merged, 0.50)),
+        'p95_ms': _ms(percentile(merged, 0.95)),
+        'p99_ms': _ms(percentile(merged, 0.99)),
+    }
+
+
+def run_scenarios(sender, args, mode, backend, worker_class):
+    results = []
+    for scenario in args.scenarios:
+        make_request = scenario_requests(scenario, args.batch_size)
+        for concurrency in args.concurrency:
+            result = run_load(sender, make_request, concurrency, args.duration, args.warmup)
+            results.append(dict({
+                'id': f'load/{mode}/{backend}/{worker_class}/{scenario}/c{concurrency}',
+                'mode': mode,
+                'backend': backend,
+                'worker_class': worker_class,
+                'scenario': scenario,
+                'concurrency': concurrency,
+            }, **result))
+            print(f"{results[-1]['id']}: {result['throughput_rps']:.0f} req/s, p99 {result['p99_ms']} ms",
+                  file=sys.stderr)
+    return results
+
+
+def run_testclient(backend, args):
+    # Die Konfiguration wird beim Import gelesen, daher ein eigener Prozess pro Backend
+    with tempfile.NamedTemporaryFile('r', suffix='.json') as result:
+        env = bench_environment(backend, tempfile.mkdtemp(prefix='load-bench-'))
+        command = [sys.executable, __file__, '--child-backend', backend, '--child-result', result.name]
+        command += _forwarded_args(args)
+        if subprocess.run(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL).returncode != 0:
+            raise RuntimeError(f"Benchmark-Prozess für Backend {backend} fehlgeschlagen")
+        return json.load(result)
+
+
+def run_gunicorn(backend, worker_class, args):
+    port = _free_port()
+    env = bench_environment(backend, tempfile.mkdtemp(prefix='load-bench-'))
+    env['WORKERS'] = str(args.workers)
+    if worker_class == 'asgi':
+        env['SERVER_MODE'] = 'asgi'
+    else:
+        env['SERVER_MODE'] = 'wsgi'
+        env['WORKER_CLASS'] = worker_class
+
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_ready(port, server)
+        return run_scenarios(HttpSender(port), args, 'gunicorn', backend, worker_class)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def _wait_ready(port, server):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Gunicorn beendet mit Exit-Code {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/actuator/health/readiness')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Gunicorn nach {STARTUP_TIMEOUT} s nicht bereit")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _forwarded_args(args):
+    return ['--scenarios', *args.scenarios, '--concurrency', *map(str, args.concurrency),
+            '--duration', str(args.duration), '--warmup', str(args.warmup), '--batch-size', str(args.batch_size)]
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modes', nargs='+', choices=('testclient', 'gunicorn'), default=['testclient', 'gunicorn'])
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--worker-classes', nargs='+', choices=WORKER_CLASSES, default=['sync', 'gthread'])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--duration', type=float, default=5.0, help="Messdauer pro Szenario in Sekunden")
+    parser.add_argument('--warmup', type=float, default=1.0, help="Aufwärmphase pro Szenario in Sekunden")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Gunicorn-Worker")
+    parser.add_argument('--output')
+    parser.add_argument('--child-backend')
+    parser.add_argument('--child-result')
+    args = parser.parse_args()
+
+    if args.child_backend:
+        from python.wsgi import app
+        results = run_scenarios(TestClientSender(app), args, 'testclient', args.child_backend, 'testclient')
+        with open(args.child_result, 'w') as f:
+            json.dump(results, f)
+        return
+
+    results = []
+    for backend in args.backends:
+        if 'testclient' in args.modes:
+            results += run_testclient(backend, args)
+        if 'gunicorn' in args.modes:
+            for worker_class in args.worker_classes:
+                results += run_gunicorn(backend, worker_class, args)
+
+    write_results(args.output, args, results)
+
+
+if __name__ == '__main__':
+    main()
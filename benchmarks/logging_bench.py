@@ -0,0 +1,134 @@
+# benchmarks/logging_bench.py
+#
+# Vergleicht synchrones und asynchrones JSON-Logging:
+#   - Records pro Sekunde (Aufrufer-Seite und inkl. Schreiben)
+#   - p50/p99-Latenz von /add über den Flask-Test-Client, verglichen mit abgeschaltetem Logging
+#
+# Jede Variante läuft in einem eigenen Prozess, da die Log-Konfiguration beim Import gelesen wird.
+# Die Log-Ausgabe geht nach /dev/null oder (--sink slow) in eine Pipe, die wie ein überlasteter
+# Log-Collector nur gedrosselt gelesen wird. Die Ergebnisse werden als JSON ausgegeben.
+#
+#   python benchmarks/logging_bench.py [--records 100000] [--requests 5000] [--sink slow]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    'off': {'LOG_ASYNC': 'False'},
+    'sync': {'LOG_ASYNC': 'False'},
+    'async': {'LOG_ASYNC': 'True'},
+    'async+sampling': {'LOG_ASYNC': 'True', 'LOG_SAMPLING': 'INFO=0.1'},
+}
+
+
+def bench_records(count):
+    from python.logging_config import _async_logging, setup_logger
+
+    logger = setup_logger("benchmark")
+    extra = {'trace_id': '0' * 32, 'span_id': '0' * 16, 'parent_span_id': 'unset'}
+
+    start = time.perf_counter()
+    for i in range(count):
+        logger.info("add-Operation gestartet mit a=%s, b=%s", float(i), 2.0, extra=extra)
+    emitted = time.perf_counter() - start
+
+    # Im asynchronen Modus zusätzlich warten, bis der Listener alles geschrieben hat
+    _async_logging.stop()
+    drained = time.perf_counter() - start
+
+    # Bei voller Queue verworfene Records
+    dropped = sum(handler.dropped for handler in _async_logging.handlers)
+    return {'records': count, 'dropped': dropped, 'emit_per_sec': count / emitted, 'total_per_sec': count / drained}
+
+
+def bench_requests(count, logging_enabled):
+    import logging
+
+    from python.wsgi import app
+
+    if not logging_enabled:
+        logging.disable(logging.CRITICAL)
+
+    client = app.test_client()
+    for _ in range(100):
+        client.get('/add?a=1&b=2')
+
+    latencies = []
+    for i in range(count):
+        # Wechselnde Operanden, damit der Ergebnis-Cache nicht greift
+        start = time.perf_counter()
+        client.get(f'/add?a={i}&b=2')
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    return {
+        'requests': count,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def drain_slowly(pipe, chunk_size, pause):
+    # Simuliert einen langsamen Log-Collector, der stdout nur gedrosselt liest
+    while os.read(pipe.fileno(), chunk_size):
+        time.sleep(pause)
+
+
+def run_child(mode, args):
+    with tempfile.NamedTemporaryFile('r', suffix='.json') as result:
+        env = dict(os.environ, **MODES[mode])
+        env.setdefault('ENABLE_OPENTELEMETRY', 'False')
+        env.setdefault('ENABLE_RESULT_CACHE', 'False')
+        env.setdefault('PROMETHEUS_MULTIPROC_DIR', tempfile.mkdtemp(prefix='logging-bench-'))
+        env['PYTHONPATH'] = ROOT
+        process = subprocess.Popen(
+            [sys.executable, __file__, '--child', mode, '--result', result.name,
+             '--records', str(args.records), '--requests', str(args.requests)],
+            cwd=ROOT, env=env, stdout=subprocess.PIPE if args.sink == 'slow' else subprocess.DEVNULL
+        )
+        if args.sink == 'slow':
+            reader = threading.Thread(target=drain_slowly, args=(process.stdout, 4096, 0.001), daemon=True)
+            reader.start()
+        if process.wait() != 0:
+            raise RuntimeError(f"Benchmark-Prozess für {mode} fehlgeschlagen")
+        return json.load(result)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--sink', choices=('devnull', 'slow'), default='devnull',
+                        help="Ziel der Log-Ausgabe: /dev/null oder ein gedrosselt gelesener Pipe")
+    parser.add_argument('--child')
+    parser.add_argument('--result')
+    args = parser.parse_args()
+
+    if args.child:
+        result = {'requests': bench_requests(args.requests, args.child != 'off')}
+        if args.child != 'off':
+            result['logging'] = bench_records(args.records)
+        with open(args.result, 'w') as f:
+            json.dump(result, f)
+        return
+
+    results = {mode: run_child(mode, args) for mode in MODES}
+    baseline = results['off']['requests']['p99_ms']
+    for mode, result in results.items():
+        result['requests']['added_p99_ms'] = result['requests']['p99_ms'] - baseline
+
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
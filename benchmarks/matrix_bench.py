@@ -0,0 +1,107 @@
+# benchmarks/matrix_bench.py
+#
+# Misst die Matrixoperationen (matmul, transpose, elementweise, solve) über quadratische Matrizen
+# von 64 bis 4096 Zeilen, pro Backend. Berichtet werden die Rechenzeit in Fortran (ohne Übertragung)
+# mit den daraus folgenden FLOP/s sowie die Gesamtzeit des Backend-Aufrufs; der Unterschied ist der
+# Aufwand für das Kopieren in und aus dem Shared-Memory-Segment bzw. den Prozessstart. Gemessen wird
+# der Median über --repeat Aufrufe, Matrizen ab --single-above Zeilen werden nur einmal gerechnet.
+# Ergebnisse (Format siehe bench_results.py) nach --output bzw. stdout.
+#
+#   make                      (bzw. make openmp für die parallelen Blöcke)
+#   python benchmarks/matrix_bench.py [--backends library pool] [--sizes 64 256 1024] [--repeat 5]
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from array import array
+
+from bench_results import ROOT, write_results
+
+sys.path.insert(0, ROOT)
+
+from python.backend import LibraryBackend, PoolBackend, SubprocessBackend  # noqa: E402
+from python.backend.base import MATRIX_OPERATIONS, matrix_flops  # noqa: E402
+
+CALCULATOR = os.path.join(ROOT, 'bin', 'calculator')
+LIBRARY = os.path.join(ROOT, 'bin', 'libmath_operations.so')
+
+BACKENDS = ('library', 'subprocess', 'pool')
+
+
+def create_backend(name, threads):
+    if name == 'library':
+        return LibraryBackend(LIBRARY, threads=threads)
+    if name == 'pool':
+        return PoolBackend(CALCULATOR, size=1, log_level='OFF', threads=threads, batch_timeout=None)
+    return SubprocessBackend(CALCULATOR, log_level='OFF', threads=threads, batch_timeout=None)
+
+
+def operands(size):
+    rng = random.Random(size)
+    a = array('d', (rng.random() for _ in range(size * size)))
+    b = array('d', (rng.random() + 0.5 for _ in range(size * size)))
+    # Diagonal dominant, damit solve ohne Nullpivot durchläuft
+    for i in range(size):
+        a[i * size + i] += size
+    return a, b
+
+
+def measure(backend, operation, a, b, size, repeat):
+    shape = (size, size, size)
+    fortran, total = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, _, seconds = backend.matrix(operation, a, None if operation == 'transpose' else b, shape, True,
+                                       'bench', 'bench', 'unset')
+        total.append(time.perf_counter() - start)
+        fortran.append(seconds)
+    return statistics.median(fortran), statistics.median(total)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--operations', nargs='+', choices=MATRIX_OPERATIONS, default=list(MATRIX_OPERATIONS))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[64, 128, 256, 512, 1024, 2048, 4096])
+    parser.add_argument('--threads', type=int, default=0, help="OpenMP-Threads (0 = Vorgabe von OMP_NUM_THREADS)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--single-above', type=int, default=1024,
+                        help="Matrizen mit mehr Zeilen werden nur einmal gerechnet")
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        a, b = operands(size)
+        repeat = 1 if size > args.single_above else args.repeat
+        for name in args.backends:
+            backend = create_backend(name, args.threads)
+            for operation in args.operations:
+                # Erster Aufruf startet den Co-Prozess bzw. legt das Segment an
+                if repeat > 1:
+                    backend.matrix(operation, a, b, (size, size, size), True, 'bench', 'bench', 'unset')
+                fortran, total = measure(backend, operation, a, b, size, repeat)
+                flops = matrix_flops(operation, size, size, size)
+                result = {
+                    'id': f'matrix/{name}/{operation}/{size}',
+                    'backend': name,
+                    'operation': operation,
+                    'size': size,
+                    'fortran_ms': round(fortran * 1000, 3),
+                    'call_ms': round(total * 1000, 3),
+                    'gflop_per_s': round(flops / fortran / 1e9, 3) if flops and fortran > 0 else None,
+                }
+                results.append(result)
+                print(f"{name}/{operation}/{size}: Fortran {result['fortran_ms']} ms, Aufruf {result['call_ms']} ms, "
+                      f"{result['gflop_per_s']} GFLOP/s", file=sys.stderr)
+            if isinstance(backend, PoolBackend):
+                backend.close()
+
+    write_results(args.output, args, results)
+
+
+if __name__ == '__main__':
+    main()
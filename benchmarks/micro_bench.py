@@ -0,0 +1,112 @@
+# benchmarks/micro_bench.py
+#
+# Micro-Benchmarks der Pfade, die jeder Request durchläuft, ohne HTTP und ohne Fortran-Aufruf:
+#   - extract_trace_context mit W3C-, B3- und Jaeger-Headern sowie ohne Trace-Header
+#   - SpringBootJsonFormatter.format für einen Record mit Trace-Kontext und einen mit Exception
+#   - Scrape-Pfad: Rendern der Prometheus- und OpenMetrics-Ausgabe, mit und ohne Scrape-Cache,
+#     sowie /actuator/prometheus über den Flask-Test-Client
+#
+# Pro Fall wird die Median-Zeit pro Aufruf über --repeat Runden ausgegeben (Format siehe
+# bench_results.py) nach --output bzw. stdout.
+#
+#   python benchmarks/micro_bench.py [--repeat 7] [--output micro.json]
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from bench_results import ROOT, write_results
+
+os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='micro-bench-')
+os.environ.setdefault('ENABLE_OPENTELEMETRY', 'False')
+os.environ.setdefault('ENABLE_RESULT_CACHE', 'False')
+os.environ.setdefault('CALCULATOR_BACKEND', 'library')
+sys.path.insert(0, ROOT)
+
+from python.logging_config import SpringBootJsonFormatter, extract_trace_context  # noqa: E402
+from python.metrics import ScrapeCache  # noqa: E402
+
+TRACE_HEADERS = {
+    'w3c': {'traceparent': '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'},
+    'b3': {'X-B3-TraceId': '4bf92f3577b34da6a3ce929d0e0e4736', 'X-B3-SpanId': '00f067aa0ba902b7'},
+    'jaeger': {'uber-trace-id': '4bf92f3577b34da6a3ce929d0e0e4736:00f067aa0ba902b7:0:1'},
+    'none': {'Accept': 'application/json'},
+}
+
+
+def measure(function, iterations, repeat):
+    """Median-Zeit pro Aufruf in Sekunden über repeat Runden mit je iterations Aufrufen"""
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        rounds.append((time.perf_counter() - start) / iterations)
+    return statistics.median(rounds)
+
+
+def log_records():
+    extra = {'trace_id': '4bf92f3577b34da6a3ce929d0e0e4736', 'span_id': '00f067aa0ba902b7', 'parent_span_id': 'unset'}
+    record = logging.getLogger('calculator-api').makeRecord(
+        'calculator-api', logging.INFO, __file__, 1, "add-Operation erfolgreich: %s + %s = %s",
+        (1.0, 2.0, 3.0), None, extra=extra)
+    try:
+        raise ZeroDivisionError("Division durch Null nicht erlaubt")
+    except ZeroDivisionError:
+        exc_record = logging.getLogger('calculator-api').makeRecord(
+            'calculator-api', logging.ERROR, __file__, 1, "Fehler bei der Berechnung", (), sys.exc_info(),
+            extra=extra)
+    return {'trace': record, 'exception': exc_record}
+
+
+def cases(iterations):
+    """(Name, Funktion, Iterationen pro Runde) aller Micro-Benchmarks"""
+    for name, headers in TRACE_HEADERS.items():
+        yield f'trace_context/{name}', lambda headers=headers: extract_trace_context(headers), iterations
+
+    formatter = SpringBootJsonFormatter()
+    for name, record in log_records().items():
+        yield f'log_format/{name}', lambda record=record: formatter.format(record), iterations
+
+    # Die Metrik-Dateien mit einigen Requests befüllen, damit der Scrape realistische Größe hat
+    from python.wsgi import app
+    client = app.test_client()
+    for i in range(200):
+        client.get(f'/add?a={i}&b=2')
+        client.get(f'/div?a={i}&b={i % 3}')
+
+    uncached = ScrapeCache(ttl=0)
+    cached = ScrapeCache(ttl=3600)
+    scrapes = max(1, iterations // 100)
+    yield 'scrape/prometheus', lambda: uncached.render(False), scrapes
+    yield 'scrape/openmetrics', lambda: uncached.render(True), scrapes
+    yield 'scrape/cached', lambda: cached.render(False), iterations
+    yield 'scrape/endpoint', lambda: client.get('/actuator/prometheus').get_data(), scrapes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=10000, help="Aufrufe pro Runde (Scrape: 1/100 davon)")
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    # Log-Ausgabe der Anwendung würde die Messung der Requests im Scrape-Fall dominieren
+    logging.disable(logging.CRITICAL)
+
+    results = []
+    for name, function, iterations in cases(args.iterations):
+        function()
+        duration = measure(function, iterations, args.repeat)
+        results.append({'id': f'micro/{name}', 'median_us': round(duration * 1e6, 3)})
+        print(f"{name}: {duration * 1e6:.2f} us", file=sys.stderr)
+
+    write_results(args.output, args, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/omp_scaling.py
+#
+# Misst die Skalierung der Array-Kernel (calc_*_array) über die Anzahl der OpenMP-Threads.
+# Setzt eine mit "make openmp" gebaute Shared Library voraus; ohne OpenMP bleibt max_threads 1
+# und alle Messungen laufen in einem Thread.
+#
+# Pro Operation, Array-Länge und Thread-Anzahl werden Median-Laufzeit, Durchsatz
+# (Elemente/s, Speicherbandbreite für a, b, Ergebnis und Status) und Speedup gegenüber
+# einem Thread ausgegeben. Ergebnisse als JSON auf stdout.
+#
+#   make openmp
+#   python benchmarks/omp_scaling.py [--threads 1 2 4 8] [--sizes 10000 1000000] [--repeat 20]
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from array import array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from python.backend.library import LibraryBackend  # noqa: E402
+
+# Bytes pro Element: a, b und Ergebnis als float64, Status als int8
+BYTES_PER_ELEMENT = 3 * 8 + 1
+
+
+def measure(backend, operation, a, b, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        backend.calculate_batch(operation, a, b, 'bench', 'bench', 'unset')
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--library', default=os.path.join(ROOT, 'bin', 'libmath_operations.so'))
+    parser.add_argument('--threads', type=int, nargs='+',
+                        default=sorted({1 << i for i in range(cores.bit_length())} | {cores}))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--operations', nargs='+', default=['add', 'div'])
+    parser.add_argument('--threshold', type=int, default=1,
+                        help='Parallel-Schwelle der Kernel während der Messung (1 = immer parallel)')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    backend = LibraryBackend(args.library, parallel_threshold=args.threshold)
+    results = {'cores': cores, 'max_threads': backend.threads, 'threshold': args.threshold, 'runs': []}
+
+    for size in args.sizes:
+        a = array('d', (float(i % 1000) + 1.0 for i in range(size)))
+        # Ohne Nulldivisoren, damit das NaN-Markieren in Python die Messung nicht überdeckt
+        b = array('d', (float(i % 7) + 0.5 for i in range(size)))
+        for operation in args.operations:
+            baseline = None
+            for threads in args.threads:
+                backend.set_threads(threads)
+                backend.calculate_batch(operation, a, b, 'bench', 'bench', 'unset')  # Thread-Pool aufwärmen
+                duration = measure(backend, operation, a, b, args.repeat)
+                baseline = baseline or duration
+                results['runs'].append({
+                    'operation': operation,
+                    'size': size,
+                    'threads': threads,
+                    'effective_threads': backend.threads,
+                    'median_ms': duration * 1000,
+                    'elements_per_s': size / duration,
+                    'gb_per_s': size * BYTES_PER_ELEMENT / duration / 1e9,
+                    'speedup': baseline / duration,
+                })
+
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
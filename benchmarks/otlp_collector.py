@@ -0,0 +1,154 @@
+# benchmarks/otlp_collector.py
+#
+# Lokaler Ersatz für einen OpenTelemetry-Collector zum Testen ohne Netzwerk: nimmt OTLP-Exporte
+# über HTTP (POST /v1/traces, Standard-Port 4318) und, falls grpcio installiert ist, über gRPC
+# (Standard-Port 4317) an, bestätigt sie und zählt Exporte, Bytes und Spans. Die Spans werden nur
+# gezählt, wenn opentelemetry-proto installiert ist (kommt mit den OTLP-Exportern).
+#
+# Statistik als JSON unter GET /stats bzw. beim Beenden auf stdout.
+#
+#   python benchmarks/otlp_collector.py [--http-port 4318] [--grpc-port 4317]
+#   TRACE_EXPORTER=otlp-http TRACE_EXPORTER_ENDPOINT=http://localhost:4318/v1/traces poetry run gunicorn ...
+
+import argparse
+import gzip
+import importlib.util
+import json
+import sys
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+except ImportError:
+    ExportTraceServiceRequest = None
+
+GRPC_SERVICE = 'opentelemetry.proto.collector.trace.v1.TraceService'
+
+
+class CollectorStats:
+    def __init__(self):
+        self.exports = 0
+        self.bytes = 0
+        self.spans = 0
+        self._lock = threading.Lock()
+
+    def record(self, payload):
+        spans = _count_spans(payload)
+        with self._lock:
+            self.exports += 1
+            self.bytes += len(payload)
+            self.spans += spans
+
+    def snapshot(self):
+        with self._lock:
+            return {'exports': self.exports, 'bytes': self.bytes,
+                    'spans': self.spans if ExportTraceServiceRequest is not None else None}
+
+
+class StandInCollector:
+    """OTLP-Empfänger in Hintergrund-Threads; Port 0 wählt einen freien Port, None schaltet ihn ab"""
+
+    def __init__(self, http_port=4318, grpc_port=None, host='127.0.0.1'):
+        self.stats = CollectorStats()
+        self.http_port = None
+        self.grpc_port = None
+        self._http = None
+        self._grpc = None
+
+        if http_port is not None:
+            self._http = ThreadingHTTPServer((host, http_port), _handler(self.stats))
+            self._http.daemon_threads = True
+            self.http_port = self._http.server_address[1]
+            threading.Thread(target=self._http.serve_forever, daemon=True).start()
+
+        if grpc_port is not None:
+            import grpc
+
+            def export(payload, context):
+                self.stats.record(payload)
+                # Leere ExportTraceServiceResponse
+                return b''
+
+            handler = grpc.method_handlers_generic_handler(GRPC_SERVICE, {
+                'Export': grpc.unary_unary_rpc_method_handler(export),
+            })
+            self._grpc = grpc.server(ThreadPoolExecutor(4), handlers=(handler,))
+            self.grpc_port = self._grpc.add_insecure_port(f'{host}:{grpc_port}')
+            self._grpc.start()
+
+    def stop(self):
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+        if self._grpc is not None:
+            self._grpc.stop(None)
+
+
+def _handler(stats):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.headers.get('Content-Encoding') == 'gzip':
+                payload = gzip.decompress(payload)
+            elif self.headers.get('Content-Encoding') == 'deflate':
+                payload = zlib.decompress(payload)
+            if self.path != '/v1/traces':
+                self.send_response(404)
+                self.end_headers()
+                return
+            stats.record(payload)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-protobuf')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def do_GET(self):
+            body = json.dumps(stats.snapshot()).encode()
+            self.send_response(200 if self.path == '/stats' else 404)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def _count_spans(payload):
+    if ExportTraceServiceRequest is None:
+        return 0
+    request = ExportTraceServiceRequest()
+    request.ParseFromString(payload)
+    return sum(len(scope.spans) for resource in request.resource_spans for scope in resource.scope_spans)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--http-port', type=int, default=4318)
+    parser.add_argument('--grpc-port', type=int, default=4317, help="-1 = kein gRPC")
+    args = parser.parse_args()
+
+    grpc_port = args.grpc_port if args.grpc_port >= 0 else None
+    if importlib.util.find_spec('grpc') is None:
+        print("grpcio nicht installiert, nur OTLP über HTTP", file=sys.stderr)
+        grpc_port = None
+
+    collector = StandInCollector(args.http_port, grpc_port, host='0.0.0.0')
+    print(f"OTLP-Ersatz-Collector: HTTP {collector.http_port}, gRPC {collector.grpc_port}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.stop()
+        json.dump(collector.stats.snapshot(), sys.stdout)
+        print()
+
+
+if __name__ == '__main__':
+    main()
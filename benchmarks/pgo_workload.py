@@ -0,0 +1,117 @@
+# benchmarks/pgo_workload.py
+#
+# Trainingslast für die profilgesteuerte Optimierung (make pgo): ruft die instrumentierten
+# Binärdateien über dieselben Backends auf wie die Anwendung, d.h. die Shared Library über ctypes
+# sowie das Calculator-Programm als Co-Prozess (Text- und Shared-Memory-Transport) und als
+# Subprozess. Die Mischung folgt dem üblichen Verkehr: viele Skalar-Aufrufe, Batches und Ausdrücke
+# verschiedener Größe, dazu Reduktionen und Matrixoperationen. Die Profile schreiben die Programme
+# beim Beenden, die Bibliothek beim Ende dieses Prozesses.
+#
+#   python benchmarks/pgo_workload.py --calculator bin/calculator --library bin/libmath_operations.so
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+from array import array
+
+from bench_results import ROOT
+
+sys.path.insert(0, ROOT)
+
+from python.api.expression import bind_variables, compile_expression  # noqa: E402
+from python.backend import LibraryBackend, OperationError, PoolBackend, SubprocessBackend  # noqa: E402
+from python.backend.base import MATRIX_OPERATIONS, OPERATIONS  # noqa: E402
+from python.backend.reduction import REDUCTIONS, reduce_file  # noqa: E402
+
+EXPRESSIONS = ('a * b + c', '(a - b) / (c + 1)', 'a * a + b * b * c', 'a / b - c * 2')
+TRACE = ('pgo', 'pgo', 'unset')
+
+
+def operands(rng, n):
+    # Ohne Nullen: seltene Nulldivisoren im Profil lassen GCC die Verzweigung in divide behalten statt
+    # die Schleife zu vektorisieren; den Fehlerpfad trainieren die Skalar-Aufrufe
+    a = array('d', (rng.uniform(-1e3, 1e3) for _ in range(n)))
+    b = array('d', (rng.uniform(-1e3, 1e3) for _ in range(n)))
+    return a, b
+
+
+def scalar(backend, rng, count):
+    for _ in range(count):
+        operation = rng.choice(OPERATIONS)
+        try:
+            backend.calculate(operation, rng.uniform(-1e6, 1e6), rng.choice((0.0, rng.uniform(-1e3, 1e3))), *TRACE)
+        except OperationError:
+            pass
+
+
+def arrays(backend, rng, sizes):
+    for n in sizes:
+        a, b = operands(rng, n)
+        for operation in OPERATIONS:
+            backend.calculate_batch(operation, a, b, *TRACE)
+        for expression in EXPRESSIONS:
+            plan = compile_expression(expression, 64)
+            slots, length = bind_variables(plan, {'a': list(a), 'b': list(b), 'c': rng.uniform(1, 10)}, n)
+            backend.evaluate(plan, slots, length, *TRACE)
+
+
+def reductions(backend, path, other, n):
+    for operation in REDUCTIONS:
+        reduce_file(backend, operation, path, other if operation == 'dot' else None, max(n // 8, 1), None, *TRACE)
+
+
+def matrices(backend, rng, sizes):
+    for size in sizes:
+        a = array('d', (rng.random() for _ in range(size * size)))
+        b = array('d', (rng.random() + 0.5 for _ in range(size * size)))
+        # Diagonal dominant, damit solve ohne Nullpivot durchläuft
+        for i in range(size):
+            a[i * size + i] += size
+        for operation in MATRIX_OPERATIONS:
+            for row_major in (True, False):
+                backend.matrix(operation, a, None if operation == 'transpose' else b, (size, size, size), row_major,
+                               *TRACE)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calculator', default=os.path.join(ROOT, 'bin', 'calculator'))
+    parser.add_argument('--library', default=os.path.join(ROOT, 'bin', 'libmath_operations.so'))
+    parser.add_argument('--scale', type=float, default=1.0, help="Faktor für die Anzahl der Aufrufe")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    scale = args.scale
+    sizes = [16, 256, 4096, 65536, 262144]
+    reduce_size = 1 << 20
+
+    library = LibraryBackend(args.library)
+    pools = [PoolBackend(args.calculator, size=1, log_level='OFF', transport=transport)
+             for transport in ('text', 'shm')]
+    subprocess_backend = SubprocessBackend(args.calculator, log_level='OFF')
+
+    with tempfile.TemporaryDirectory(prefix='pgo-') as directory:
+        path, other = os.path.join(directory, 'a.f64'), os.path.join(directory, 'b.f64')
+        for name in (path, other):
+            with open(name, 'wb') as f:
+                array('d', (rng.uniform(-1, 1) for _ in range(reduce_size))).tofile(f)
+
+        for backend in (library, *pools):
+            scalar(backend, rng, int(20000 * scale))
+            arrays(backend, rng, sizes if backend is library or backend.transport == 'shm' else sizes[:3])
+            reductions(backend, path, other, reduce_size)
+            matrices(backend, rng, (8, 64, 256))
+
+        # Jeder Aufruf startet das Programm neu, daher nur wenige
+        scalar(subprocess_backend, rng, int(50 * scale))
+        arrays(subprocess_backend, rng, sizes[:2])
+
+    for pool in pools:
+        pool.close()
+    print(f"Trainingslast abgeschlossen: {args.calculator}, {args.library}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+# benchmarks/request_bench.py
+#
+# Micro-Benchmark des Python-Pfads eines Requests ohne Fortran: das Backend wird durch einen Stub
+# ersetzt, der sofort antwortet, und die Requests gehen direkt an die WSGI-Anwendung (ohne
+# HTTP-Server und ohne Test-Client). Gemessen wird die Zeit pro Request in Mikrosekunden für die
+# Rechen-Endpunkte mit und ohne Trace-Header, die Fehlerpfade und /actuator/health, dazu eine
+# leere Flask-Anwendung als Untergrenze des Frameworks; overhead_us ist die Differenz dazu.
+# Ergebnisse (Format siehe bench_results.py) nach --output bzw. stdout.
+#
+#   python benchmarks/request_bench.py [--iterations 2000] [--repeat 7] [--output request.json]
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from array import array
+
+from bench_results import ROOT, write_results
+
+os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='request-bench-')
+os.environ.setdefault('ENABLE_OPENTELEMETRY', 'False')
+os.environ.setdefault('ENABLE_RESULT_CACHE', 'False')
+os.environ.setdefault('ENABLE_WARMUP', 'False')
+os.environ.setdefault('ENABLE_JOBS', 'False')
+sys.path.insert(0, ROOT)
+
+from flask import Flask  # noqa: E402
+from werkzeug.test import EnvironBuilder  # noqa: E402
+
+import python.api.routes as routes  # noqa: E402
+from python.backend import OperationError  # noqa: E402
+
+TRACEPARENT = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+
+
+class StubBackend:
+    """Backend ohne Fortran: Ergebnisse sofort, Division durch Null wie das echte Backend"""
+
+    name = 'stub'
+
+    def calculate(self, operation, a, b, trace_id, span_id, parent_span_id):
+        if operation == 'div' and b == 0:
+            raise OperationError("Fehler: Division durch Null nicht erlaubt")
+        return a + b
+
+    def calculate_batch(self, operation, a, b, trace_id, span_id, parent_span_id):
+        return array('d', a), array('b', bytes(len(a)))
+
+
+def create_app():
+    # Der Stub wird anstelle des konfigurierten Backends in die Routen gereicht
+    routes.create_backend = lambda config: StubBackend()
+    from python.wsgi import create_app as create_calculator_app
+    return create_calculator_app()
+
+
+def create_empty_app():
+    app = Flask(__name__)
+
+    @app.route('/add')
+    def add():
+        return '{}'
+
+    return app
+
+
+def requests():
+    """(Name, Pfad, Methode, Header, JSON-Body) der gemessenen Requests"""
+    batch = {'a': [float(i) for i in range(16)], 'b': [1.0] * 16}
+    yield 'add', '/add?a=1&b=2', 'GET', {}, None
+    yield 'add/traceparent', '/add?a=1&b=2', 'GET', {'traceparent': TRACEPARENT}, None
+    yield 'div/zero', '/div?a=1&b=0', 'GET', {}, None
+    yield 'add/missing', '/add?a=1', 'GET', {}, None
+    yield 'batch/16', '/batch/add', 'POST', {'traceparent': TRACEPARENT}, batch
+    yield 'health', '/actuator/health', 'GET', {}, None
+
+
+def request_function(app, path, method, headers, body):
+    environ = EnvironBuilder(path=path, method=method, headers=headers,
+                             data=json.dumps(body) if body is not None else None,
+                             content_type='application/json' if body is not None else None).get_environ()
+    payload = environ['wsgi.input'].read()
+    statuses = []
+
+    def start_response(status, response_headers, exc_info=None):
+        statuses.append(status)
+
+    def run():
+        request_environ = dict(environ)
+        request_environ['wsgi.input'] = _Input(payload)
+        for _ in app(request_environ, start_response):
+            pass
+
+    run()
+    return run, statuses[0]
+
+
+class _Input:
+    # Minimaler Ersatz für io.BytesIO, der bei jedem Request neu angelegt wird
+    def __init__(self, payload):
+        self.payload = payload
+
+    def read(self, size=-1):
+        payload, self.payload = self.payload, b''
+        return payload
+
+    def readline(self, size=-1):
+        return self.read()
+
+
+def measure(function, iterations, repeat):
+    """Median-Zeit pro Aufruf in Sekunden über repeat Runden mit je iterations Aufrufen"""
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        rounds.append((time.perf_counter() - start) / iterations)
+    return statistics.median(rounds)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    # Log-Ausgabe würde die Messung dominieren
+    logging.disable(logging.CRITICAL)
+
+    floor_function, _ = request_function(create_empty_app(), '/add', 'GET', {}, None)
+    floor = measure(floor_function, args.iterations, args.repeat)
+    results = [{'id': 'request/flask-floor', 'median_us': round(floor * 1e6, 3)}]
+    print(f"flask-floor: {floor * 1e6:.2f} us", file=sys.stderr)
+
+    app = create_app()
+    for name, path, method, headers, body in requests():
+        function, status = request_function(app, path, method, headers, body)
+        duration = measure(function, args.iterations, args.repeat)
+        results.append({
+            'id': f'request/{name}',
+            'status': status,
+            'median_us': round(duration * 1e6, 3),
+            'overhead_us': round((duration - floor) * 1e6, 3),
+        })
+        print(f"{name} ({status}): {duration * 1e6:.2f} us, über Flask {(duration - floor) * 1e6:.2f} us",
+              file=sys.stderr)
+
+    write_results(args.output, args, results)
+
+
+if __name__ == '__main__':
+    main()
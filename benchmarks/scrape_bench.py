@@ -0,0 +1,119 @@
+# benchmarks/scrape_bench.py
+#
+# Misst die Dauer eines Prometheus-Scrapes im Multiprozess-Modus abhängig von der Anzahl
+# der Worker-Dateien in PROMETHEUS_MULTIPROC_DIR:
+#   - legacy:    MultiProcessCollector an der Registry der Live-Metriken (bisheriges Verhalten)
+#   - scrape:    eigene Scrape-Registry nur mit dem MultiProcessCollector
+#   - compacted: wie scrape, nachdem die Dateien beendeter Worker verdichtet wurden
+#   - cached:    wie compacted, mit Scrape-Cache
+#
+# Die Worker-Dateien werden erzeugt, indem die Dateien eines mit typischen Werten befüllten
+# Prozesses unter fremden PIDs kopiert werden. Ergebnisse als JSON auf stdout.
+#
+#   python benchmarks/scrape_bench.py [--workers 4 16 64 256] [--repeat 20]
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MULTIPROC_DIR = tempfile.mkdtemp(prefix='scrape-bench-')
+os.environ['PROMETHEUS_MULTIPROC_DIR'] = MULTIPROC_DIR
+sys.path.insert(0, ROOT)
+
+from prometheus_client import generate_latest, multiprocess  # noqa: E402
+
+from python import metrics  # noqa: E402
+from python.metrics_archive import compact_dead_worker  # noqa: E402
+
+OPERATIONS = ('add', 'sub', 'mul', 'div')
+ENDPOINTS = ('add', 'subtract', 'multiply', 'divide', 'calculate_batch', 'health')
+
+
+def populate():
+    """Befüllt die Metriken dieses Prozesses ungefähr so wie ein Worker unter Last"""
+    for endpoint in ENDPOINTS:
+        for status in (200, 400, 500):
+            metrics.http_requests_total.labels(method='GET', endpoint=endpoint, status=status).inc()
+        metrics.http_request_duration.labels(method='GET', endpoint=endpoint).observe(0.002)
+    for operation in OPERATIONS:
+        for backend in ('subprocess', 'pool', 'library'):
+            for phase in ('queue', 'launch', 'checkout', 'execute', 'parse'):
+                metrics.observe_fortran_phase(phase, operation, backend, 0.0005)
+        metrics.fortran_calls_total.labels(function=operation).inc()
+        metrics.fortran_call_duration.labels(function=operation).observe(0.001)
+        metrics.fortran_batch_size.labels(operation=operation).observe(100)
+    metrics.fortran_cache_hits.labels(tier='local').inc()
+    metrics.fortran_in_flight.set(0)
+
+
+def spawn_worker_files(count, first_pid):
+    own = glob.glob(os.path.join(MULTIPROC_DIR, f'*_{os.getpid()}.db'))
+    for pid in range(first_pid, first_pid + count):
+        for filename in own:
+            prefix = os.path.basename(filename)[:-len(f'_{os.getpid()}.db')]
+            shutil.copy(filename, os.path.join(MULTIPROC_DIR, f'{prefix}_{pid}.db'))
+    return list(range(first_pid, first_pid + count))
+
+
+def measure(render, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        durations.append(time.perf_counter() - start)
+    return {'median_ms': statistics.median(durations) * 1000, 'max_ms': max(durations) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, nargs='+', default=[4, 16, 64, 256])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    populate()
+
+    legacy_registry = metrics.metrics_registry
+    multiprocess.MultiProcessCollector(legacy_registry, path=MULTIPROC_DIR)
+    metrics.scrape_registry.register(multiprocess.MultiProcessCollector(None, path=MULTIPROC_DIR))
+    cache = metrics.ScrapeCache(ttl=1.0)
+
+    results = []
+    next_pid = 10 ** 6
+    for workers in args.workers:
+        # Dateien beendeter Worker (z.B. nach max_requests) gegenüber einer festen Anzahl laufender
+        pids = spawn_worker_files(workers, next_pid)
+        next_pid += workers
+
+        result = {
+            'worker_files': len(os.listdir(MULTIPROC_DIR)),
+            'legacy': measure(lambda: generate_latest(legacy_registry), args.repeat),
+            'scrape': measure(lambda: generate_latest(metrics.scrape_registry), args.repeat),
+        }
+
+        start = time.perf_counter()
+        for pid in pids:
+            compact_dead_worker(pid, MULTIPROC_DIR)
+        result['compaction_ms'] = (time.perf_counter() - start) * 1000
+        result['files_after_compaction'] = len(os.listdir(MULTIPROC_DIR))
+        result['compacted'] = measure(lambda: generate_latest(metrics.scrape_registry), args.repeat)
+        result['cached'] = measure(lambda: cache.render(False), args.repeat)
+        results.append(result)
+
+        # Für die nächste Stufe wieder mit unverdichteten Dateien beginnen
+        for filename in glob.glob(os.path.join(MULTIPROC_DIR, '*_archive.db')):
+            os.remove(filename)
+
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    shutil.rmtree(MULTIPROC_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# benchmarks/startup_bench.py
+#
+# Misst die Startzeit eines Gunicorn-Servers: vom Start des Prozesses bis zur ersten erfolgreichen
+# Antwort von /add und bis /actuator/health/readiness "bereit" meldet (Backend aufgewärmt), pro Backend und
+# Variante (PRELOAD_APP an/aus, OpenTelemetry an/aus). Danach wird der Speicher der Worker
+# gemessen (PSS aus /proc/<pid>/smaps_rollup, nur Linux), an dem sich das Teilen per
+# Copy-on-Write mit PRELOAD_APP zeigt. Jeder Start wird --repeat mal wiederholt, berichtet wird
+# der Median. Ergebnisse (Format siehe bench_results.py) nach --output bzw. stdout.
+#
+#   make
+#   python benchmarks/startup_bench.py [--backends subprocess library pool] [--workers 4] [--repeat 5]
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_results import ROOT, write_results
+
+BACKENDS = ('subprocess', 'library', 'pool')
+
+VARIANTS = {
+    'default': {'PRELOAD_APP': 'False', 'ENABLE_OPENTELEMETRY': 'False'},
+    'preload': {'PRELOAD_APP': 'True', 'ENABLE_OPENTELEMETRY': 'False'},
+    'otel': {'PRELOAD_APP': 'False', 'ENABLE_OPENTELEMETRY': 'True'},
+    'preload-otel': {'PRELOAD_APP': 'True', 'ENABLE_OPENTELEMETRY': 'True'},
+}
+
+# Zeit bis zur Bereitschaft von Gunicorn in Sekunden
+STARTUP_TIMEOUT = 60
+
+# Abstand der Abfragen während des Starts in Sekunden
+POLL_INTERVAL = 0.005
+
+
+def start_once(backend, variant, workers):
+    port = _free_port()
+    env = dict(os.environ, **VARIANTS[variant])
+    env.update({
+        'CALCULATOR_BACKEND': backend,
+        'ENABLE_RESULT_CACHE': 'False',
+        'ENABLE_JOBS': 'False',
+        'TRACE_EXPORTER': 'none',
+        'WORKERS': str(workers),
+        'PROMETHEUS_MULTIPROC_DIR': tempfile.mkdtemp(prefix='startup-bench-'),
+        'PYTHONPATH': ROOT,
+    })
+
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        first_add = _wait_status(server, port, '/add?a=1&b=2', start)
+        ready = _wait_status(server, port, '/actuator/health/readiness', start)
+        # Alle Worker gestartet und aufgewärmt, bevor der Speicher gemessen wird
+        time.sleep(0.5)
+        return {'first_add_s': first_add, 'ready_s': ready, 'workers_pss_mb': _workers_pss_mb(server.pid)}
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def _wait_status(server, port, path, start):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Gunicorn beendet mit Exit-Code {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', path)
+            if connection.getresponse().status == 200:
+                return time.perf_counter() - start
+        except OSError:
+            pass
+        time.sleep(POLL_INTERVAL)
+    raise RuntimeError(f"{path} nach {STARTUP_TIMEOUT} s nicht erfolgreich")
+
+
+def _workers_pss_mb(master_pid):
+    """Summe der PSS aller Worker in MB, None ohne /proc/<pid>/smaps_rollup"""
+    total_kb = 0
+    found = False
+    for pid in os.listdir('/proc') if os.path.isdir('/proc') else ():
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                # Feld 4 nach dem Programmnamen in Klammern ist die PID des Elternprozesses
+                if int(f.read().rsplit(')', 1)[1].split()[1]) != master_pid:
+                    continue
+            with open(f'/proc/{pid}/smaps_rollup') as f:
+                for line in f:
+                    if line.startswith('Pss:'):
+                        total_kb += int(line.split()[1])
+                        found = True
+        except (OSError, ValueError, IndexError):
+            continue
+    return round(total_kb / 1024, 1) if found else None
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--variants', nargs='+', choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Gunicorn-Worker")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    results = []
+    for backend in args.backends:
+        for variant in args.variants:
+            runs = [start_once(backend, variant, args.workers) for _ in range(args.repeat)]
+            pss = [run['workers_pss_mb'] for run in runs if run['workers_pss_mb'] is not None]
+            result = {
+                'id': f'startup/{backend}/{variant}',
+                'backend': backend,
+                'variant': variant,
+                'workers': args.workers,
+                'first_add_ms': round(statistics.median(run['first_add_s'] for run in runs) * 1000, 1),
+                'ready_ms': round(statistics.median(run['ready_s'] for run in runs) * 1000, 1),
+                'workers_pss_mb': round(statistics.median(pss), 1) if pss else None,
+            }
+            results.append(result)
+            print(f"{backend}/{variant}: erstes /add {result['first_add_ms']} ms, "
+                  f"bereit {result['ready_ms']} ms, PSS {result['workers_pss_mb']} MB", file=sys.stderr)
+
+    write_results(args.output, args, results)
+
+
+if __name__ == '__main__':
+    main()
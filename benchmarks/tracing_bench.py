@@ -0,0 +1,154 @@
+# benchmarks/tracing_bench.py
+#
+# Misst den Overhead von OpenTelemetry pro Request: Latenz (p50/p99) und Durchsatz von /add über
+# den Flask-Test-Client ohne Tracing, mit Tracing ohne Export und mit verschiedenen Exportern und
+# Sampling-Anteilen. OTLP geht an den lokalen Ersatz-Collector aus otlp_collector.py, der die
+# angekommenen Spans zählt; Modi, deren Exporter-Paket fehlt, werden übersprungen.
+#
+# Jeder Modus läuft in einem eigenen Prozess, da die Konfiguration beim Import gelesen wird.
+# Ergebnisse (Format siehe bench_results.py) nach --output bzw. stdout.
+#
+#   python benchmarks/tracing_bench.py [--requests 5000] [--output tracing.json]
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_results import ROOT, percentile, write_results
+from otlp_collector import StandInCollector
+
+MODES = {
+    'off': {'ENABLE_OPENTELEMETRY': 'False'},
+    'no-export': {'TRACE_EXPORTER': 'none', 'TRACE_SAMPLE_RATIO': '1.0'},
+    'console': {'TRACE_EXPORTER': 'console', 'TRACE_SAMPLE_RATIO': '1.0'},
+    'file': {'TRACE_EXPORTER': 'file', 'TRACE_SAMPLE_RATIO': '1.0'},
+    'otlp-http': {'TRACE_EXPORTER': 'otlp-http', 'TRACE_SAMPLE_RATIO': '1.0'},
+    'otlp-http-1%': {'TRACE_EXPORTER': 'otlp-http', 'TRACE_SAMPLE_RATIO': '0.01'},
+    'otlp-grpc': {'TRACE_EXPORTER': 'otlp-grpc', 'TRACE_SAMPLE_RATIO': '1.0'},
+    'otlp-grpc-1%': {'TRACE_EXPORTER': 'otlp-grpc', 'TRACE_SAMPLE_RATIO': '0.01'},
+}
+
+EXPORTER_MODULES = {
+    'otlp-http': 'opentelemetry.exporter.otlp.proto.http',
+    'otlp-grpc': 'opentelemetry.exporter.otlp.proto.grpc',
+}
+
+
+def bench_requests(count):
+    from opentelemetry import trace
+
+    from python.wsgi import app
+
+    client = app.test_client()
+    for _ in range(100):
+        client.get('/add?a=1&b=2')
+
+    latencies = []
+    start_all = time.perf_counter()
+    for i in range(count):
+        # Wechselnde Operanden, damit jeder Request das Backend erreicht
+        start = time.perf_counter()
+        client.get(f'/add?a={i}&b=2')
+        latencies.append(time.perf_counter() - start)
+    duration = time.perf_counter() - start_all
+
+    # Ausstehende Spans exportieren, damit der Collector alle zählt
+    flush = getattr(trace.get_tracer_provider(), 'force_flush', None)
+    if flush is not None:
+        flush()
+
+    latencies.sort()
+    return {
+        'requests': count,
+        'throughput_rps': count / duration,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+def available(mode):
+    exporter = MODES[mode].get('TRACE_EXPORTER', '')
+    module = EXPORTER_MODULES.get(exporter)
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def run_child(mode, args, collector, spool_dir):
+    with tempfile.NamedTemporaryFile('r', suffix='.json') as result:
+        env = dict(os.environ, **MODES[mode])
+        env.setdefault('ENABLE_OPENTELEMETRY', 'True')
+        env.update({
+            'ENABLE_RESULT_CACHE': 'False',
+            'CALCULATOR_BACKEND': args.backend,
+            'PROMETHEUS_MULTIPROC_DIR': tempfile.mkdtemp(prefix='tracing-bench-'),
+            'TRACE_FILE_PATH': os.path.join(spool_dir, 'spans-{pid}.jsonl'),
+            'PYTHONPATH': ROOT,
+        })
+        if env.get('TRACE_EXPORTER') == 'otlp-http':
+            env['TRACE_EXPORTER_ENDPOINT'] = f'http://127.0.0.1:{collector.http_port}/v1/traces'
+        elif env.get('TRACE_EXPORTER') == 'otlp-grpc':
+            env['TRACE_EXPORTER_ENDPOINT'] = f'http://127.0.0.1:{collector.grpc_port}'
+
+        before = collector.stats.snapshot()
+        process = subprocess.run(
+            [sys.executable, __file__, '--child', mode, '--result', result.name, '--requests', str(args.requests)],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"Benchmark-Prozess für {mode} fehlgeschlagen")
+        after = collector.stats.snapshot()
+
+        measured = json.load(result)
+        if after['spans'] is not None:
+            measured['spans_received'] = after['spans'] - before['spans']
+        measured['export_bytes'] = after['bytes'] - before['bytes']
+        return measured
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--backend', default='library')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--output')
+    parser.add_argument('--child')
+    parser.add_argument('--result')
+    args = parser.parse_args()
+
+    if args.child:
+        with open(args.result, 'w') as f:
+            json.dump(bench_requests(args.requests), f)
+        return
+
+    grpc_port = 0 if importlib.util.find_spec('grpc') is not None else None
+    collector = StandInCollector(http_port=0, grpc_port=grpc_port)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix='tracing-bench-spans-') as spool_dir:
+            for mode in args.modes:
+                if not available(mode):
+                    print(f"{mode}: Exporter nicht installiert, übersprungen", file=sys.stderr)
+                    continue
+                measured = run_child(mode, args, collector, spool_dir)
+                results.append(dict({'id': f'tracing/{args.backend}/{mode}', 'mode': mode}, **measured))
+                print(f"{mode}: p50 {measured['p50_ms']:.3f} ms, p99 {measured['p99_ms']:.3f} ms", file=sys.stderr)
+    finally:
+        collector.stop()
+
+    # Zusätzliche Latenz gegenüber dem Lauf ohne Tracing
+    baseline = next((result for result in results if result['mode'] == 'off'), None)
+    if baseline is not None:
+        for result in results:
+            result['added_p50_ms'] = result['p50_ms'] - baseline['p50_ms']
+            result['added_p99_ms'] = result['p99_ms'] - baseline['p99_ms']
+
+    write_results(args.output, args, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/transport_bench.py
+#
+# Vergleicht den Durchsatz von Batch-Aufrufen über das Text-Protokoll (Zeilen "a b" über stdin,
+# "OK <ergebnis>" über stdout) mit der Übertragung über Shared Memory, jeweils für das Backend
+# subprocess (ein Prozess pro Aufruf) und pool (langlebiger Co-Prozess). Das Backend library
+# dient als Referenz für einen Aufruf ganz ohne Prozessgrenze.
+#
+# Ergebnisse als JSON auf stdout (Median-Laufzeit und Elemente pro Sekunde).
+#
+#   make
+#   python benchmarks/transport_bench.py [--sizes 1000 100000 1000000] [--repeat 10]
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from array import array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from python.backend import LibraryBackend, PoolBackend, SubprocessBackend  # noqa: E402
+
+CALCULATOR = os.path.join(ROOT, 'bin', 'calculator')
+LIBRARY = os.path.join(ROOT, 'bin', 'libmath_operations.so')
+
+
+def backends():
+    yield 'library', None, LibraryBackend(LIBRARY)
+    for transport in ('text', 'shm'):
+        yield 'subprocess', transport, SubprocessBackend(CALCULATOR, log_level='OFF', transport=transport)
+        yield 'pool', transport, PoolBackend(CALCULATOR, size=1, log_level='OFF', transport=transport)
+
+
+def measure(backend, a, b, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        backend.calculate_batch('mul', a, b, 'bench', 'bench', 'unset')
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        a = array('d', (i * 0.5 for i in range(size)))
+        b = array('d', (1.0 / (i + 1) for i in range(size)))
+        for name, transport, backend in backends():
+            # Erster Aufruf startet den Co-Prozess bzw. legt das Segment an
+            backend.calculate_batch('mul', a, b, 'bench', 'bench', 'unset')
+            duration = measure(backend, a, b, args.repeat)
+            results.append({
+                'backend': name,
+                'transport': transport,
+                'size': size,
+                'median_ms': duration * 1000,
+                'elements_per_s': size / duration,
+            })
+            if isinstance(backend, PoolBackend):
+                backend.close()
+
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,29 @@
 import os
-import time
+import subprocess
 import sys
-from datetime import datetime
-from python.logging_config import setup_logger, extract_trace_context
+from python.logging_config import setup_logger
 
 # Basis-Einstellungen für Gunicorn
 bind = "0.0.0.0:8080"
 workers = int(os.environ.get("WORKERS", "4"))
-threads = 2
+threads = int(os.environ.get("THREADS", "2"))
 timeout = 120
-worker_class = "sync"
+
+# Serving-Modus: 'wsgi' (Flask) oder 'asgi' (asyncio mit Uvicorn-Workern)
+server_mode = os.environ.get("SERVER_MODE", "wsgi").lower()
+if server_mode == "asgi":
+    # Ein Worker hält viele gleichzeitige Requests, die Fortran-Aufrufe begrenzt ASYNC_MAX_IN_FLIGHT
+    wsgi_app = "python.asgi:app"
+    worker_class = "uvicorn_worker.UvicornWorker"
+    worker_connections = int(os.environ.get("WORKER_CONNECTIONS", "1000"))
+else:
+    # Der sync-Worker ignoriert 'threads', mit 'gthread' werden sie genutzt
+    wsgi_app = "python.wsgi:app"
+    worker_class = os.environ.get("WORKER_CLASS", "sync")
+
+# Anwendung einmal im Master laden und per Copy-on-Write mit den Workern teilen; das Aufwärmen
+# des Fortran-Backends startet dann erst im Worker (post_worker_init)
+preload_app = os.environ.get("PRELOAD_APP", "False").lower() in ("true", "1", "t")
 
 # Optional: Umgebungsvariablen für Feature Toggles setzen
 os.environ.setdefault('ENABLE_PROMETHEUS', 'True')
@@ -39,6 +53,44 @@ def post_fork(server, worker):
     # Hier können Worker-spezifische Log-Konfigurationen vorgenommen werden
     pass
 
+def post_worker_init(worker):
+    # Mit preload_app wurde die Anwendung im Master erzeugt: Co-Prozesse und OpenMP-Threads des
+    # Backends entstehen erst hier im Worker
+    if not preload_app:
+        return
+    from python.wsgi import app
+    warmup = app.extensions.get('calculator_warmup')
+    if warmup is not None:
+        warmup.start()
+
+def child_exit(server, worker):
+    # Metrik-Dateien des beendeten Workers in die Archivdateien übernehmen, damit die Anzahl
+    # der Dateien (und damit die Scrape-Dauer) bei Worker-Neustarts nicht unbegrenzt wächst
+    from python.metrics_archive import compact_dead_worker
+    compact_dead_worker(worker.pid, multiprocess_dir)
+
 def on_starting(server):
     # Logging vorbereiten, bevor Gunicorn vollständig startet
-    pass
\ No newline at end of file
+    pass
+
+
+# Job-Runner (python -m python.jobs) als eigener Prozess neben den Workern: Jobs laufen in dessen
+# Prozess-Pool weiter, auch wenn Worker neu gestartet werden
+job_runner = None
+
+def when_ready(server):
+    global job_runner
+    if os.environ.get('ENABLE_JOBS', 'False').lower() not in ('true', '1', 't'):
+        return
+    job_runner = subprocess.Popen([sys.executable, '-m', 'python.jobs'], cwd=os.path.dirname(os.path.abspath(__file__)))
+    server.log.info("Job-Runner gestartet (PID %s)", job_runner.pid)
+
+def on_exit(server):
+    # Laufende Jobs bleiben im Spool-Verzeichnis und werden beim nächsten Start fortgesetzt
+    if job_runner is None:
+        return
+    job_runner.terminate()
+    try:
+        job_runner.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        job_runner.kill()
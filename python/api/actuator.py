@@ -1,32 +1,28 @@
-# python/api/routes.py
+# python/api/actuator.py
 
-from flask import jsonify, Flask, request
-import prometheus_client
-from prometheus_client import multiprocess, CONTENT_TYPE_LATEST
-import subprocess
+from flask import jsonify, request, Response
+import hmac
 import os
 import json
-import time
-from python.metrics import track_request_metrics, track_fortran_call, metrics_registry
-from python.logging_config import setup_logger, extract_trace_context, default_logger
-
-CALCULATOR_PATH = os.path.abspath("./bin/calculator")
+import re
+from python.metrics import scrape_cache
+from python.api.pipeline import register_pipeline, trace_fields
+from python.logging_config import setup_logger, extract_trace_context
+from python.profiler import ProfilerBusyError, SamplingProfiler
 
 # Logger für die API-Komponente einrichten
 logger = setup_logger("calculator-api")
 
+# Umgebungsvariablen mit Geheimnissen (z.B. PROFILE_TOKEN), deren Werte /actuator/debug nicht ausgibt
+SECRET_VARIABLE = re.compile(r'TOKEN|SECRET|KEY|PASSWORD|PASSWD|CREDENTIAL|AUTH|HEADERS', re.IGNORECASE)
+
 def register_actuator(app):
-    @app.before_request
-    def before_request():
-        request.logger = default_logger
-        request.start_time = time.time()
-        request.logger.debug(f"Anfrage gestartet: {request.method} {request.path}")
-
-    @app.after_request
-    def after_request(response):
-        request.logger.debug(f"Anfrage abgeschlossen: {request.method} {request.path} - Status: {response.status_code}")
-        return response
+    profiler = SamplingProfiler(app.config.get('PROFILE_INTERVAL_MS', 10) / 1000.0,
+                                app.config.get('PROFILE_MAX_OVERHEAD', 0.02))
+    app.extensions['calculator_profiler'] = profiler
 
+    # Threads mit laufendem Request werden vom Profiler gesampelt (Hooks in python/api/pipeline.py)
+    register_pipeline(app).profiler = profiler
 
     @app.route('/actuator')
     def actuator():
@@ -34,67 +30,183 @@ def register_actuator(app):
             "message": "Willkommen beim Calculator API",
             "endpoints": {
                 "/actuator/health": "k8s health check",
+                "/actuator/health/liveness": "k8s liveness check",
+                "/actuator/health/readiness": "k8s readiness check (503, bis das Backend aufgewärmt ist)",
                 "/actuator/prometheus": "Prometheus-Metriken abrufen (wenn aktiviert)",
-                "/actuator/debug": "Debug-Informationen der Anwendung abrufen"
+                "/actuator/debug": "Debug-Informationen der Anwendung abrufen",
+                "/actuator/profile": "Sampling-Profil dieses Workers über ?seconds=N (mit PROFILE_TOKEN)",
+                "/actuator/cache": "Statistik des Ergebnis-Caches abrufen (GET) oder Cache leeren "
+                                   "(DELETE, mit CACHE_FLUSH_TOKEN)"
                 # end::[]"
             }
         })
 
     @app.route('/actuator/health')
     def health_check():
-        trace_id, span_id, parent_span_id = extract_trace_context()
+        trace = extract_trace_context()
 
         # Log-Eintrag mit Trace-Kontext
-        log_extra = {'trace_id': trace_id, 'span_id': span_id, 'parent_span_id': parent_span_id}
-        logger.info("Gesundheitscheck durchgeführt", extra=log_extra)
-
-        response = jsonify({
-            "status": "healthy",
-            "trace_id": trace_id,
-            "span_id": span_id,
-            "parent_span_id": parent_span_id
-        })
+        context = trace_fields(trace)
+        logger.info("Gesundheitscheck durchgeführt", extra=context)
 
-        # Tracing-Header zur Antwort hinzufügen
-        response.headers['traceparent'] = f'00-{trace_id}-{span_id}-01'
-        response.headers['X-Trace-Id'] = trace_id
-        response.headers['X-Span-Id'] = span_id
-        response.headers['X-Parent-Span-Id'] = parent_span_id
+        response = jsonify(dict(context, status="healthy"))
+
+        # Die übrigen Tracing-Header setzt die Pipeline, X-Parent-Span-Id gibt es hier auch ohne Eltern-Span
+        if trace[2] == 'unset':
+            response.headers['X-Parent-Span-Id'] = 'unset'
 
         return response
 
+    @app.route('/actuator/health/liveness')
+    def liveness_check():
+        # Der Prozess läuft und nimmt Requests an, auch während des Aufwärmens
+        return jsonify({"status": "alive"})
+
+    @app.route('/actuator/health/readiness')
+    def readiness_check():
+        # Nicht bereit, solange das Fortran-Backend noch aufgewärmt wird
+        warmup = app.extensions.get('calculator_warmup')
+        ready = warmup is None or warmup.ready.is_set()
+        body = {"status": "ready" if ready else "starting"}
+        if warmup is not None:
+            body.update(warmup.status())
+        return jsonify(body), 200 if ready else 503
+
     @app.route('/actuator/prometheus', methods=['GET'])
     def metrics():
-        from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+        from prometheus_client import CONTENT_TYPE_LATEST
+        from prometheus_client.openmetrics.exposition import CONTENT_TYPE_LATEST as OPENMETRICS_CONTENT_TYPE
         try:
-            ENABLE_PROMETHEUS = os.environ.get('ENABLE_PROMETHEUS', True)
-            if not ENABLE_PROMETHEUS:
+            if not app.config.get('ENABLE_PROMETHEUS', True):
                 return jsonify({"error": "Prometheus-Metriken sind deaktiviert"}), 503
 
-            output = generate_latest(metrics_registry)
+            # OpenMetrics (mit trace_id-Exemplars an den Histogramm-Buckets), wenn der Scraper es anfragt
+            openmetrics = 'application/openmetrics-text' in request.headers.get('Accept', '')
+            output = scrape_cache.render(openmetrics)
 
         except Exception as e:
-            return jsonify({"error": "Fehler beim Abrufen der Metriken: {str(e)}"}), 500
+            return jsonify({"error": f"Fehler beim Abrufen der Metriken: {str(e)}"}), 500
+
+        return output, 200, {'Content-Type': OPENMETRICS_CONTENT_TYPE if openmetrics else CONTENT_TYPE_LATEST}
+
+    @app.route('/actuator/cache', methods=['GET', 'DELETE'])
+    def cache():
+        """
+        Statistik des Ergebnis-Caches bzw. Leeren aller Cache-Stufen
+        """
+        result_cache = getattr(app.extensions.get('calculator_backend'), 'cache', None)
+        if result_cache is None:
+            return jsonify({"error": "Ergebnis-Cache ist deaktiviert"}), 404
+
+        log_extra = trace_fields(extract_trace_context())
+
+        if request.method == 'DELETE':
+            error = bearer_token_error(app.config.get('CACHE_FLUSH_TOKEN', ''), "Leeren des Caches ist deaktiviert")
+            if error is not None:
+                return error
+            result_cache.flush()
+            logger.info("Ergebnis-Cache geleert", extra=log_extra)
+            return jsonify({"status": "flushed", **result_cache.stats()})
 
-        return output, 200, {'Content-Type': CONTENT_TYPE_LATEST}
+        return jsonify(result_cache.stats())
 
     @app.route('/actuator/debug', methods=['GET'])
     def debug():
         """
         Debug-Endpoint, um den aktuellen Zustand der Anwendung zu überprüfen
         """
-        trace_id, span_id, parent_span_id = extract_trace_context()
-        logger.info("Debug-Informationen abgerufen", extra={'trace_id': trace_id, 'span_id': span_id, 'parent_span_id': parent_span_id})
-
-        debug_info = {
-            "trace_id": trace_id,
-            "span_id": span_id,
-            "parent_span_id": parent_span_id,
-            "environment": dict(os.environ),
-            "python_version": os.sys.version,
-            "hostname": os.uname().nodename
-        }
+        context = trace_fields(extract_trace_context())
+        logger.info("Debug-Informationen abgerufen", extra=context)
+
+        debug_info = dict(
+            context,
+            environment=redacted_environment(),
+            python_version=os.sys.version,
+            hostname=os.uname().nodename
+        )
 
         return jsonify(debug_info)
 
-    return app
\ No newline at end of file
+    def profile_access_error():
+        return bearer_token_error(app.config.get('PROFILE_TOKEN', ''), "Profiler ist deaktiviert")
+
+    def profile_response(result):
+        if request.args.get('format') == 'collapsed':
+            return Response(result['collapsed'], mimetype='text/plain')
+        return jsonify(result)
+
+    @app.route('/actuator/profile', methods=['GET'])
+    def profile():
+        """
+        Statistisches Profil dieses Workers über ?seconds=N: Collapsed Stacks (flamegraph.pl) und
+        die Funktionen mit den meisten Samples. Mit wait=false läuft das Profil im Hintergrund
+        (z.B. für sync-Worker, die sonst während des Profils keine Requests bearbeiten) und ist
+        danach unter /actuator/profile/<pid> abrufbar.
+        """
+        error = profile_access_error()
+        if error is not None:
+            return error
+
+        max_seconds = app.config.get('PROFILE_MAX_SECONDS', 60.0)
+        seconds = request.args.get('seconds', 10.0, type=float)
+        if seconds is None or not 0 < seconds <= max_seconds:
+            return jsonify({"error": f"'seconds' muss zwischen 0 und {max_seconds:g} liegen"}), 400
+        all_threads = request.args.get('threads') == 'all'
+
+        log_extra = trace_fields(extract_trace_context())
+        logger.info("Profil über %s s gestartet", seconds, extra=log_extra)
+
+        try:
+            if request.args.get('wait', 'true').lower() in ('false', '0', 'f'):
+                os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+                profiler.start(seconds, _profile_path(app, os.getpid()), all_threads)
+                location = f'/actuator/profile/{os.getpid()}'
+                return jsonify({"status": "running", "pid": os.getpid(), "result": location}), 202, \
+                    {'Location': location}
+
+            result = profiler.profile(seconds, all_threads)
+        except ProfilerBusyError as e:
+            return jsonify({"error": str(e)}), 409
+
+        logger.info("Profil abgeschlossen: %s Samples, Overhead %s", result['samples'], result['overhead'],
+                    extra=log_extra)
+        return profile_response(result)
+
+    @app.route('/actuator/profile/<int:pid>', methods=['GET'])
+    def profile_result(pid):
+        """Ergebnis eines im Hintergrund erstellten Profils, von jedem Worker abrufbar"""
+        error = profile_access_error()
+        if error is not None:
+            return error
+
+        try:
+            with open(_profile_path(app, pid)) as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            return jsonify({"error": f"Kein Profil für Worker {pid}"}), 404
+
+        if result.get('status') == 'running':
+            return jsonify(result), 202
+        return profile_response(result)
+
+    return app
+
+
+def bearer_token_error(token, disabled_message):
+    """Fehlerantwort, wenn kein Token konfiguriert ist oder der Authorization-Header nicht passt, sonst None"""
+    # Der Vergleich dauert unabhängig vom Inhalt gleich lang
+    if not token:
+        return jsonify({"error": disabled_message}), 404
+    authorization = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()):
+        return jsonify({"error": "Nicht autorisiert"}), 401, {'WWW-Authenticate': 'Bearer'}
+    return None
+
+
+def redacted_environment():
+    """Umgebungsvariablen des Workers, Werte von Geheimnissen sind durch '***' ersetzt"""
+    return {name: '***' if SECRET_VARIABLE.search(name) else value for name, value in os.environ.items()}
+
+
+def _profile_path(app, pid):
+    return os.path.join(app.config['PROFILE_DIR'], f'profile-{pid}.json')
\ No newline at end of file
@@ -0,0 +1,68 @@
+# python/api/batch.py
+
+import sys
+from array import array
+
+from python.backend.base import STATUS_OK
+
+# Kompaktes Binärformat: n float64-Werte für a, danach n float64-Werte für b (little-endian).
+# Die Antwort enthält n float64-Ergebnisse, gefolgt von n Statusbytes (0 = ok, 1 = Division durch Null).
+BINARY_CONTENT_TYPE = 'application/octet-stream'
+
+
+class BatchRequestError(ValueError):
+    """Ungültige Batch-Anfrage, status_code ist der passende HTTP-Status"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def parse_batch_request(req, max_size):
+    """Liest die Operanden a und b als array('d') aus einer JSON- oder Binär-Anfrage"""
+    if req.mimetype == BINARY_CONTENT_TYPE:
+        data = req.get_data()
+        if len(data) % 16 != 0:
+            raise BatchRequestError("Binäre Anfrage muss 2 * n float64-Werte enthalten")
+
+        values = array('d')
+        values.frombytes(data)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        n = len(values) // 2
+        a, b = values[:n], values[n:]
+    else:
+        payload = req.get_json(silent=True)
+        if not isinstance(payload, dict) or not isinstance(payload.get('a'), list) \
+                or not isinstance(payload.get('b'), list):
+            raise BatchRequestError("Parameter 'a' und 'b' müssen als Listen von Zahlen angegeben werden")
+
+        try:
+            a = array('d', payload['a'])
+            b = array('d', payload['b'])
+        except (TypeError, OverflowError):
+            raise BatchRequestError("Parameter 'a' und 'b' dürfen nur Zahlen im float64-Bereich enthalten") from None
+
+        if len(a) != len(b):
+            raise BatchRequestError("Parameter 'a' und 'b' müssen gleich lang sein")
+
+    if len(a) > max_size:
+        raise BatchRequestError(f"Batch zu groß: maximal {max_size} Elemente erlaubt", 413)
+
+    return a, b
+
+
+def encode_binary_result(results, statuses):
+    """Kodiert Ergebnisse und Statuscodes im Binärformat"""
+    if sys.byteorder == 'big':
+        results = array('d', results)
+        results.byteswap()
+    return results.tobytes() + statuses.tobytes()
+
+
+def batch_errors(statuses):
+    """Liste der fehlerhaften Elemente für die JSON-Antwort"""
+    return [
+        {"index": i, "error": "Division durch Null nicht erlaubt"}
+        for i, status in enumerate(statuses) if status != STATUS_OK
+    ]
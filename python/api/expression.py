@@ -0,0 +1,238 @@
+# python/api/expression.py
+
+import json
+import re
+from array import array
+from functools import lru_cache
+
+from python.backend.base import OP_PUSH, OPCODES, ExpressionPlan
+
+# Anzahl übersetzter Ausdrücke, die pro Worker vorgehalten werden
+PLAN_CACHE_SIZE = 1024
+
+# Maximale Verschachtelungstiefe (Klammern, unäres Minus, Ebenen im Baum), begrenzt die Rekursion der Parser
+MAX_DEPTH = 100
+
+# Operatoren der Infix-Schreibweise und ihre Namen im Ausdrucksbaum
+INFIX_OPERATORS = {'+': 'add', '-': 'sub', '*': 'mul', '/': 'div'}
+
+_TOKEN = re.compile(r'\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(.))')
+
+
+class ExpressionError(ValueError):
+    """Ungültiger Ausdruck oder ungültige Variablen, status_code ist der passende HTTP-Status"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def compile_expression(expression, max_nodes):
+    """
+    Übersetzt einen Ausdruck in Infix-Schreibweise ("a * b + 2") oder als Baum
+    ({"op": "add", "args": [...]}, Blätter sind Zahlen, Variablennamen, {"var": ...} oder {"const": ...})
+    in einen ExpressionPlan. Das Ergebnis wird pro Ausdruckstext gecacht.
+    """
+    if isinstance(expression, str):
+        return _compile_infix(expression, max_nodes)
+    if isinstance(expression, dict):
+        _check_tree_depth(expression)
+        return _compile_tree(json.dumps(expression, sort_keys=True, separators=(',', ':')), max_nodes)
+    raise ExpressionError("Parameter 'expression' muss ein String oder ein Ausdrucksbaum sein")
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _compile_infix(text, max_nodes):
+    return _emit(_InfixParser(text).parse(), max_nodes)
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _compile_tree(text, max_nodes):
+    return _emit(_tree_node(json.loads(text)), max_nodes)
+
+
+def bind_variables(plan, variables, max_size):
+    """
+    Liefert die Slots (array('d'), Länge 1 oder n) für den Plan sowie n.
+    Arrays müssen gleich lang sein, Skalare werden auf alle Elemente angewendet.
+    """
+    if not isinstance(variables, dict):
+        raise ExpressionError("Parameter 'variables' muss ein Objekt sein")
+
+    slots = []
+    n = None
+    for name in plan.variables:
+        if name not in variables:
+            raise ExpressionError(f"Variable '{name}' fehlt")
+
+        value = variables[name]
+        # OverflowError bei ganzen Zahlen außerhalb des float64-Bereichs
+        try:
+            if isinstance(value, list):
+                slot = array('d', value)
+                if n is not None and len(slot) != n:
+                    raise ExpressionError("Alle Array-Variablen müssen gleich lang sein")
+                n = len(slot)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                slot = array('d', (value,))
+            else:
+                raise TypeError
+        except (TypeError, OverflowError):
+            raise ExpressionError(f"Variable '{name}' muss eine Zahl oder eine Liste von Zahlen sein") from None
+        slots.append(slot)
+
+    if n == 0:
+        raise ExpressionError("Array-Variablen dürfen nicht leer sein")
+    if n is not None and n > max_size:
+        raise ExpressionError(f"Ausdruck zu groß: maximal {max_size} Elemente erlaubt", 413)
+
+    slots.extend(array('d', (constant,)) for constant in plan.constants)
+    return slots, n
+
+
+def _emit(tree, max_nodes):
+    """Erzeugt das Programm in umgekehrter polnischer Notation, gleiche Blätter teilen sich einen Slot"""
+    variables = []
+    constants = []
+    code = []
+
+    # Iterativ, da Ketten wie "a + a + ... + a" ohne Klammern beliebig tiefe Bäume ergeben
+    stack = [(tree, False)]
+    while stack:
+        node, visited = stack.pop()
+        kind = node[0]
+        if kind in OPCODES and not visited:
+            stack.extend(((node, True), (node[2], False), (node[1], False)))
+            continue
+
+        if len(code) >= max_nodes:
+            raise ExpressionError(f"Ausdruck zu groß: maximal {max_nodes} Knoten erlaubt", 413)
+        if kind == 'var':
+            if node[1] not in variables:
+                variables.append(node[1])
+            code.append((OP_PUSH, variables.index(node[1])))
+        elif kind == 'const':
+            if node[1] not in constants:
+                constants.append(node[1])
+            code.append((OP_PUSH, -1 - constants.index(node[1])))
+        else:
+            code.append((OPCODES[kind], 0))
+
+    # Slot-Nummern sind 1-basiert, Konstanten folgen auf die Variablen
+    code = [(op, arg + 1 if arg >= 0 else len(variables) - arg) if op == OP_PUSH else (op, arg)
+            for op, arg in code]
+    return ExpressionPlan(code, variables, constants)
+
+
+def _check_tree_depth(tree):
+    """Prüft die Tiefe des Baums iterativ, bevor Cache-Schlüssel und _tree_node rekursiv darüber laufen"""
+    stack = [(tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        # Jede Ebene besteht aus dem Knoten und der Liste seiner Argumente
+        if depth > 2 * MAX_DEPTH:
+            raise ExpressionError(f"Ausdruck zu tief verschachtelt: maximal {MAX_DEPTH} Ebenen erlaubt", 413)
+        if isinstance(node, dict):
+            stack.extend((value, depth + 1) for value in node.values())
+        elif isinstance(node, list):
+            stack.extend((value, depth + 1) for value in node)
+
+
+def _tree_node(node):
+    if isinstance(node, bool):
+        raise ExpressionError("Ungültiger Knoten im Ausdrucksbaum")
+    if isinstance(node, (int, float)):
+        try:
+            return ('const', float(node))
+        except OverflowError:
+            raise ExpressionError("Konstante außerhalb des float64-Bereichs") from None
+    if isinstance(node, str):
+        return ('var', node)
+    if isinstance(node, dict):
+        if 'var' in node and isinstance(node['var'], str):
+            return ('var', node['var'])
+        if 'const' in node:
+            return _tree_node(node['const'] if isinstance(node['const'], (int, float)) else None)
+
+        operation = INFIX_OPERATORS.get(node.get('op'), node.get('op'))
+        args = node.get('args')
+        if operation in OPCODES and isinstance(args, list) and len(args) == 2:
+            return (operation, _tree_node(args[0]), _tree_node(args[1]))
+    raise ExpressionError(f"Ungültiger Knoten im Ausdrucksbaum: {json.dumps(node)[:100]}")
+
+
+class _InfixParser:
+    """Rekursiver Abstieg für + - * / mit üblicher Rangfolge, Klammern und unärem Minus"""
+
+    def __init__(self, text):
+        self.tokens = []
+        for match in _TOKEN.finditer(text):
+            number, name, symbol = match.groups()
+            if number:
+                self.tokens.append(('const', float(number)))
+            elif name:
+                self.tokens.append(('var', name))
+            elif symbol and not symbol.isspace():
+                if symbol not in '+-*/()':
+                    raise ExpressionError(f"Unerwartetes Zeichen im Ausdruck: '{symbol}'")
+                self.tokens.append(('symbol', symbol))
+        self.position = 0
+        self.depth = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("Leerer Ausdruck")
+        node = self._expression()
+        if self.position != len(self.tokens):
+            raise ExpressionError(f"Unerwartetes Token im Ausdruck: '{self.tokens[self.position][1]}'")
+        return node
+
+    def _enter(self):
+        # Klammern und unäres Minus rekursieren, die Tiefe ist daher begrenzt
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise ExpressionError(f"Ausdruck zu tief verschachtelt: maximal {MAX_DEPTH} Ebenen erlaubt", 413)
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def _expression(self):
+        node = self._term()
+        while self._peek() in (('symbol', '+'), ('symbol', '-')):
+            self.position += 1
+            node = (INFIX_OPERATORS[self.tokens[self.position - 1][1]], node, self._term())
+        return node
+
+    def _term(self):
+        node = self._unary()
+        while self._peek() in (('symbol', '*'), ('symbol', '/')):
+            self.position += 1
+            node = (INFIX_OPERATORS[self.tokens[self.position - 1][1]], node, self._unary())
+        return node
+
+    def _unary(self):
+        if self._peek() == ('symbol', '-'):
+            self.position += 1
+            self._enter()
+            operand = self._unary()
+            self.depth -= 1
+            if operand[0] == 'const':
+                return ('const', -operand[1])
+            return ('sub', ('const', 0.0), operand)
+        return self._primary()
+
+    def _primary(self):
+        kind, value = self._peek()
+        if kind in ('const', 'var'):
+            self.position += 1
+            return (kind, value)
+        if (kind, value) == ('symbol', '('):
+            self.position += 1
+            self._enter()
+            node = self._expression()
+            if self._peek() != ('symbol', ')'):
+                raise ExpressionError("Fehlende schließende Klammer im Ausdruck")
+            self.position += 1
+            self.depth -= 1
+            return node
+        raise ExpressionError("Unvollständiger Ausdruck" if kind is None else f"Unerwartetes Token im Ausdruck: '{value}'")
@@ -0,0 +1,165 @@
+# python/api/formats.py
+
+import json
+import struct
+import sys
+from array import array
+
+from flask import Response
+
+from python.api.batch import BINARY_CONTENT_TYPE, batch_errors, encode_binary_result
+from python.backend.base import STATUS_OK
+
+# Antwortformate für Ergebnis-Arrays (/batch, /eval), ausgewählt über den Accept-Header
+JSON_CONTENT_TYPE = 'application/json'
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+MSGPACK_CONTENT_TYPES = ('application/msgpack', 'application/vnd.msgpack', 'application/x-msgpack')
+
+# Elemente pro Zeile bei NDJSON
+NDJSON_CHUNK_SIZE = 8192
+
+# Gleiche Ausgabe wie jsonify ohne Debug-Modus (kompakt, sortierte Schlüssel), der Encoder wird nur
+# einmal angelegt
+_encode_json = json.JSONEncoder(separators=(',', ':'), sort_keys=True).encode
+
+
+def encode_json(payload):
+    """JSON mit Zeilenende, einheitlich für alle JSON- und NDJSON-Antworten"""
+    return _encode_json(payload) + '\n'
+
+
+def negotiate_format(req):
+    """
+    Wählt das Antwortformat anhand des Accept-Headers. Ohne Präferenz des Clients wird im Format
+    der Anfrage geantwortet (binär auf binär, sonst JSON).
+    """
+    default = BINARY_CONTENT_TYPE if req.mimetype == BINARY_CONTENT_TYPE else JSON_CONTENT_TYPE
+    offers = (default, JSON_CONTENT_TYPE, NDJSON_CONTENT_TYPE, BINARY_CONTENT_TYPE) + MSGPACK_CONTENT_TYPES
+    return req.accept_mimetypes.best_match(offers, default)
+
+
+def result_response(content_type, results, statuses, context, scalar=False):
+    """
+    Baut die Antwort für Ergebnisse und Statuscodes (array('d'), array('b')) im gewählten Format.
+    context enthält die Felder für Trace-Kontext usw., scalar liefert bei JSON nur das erste Ergebnis.
+    """
+    n = len(results)
+
+    if content_type == BINARY_CONTENT_TYPE:
+        # Die Puffer der Arrays werden ohne Umweg über Python-Zahlen übernommen
+        response = Response(encode_binary_result(results, statuses), content_type=BINARY_CONTENT_TYPE)
+        response.headers['X-Batch-Size'] = str(n)
+        response.headers['X-Batch-Errors'] = str(n - statuses.count(STATUS_OK))
+        return response
+
+    if content_type in MSGPACK_CONTENT_TYPES:
+        payload = dict(context, result=results, status=statuses, errors=batch_errors(statuses), size=n)
+        return Response(encode_msgpack(payload), content_type=content_type)
+
+    if content_type == NDJSON_CONTENT_TYPE:
+        return Response(encode_ndjson(results, statuses, context), mimetype=NDJSON_CONTENT_TYPE)
+
+    result = json_results(results, statuses)
+    return Response(
+        encode_json(dict(context, result=result[0] if scalar else result, errors=batch_errors(statuses), size=n)),
+        mimetype=JSON_CONTENT_TYPE
+    )
+
+
+def json_results(results, statuses):
+    """Ergebnisse als Liste für JSON, fehlerhafte Elemente als None"""
+    result = results.tolist()
+    if statuses.count(STATUS_OK) != len(statuses):
+        for i, status in enumerate(statuses):
+            if status != STATUS_OK:
+                result[i] = None
+    return result
+
+
+def encode_ndjson(results, statuses, context, chunk_size=NDJSON_CHUNK_SIZE):
+    """
+    NDJSON-Stream: pro Block eine Zeile {"offset": k, "result": [...]} mit None für fehlerhafte Elemente,
+    zum Schluss eine Zeile mit context, Anzahl und Fehlerliste. Es wird immer nur ein Block umgewandelt.
+    """
+    n = len(results)
+    for offset in range(0, n, chunk_size):
+        chunk = json_results(results[offset:offset + chunk_size], statuses[offset:offset + chunk_size])
+        yield encode_json({"offset": offset, "result": chunk})
+    yield encode_json(dict(context, size=n, errors=batch_errors(statuses)))
+
+
+def encode_msgpack(value):
+    """
+    Kodiert value als MessagePack. Neben None, bool, int, float, str, list und dict werden
+    array('d') als Array von float64 und array('b') als bin direkt aus dem Puffer kodiert.
+    """
+    parts = []
+    _pack(value, parts)
+    return b''.join(parts)
+
+
+def _pack(value, parts):
+    if value is None:
+        parts.append(b'\xc0')
+    elif value is True or value is False:
+        parts.append(b'\xc3' if value else b'\xc2')
+    elif isinstance(value, int):
+        parts.append(_pack_int(value))
+    elif isinstance(value, float):
+        parts.append(b'\xcb' + struct.pack('>d', value))
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        parts.append(_header(len(data), b'\xd9', b'\xda', b'\xdb', 0xa0, 32) + data)
+    elif isinstance(value, array) and value.typecode == 'd':
+        parts.append(_header(len(value), None, b'\xdc', b'\xdd', 0x90, 16))
+        parts.append(_pack_float64_values(value))
+    elif isinstance(value, array) and value.typecode in 'bB':
+        parts.append(_header(len(value), b'\xc4', b'\xc5', b'\xc6', None, 0) + value.tobytes())
+    elif isinstance(value, dict):
+        parts.append(_header(len(value), None, b'\xde', b'\xdf', 0x80, 16))
+        for key, item in value.items():
+            _pack(key, parts)
+            _pack(item, parts)
+    elif isinstance(value, (list, tuple)):
+        parts.append(_header(len(value), None, b'\xdc', b'\xdd', 0x90, 16))
+        for item in value:
+            _pack(item, parts)
+    else:
+        raise TypeError(f"Nicht als MessagePack kodierbar: {type(value).__name__}")
+
+
+def _header(length, marker8, marker16, marker32, fix, fix_limit):
+    # Längenangabe für str, bin, array und map: Fix-Format, danach 8, 16 oder 32 Bit
+    if fix is not None and length < fix_limit:
+        return bytes((fix | length,))
+    if marker8 is not None and length < 1 << 8:
+        return marker8 + struct.pack('>B', length)
+    if length < 1 << 16:
+        return marker16 + struct.pack('>H', length)
+    return marker32 + struct.pack('>I', length)
+
+
+def _pack_int(value):
+    if 0 <= value < 128:
+        return bytes((value,))
+    if -32 <= value < 0:
+        return struct.pack('>b', value)
+    if value >= 0:
+        return b'\xcf' + struct.pack('>Q', value)
+    return b'\xd3' + struct.pack('>q', value)
+
+
+def _pack_float64_values(values):
+    # Jedes Element ist 0xcb gefolgt von 8 Bytes big-endian; die Bytes werden über Slices
+    # mit Schrittweite 9 verteilt statt Element für Element kodiert
+    n = len(values)
+    if sys.byteorder == 'little':
+        values = array('d', values)
+        values.byteswap()
+    raw = values.tobytes()
+
+    packed = bytearray(9 * n)
+    packed[0::9] = b'\xcb' * n
+    for i in range(8):
+        packed[i + 1::9] = raw[i::8]
+    return packed
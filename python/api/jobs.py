@@ -0,0 +1,226 @@
+# python/api/jobs.py
+
+import sys
+
+from flask import Response, request
+
+from python.api.batch import BINARY_CONTENT_TYPE, BatchRequestError, parse_batch_request
+from python.api.expression import ExpressionError, bind_variables, compile_expression
+from python.api.formats import negotiate_format, result_response
+from python.api.pipeline import error_response, json_response, trace_fields
+from python.backend import OPERATIONS
+from python.jobs import JobError, JobSpool
+from python.logging_config import extract_trace_context, setup_logger
+from python.metrics import job_submissions, track_request_metrics
+
+# Größe der Blöcke beim Zwischenspeichern und Ausliefern großer Binärdaten
+SPOOL_BUFFER_SIZE = 1 << 20
+
+# Logger für die Job-API einrichten
+logger = setup_logger("calculator-api")
+
+
+def register_jobs(app):
+    if not app.config.get('ENABLE_JOBS', False):
+        return app
+
+    spool = JobSpool(app.config['JOB_SPOOL_DIR'])
+    app.extensions['calculator_jobs'] = spool
+
+    @app.route('/jobs', methods=['POST'])
+    @track_request_metrics
+    def submit_job():
+        """
+        Nimmt eine Batch-Berechnung oder einen Ausdruck als Job an und liefert sofort dessen ID
+        """
+        trace = trace_id, span_id, parent_span_id = extract_trace_context()
+
+        # Kontext für Antwort und Log-Einträge dieser Anfrage
+        context = trace_fields(trace)
+
+        try:
+            job_id = spool.create()
+            try:
+                spec = spool_inputs(request, spool, job_id, app.config)
+                spec.update(trace_id=trace_id, span_id=span_id)
+                chunks = -(-spec['size'] // spec['chunk_size'])
+                spool.submit(job_id, spec, chunks)
+            except Exception:
+                spool.remove(job_id)
+                raise
+
+            job_submissions.labels(kind=spec['kind']).inc()
+            logger.info("Job %s angenommen: %s mit %d Elementen in %d Blöcken", job_id, spec['kind'],
+                        spec['size'], chunks, extra=context)
+            response = json_response(dict(context, job_id=job_id, status='queued', kind=spec['kind'],
+                                          size=spec['size'], chunks=chunks), 202)
+            response.headers['Location'] = f'/jobs/{job_id}'
+            return response
+
+        except (JobError, BatchRequestError, ExpressionError) as e:
+            logger.warning("Ungültiger Job: %s", e, extra=context)
+            return error_response(context, str(e), e.status_code)
+
+        except Exception as e:
+            logger.error("Unerwarteter Fehler beim Anlegen eines Jobs: %s", e, exc_info=True, extra=context)
+            return error_response(context, str(e), 500)
+
+    @app.route('/jobs/<job_id>', methods=['GET'])
+    @track_request_metrics
+    def job_status(job_id):
+        """
+        Zustand und Fortschritt eines Jobs
+        """
+        context = trace_fields(extract_trace_context())
+
+        try:
+            spec = spool.spec(job_id)
+            state = spool.state(job_id)
+        except JobError as e:
+            return error_response(context, str(e), e.status_code)
+
+        return json_response(dict(
+            context,
+            job_id=job_id,
+            kind=spec['kind'],
+            status=state['status'],
+            size=spec['size'],
+            done=state['done'],
+            progress=state['done'] / spec['size'],
+            chunks=state['chunks'],
+            chunks_done=len(state['completed']),
+            errors=state['errors'],
+            error=state['error'],
+            submitted_at=state['submitted_at'],
+            started_at=state['started_at'],
+            finished_at=state['finished_at'],
+            job_trace_id=spec['trace_id'],
+        ))
+
+    @app.route('/jobs/<job_id>/result', methods=['GET'])
+    @track_request_metrics
+    def job_result(job_id):
+        """
+        Ergebnis eines abgeschlossenen Jobs, Format wie bei /batch über den Accept-Header
+        """
+        context = trace_fields(extract_trace_context())
+
+        try:
+            spec = spool.spec(job_id)
+            state = spool.state(job_id)
+            if state['status'] == 'failed':
+                raise JobError(f"Job fehlgeschlagen: {state['error']}", 409)
+            if state['status'] != 'done':
+                raise JobError(f"Job noch nicht abgeschlossen (Status {state['status']})", 409)
+
+            n = spec['size']
+            content_type = negotiate_format(request)
+            if content_type == BINARY_CONTENT_TYPE and sys.byteorder == 'little':
+                # Ergebnis- und Statusdatei haben bereits das Binärformat und werden blockweise ausgeliefert
+                response = Response(stream_files([spool.path(job_id, 'result.f64'), spool.path(job_id, 'status.i8')]),
+                                    content_type=BINARY_CONTENT_TYPE)
+                response.headers['Content-Length'] = str(9 * n)
+                response.headers['X-Batch-Size'] = str(n)
+                response.headers['X-Batch-Errors'] = str(state['errors'])
+                return response
+
+            results, statuses = spool.read_results(job_id, n)
+            return result_response(content_type, results, statuses, dict(context, job_id=job_id),
+                                   scalar=spec.get('scalar', False))
+
+        except JobError as e:
+            return error_response(context, str(e), e.status_code)
+
+        except Exception as e:
+            logger.error("Unerwarteter Fehler beim Lesen des Ergebnisses von Job %s: %s", job_id, e,
+                         exc_info=True, extra=context)
+            return error_response(context, str(e), 500)
+
+    return app
+
+
+def spool_inputs(req, spool, job_id, config):
+    """
+    Schreibt die Eingaben eines Jobs in dessen Spool-Verzeichnis und liefert die Job-Beschreibung.
+    Möglich sind JSON {"operation", "a", "b"} bzw. {"expression", "variables"} wie bei /batch und /eval
+    oder das float64-Binärformat von /batch mit der Operation als Query-Parameter.
+    """
+    max_size = config['JOB_MAX_SIZE']
+    spec = {'chunk_size': config['JOB_CHUNK_SIZE']}
+
+    if req.mimetype == BINARY_CONTENT_TYPE:
+        operation = req.args.get('operation')
+        if operation not in OPERATIONS:
+            raise JobError("Query-Parameter 'operation' muss add, sub, mul oder div sein")
+        if sys.byteorder != 'little':
+            raise JobError("Binäre Jobs werden nur auf Little-Endian-Systemen unterstützt", 501)
+        if req.content_length is not None and req.content_length > 16 * max_size:
+            raise JobError(f"Job zu groß: maximal {max_size} Elemente erlaubt", 413)
+
+        # Der Request-Body wird direkt in die Eingabedatei kopiert, a und b liegen hintereinander.
+        # Ohne Content-Length (chunked) wird höchstens ein Byte über der Grenze gelesen
+        path = spool.path(job_id, 'input.f64')
+        with open(path, 'wb') as f:
+            size = copy_limited(req.stream, f, 16 * max_size + 1)
+        if size > 16 * max_size:
+            raise JobError(f"Job zu groß: maximal {max_size} Elemente erlaubt", 413)
+        if size == 0 or size % 16 != 0:
+            raise JobError("Binäre Anfrage muss 2 * n float64-Werte enthalten")
+        n = size // 16
+        inputs = [{'file': 'input.f64', 'offset': 0}, {'file': 'input.f64', 'offset': 8 * n}]
+        return dict(spec, kind='batch', operation=operation, size=n, inputs=inputs)
+
+    payload = req.get_json(silent=True)
+    if not isinstance(payload, dict):
+        raise JobError("Erwartet JSON oder application/octet-stream")
+
+    if 'expression' in payload:
+        plan = compile_expression(payload['expression'], config['EVAL_MAX_NODES'])
+        variables = payload.get('variables', {})
+        slots, n = bind_variables(plan, variables, max_size)
+
+        # Array-Variablen als eigene Dateien, Skalare in der Job-Beschreibung
+        inputs = []
+        for index, name in enumerate(plan.variables):
+            if isinstance(variables[name], list):
+                spool.write_input(job_id, f'var{index}.f64', slots[index])
+                inputs.append({'file': f'var{index}.f64', 'offset': 0})
+            else:
+                inputs.append({'value': slots[index][0]})
+        return dict(spec, kind='eval', size=n or 1, scalar=n is None, inputs=inputs,
+                    code=[list(entry) for entry in plan.code], variables=list(plan.variables),
+                    constants=list(plan.constants))
+
+    operation = payload.get('operation')
+    if operation not in OPERATIONS:
+        raise JobError("Parameter 'operation' muss add, sub, mul oder div sein")
+    a, b = parse_batch_request(req, max_size)
+    if not len(a):
+        raise JobError("Parameter 'a' und 'b' dürfen nicht leer sein")
+    spool.write_input(job_id, 'a.f64', a)
+    spool.write_input(job_id, 'b.f64', b)
+    inputs = [{'file': 'a.f64', 'offset': 0}, {'file': 'b.f64', 'offset': 0}]
+    return dict(spec, kind='batch', operation=operation, size=len(a), inputs=inputs)
+
+
+def copy_limited(source, target, limit):
+    """Kopiert höchstens limit Bytes in Blöcken und liefert die Anzahl kopierter Bytes"""
+    copied = 0
+    while copied < limit:
+        block = source.read(min(SPOOL_BUFFER_SIZE, limit - copied))
+        if not block:
+            break
+        target.write(block)
+        copied += len(block)
+    return copied
+
+
+def stream_files(paths):
+    """Liefert den Inhalt der Dateien nacheinander in Blöcken"""
+    for path in paths:
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(SPOOL_BUFFER_SIZE)
+                if not block:
+                    break
+                yield block
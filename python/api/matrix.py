@@ -0,0 +1,171 @@
+# python/api/matrix.py
+
+import math
+import sys
+from array import array
+from itertools import chain
+
+from flask import Response
+
+from python.api.batch import BINARY_CONTENT_TYPE
+from python.api.formats import JSON_CONTENT_TYPE, encode_json
+from python.backend.base import MATRIX_OPERATIONS, matrix_flops
+
+# Binärformat: float64-Werte (little-endian) von A, direkt gefolgt von B, jeweils in der Reihenfolge aus
+# ?order= ('row' wie C und NumPy, Standard, oder 'col' wie Fortran); die Formen stehen in ?a=<zeilen>x<spalten>
+# und ?b=<zeilen>x<spalten>. Die Antwort enthält C im selben Format und in derselben Reihenfolge.
+MATRIX_ORDERS = ('row', 'col')
+
+
+class MatrixRequestError(ValueError):
+    """Ungültige Matrix-Anfrage, status_code ist der passende HTTP-Status"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class MatrixRequest:
+    """Operanden einer Matrixoperation als array('d') mit Formen (Zeilen, Spalten) und Reihenfolge"""
+
+    def __init__(self, operation, a, shape_a, b, shape_b, row_major, binary):
+        self.operation = operation
+        self.a = a
+        self.shape_a = shape_a
+        self.b = b
+        self.shape_b = shape_b
+        self.row_major = row_major
+        self.binary = binary
+
+    @property
+    def dimensions(self):
+        """(m, k, n) für das Backend, siehe matrix_sizes in python/backend/base.py"""
+        m, k = self.shape_a
+        if self.operation == 'matmul' or self.operation == 'solve':
+            return m, k, self.shape_b[1]
+        # transpose und elementweise: n wird nicht verwendet
+        return m, k, k
+
+    @property
+    def result_shape(self):
+        m, k, n = self.dimensions
+        if self.operation == 'transpose':
+            return k, m
+        if self.operation == 'matmul' or self.operation == 'solve':
+            return m, n
+        return m, k
+
+    @property
+    def flops(self):
+        return matrix_flops(self.operation, *self.dimensions)
+
+
+def parse_matrix_request(req, operation, max_dimension):
+    """Liest A und B aus einer Binär-Anfrage (Formen im Query-String) oder aus JSON {a: [[...]], b: [[...]]}"""
+    if operation not in MATRIX_OPERATIONS:
+        raise MatrixRequestError(f"Unbekannte Matrixoperation: {operation}", 404)
+
+    with_b = operation != 'transpose'
+    if req.mimetype == BINARY_CONTENT_TYPE:
+        order = req.args.get('order', 'row').lower()
+        if order not in MATRIX_ORDERS:
+            raise MatrixRequestError("Parameter 'order' muss 'row' oder 'col' sein")
+        shape_a = _parse_shape(req.args.get('a'), 'a')
+        shape_b = _parse_shape(req.args.get('b'), 'b') if with_b else None
+        _check_shapes(operation, shape_a, shape_b, max_dimension)
+
+        size_a = shape_a[0] * shape_a[1]
+        size_b = shape_b[0] * shape_b[1] if with_b else 0
+        data = req.get_data()
+        if len(data) != 8 * (size_a + size_b):
+            raise MatrixRequestError(f"Binäre Anfrage muss {size_a + size_b} float64-Werte enthalten")
+
+        values = array('d')
+        values.frombytes(data)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        b = values[size_a:] if with_b else None
+        return MatrixRequest(operation, values[:size_a], shape_a, b, shape_b, order == 'row', True)
+
+    payload = req.get_json(silent=True)
+    if not isinstance(payload, dict):
+        raise MatrixRequestError("Parameter 'a' muss als Liste von Zeilen angegeben werden")
+    a, shape_a = _parse_rows(payload.get('a'), 'a', max_dimension)
+    b, shape_b = _parse_rows(payload.get('b'), 'b', max_dimension) if with_b else (None, None)
+    _check_shapes(operation, shape_a, shape_b, max_dimension)
+    return MatrixRequest(operation, a, shape_a, b, shape_b, True, False)
+
+
+def matrix_response(content_type, matrix, result, errors, seconds, context):
+    """Antwort mit dem Ergebnis C, FLOP/s der Fortran-Rechnung in den Metadaten bzw. Headern"""
+    rows, cols = matrix.result_shape
+    flops = matrix.flops
+    metadata = {
+        "flops": flops,
+        "seconds": seconds,
+        "flops_per_second": flops / seconds if seconds > 0 and flops else None,
+    }
+
+    if content_type == BINARY_CONTENT_TYPE:
+        if sys.byteorder == 'big':
+            result = array('d', result)
+            result.byteswap()
+        response = Response(result.tobytes(), content_type=BINARY_CONTENT_TYPE)
+        response.headers['X-Matrix-Shape'] = f'{rows}x{cols}'
+        response.headers['X-Matrix-Order'] = 'row' if matrix.row_major else 'col'
+        response.headers['X-Matrix-Errors'] = str(errors)
+        response.headers['X-Flops'] = str(flops)
+        response.headers['X-Fortran-Seconds'] = repr(seconds)
+        if metadata['flops_per_second'] is not None:
+            response.headers['X-Flops-Per-Second'] = f"{metadata['flops_per_second']:.6g}"
+        return response
+
+    # JSON kennt kein NaN, Nulldivisionen werden wie bei /batch zu null
+    values = [None if math.isnan(value) else value for value in result] if errors else result.tolist()
+    if not matrix.row_major:
+        values = [values[j * rows + i] for i in range(rows) for j in range(cols)]
+    return Response(encode_json(dict(
+        context,
+        result=[values[i * cols:(i + 1) * cols] for i in range(rows)],
+        shape=[rows, cols],
+        errors=errors,
+        metadata=metadata,
+    )), mimetype=JSON_CONTENT_TYPE)
+
+
+def _parse_shape(value, name):
+    try:
+        rows, cols = (int(part) for part in (value or '').lower().split('x'))
+    except ValueError:
+        raise MatrixRequestError(f"Parameter '{name}' muss die Form <zeilen>x<spalten> haben") from None
+    return rows, cols
+
+
+def _parse_rows(rows, name, max_dimension):
+    if not isinstance(rows, list) or not rows or not all(isinstance(row, list) for row in rows):
+        raise MatrixRequestError(f"Parameter '{name}' muss als Liste von Zeilen angegeben werden")
+    cols = len(rows[0])
+    if len(rows) > max_dimension or cols > max_dimension:
+        raise MatrixRequestError(f"Matrix zu groß: maximal {max_dimension} Zeilen und Spalten erlaubt", 413)
+    if any(len(row) != cols for row in rows):
+        raise MatrixRequestError(f"Alle Zeilen von '{name}' müssen gleich lang sein")
+    try:
+        values = array('d', chain.from_iterable(rows))
+    except (TypeError, OverflowError):
+        raise MatrixRequestError(f"Parameter '{name}' darf nur Zahlen im float64-Bereich enthalten") from None
+    return values, (len(rows), cols)
+
+
+def _check_shapes(operation, shape_a, shape_b, max_dimension):
+    shapes = (shape_a,) if shape_b is None else (shape_a, shape_b)
+    if any(rows < 1 or cols < 1 for rows, cols in shapes):
+        raise MatrixRequestError("Matrizen müssen mindestens eine Zeile und eine Spalte haben")
+    if any(rows > max_dimension or cols > max_dimension for rows, cols in shapes):
+        raise MatrixRequestError(f"Matrix zu groß: maximal {max_dimension} Zeilen und Spalten erlaubt", 413)
+
+    if operation == 'matmul' and shape_a[1] != shape_b[0]:
+        raise MatrixRequestError(f"Spalten von A ({shape_a[1]}) und Zeilen von B ({shape_b[0]}) passen nicht zusammen")
+    if operation == 'solve' and (shape_a[0] != shape_a[1] or shape_b[0] != shape_a[0]):
+        raise MatrixRequestError("Für solve muss A quadratisch sein und B so viele Zeilen wie A haben")
+    if operation in ('add', 'sub', 'mul', 'div') and shape_a != shape_b:
+        raise MatrixRequestError("A und B müssen für elementweise Operationen dieselbe Form haben")
@@ -0,0 +1,84 @@
+# python/api/pipeline.py
+#
+# Gemeinsame Request-Pipeline der Flask-Anwendung: genau ein before_request-, after_request- und
+# teardown_request-Hook, egal wie viele Module register_pipeline aufrufen. Die Trace-Header werden
+# einmal im after_request-Hook aus dem pro Request gemerkten Trace-Kontext gesetzt, die Views
+# bauen ihre JSON-Antworten über json_response bzw. error_response.
+
+import logging
+
+from flask import Response, request
+
+from python.api.formats import JSON_CONTENT_TYPE, encode_json
+from python.logging_config import cached_trace_context, default_logger
+
+
+def trace_fields(trace):
+    """Trace-Kontext als Felder für Antworten und als extra für Log-Einträge"""
+    trace_id, span_id, parent_span_id = trace
+    return {"trace_id": trace_id, "span_id": span_id, "parent_span_id": parent_span_id}
+
+
+def trace_headers(trace):
+    """Tracing-Header (Name, Wert) einer Antwort, X-Parent-Span-Id nur mit bekanntem Eltern-Span"""
+    trace_id, span_id, parent_span_id = trace
+    headers = [
+        ('traceparent', f'00-{trace_id}-{span_id}-01'),
+        ('X-Trace-Id', trace_id),
+        ('X-Span-Id', span_id),
+    ]
+    if parent_span_id != 'unset':
+        headers.append(('X-Parent-Span-Id', parent_span_id))
+    return headers
+
+
+def json_response(payload, status_code=200):
+    """JSON-Antwort wie jsonify, ohne den Umweg über den JSON-Provider der Anwendung"""
+    return Response(encode_json(payload), status_code, content_type=JSON_CONTENT_TYPE)
+
+
+def error_response(context, message, status_code, retry_after=None):
+    """Fehlerantwort mit Trace-Kontext, bei Überlast bzw. offenem Circuit Breaker mit Retry-After"""
+    response = json_response(dict(context, error=message), status_code)
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+class RequestPipeline:
+    """Hooks für jeden Request; profiler wird von register_actuator gesetzt"""
+
+    def __init__(self):
+        self.profiler = None
+
+    def before_request(self):
+        if default_logger.isEnabledFor(logging.DEBUG):
+            default_logger.debug("Anfrage gestartet: %s %s", request.method, request.path)
+        # Threads mit laufendem Request werden vom Profiler gesampelt
+        if self.profiler is not None:
+            self.profiler.request_started()
+
+    def after_request(self, response):
+        # Nur Views, die den Trace-Kontext gelesen haben, antworten mit Tracing-Headern
+        trace = cached_trace_context()
+        if trace is not None:
+            response.headers.extend(trace_headers(trace))
+        if default_logger.isEnabledFor(logging.DEBUG):
+            default_logger.debug("Anfrage abgeschlossen: %s %s - Status: %s", request.method, request.path,
+                                 response.status_code)
+        return response
+
+    def teardown_request(self, exception):
+        if self.profiler is not None:
+            self.profiler.request_finished()
+
+
+def register_pipeline(app):
+    """Registriert die Hooks der Pipeline einmal pro Anwendung und liefert die Pipeline"""
+    pipeline = app.extensions.get('calculator_pipeline')
+    if pipeline is None:
+        pipeline = app.extensions['calculator_pipeline'] = RequestPipeline()
+        app.before_request(pipeline.before_request)
+        app.after_request(pipeline.after_request)
+        app.teardown_request(pipeline.teardown_request)
+    return pipeline
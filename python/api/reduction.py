@@ -0,0 +1,102 @@
+# python/api/reduction.py
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+
+from python.api.formats import encode_json
+from python.backend.base import CalculationError
+from python.backend.reduction import ReductionError
+
+# Größe der Blöcke beim Zwischenspeichern hochgeladener Dateien
+UPLOAD_BUFFER_SIZE = 1 << 20
+
+
+def reduction_inputs(req, data_dir, cleanup):
+    """
+    Liefert die Dateipfade (a, b oder None) einer Reduktions-Anfrage. Möglich sind:
+    JSON {"path": ..., "other": ...} relativ zu data_dir, multipart/form-data mit den Dateien a und b
+    oder ein roher Request-Body (application/octet-stream) als einziger Operand.
+    Hochgeladene Daten werden blockweise in temporäre Dateien geschrieben, die über cleanup
+    (contextlib.ExitStack) wieder entfernt werden.
+    """
+    if req.mimetype == 'application/json':
+        payload = req.get_json(silent=True)
+        if not isinstance(payload, dict) or not isinstance(payload.get('path'), str):
+            raise ReductionError("Parameter 'path' fehlt")
+        other = payload.get('other')
+        if other is not None and not isinstance(other, str):
+            raise ReductionError("Parameter 'other' muss ein Dateipfad sein")
+        return _data_path(data_dir, payload['path']), _data_path(data_dir, other) if other else None
+
+    directory = cleanup.enter_context(tempfile.TemporaryDirectory(prefix='reduce-'))
+
+    if req.mimetype == 'multipart/form-data':
+        if 'a' not in req.files:
+            raise ReductionError("Datei 'a' fehlt")
+        paths = []
+        for name in ('a', 'b'):
+            upload = req.files.get(name)
+            paths.append(_spool(upload.stream, os.path.join(directory, name)) if upload else None)
+        return tuple(paths)
+
+    if req.mimetype == 'application/octet-stream':
+        return _spool(req.stream, os.path.join(directory, 'a')), None
+
+    raise ReductionError("Erwartet JSON, multipart/form-data oder application/octet-stream", 415)
+
+
+def stream_reduction(run, cleanup, context):
+    """
+    NDJSON-Antwort einer Reduktion: pro verarbeitetem Block eine Zeile {"progress": k, "total": n},
+    zum Schluss {"result": ...} bzw. {"error": ..., "status": ...}, jeweils mit den Feldern aus context.
+    run(progress) läuft in einem eigenen Thread, cleanup wird nach dessen Ende geschlossen.
+    """
+    events = queue.Queue()
+
+    def worker():
+        try:
+            events.put(('result', run(lambda done, total: events.put(('progress', done, total)))))
+        except ReductionError as e:
+            events.put(('error', str(e), e.status_code))
+        except CalculationError as e:
+            events.put(('error', f"Fehler bei der Berechnung: {e}", e.status_code))
+        except Exception as e:
+            events.put(('error', str(e), 500))
+
+    thread = threading.Thread(target=worker, name='reduce-stream', daemon=True)
+    thread.start()
+    try:
+        while True:
+            event = events.get()
+            if event[0] == 'progress':
+                yield encode_json({"progress": event[1], "total": event[2]})
+            elif event[0] == 'result':
+                yield encode_json(dict(context, result=event[1]))
+                return
+            else:
+                yield encode_json(dict(context, error=event[1], status=event[2]))
+                return
+    finally:
+        # Auch bei Abbruch durch den Client erst aufräumen, wenn die Reduktion beendet ist
+        thread.join()
+        cleanup.close()
+
+
+def _data_path(data_dir, path):
+    # Dateipfade sind nur innerhalb des freigegebenen Verzeichnisses erlaubt
+    if not data_dir:
+        raise ReductionError("Reduktionen über Dateipfade sind nicht freigegeben (REDUCE_DATA_DIR)", 403)
+    root = os.path.realpath(data_dir)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ReductionError("Dateipfad liegt außerhalb von REDUCE_DATA_DIR", 403)
+    return resolved
+
+
+def _spool(stream, path):
+    with open(path, 'wb') as f:
+        shutil.copyfileobj(stream, f, UPLOAD_BUFFER_SIZE)
+    return path
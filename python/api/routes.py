@@ -1,32 +1,30 @@
 # python/api/routes.py
 
-from flask import jsonify, Flask, request
-import prometheus_client
-from prometheus_client import multiprocess, CONTENT_TYPE_LATEST
-import subprocess
-import os
-import json
-import time
-from python.metrics import track_request_metrics, track_fortran_call, metrics_registry
-from python.logging_config import setup_logger, extract_trace_context, default_logger
-
-CALCULATOR_PATH = os.path.abspath("./bin/calculator")
+from contextlib import ExitStack
+from flask import jsonify, request, Response
+from python.api.batch import BatchRequestError, parse_batch_request
+from python.api.expression import ExpressionError, bind_variables, compile_expression
+from python.api.formats import negotiate_format, result_response
+from python.api.matrix import MatrixRequestError, matrix_response, parse_matrix_request
+from python.api.pipeline import error_response, json_response, register_pipeline, trace_fields
+from python.api.reduction import reduction_inputs, stream_reduction
+from python.backend import OPERATIONS, CalculationError, create_backend
+from python.backend.base import STATUS_OK
+from python.backend.reduction import ReductionError, reduce_file
+from python.metrics import track_request_metrics, fortran_batch_size
+from python.logging_config import setup_logger, extract_trace_context
 
 # Logger für die API-Komponente einrichten
 logger = setup_logger("calculator-api")
 
 def register_routes(app):
-    @app.before_request
-    def before_request():
-        request.logger = default_logger
-        request.start_time = time.time()
-        request.logger.debug(f"Anfrage gestartet: {request.method} {request.path}")
-
-    @app.after_request
-    def after_request(response):
-        request.logger.debug(f"Anfrage abgeschlossen: {request.method} {request.path} - Status: {response.status_code}")
-        return response
+    # Fortran-Backend gemäß Konfiguration auswählen
+    backend = create_backend(app.config)
+    app.extensions['calculator_backend'] = backend
+    logger.info(f"Fortran-Backend: {backend.name}")
 
+    # Gemeinsame Hooks, Tracing-Header und JSON-Antworten (python/api/pipeline.py)
+    register_pipeline(app)
 
     @app.route('/')
     def index():
@@ -37,6 +35,13 @@ def register_routes(app):
                 "/sub": "Subtraktion zweier Zahlen (GET, Parameter: a, b)",
                 "/mul": "Multiplikation zweier Zahlen (GET, Parameter: a, b)",
                 "/div": "Division zweier Zahlen (GET, Parameter: a, b)",
+                "/batch/<op>": "Elementweise Berechnung über Arrays (POST, JSON {a: [], b: []} oder float64-Binärformat)",
+                "/eval": "Zusammengesetzter Ausdruck über Skalare und Arrays (POST, JSON {expression, variables})",
+                "/reduce/<op>": "sum, mean, min, max, stats oder dot über float64-Dateien (POST, Pfad oder Upload)",
+                "/matrix/<op>": "matmul, transpose, add, sub, mul, div oder solve über dichte Matrizen "
+                                "(POST, JSON {a: [[]], b: [[]]} oder float64-Binärformat mit ?a=<m>x<k>&b=<k>x<n>)",
+                "/jobs": "Batch-Berechnung oder Ausdruck als asynchroner Job (POST), Zustand unter /jobs/<id>, "
+                         "Ergebnis unter /jobs/<id>/result",
 
                 # end::[]"
             }
@@ -46,100 +51,199 @@ def register_routes(app):
         """
         Generische Funktion für alle Rechenoperationen
         """
-        trace_id, span_id, parent_span_id = extract_trace_context()
+        trace = trace_id, span_id, parent_span_id = extract_trace_context()
 
-        # Log-Kontext für diese Anfrage
-        log_extra = {'trace_id': trace_id, 'span_id': span_id, 'parent_span_id': parent_span_id}
+        # Kontext für Antwort und Log-Einträge dieser Anfrage
+        context = trace_fields(trace)
 
         try:
-            a = request.args.get('a', type=float)
-            b = request.args.get('b', type=float)
+            args = request.args
+            a = args.get('a', type=float)
+            b = args.get('b', type=float)
 
             if a is None or b is None:
-                logger.warning(f"Fehlende Parameter bei {operation}-Operation", extra=log_extra)
-                response = jsonify({
-                    "error": "Parameter 'a' und 'b' müssen als Zahlen angegeben werden",
-                    "trace_id": trace_id,
-                    "span_id": span_id,
-                    "parent_span_id": parent_span_id
-                }), 400
-                if isinstance(response, tuple) and len(response) > 0:
-                    response[0].headers['traceparent'] = f'00-{trace_id}-{span_id}-01'
-                    response[0].headers['X-Trace-Id'] = trace_id
-                    response[0].headers['X-Span-Id'] = span_id
-                    if parent_span_id != 'unset':
-                        response[0].headers['X-Parent-Span-Id'] = parent_span_id
-                return response
+                logger.warning(f"Fehlende Parameter bei {operation}-Operation", extra=context)
+                return error_response(context, "Parameter 'a' und 'b' müssen als Zahlen angegeben werden", 400)
 
-            logger.info(f"{operation}-Operation gestartet mit a={a}, b={b}", extra=log_extra)
-
-            # Umgebungsvariablen für das Fortran-Programm bereitstellen
-            env = os.environ.copy()
-            env['TRACE_ID'] = trace_id
-            env['SPAN_ID'] = span_id
-            env['PARENT_SPAN_ID'] = parent_span_id
-
-            # Aufruf des Fortran-Programms mit der übergebenen Operation und Trace-Kontext
-            result = subprocess.run(
-                [CALCULATOR_PATH, str(a), str(b), operation],
-                capture_output=True,
-                text=True,
-                env=env
-            )
-
-            if result.returncode != 0:
-                error_msg = f"Fehler bei der Berechnung: {result.stderr}"
-                logger.error(error_msg, extra=log_extra)
-                response = jsonify({
-                    "error": error_msg,
-                    "trace_id": trace_id,
-                    "span_id": span_id,
-                    "parent_span_id": parent_span_id
-                }), 500
-                if isinstance(response, tuple) and len(response) > 0:
-                    response[0].headers['traceparent'] = f'00-{trace_id}-{span_id}-01'
-                    response[0].headers['X-Trace-Id'] = trace_id
-                    response[0].headers['X-Span-Id'] = span_id
-                    if parent_span_id != 'unset':
-                        response[0].headers['X-Parent-Span-Id'] = parent_span_id
-                return response
+            logger.info("%s-Operation gestartet mit a=%s, b=%s", operation, a, b, extra=context)
 
-            # Ausgabe des Fortran-Programms parsen
-            output = float(result.stdout.strip())
+            try:
+                output = backend.calculate(operation, a, b, trace_id, span_id, parent_span_id)
+            except CalculationError as e:
+                error_msg = f"Fehler bei der Berechnung: {e}"
+                logger.error(error_msg, extra=context)
+                return error_response(context, error_msg, e.status_code, e.retry_after)
 
-            logger.info(f"{operation}-Operation erfolgreich: {a} {operation} {b} = {output}", extra=log_extra)
+            logger.info("%s-Operation erfolgreich: %s %s %s = %s", operation, a, operation, b, output, extra=context)
 
-            response = jsonify({
-                "result": output,
-                "trace_id": trace_id,
-                "span_id": span_id,
-                "parent_span_id": parent_span_id
-            })
+            return json_response(dict(context, result=output))
 
-            # Tracing-Header zur Antwort hinzufügen
-            response.headers['traceparent'] = f'00-{trace_id}-{span_id}-01'
-            response.headers['X-Trace-Id'] = trace_id
-            response.headers['X-Span-Id'] = span_id
-            if parent_span_id != 'unset':
-                response[0].headers['X-Parent-Span-Id'] = parent_span_id
+        except Exception as e:
+            error_msg = f"Unerwarteter Fehler bei {operation}: {str(e)}"
+            logger.error(error_msg, exc_info=True, extra=context)
+            return error_response(context, str(e), 500)
 
-            return response
+    def calculate_batch(operation):
+        """
+        Elementweise Berechnung über zwei Arrays in einem einzigen Backend-Aufruf
+        """
+        trace = trace_id, span_id, parent_span_id = extract_trace_context()
+
+        # Kontext für Antwort und Log-Einträge dieser Anfrage
+        context = trace_fields(trace)
+
+        try:
+            if operation not in OPERATIONS:
+                raise BatchRequestError(f"Unbekannte Operation: {operation}", 404)
+
+            a, b = parse_batch_request(request, app.config['BATCH_MAX_SIZE'])
+            fortran_batch_size.labels(operation=operation).observe(len(a))
+            logger.info(f"Batch-{operation}-Operation gestartet mit {len(a)} Elementen", extra=context)
+
+            results, statuses = backend.calculate_batch(operation, a, b, trace_id, span_id, parent_span_id)
+            errors = len(statuses) - statuses.count(STATUS_OK)
+
+            logger.info(f"Batch-{operation}-Operation erfolgreich: {len(a)} Elemente, {errors} Fehler",
+                        extra=context)
+
+            # JSON, NDJSON, float64-Binärformat oder MessagePack je nach Accept-Header
+            return result_response(negotiate_format(request), results, statuses, context)
+
+        except BatchRequestError as e:
+            logger.warning(f"Ungültige Batch-Anfrage bei {operation}: {e}", extra=context)
+            return error_response(context, str(e), e.status_code)
+
+        except CalculationError as e:
+            error_msg = f"Fehler bei der Berechnung: {e}"
+            logger.error(error_msg, extra=context)
+            return error_response(context, error_msg, e.status_code, e.retry_after)
 
         except Exception as e:
-            error_msg = f"Unerwarteter Fehler bei {operation}: {str(e)}"
-            logger.error(error_msg, exc_info=True, extra=log_extra)
-            response = jsonify({
-                "error": str(e),
-                "trace_id": trace_id,
-                "span_id": span_id
-            }), 500
-            if isinstance(response, tuple) and len(response) > 0:
-                response[0].headers['traceparent'] = f'00-{trace_id}-{span_id}-01'
-                response[0].headers['X-Trace-Id'] = trace_id
-                response[0].headers['X-Span-Id'] = span_id
-                if parent_span_id != 'unset':
-                    response[0].headers['X-Parent-Span-Id'] = parent_span_id
-            return response
+            error_msg = f"Unerwarteter Fehler bei Batch-{operation}: {str(e)}"
+            logger.error(error_msg, exc_info=True, extra=context)
+            return error_response(context, str(e), 500)
+
+    def evaluate_expression():
+        """
+        Wertet einen zusammengesetzten Ausdruck in einem einzigen Backend-Aufruf aus
+        """
+        trace = trace_id, span_id, parent_span_id = extract_trace_context()
+
+        # Kontext für Antwort und Log-Einträge dieser Anfrage
+        context = trace_fields(trace)
+
+        try:
+            payload = request.get_json(silent=True)
+            if not isinstance(payload, dict) or 'expression' not in payload:
+                raise ExpressionError("Parameter 'expression' fehlt")
+
+            plan = compile_expression(payload['expression'], app.config['EVAL_MAX_NODES'])
+            slots, n = bind_variables(plan, payload.get('variables', {}), app.config['BATCH_MAX_SIZE'])
+            scalar = n is None
+            n = n or 1
+            fortran_batch_size.labels(operation='eval').observe(n)
+            logger.info("Ausdruck gestartet mit %d Elementen und %d Befehlen", n, len(plan.code), extra=context)
+
+            results, statuses = backend.evaluate(plan, slots, n, trace_id, span_id, parent_span_id)
+            errors = len(statuses) - statuses.count(STATUS_OK)
+
+            logger.info("Ausdruck erfolgreich: %d Elemente, %d Fehler", n, errors, extra=context)
+
+            return result_response(negotiate_format(request), results, statuses, context, scalar=scalar)
+
+        except ExpressionError as e:
+            logger.warning("Ungültiger Ausdruck: %s", e, extra=context)
+            return error_response(context, str(e), e.status_code)
+
+        except CalculationError as e:
+            error_msg = f"Fehler bei der Berechnung: {e}"
+            logger.error(error_msg, extra=context)
+            return error_response(context, error_msg, e.status_code, e.retry_after)
+
+        except Exception as e:
+            logger.error("Unerwarteter Fehler bei Ausdruck: %s", e, exc_info=True, extra=context)
+            return error_response(context, str(e), 500)
+
+    def matrix_operation(operation):
+        """
+        Dichte Matrixoperation in einem einzigen Backend-Aufruf, mit FLOP/s der Fortran-Rechnung
+        """
+        trace = trace_id, span_id, parent_span_id = extract_trace_context()
+
+        # Kontext für Antwort und Log-Einträge dieser Anfrage
+        context = trace_fields(trace)
+
+        try:
+            matrix = parse_matrix_request(request, operation, app.config['MATRIX_MAX_DIMENSION'])
+            logger.info("Matrix-%s-Operation gestartet mit %s", operation, 'x'.join(map(str, matrix.dimensions)),
+                        extra=context)
+
+            result, errors, seconds = backend.matrix(operation, matrix.a, matrix.b, matrix.dimensions,
+                                                     matrix.row_major, trace_id, span_id, parent_span_id)
+
+            logger.info("Matrix-%s-Operation erfolgreich in %.6f s, %d Fehler", operation, seconds, errors,
+                        extra=context)
+
+            return matrix_response(negotiate_format(request), matrix, result, errors, seconds, context)
+
+        except MatrixRequestError as e:
+            logger.warning("Ungültige Matrix-Anfrage bei %s: %s", operation, e, extra=context)
+            return error_response(context, str(e), e.status_code)
+
+        except CalculationError as e:
+            error_msg = f"Fehler bei der Berechnung: {e}"
+            logger.error(error_msg, extra=context)
+            return error_response(context, error_msg, e.status_code, e.retry_after)
+
+        except Exception as e:
+            logger.error("Unerwarteter Fehler bei Matrix-%s: %s", operation, e, exc_info=True, extra=context)
+            return error_response(context, str(e), 500)
+
+    def reduce_values(operation):
+        """
+        Reduktion über eine große float64-Datei, blockweise im Fortran-Backend
+        """
+        trace = trace_id, span_id, parent_span_id = extract_trace_context()
+
+        # Kontext für Log-Einträge dieser Anfrage, die Antwort nennt zusätzlich die Operation
+        log_extra = trace_fields(trace)
+        context = dict(log_extra, operation=operation)
+
+        cleanup = ExitStack()
+        try:
+            path, other = reduction_inputs(request, app.config['REDUCE_DATA_DIR'], cleanup)
+            logger.info("Reduktion %s gestartet", operation, extra=log_extra)
+
+            def run(progress=None):
+                return reduce_file(backend, operation, path, other, app.config['REDUCE_CHUNK_SIZE'], progress,
+                                   trace_id, span_id, parent_span_id)
+
+            if 'application/x-ndjson' in request.headers.get('Accept', ''):
+                # Fortschritt als NDJSON, die temporären Dateien gehören ab hier dem Stream
+                response = Response(stream_reduction(run, cleanup, context), mimetype='application/x-ndjson')
+                cleanup = None
+                return response
+
+            result = run()
+            logger.info("Reduktion %s erfolgreich über %d Werte", operation, result['count'], extra=log_extra)
+            return json_response(dict(context, result=result))
+
+        except ReductionError as e:
+            logger.warning("Ungültige Reduktion %s: %s", operation, e, extra=log_extra)
+            return error_response(context, str(e), e.status_code)
+
+        except CalculationError as e:
+            error_msg = f"Fehler bei der Berechnung: {e}"
+            logger.error(error_msg, extra=log_extra)
+            return error_response(context, error_msg, e.status_code, e.retry_after)
+
+        except Exception as e:
+            logger.error("Unerwarteter Fehler bei Reduktion %s: %s", operation, e, exc_info=True, extra=log_extra)
+            return error_response(log_extra, str(e), 500)
+
+        finally:
+            if cleanup is not None:
+                cleanup.close()
 
     # Endpunkte für die verschiedenen Operationen
     @app.route('/add', methods=['GET'])
@@ -162,4 +266,24 @@ def register_routes(app):
     def divide():
         return calculate("div")
 
+    @app.route('/batch/<operation>', methods=['POST'])
+    @track_request_metrics
+    def batch(operation):
+        return calculate_batch(operation)
+
+    @app.route('/reduce/<operation>', methods=['POST'])
+    @track_request_metrics
+    def reduce(operation):
+        return reduce_values(operation)
+
+    @app.route('/matrix/<operation>', methods=['POST'])
+    @track_request_metrics
+    def matrix(operation):
+        return matrix_operation(operation)
+
+    @app.route('/eval', methods=['POST'])
+    @track_request_metrics
+    def evaluate():
+        return evaluate_expression()
+
     return app
\ No newline at end of file
@@ -0,0 +1,142 @@
+# python/asgi.py
+#
+# ASGI-Variante der Anwendung für den Betrieb mit Uvicorn-Workern. Die Rechen-Endpunkte
+# /add, /sub, /mul und /div laufen direkt auf der Event-Loop und rufen das Fortran-Backend
+# nicht-blockierend auf; ein Semaphor begrenzt die gleichzeitigen Fortran-Aufrufe.
+# Alle anderen Routen (Batch, Actuator, ...) werden an die Flask-Anwendung weitergereicht.
+
+import asyncio
+import logging
+import time
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.datastructures import Headers
+
+from python.api.pipeline import encode_json, trace_fields, trace_headers
+from python.backend import CalculationError
+from python.logging_config import extract_trace_context
+from python.metrics import observe_fortran_phase, observe_request
+from python.wsgi import app as flask_app
+
+logger = logging.getLogger("calculator-api")
+
+# Pfad -> (Operation, Endpoint-Name wie in python/api/routes.py)
+CALCULATION_ROUTES = {
+    '/add': ('add', 'add'),
+    '/sub': ('sub', 'subtract'),
+    '/mul': ('mul', 'multiply'),
+    '/div': ('div', 'divide'),
+}
+
+
+class CalculatorASGI:
+    """ASGI-Anwendung mit nativen async Rechen-Endpunkten und Flask als Fallback"""
+
+    def __init__(self, wsgi_app, max_in_flight):
+        self.wsgi_app = wsgi_app
+        self.fallback = WsgiToAsgi(wsgi_app)
+        self.backend = wsgi_app.extensions['calculator_backend']
+        self.profiler = wsgi_app.extensions['calculator_profiler']
+        self.in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http' and scope['method'] == 'GET' and scope['path'] in CALCULATION_ROUTES:
+            await self._calculation(scope, send)
+        else:
+            await self.fallback(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Aufwärmen im Worker-Prozess starten, falls es nicht schon läuft (PRELOAD_APP)
+                warmup = self.wsgi_app.extensions.get('calculator_warmup')
+                if warmup is not None:
+                    warmup.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _calculation(self, scope, send):
+        operation, endpoint = CALCULATION_ROUTES[scope['path']]
+        start_time = time.time()
+        status = 500
+        # Die Event-Loop bearbeitet einen Request und wird vom Profiler gesampelt
+        self.profiler.request_started()
+
+        try:
+            headers = Headers([(k.decode('latin-1'), v.decode('latin-1')) for k, v in scope['headers']])
+            status, payload, trace, retry_after = await self.calculate(operation, scope['query_string'], headers)
+            await _send_json(send, status, payload, trace, retry_after)
+        finally:
+            self.profiler.request_finished()
+            observe_request('GET', endpoint, status, time.time() - start_time)
+
+    async def calculate(self, operation, query_string, headers):
+        """
+        Async-Gegenstück zu calculate() in python/api/routes.py, liefert
+        (Status, Payload, Trace-Kontext, Retry-After)
+        """
+        trace = trace_id, span_id, parent_span_id = extract_trace_context(headers)
+
+        # Kontext für Antwort und Log-Einträge dieser Anfrage
+        context = trace_fields(trace)
+
+        try:
+            args = parse_qs(query_string.decode('latin-1'))
+            a = _float_arg(args, 'a')
+            b = _float_arg(args, 'b')
+
+            if a is None or b is None:
+                logger.warning(f"Fehlende Parameter bei {operation}-Operation", extra=context)
+                return 400, dict(context, error="Parameter 'a' und 'b' müssen als Zahlen angegeben werden"), trace, None
+
+            logger.info("%s-Operation gestartet mit a=%s, b=%s", operation, a, b, extra=context)
+
+            try:
+                queued_at = time.perf_counter()
+                async with self.in_flight:
+                    observe_fortran_phase('queue', operation, self.backend.name, time.perf_counter() - queued_at,
+                                          trace_id)
+                    output = await self.backend.calculate_async(operation, a, b, trace_id, span_id, parent_span_id)
+            except CalculationError as e:
+                error_msg = f"Fehler bei der Berechnung: {e}"
+                logger.error(error_msg, extra=context)
+                return e.status_code, dict(context, error=error_msg), trace, e.retry_after
+
+            logger.info("%s-Operation erfolgreich: %s %s %s = %s", operation, a, operation, b, output, extra=context)
+
+            return 200, dict(context, result=output), trace, None
+
+        except Exception as e:
+            error_msg = f"Unerwarteter Fehler bei {operation}: {str(e)}"
+            logger.error(error_msg, exc_info=True, extra=context)
+            return 500, dict(context, error=str(e)), trace, None
+
+
+def _float_arg(args, name):
+    # Entspricht request.args.get(name, type=float)
+    try:
+        return float(args[name][0])
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+async def _send_json(send, status, payload, trace, retry_after=None):
+    body = encode_json(payload).encode('utf-8')
+
+    # Tracing-Header wie bei den Flask-Routen (python/api/pipeline.py)
+    headers = [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    headers.extend((name.lower().encode(), value.encode()) for name, value in trace_headers(trace))
+    if retry_after is not None:
+        headers.append((b'retry-after', str(retry_after).encode()))
+
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+app = CalculatorASGI(flask_app, flask_app.config['ASYNC_MAX_IN_FLIGHT'])
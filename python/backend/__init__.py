@@ -0,0 +1,111 @@
+# python/backend/__init__.py
+
+import logging
+import os
+
+from python.backend.base import OPERATIONS, BackendTimeoutError, CalculationError, OperationError, RejectedError
+from python.backend.cache import CachingBackend, LocalCache, ResultCache, SharedCache
+from python.backend.coalesce import CoalescingBackend
+from python.backend.guard import AdmissionController, CircuitBreaker, GuardedBackend
+from python.backend.library import LibraryBackend
+from python.backend.pool import PoolBackend
+from python.backend.process import SubprocessBackend
+
+__all__ = ['OPERATIONS', 'BackendTimeoutError', 'CachingBackend', 'CalculationError', 'CoalescingBackend',
+           'GuardedBackend', 'LibraryBackend', 'OperationError', 'PoolBackend', 'RejectedError', 'ResultCache',
+           'SubprocessBackend', 'create_backend', 'fortran_backend']
+
+
+def create_backend(config):
+    """
+    Erzeugt das in der Konfiguration gewählte Fortran-Backend. Von außen nach innen:
+    Ergebnis-Cache -> Tracing -> Admission Control/Circuit Breaker -> Micro-Batching -> Fortran-Backend,
+    d.h. Cache-Treffer werden weder abgelehnt noch warten sie auf das Sammelfenster; einen Span
+    bekommen nur Aufrufe, die das Backend erreichen.
+    """
+    backend = _create_fortran_backend(config)
+
+    if config.get('ENABLE_COALESCING', False):
+        backend = CoalescingBackend(backend, config.get('COALESCE_WINDOW_MS', 2.0) / 1000.0,
+                                    config.get('COALESCE_MAX_BATCH', 64))
+
+    if config.get('ENABLE_ADMISSION_CONTROL', False):
+        backend = GuardedBackend(
+            backend,
+            AdmissionController(config.get('ADMISSION_MAX_IN_FLIGHT', 64), config.get('ADMISSION_RETRY_AFTER', 1)),
+            CircuitBreaker(config.get('CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5),
+                           config.get('CIRCUIT_BREAKER_RESET_TIMEOUT', 10.0))
+        )
+
+    if config.get('ENABLE_OPENTELEMETRY', False):
+        # OpenTelemetry wird nur importiert, wenn es eingeschaltet ist
+        from python.backend.tracing import TracingBackend
+        backend = TracingBackend(backend)
+
+    if not config.get('ENABLE_RESULT_CACHE', False):
+        return backend
+
+    ttl = config.get('RESULT_CACHE_TTL', 300.0)
+    shared = None
+    if config.get('RESULT_CACHE_SHARED_PATH'):
+        shared = SharedCache(config['RESULT_CACHE_SHARED_PATH'], config.get('RESULT_CACHE_SHARED_SLOTS', 65536), ttl)
+
+    cache = ResultCache(LocalCache(config.get('RESULT_CACHE_SIZE', 10000), ttl), shared)
+    return CachingBackend(backend, cache)
+
+
+def fortran_backend(backend):
+    """Das Fortran-Backend unter Cache, Tracing, Admission Control und Micro-Batching"""
+    while hasattr(backend, 'backend'):
+        backend = backend.backend
+    return backend
+
+
+def _create_fortran_backend(config):
+    logger = logging.getLogger("calculator-app")
+    backend_name = config.get('CALCULATOR_BACKEND', 'subprocess')
+
+    if backend_name == 'library':
+        try:
+            return LibraryBackend(config['FORTRAN_LIB_PATH'], threads=_fortran_threads(config, 1),
+                                  parallel_threshold=config.get('FORTRAN_PARALLEL_THRESHOLD'))
+        except OSError as e:
+            # Fallback auf den Subprozess-Aufruf, wenn die Bibliothek nicht geladen werden kann
+            logger.warning(f"Fortran-Bibliothek konnte nicht geladen werden, verwende Subprozess: {e}")
+    elif backend_name == 'pool':
+        return PoolBackend(
+            config['FORTRAN_CALC_PATH'],
+            size=config.get('FORTRAN_POOL_SIZE', 2),
+            max_lifetime=config.get('FORTRAN_POOL_MAX_LIFETIME', 3600.0),
+            checkout_timeout=config.get('FORTRAN_POOL_CHECKOUT_TIMEOUT', 5.0),
+            health_check_interval=config.get('FORTRAN_POOL_HEALTH_CHECK_INTERVAL', 30.0),
+            timeout=config.get('FORTRAN_CALL_TIMEOUT'),
+            batch_timeout=config.get('FORTRAN_BATCH_TIMEOUT'),
+            log_level=config.get('FORTRAN_LOG_LEVEL', 'OFF'),
+            threads=_fortran_threads(config, config.get('FORTRAN_POOL_SIZE', 2)),
+            parallel_threshold=config.get('FORTRAN_PARALLEL_THRESHOLD'),
+            transport=config.get('FORTRAN_TRANSPORT', 'text'),
+            result_format=config.get('FORTRAN_RESULT_FORMAT', 'hex')
+        )
+    elif backend_name != 'subprocess':
+        raise ValueError(f"Unbekanntes Fortran-Backend: {backend_name}")
+
+    return SubprocessBackend(config['FORTRAN_CALC_PATH'], timeout=config.get('FORTRAN_CALL_TIMEOUT'),
+                             batch_timeout=config.get('FORTRAN_BATCH_TIMEOUT'),
+                             log_level=config.get('FORTRAN_LOG_LEVEL', 'OFF'),
+                             threads=_fortran_threads(config, 1),
+                             parallel_threshold=config.get('FORTRAN_PARALLEL_THRESHOLD'),
+                             transport=config.get('FORTRAN_TRANSPORT', 'text'),
+                             result_format=config.get('FORTRAN_RESULT_FORMAT', 'hex'))
+
+
+def _fortran_threads(config, processes_per_worker):
+    """
+    Threads pro Fortran-Prozess. Ohne Vorgabe werden die CPU-Kerne auf alle Gunicorn-Worker und
+    deren gleichzeitig rechnende Fortran-Prozesse aufgeteilt, damit die Kerne nicht überbucht werden.
+    """
+    threads = config.get('FORTRAN_THREADS', 0)
+    if threads > 0:
+        return threads
+    processes = max(config.get('WORKERS', 1) * processes_per_worker, 1)
+    return max((os.cpu_count() or 1) // processes, 1)
@@ -0,0 +1,218 @@
+# python/backend/base.py
+
+import struct
+import sys
+from array import array
+
+# Unterstützte Rechenoperationen (entsprechen den Operationen von bin/calculator)
+OPERATIONS = ('add', 'sub', 'mul', 'div')
+
+# Statuscodes pro Element bei Batch-Berechnungen (siehe src/math_bindings.f90)
+STATUS_OK = 0
+STATUS_DIVISION_BY_ZERO = 1
+
+# Übertragung der Operanden an bin/calculator: Textzeilen über stdin/stdout oder Shared Memory
+TRANSPORTS = ('text', 'shm')
+
+# Ergebnisformat von bin/calculator (FORTRAN_RESULT_FORMAT): Dezimaltext oder IEEE-754-Bitmuster in Hex-Ziffern
+RESULT_FORMATS = ('text', 'hex')
+
+# Befehlscodes des Ausdrucks-Auswerters (siehe src/expression_eval.f90)
+OP_PUSH = 0
+OPCODES = {'add': 1, 'sub': 2, 'mul': 3, 'div': 4}
+
+# Matrixoperationen und ihre Befehlscodes (siehe src/matrix_operations.f90)
+MATRIX_OPERATIONS = ('matmul', 'transpose', 'add', 'sub', 'mul', 'div', 'solve')
+MATRIX_OPCODES = {operation: code for code, operation in enumerate(MATRIX_OPERATIONS, start=1)}
+
+
+class CalculationError(Exception):
+    """Fehler bei der Ausführung einer Rechenoperation im Fortran-Backend"""
+
+    # Passender HTTP-Status und optionaler Retry-After-Wert in Sekunden
+    status_code = 500
+    retry_after = None
+
+
+class OperationError(CalculationError):
+    """Fachlicher Fehler der Operation (z.B. Division durch Null), für dieselben Operanden immer gleich"""
+
+
+class BackendTimeoutError(CalculationError):
+    """Der Fortran-Aufruf hat das Zeitlimit überschritten und wurde abgebrochen"""
+
+    status_code = 504
+
+
+class RejectedError(CalculationError):
+    """Der Aufruf wurde wegen Überlast oder offenem Circuit Breaker nicht ausgeführt"""
+
+    def __init__(self, message, status_code, retry_after):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ExpressionPlan:
+    """
+    Übersetzter Ausdruck für den Fortran-Auswerter: Programm in umgekehrter polnischer Notation
+    als Liste von (Befehl, Slot) sowie die Slots, zuerst die Variablen, danach die Konstanten
+    """
+
+    def __init__(self, code, variables, constants):
+        self.code = tuple(code)
+        self.variables = tuple(variables)
+        self.constants = tuple(constants)
+
+    def __repr__(self):
+        return f"ExpressionPlan(code={self.code!r}, variables={self.variables!r}, constants={self.constants!r})"
+
+
+def check_transport(transport):
+    """Prüft die konfigurierte Übertragungsart für Batch-Aufrufe"""
+    transport = (transport or 'text').lower()
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unbekannte Übertragungsart: {transport}")
+    return transport
+
+
+def check_result_format(result_format):
+    """Prüft das konfigurierte Ergebnisformat von bin/calculator"""
+    result_format = (result_format or 'text').lower()
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"Unbekanntes Ergebnisformat: {result_format}")
+    return result_format
+
+
+def parallel_environment(threads, parallel_threshold):
+    """Umgebungsvariablen für die OpenMP-Einstellungen der Array-Kernel von bin/calculator"""
+    env = {}
+    if threads:
+        env['OMP_NUM_THREADS'] = str(threads)
+    if parallel_threshold:
+        env['FORTRAN_PARALLEL_THRESHOLD'] = str(parallel_threshold)
+    return env
+
+
+def format_batch_input(a, b):
+    """Formatiert die Operanden als Zeilen "a b" für den Batch-Modus von bin/calculator"""
+    return ''.join(f"{x!r} {y!r}\n" for x, y in zip(a, b))
+
+
+def parse_result(payload, result_format='text'):
+    """Parst ein einzelnes Ergebnis von bin/calculator"""
+    if result_format == 'hex':
+        return struct.unpack('>d', bytes.fromhex(payload))[0]
+    return float(payload)
+
+
+def parse_batch_output(lines, n, result_format='text'):
+    """Parst die Antwort des Batch-Modus von bin/calculator in Ergebnis- und Status-Arrays"""
+    header = next(lines, '').strip()
+    status, _, payload = header.partition(' ')
+    if status != 'OK':
+        raise CalculationError(payload or "Leere Antwort im Batch-Modus")
+
+    if result_format == 'hex':
+        return _parse_hex_results(next(lines, ''), next(lines, ''), n)
+
+    results = array('d', bytes(8 * n))
+    statuses = array('b', bytes(n))
+    for i in range(n):
+        status, _, payload = next(lines, '').strip().partition(' ')
+        if status == 'OK':
+            results[i] = float(payload)
+        elif status == 'ERR':
+            results[i] = float('nan')
+            statuses[i] = STATUS_DIVISION_BY_ZERO
+        else:
+            raise CalculationError(f"Unvollständige Antwort im Batch-Modus nach {i} Elementen")
+
+    return results, statuses
+
+
+def _parse_hex_results(values, statuses, n):
+    # Zwei Zeilen: n Bitmuster mit je 16 Hex-Ziffern (big-endian), danach n Statusbytes mit je 2 Hex-Ziffern
+    try:
+        raw_values = bytes.fromhex(values)
+        raw_statuses = bytes.fromhex(statuses)
+    except ValueError:
+        raise CalculationError("Ungültige Antwort im Hex-Format") from None
+    if len(raw_values) != 8 * n or len(raw_statuses) != n:
+        raise CalculationError("Unvollständige Antwort im Hex-Format")
+
+    results = array('d')
+    results.frombytes(raw_values)
+    if sys.byteorder == 'little':
+        results.byteswap()
+    statuses = array('b', raw_statuses)
+
+    # Fehlerhafte Elemente wie im Textformat als NaN kennzeichnen
+    if any(statuses):
+        for i, status in enumerate(statuses):
+            if status != STATUS_OK:
+                results[i] = float('nan')
+    return results, statuses
+
+
+def format_expression_input(plan, slots):
+    """Formatiert Programm, Slot-Längen und Slot-Werte für den Ausdrucks-Modus von bin/calculator"""
+    parts = [' '.join(f"{op} {arg}" for op, arg in plan.code), '\n',
+             ' '.join(str(len(slot)) for slot in slots), '\n']
+    for slot in slots:
+        parts.extend(f"{value!r}\n" for value in slot)
+    return ''.join(parts)
+
+
+def parse_reduction_output(lines, n, progress=None):
+    """
+    Parst die Antwort einer Reduktion von bin/calculator: Fortschrittszeilen "PROGRESS <k>" werden an
+    progress(k, n) gemeldet, "OK <n> <werte...>" liefert das Tupel (n, werte...)
+    """
+    for line in lines:
+        status, _, payload = line.strip().partition(' ')
+        if status == 'PROGRESS':
+            if progress is not None:
+                progress(int(payload), n)
+            continue
+        if status == 'OK':
+            count, *values = payload.split()
+            return (int(count),) + tuple(float(value) for value in values)
+        raise CalculationError(payload or "Leere Antwort bei Reduktion")
+    raise CalculationError("Unvollständige Antwort bei Reduktion")
+
+
+def matrix_sizes(operation, m, k, n):
+    """
+    Anzahl der Elemente von A, B und C einer Matrixoperation (wie matrix_sizes in
+    src/matrix_operations.f90): matmul A (m x k) * B (k x n), transpose A (m x k), elementweise
+    A und B (m x k), solve A (m x m) * X = B (m x n)
+    """
+    size_a = m * k
+    if operation == 'matmul':
+        return size_a, k * n, m * n
+    if operation == 'transpose':
+        return size_a, 0, size_a
+    if operation == 'solve':
+        return size_a, m * n, m * n
+    return size_a, size_a, size_a
+
+
+def matrix_flops(operation, m, k, n):
+    """Gleitkommaoperationen einer Matrixoperation (wie matrix_flops in src/matrix_operations.f90)"""
+    if operation == 'matmul':
+        return 2 * m * k * n
+    if operation == 'solve':
+        return 2 * m ** 3 // 3 + 2 * m * m * n
+    if operation == 'transpose':
+        return 0
+    return m * k
+
+
+def matrix_errors(operation, info):
+    """Wertet den Rückgabewert einer Matrixoperation aus: Anzahl der Nulldivisionen, sonst 0"""
+    if info < 0:
+        raise OperationError(f"Unbekannte Matrixoperation: {operation}")
+    if operation == 'solve' and info > 0:
+        raise OperationError(f"Matrix ist singulär (Nullpivot in Spalte {info})")
+    return info
@@ -0,0 +1,292 @@
+# python/backend/cache.py
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from python.backend.base import OPERATIONS, OperationError
+from python.metrics import fortran_cache_evictions, fortran_cache_hits, fortran_cache_misses
+
+# Art eines Cache-Eintrags: Ergebnis oder fachlicher Fehler (negativer Eintrag)
+RESULT = 0
+ERROR = 1
+
+
+class LocalCache:
+    """Prozesslokaler LRU-Cache mit Größen- und TTL-Begrenzung"""
+
+    tier = 'local'
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                fortran_cache_evictions.labels(tier=self.tier, reason='ttl').inc()
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                fortran_cache_evictions.labels(tier=self.tier, reason='size').inc()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {"entries": len(self._entries), "max_size": self.max_size, "ttl": self.ttl}
+
+
+class SharedCache:
+    """
+    Von allen Gunicorn-Workern gemeinsam genutzter Cache in einer mmap-Datei.
+
+    Die Datei ist eine direkt adressierte Hashtabelle mit fester Anzahl Slots; ein neuer
+    Eintrag verdrängt den bisherigen Eintrag im selben Slot. Zugriffe auf einen Slot
+    werden über fcntl-Bereichssperren zwischen den Prozessen synchronisiert.
+    """
+
+    tier = 'shared'
+
+    _MAGIC = b'FCCACHE1'
+    # Kopf: Magic, Anzahl Slots, Generation (wird bei jedem Flush erhöht)
+    _HEADER = struct.Struct('<8sQQ')
+    _HEADER_SIZE = 32
+    # Slot: Tag, a, b, Ablaufzeit, Wert, Operation, Flags, Länge der Meldung, Meldung
+    _SLOT = struct.Struct('<QddddBBH116s')
+    _VALID = 1
+    _NEGATIVE = 2
+
+    def __init__(self, path, slots, ttl):
+        self.path = path
+        self.slots = slots
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._operation_codes = {operation: code for code, operation in enumerate(OPERATIONS, start=1)}
+
+        size = self._HEADER_SIZE + slots * self._SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        # Datei beim ersten Zugriff bzw. bei geändertem Layout initialisieren
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(self._fd, self._HEADER.size, 0)
+            if len(header) != self._HEADER.size or self._HEADER.unpack(header)[:2] != (self._MAGIC, slots) \
+                    or os.fstat(self._fd).st_size != size:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, self._HEADER.pack(self._MAGIC, slots, 0), 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+        self._map = mmap.mmap(self._fd, size)
+
+    def generation(self):
+        return self._HEADER.unpack_from(self._map, 0)[2]
+
+    def get(self, key):
+        operation, a, b = key
+        tag, offset = self._locate(key)
+
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_SH, self._SLOT.size, offset)
+            try:
+                slot = self._SLOT.unpack_from(self._map, offset)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._SLOT.size, offset)
+
+        slot_tag, slot_a, slot_b, expires_at, value, code, flags, length, message = slot
+        if not flags & self._VALID or slot_tag != tag or code != self._operation_codes[operation] \
+                or slot_a != a or slot_b != b:
+            return None
+        if expires_at <= time.time():
+            return None
+
+        if flags & self._NEGATIVE:
+            return ERROR, message[:length].decode('utf-8', 'ignore')
+        return RESULT, value
+
+    def put(self, key, entry):
+        operation, a, b = key
+        kind, payload = entry
+        tag, offset = self._locate(key)
+        code = self._operation_codes[operation]
+
+        if kind == ERROR:
+            message = payload.encode('utf-8')[:116]
+            slot = self._SLOT.pack(tag, a, b, time.time() + self.ttl, 0.0, code,
+                                   self._VALID | self._NEGATIVE, len(message), message)
+        else:
+            slot = self._SLOT.pack(tag, a, b, time.time() + self.ttl, payload, code, self._VALID, 0, b'')
+
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self._SLOT.size, offset)
+            try:
+                old_tag, _, _, old_expires_at, _, _, old_flags, _, _ = self._SLOT.unpack_from(self._map, offset)
+                if old_flags & self._VALID and old_tag != tag and old_expires_at > time.time():
+                    fortran_cache_evictions.labels(tier=self.tier, reason='size').inc()
+                self._map[offset:offset + self._SLOT.size] = slot
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._SLOT.size, offset)
+
+    def clear(self):
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                generation = self.generation() + 1
+                self._map[self._HEADER_SIZE:] = bytes(len(self._map) - self._HEADER_SIZE)
+                self._HEADER.pack_into(self._map, 0, self._MAGIC, self.slots, generation)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def stats(self):
+        now = time.time()
+        used = 0
+        for offset in range(self._HEADER_SIZE, len(self._map), self._SLOT.size):
+            _, _, _, expires_at, _, _, flags, _, _ = self._SLOT.unpack_from(self._map, offset)
+            if flags & self._VALID and expires_at > now:
+                used += 1
+        return {"path": self.path, "slots": self.slots, "used": used, "ttl": self.ttl,
+                "generation": self.generation()}
+
+    def _locate(self, key):
+        operation, a, b = key
+        # Prozessunabhängiger Hash (hash() ist pro Interpreter randomisiert)
+        packed = struct.pack('<Bdd', self._operation_codes[operation], a, b)
+        tag = int.from_bytes(hashlib.blake2b(packed, digest_size=8).digest(), 'little') | 1
+        return tag, self._HEADER_SIZE + (tag % self.slots) * self._SLOT.size
+
+
+class ResultCache:
+    """Zweistufiger Ergebnis-Cache: lokaler LRU-Cache, optional dahinter der gemeinsame mmap-Cache"""
+
+    def __init__(self, local, shared=None):
+        self.local = local
+        self.shared = shared
+        self._generation = shared.generation() if shared else 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, operation, a, b):
+        # Ein Flush in einem anderen Worker leert auch den lokalen Cache
+        if self.shared is not None:
+            generation = self.shared.generation()
+            if generation != self._generation:
+                self.local.clear()
+                self._generation = generation
+
+        key = (operation, a, b)
+        for tier in (self.local, self.shared):
+            if tier is None:
+                continue
+            entry = tier.get(key)
+            if entry is not None:
+                fortran_cache_hits.labels(tier=tier.tier).inc()
+                self.hits += 1
+                if tier is not self.local:
+                    self.local.put(key, entry)
+                return entry
+
+        fortran_cache_misses.inc()
+        self.misses += 1
+        return None
+
+    def put(self, operation, a, b, entry):
+        key = (operation, a, b)
+        self.local.put(key, entry)
+        if self.shared is not None:
+            self.shared.put(key, entry)
+
+    def flush(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+            self._generation = self.shared.generation()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "local": self.local.stats(),
+            "shared": self.shared.stats() if self.shared is not None else None
+        }
+
+
+class CachingBackend:
+    """Fortran-Backend mit vorgeschaltetem Ergebnis-Cache für Einzelberechnungen"""
+
+    def __init__(self, backend, cache):
+        self.backend = backend
+        self.cache = cache
+        self.name = backend.name
+
+    def calculate(self, operation, a, b, trace_id, span_id, parent_span_id):
+        entry = self.cache.get(operation, a, b)
+        if entry is not None:
+            return self._cached_result(entry)
+
+        try:
+            result = self.backend.calculate(operation, a, b, trace_id, span_id, parent_span_id)
+        except OperationError as e:
+            # Fachliche Fehler sind deterministisch und werden als negativer Eintrag gecacht
+            self.cache.put(operation, a, b, (ERROR, str(e)))
+            raise
+
+        self.cache.put(operation, a, b, (RESULT, result))
+        return result
+
+    async def calculate_async(self, operation, a, b, trace_id, span_id, parent_span_id):
+        entry = self.cache.get(operation, a, b)
+        if entry is not None:
+            return self._cached_result(entry)
+
+        try:
+            result = await self.backend.calculate_async(operation, a, b, trace_id, span_id, parent_span_id)
+        except OperationError as e:
+            self.cache.put(operation, a, b, (ERROR, str(e)))
+            raise
+
+        self.cache.put(operation, a, b, (RESULT, result))
+        return result
+
+    def calculate_batch(self, operation, a, b, trace_id, span_id, parent_span_id):
+        return self.backend.calculate_batch(operation, a, b, trace_id, span_id, parent_span_id)
+
+    def evaluate(self, plan, slots, n, trace_id, span_id, parent_span_id):
+        return self.backend.evaluate(plan, slots, n, trace_id, span_id, parent_span_id)
+
+    def reduce(self, operation, sources, chunk_size, progress, trace_id, span_id, parent_span_id):
+        return self.backend.reduce(operation, sources, chunk_size, progress, trace_id, span_id, parent_span_id)
+
+    def matrix(self, operation, a, b, shape, row_major, trace_id, span_id, parent_span_id):
+        return self.backend.matrix(operation, a, b, shape, row_major, trace_id, span_id, parent_span_id)
+
+    @staticmethod
+    def _cached_result(entry):
+        kind, payload = entry
+        if kind == ERROR:
+            raise OperationError(payload)
+        return payload
@@ -0,0 +1,161 @@
+# python/backend/coalesce.py
+
+import asyncio
+import logging
+import threading
+import time
+from array import array
+from concurrent.futures import Future
+
+from python.backend.base import STATUS_OK, OperationError
+from python.metrics import fortran_coalesce_fill_ratio, fortran_coalesce_wait, observe_fortran_phase
+
+logger = logging.getLogger("calculator-app")
+
+
+class _PendingBatch:
+    """Gesammelte Einzelaufrufe einer Operation, die gemeinsam berechnet werden"""
+
+    def __init__(self):
+        self.a = array('d')
+        self.b = array('d')
+        self.waiters = []
+        self.enqueued_at = []
+        self.span_ids = []
+        self.trace_ids = []
+        self.full = threading.Event()
+        self.timer = None
+
+    def add(self, a, b, trace_id, span_id, waiter):
+        self.a.append(a)
+        self.b.append(b)
+        self.trace_ids.append(trace_id)
+        self.span_ids.append(span_id)
+        self.enqueued_at.append(time.monotonic())
+        self.waiters.append(waiter)
+        return len(self.waiters)
+
+
+class CoalescingBackend:
+    """
+    Fasst gleichzeitig eintreffende Einzelberechnungen pro Operation zu einem Batch-Aufruf zusammen.
+
+    Der erste Aufruf eines Batches wartet höchstens window Sekunden (oder bis max_batch
+    Aufrufe gesammelt sind) und schickt dann alle gesammelten Operanden in einem einzigen
+    vektorisierten Aufruf an das Backend. Jeder Aufrufer erhält sein eigenes Ergebnis.
+    """
+
+    def __init__(self, backend, window, max_batch):
+        self.backend = backend
+        self.window = window
+        self.max_batch = max_batch
+        self.name = backend.name
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._async_pending = {}
+
+    def calculate(self, operation, a, b, trace_id, span_id, parent_span_id):
+        waiter = Future()
+        with self._lock:
+            batch = self._pending.get(operation)
+            leader = batch is None
+            if leader:
+                batch = self._pending[operation] = _PendingBatch()
+            if batch.add(a, b, trace_id, span_id, waiter) >= self.max_batch:
+                del self._pending[operation]
+                batch.full.set()
+
+        # Der erste Aufrufer wartet auf das Zeitfenster und führt den Batch aus
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._pending.get(operation) is batch:
+                    del self._pending[operation]
+            self._execute(operation, batch, trace_id, span_id, parent_span_id)
+
+        return waiter.result()
+
+    async def calculate_async(self, operation, a, b, trace_id, span_id, parent_span_id):
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+
+        batch = self._async_pending.get(operation)
+        if batch is None:
+            batch = self._async_pending[operation] = _PendingBatch()
+            batch.timer = loop.call_later(self.window, self._flush_async, operation, batch,
+                                          trace_id, span_id, parent_span_id)
+
+        if batch.add(a, b, trace_id, span_id, waiter) >= self.max_batch:
+            batch.timer.cancel()
+            self._flush_async(operation, batch, trace_id, span_id, parent_span_id)
+
+        return await waiter
+
+    def calculate_batch(self, operation, a, b, trace_id, span_id, parent_span_id):
+        return self.backend.calculate_batch(operation, a, b, trace_id, span_id, parent_span_id)
+
+    def evaluate(self, plan, slots, n, trace_id, span_id, parent_span_id):
+        return self.backend.evaluate(plan, slots, n, trace_id, span_id, parent_span_id)
+
+    def reduce(self, operation, sources, chunk_size, progress, trace_id, span_id, parent_span_id):
+        return self.backend.reduce(operation, sources, chunk_size, progress, trace_id, span_id, parent_span_id)
+
+    def matrix(self, operation, a, b, shape, row_major, trace_id, span_id, parent_span_id):
+        return self.backend.matrix(operation, a, b, shape, row_major, trace_id, span_id, parent_span_id)
+
+    def _flush_async(self, operation, batch, trace_id, span_id, parent_span_id):
+        if self._async_pending.get(operation) is batch:
+            del self._async_pending[operation]
+
+        async def execute():
+            # Das Backend blockiert, daher läuft der Batch-Aufruf in einem Thread
+            results = await asyncio.to_thread(self._compute, operation, batch, trace_id, span_id, parent_span_id)
+            for waiter, (result, error) in zip(batch.waiters, results):
+                if waiter.done():
+                    continue
+                if error is not None:
+                    waiter.set_exception(error)
+                else:
+                    waiter.set_result(result)
+
+        asyncio.get_running_loop().create_task(execute())
+
+    def _execute(self, operation, batch, trace_id, span_id, parent_span_id):
+        results = self._compute(operation, batch, trace_id, span_id, parent_span_id)
+        for waiter, (result, error) in zip(batch.waiters, results):
+            if error is not None:
+                waiter.set_exception(error)
+            else:
+                waiter.set_result(result)
+
+    def _compute(self, operation, batch, trace_id, span_id, parent_span_id):
+        """Führt den gesammelten Batch aus und liefert pro Aufrufer (Ergebnis, Fehler)"""
+        n = len(batch.waiters)
+        flushed_at = time.monotonic()
+        fortran_coalesce_fill_ratio.labels(operation=operation).observe(n / self.max_batch)
+        for enqueued_at, caller_trace_id in zip(batch.enqueued_at, batch.trace_ids):
+            fortran_coalesce_wait.labels(operation=operation).observe(flushed_at - enqueued_at)
+            observe_fortran_phase('queue', operation, self.name, flushed_at - enqueued_at, caller_trace_id)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            log_extra = {'trace_id': trace_id, 'span_id': span_id, 'parent_span_id': parent_span_id,
+                         'additional_fields': {'coalesced_span_ids': batch.span_ids}}
+            logger.debug("Führe %d zusammengefasste %s-Aufrufe aus", n, operation, extra=log_extra)
+
+        try:
+            # Ein einzelner Aufruf geht über den normalen Weg ans Backend
+            if n == 1:
+                return [(self.backend.calculate(operation, batch.a[0], batch.b[0],
+                                                trace_id, span_id, parent_span_id), None)]
+
+            values, statuses = self.backend.calculate_batch(operation, batch.a, batch.b,
+                                                            trace_id, span_id, parent_span_id)
+        except Exception as e:
+            return [(None, e)] * n
+
+        return [
+            (value, None) if status == STATUS_OK
+            else (None, OperationError("Fehler: Division durch Null nicht erlaubt"))
+            for value, status in zip(values, statuses)
+        ]
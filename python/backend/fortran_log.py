@@ -0,0 +1,65 @@
+# python/backend/fortran_log.py
+
+import json
+import logging
+
+from python.logging_config import setup_logger
+
+# Log-Level, die bin/calculator über FORTRAN_LOG_LEVEL versteht
+FORTRAN_LOG_LEVELS = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARN': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'OFF': None,
+}
+
+fortran_logger = setup_logger("fortran-calculator")
+
+
+def normalize_log_level(level):
+    """Prüft das konfigurierte Fortran-Log-Level und liefert es in Großbuchstaben"""
+    level = (level or 'OFF').upper()
+    if level == 'WARNING':
+        level = 'WARN'
+    if level not in FORTRAN_LOG_LEVELS:
+        raise ValueError(f"Unbekanntes Fortran-Log-Level: {level}")
+    return level
+
+
+def forwarding_enabled(level):
+    """True, wenn bin/calculator mit diesem Level loggt und der Python-Logger die Meldungen auch ausgibt"""
+    python_level = FORTRAN_LOG_LEVELS[level]
+    return python_level is not None and fortran_logger.isEnabledFor(python_level)
+
+
+def forward_fortran_logs(lines, trace_id=None, span_id=None, parent_span_id=None):
+    """
+    Gibt die JSON-Logzeilen von bin/calculator (stderr) über den Python-Logger aus.
+    Der Trace-Kontext stammt aus der Logzeile; fehlt er dort ("unbekannt"), wird der
+    übergebene Kontext des Aufrufers verwendet. Andere Zeilen werden ignoriert.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line.startswith('{'):
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+
+        level = FORTRAN_LOG_LEVELS.get(entry.get('level')) or logging.INFO
+        if not fortran_logger.isEnabledFor(level):
+            continue
+
+        extra = {'additional_fields': {'fortran_timestamp': entry.get('@timestamp')}}
+        for key, value in (('trace_id', _known(entry.get('traceId')) or trace_id),
+                           ('span_id', _known(entry.get('spanId')) or span_id),
+                           ('parent_span_id', parent_span_id)):
+            if value is not None:
+                extra[key] = value
+        fortran_logger.log(level, entry.get('message', ''), extra=extra)
+
+
+def _known(value):
+    return value if value and value != 'unbekannt' else None
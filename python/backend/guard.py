@@ -0,0 +1,197 @@
+# python/backend/guard.py
+
+import threading
+import time
+
+from python.backend.base import BackendTimeoutError, OperationError, RejectedError
+from python.metrics import (fortran_admission_rejections, fortran_call_timeouts, fortran_circuit_breaker_state,
+                            fortran_in_flight)
+
+
+class AdmissionController:
+    """Begrenzt die Anzahl gleichzeitig laufender bzw. wartender Fortran-Aufrufe pro Worker"""
+
+    def __init__(self, max_in_flight, retry_after):
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.in_flight >= self.max_in_flight:
+                fortran_admission_rejections.labels(reason='overload').inc()
+                raise RejectedError(
+                    f"Überlast: bereits {self.in_flight} Fortran-Aufrufe in Bearbeitung", 429, self.retry_after
+                )
+            self.in_flight += 1
+        fortran_in_flight.inc()
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        fortran_in_flight.dec()
+
+
+class CircuitBreaker:
+    """
+    Circuit Breaker für das Fortran-Backend.
+
+    Nach failure_threshold aufeinanderfolgenden technischen Fehlern (Abstürze, Timeouts, ...)
+    wird der Breaker für reset_timeout Sekunden geöffnet und lehnt alle Aufrufe sofort ab.
+    Danach lässt er einen Probeaufruf durch (half-open); ist dieser erfolgreich, schließt er wieder.
+    """
+
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_running = False
+        self._lock = threading.Lock()
+        fortran_circuit_breaker_state.set(self.state)
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    fortran_admission_rejections.labels(reason='circuit_open').inc()
+                    raise RejectedError("Fortran-Backend vorübergehend nicht verfügbar (Circuit Breaker offen)",
+                                        503, max(1, int(remaining + 0.999)))
+                self._set_state(self.HALF_OPEN)
+
+            if self.state == self.HALF_OPEN:
+                if self._probe_running:
+                    fortran_admission_rejections.labels(reason='circuit_open').inc()
+                    raise RejectedError("Fortran-Backend wird geprüft (Circuit Breaker halb offen)", 503, 1)
+                self._probe_running = True
+
+    def on_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_running = False
+            if self.state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def on_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def _set_state(self, state):
+        self.state = state
+        fortran_circuit_breaker_state.set(state)
+
+
+class GuardedBackend:
+    """Fortran-Backend mit Admission Control und Circuit Breaker"""
+
+    def __init__(self, backend, admission, breaker):
+        self.backend = backend
+        self.admission = admission
+        self.breaker = breaker
+        self.name = backend.name
+
+    def calculate(self, operation, a, b, trace_id, span_id, parent_span_id):
+        self._enter()
+        try:
+            result = self.backend.calculate(operation, a, b, trace_id, span_id, parent_span_id)
+        except Exception as e:
+            self._failed(operation, e)
+            raise
+        else:
+            self.breaker.on_success()
+            return result
+        finally:
+            self.admission.release()
+
+    async def calculate_async(self, operation, a, b, trace_id, span_id, parent_span_id):
+        self._enter()
+        try:
+            result = await self.backend.calculate_async(operation, a, b, trace_id, span_id, parent_span_id)
+        except Exception as e:
+            self._failed(operation, e)
+            raise
+        else:
+            self.breaker.on_success()
+            return result
+        finally:
+            self.admission.release()
+
+    def calculate_batch(self, operation, a, b, trace_id, span_id, parent_span_id):
+        self._enter()
+        try:
+            result = self.backend.calculate_batch(operation, a, b, trace_id, span_id, parent_span_id)
+        except Exception as e:
+            self._failed(operation, e)
+            raise
+        else:
+            self.breaker.on_success()
+            return result
+        finally:
+            self.admission.release()
+
+    def evaluate(self, plan, slots, n, trace_id, span_id, parent_span_id):
+        self._enter()
+        try:
+            result = self.backend.evaluate(plan, slots, n, trace_id, span_id, parent_span_id)
+        except Exception as e:
+            self._failed('eval', e)
+            raise
+        else:
+            self.breaker.on_success()
+            return result
+        finally:
+            self.admission.release()
+
+    def reduce(self, operation, sources, chunk_size, progress, trace_id, span_id, parent_span_id):
+        self._enter()
+        try:
+            result = self.backend.reduce(operation, sources, chunk_size, progress, trace_id, span_id, parent_span_id)
+        except Exception as e:
+            self._failed(operation, e)
+            raise
+        else:
+            self.breaker.on_success()
+            return result
+        finally:
+            self.admission.release()
+
+    def matrix(self, operation, a, b, shape, row_major, trace_id, span_id, parent_span_id):
+        self._enter()
+        try:
+            result = self.backend.matrix(operation, a, b, shape, row_major, trace_id, span_id, parent_span_id)
+        except Exception as e:
+            self._failed(operation, e)
+            raise
+        else:
+            self.breaker.on_success()
+            return result
+        finally:
+            self.admission.release()
+
+    def _enter(self):
+        self.admission.acquire()
+        try:
+            self.breaker.before_call()
+        except RejectedError:
+            self.admission.release()
+            raise
+
+    def _failed(self, operation, error):
+        if isinstance(error, BackendTimeoutError):
+            fortran_call_timeouts.labels(function=operation).inc()
+        # Fachliche Fehler zeigen ein funktionierendes Backend an
+        if isinstance(error, OperationError):
+            self.breaker.on_success()
+        else:
+            self.breaker.on_failure()
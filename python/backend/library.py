@@ -0,0 +1,219 @@
+# python/backend/library.py
+
+import ctypes
+import mmap
+from array import array
+from contextlib import ExitStack, contextmanager
+
+from python.backend.base import (MATRIX_OPCODES, OPERATIONS, STATUS_DIVISION_BY_ZERO, STATUS_OK, CalculationError,
+                                 OperationError, matrix_errors, matrix_sizes)
+from python.metrics import track_fortran_execution, track_fortran_phase
+
+
+class LibraryBackend:
+    """Ruft die Fortran-Routinen in-process über die Shared Library auf"""
+
+    name = 'library'
+
+    def __init__(self, library_path, threads=None, parallel_threshold=None):
+        self.library_path = library_path
+        self._library = ctypes.CDLL(library_path)
+
+        # OpenMP-Einstellungen der Array-Kernel (ohne OpenMP-Build wirkungslos)
+        self._library.calc_set_num_threads.argtypes = [ctypes.c_int]
+        self._library.calc_set_parallel_threshold.argtypes = [ctypes.c_int64]
+        self._library.calc_max_threads.restype = ctypes.c_int
+        if parallel_threshold:
+            self._library.calc_set_parallel_threshold(parallel_threshold)
+        self.set_threads(threads)
+        self._functions = {}
+        self._array_functions = {}
+
+        for operation in OPERATIONS:
+            function = getattr(self._library, f'calc_{operation}')
+            function.argtypes = [ctypes.c_double, ctypes.c_double, ctypes.POINTER(ctypes.c_double)]
+            function.restype = ctypes.c_int
+            self._functions[operation] = function
+
+            array_function = getattr(self._library, f'calc_{operation}_array')
+            array_function.argtypes = [ctypes.c_int64, ctypes.c_void_p, ctypes.c_void_p,
+                                       ctypes.c_void_p, ctypes.c_void_p]
+            array_function.restype = ctypes.c_int64
+            self._array_functions[operation] = array_function
+
+        self._eval_function = self._library.calc_eval
+        self._eval_function.argtypes = [ctypes.c_int64, ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p,
+                                        ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int64,
+                                        ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p]
+        self._eval_function.restype = ctypes.c_int64
+
+        # Reduktionen über Blöcke, der Zwischenstand liegt in einem kleinen double-Array
+        self._library.calc_init_stats.argtypes = [ctypes.c_void_p]
+        self._reduce_functions = {
+            'stats': self._library.calc_stats_chunk,
+            'dot': self._library.calc_dot_chunk,
+        }
+        self._reduce_functions['stats'].argtypes = [ctypes.c_int64, ctypes.c_void_p, ctypes.c_void_p]
+        self._reduce_functions['dot'].argtypes = [ctypes.c_int64, ctypes.c_void_p, ctypes.c_void_p,
+                                                  ctypes.c_void_p]
+
+        self._matrix_function = self._library.calc_matrix
+        self._matrix_function.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                          ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p,
+                                          ctypes.POINTER(ctypes.c_double)]
+        self._matrix_function.restype = ctypes.c_int64
+
+    def set_threads(self, threads):
+        """Setzt die Anzahl der OpenMP-Threads der Array-Kernel für diesen Prozess"""
+        if threads:
+            self._library.calc_set_num_threads(threads)
+        self.threads = self._library.calc_max_threads()
+
+    def calculate(self, operation, a, b, trace_id, span_id, parent_span_id):
+        function = self._functions.get(operation)
+        if function is None:
+            raise OperationError(f"Unbekannte Operation: {operation}")
+
+        result = ctypes.c_double()
+        with track_fortran_execution(operation, self.name, trace_id):
+            status = function(a, b, ctypes.byref(result))
+
+        if status == STATUS_DIVISION_BY_ZERO:
+            raise OperationError("Fehler: Division durch Null nicht erlaubt")
+        if status != STATUS_OK:
+            raise CalculationError(f"Unbekannter Statuscode {status} bei {operation}")
+
+        return result.value
+
+    async def calculate_async(self, operation, a, b, trace_id, span_id, parent_span_id):
+        # Der In-Process-Aufruf dauert nur Mikrosekunden und blockiert die Event-Loop nicht spürbar
+        return self.calculate(operation, a, b, trace_id, span_id, parent_span_id)
+
+    def calculate_batch(self, operation, a, b, trace_id, span_id, parent_span_id):
+        function = self._array_functions.get(operation)
+        if function is None:
+            raise CalculationError(f"Unbekannte Operation: {operation}")
+
+        n = len(a)
+        results = array('d', bytes(8 * n))
+        statuses = array('b', bytes(n))
+        if n == 0:
+            return results, statuses
+
+        # Die Fortran-Routine arbeitet direkt auf den Puffern der array-Objekte
+        with track_fortran_execution(operation, self.name, trace_id):
+            errors = function(n, a.buffer_info()[0], b.buffer_info()[0],
+                              results.buffer_info()[0], statuses.buffer_info()[0])
+
+        # Fehlerhafte Elemente wie im Text-Protokoll als NaN kennzeichnen
+        if errors:
+            with track_fortran_phase('parse', operation, self.name, trace_id):
+                for i, status in enumerate(statuses):
+                    if status != STATUS_OK:
+                        results[i] = float('nan')
+
+        return results, statuses
+
+    def evaluate(self, plan, slots, n, trace_id, span_id, parent_span_id):
+        results = array('d', bytes(8 * n))
+        statuses = array('b', bytes(n))
+
+        # Programm und Slots als zusammenhängende Puffer, die Slot-Werte hintereinander
+        ops = array('i', (op for op, _ in plan.code))
+        args = array('i', (arg for _, arg in plan.code))
+        lengths = array('i', (len(slot) for slot in slots))
+        offsets = array('i', bytes(4 * len(slots)))
+        data = array('d')
+        for k, slot in enumerate(slots):
+            offsets[k] = len(data)
+            data.extend(slot)
+
+        with track_fortran_execution('eval', self.name, trace_id):
+            errors = self._eval_function(n, len(ops), ops.buffer_info()[0], args.buffer_info()[0],
+                                         len(slots), offsets.buffer_info()[0], lengths.buffer_info()[0],
+                                         len(data), data.buffer_info()[0],
+                                         results.buffer_info()[0], statuses.buffer_info()[0])
+
+        if errors < 0:
+            raise CalculationError("Ungültiges Programm für den Ausdrucks-Auswerter")
+        if errors:
+            with track_fortran_phase('parse', 'eval', self.name, trace_id):
+                for i, status in enumerate(statuses):
+                    if status != STATUS_OK:
+                        results[i] = float('nan')
+
+        return results, statuses
+
+    def reduce(self, operation, sources, chunk_size, progress, trace_id, span_id, parent_span_id):
+        function = self._reduce_functions.get(operation)
+        if function is None:
+            raise CalculationError(f"Unbekannte Reduktion: {operation}")
+
+        n = sources[0].count
+        state = array('d', bytes(8 * 4))
+        if operation == 'stats':
+            self._library.calc_init_stats(state.buffer_info()[0])
+
+        with ExitStack() as stack, track_fortran_execution(operation, self.name, trace_id):
+            mapped = [stack.enter_context(_mapped_file(source.path)) for source in sources] if n else []
+            for start in range(0, n, chunk_size):
+                count = min(chunk_size, n - start)
+                # Die Fortran-Routine liest direkt aus den eingeblendeten Dateien
+                pointers = [address + source.offset + 8 * start for (_, address), source in zip(mapped, sources)]
+                function(count, *pointers, state.buffer_info()[0])
+
+                # Verarbeitete Seiten freigeben, damit der Speicherbedarf nicht mit der Dateigröße wächst
+                for (mm, _), source in zip(mapped, sources):
+                    _release_pages(mm, source.offset + 8 * start, 8 * count)
+                if progress is not None:
+                    progress(start + count, n)
+
+        if operation == 'dot':
+            return n, state[0] + state[1]
+        return n, state[0] + state[1], state[2], state[3]
+
+    def matrix(self, operation, a, b, shape, row_major, trace_id, span_id, parent_span_id):
+        opcode = MATRIX_OPCODES.get(operation)
+        if opcode is None:
+            raise OperationError(f"Unbekannte Matrixoperation: {operation}")
+
+        m, k, n = shape
+        result = array('d', bytes(8 * matrix_sizes(operation, m, k, n)[2]))
+        seconds = ctypes.c_double()
+        # Ohne B (transpose) zeigt der Zeiger auf A, die Routine liest ihn dann nicht
+        b = b if b is not None and len(b) else a
+        with track_fortran_execution(operation, self.name, trace_id):
+            info = self._matrix_function(opcode, m, k, n, int(row_major), a.buffer_info()[0], b.buffer_info()[0],
+                                         result.buffer_info()[0], ctypes.byref(seconds))
+
+        return result, matrix_errors(operation, info), seconds.value
+
+
+@contextmanager
+def _mapped_file(path):
+    """Blendet eine Datei ein und liefert (mmap, Adresse des ersten Bytes)"""
+    with open(path, 'rb') as f:
+        # ACCESS_COPY ist privat und beschreibbar, nur so lässt sich die Adresse über ctypes ermitteln;
+        # da nichts geschrieben wird, bleiben die Seiten die des Page-Caches
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    try:
+        if hasattr(mm, 'madvise'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        anchor = ctypes.c_char.from_buffer(mm)
+        try:
+            yield mm, ctypes.addressof(anchor)
+        finally:
+            del anchor
+    finally:
+        mm.close()
+
+
+def _release_pages(mm, offset, length):
+    if not hasattr(mm, 'madvise'):
+        return
+    start = offset - offset % mmap.PAGESIZE
+    end = offset + length
+    # Nur vollständig verarbeitete Seiten freigeben, die letzte teilweise Seite gehört auch zum nächsten Block
+    end -= end % mmap.PAGESIZE
+    if end > start:
+        mm.madvise(mmap.MADV_DONTNEED, start, end - start)
@@ -0,0 +1,407 @@
+# python/backend/pool.py
+
+import asyncio
+import atexit
+import logging
+import os
+import queue
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+from python.backend.base import (MATRIX_OPERATIONS, BackendTimeoutError, CalculationError, OperationError,
+                                 check_result_format, check_transport, format_batch_input, format_expression_input,
+                                 matrix_errors, matrix_sizes, parallel_environment, parse_batch_output,
+                                 parse_reduction_output, parse_result)
+from python.backend.fortran_log import forward_fortran_logs, forwarding_enabled, normalize_log_level
+from python.backend.process import _calculation_error
+from python.backend.shm import SharedSegment, matrix_capacity, parse_matrix_response, parse_shm_response
+from python.metrics import fortran_pool_processes, fortran_pool_restarts, track_fortran_execution, track_fortran_phase
+
+logger = logging.getLogger("calculator-app")
+
+
+class CoProcessError(CalculationError):
+    """Der Co-Prozess ist abgestürzt oder antwortet nicht mehr"""
+
+
+class CoProcess:
+    """Ein langlebiger bin/calculator-Prozess im Server-Modus"""
+
+    def __init__(self, calculator_path, log_level='OFF', environment=None):
+        # Die Logs des Co-Prozesses werden nur gelesen, wenn sie auch ausgegeben werden
+        forward_logs = forwarding_enabled(log_level)
+        self.process = subprocess.Popen(
+            [calculator_path, '--server'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if forward_logs else subprocess.DEVNULL,
+            env=dict(os.environ, FORTRAN_LOG_LEVEL=log_level, **(environment or {})),
+            text=True,
+            bufsize=1
+        )
+        self.started_at = time.monotonic()
+        self.last_used_at = self.started_at
+        self._segment = None
+
+        if forward_logs:
+            # Die Logzeilen enthalten den Trace-Kontext der jeweiligen Anfrage
+            threading.Thread(target=forward_fortran_logs, args=(self.process.stderr,),
+                             name=f"fortran-log-{self.process.pid}", daemon=True).start()
+
+    def request(self, line):
+        """Sendet eine Anfrage und liest genau eine Antwortzeile"""
+        self.send(line + '\n')
+        return self.read_line()
+
+    def send(self, payload):
+        try:
+            self.process.stdin.write(payload)
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise CoProcessError(f"Co-Prozess {self.process.pid} nicht erreichbar: {e}") from e
+
+    def read_line(self):
+        try:
+            response = self.process.stdout.readline()
+        except (OSError, ValueError) as e:
+            raise CoProcessError(f"Co-Prozess {self.process.pid} nicht erreichbar: {e}") from e
+        if not response:
+            raise CoProcessError(f"Co-Prozess {self.process.pid} wurde beendet (Exit-Code {self.process.poll()})")
+        self.last_used_at = time.monotonic()
+        return response.strip()
+
+    def shared_segment(self, n):
+        """Shared-Memory-Segment dieses Co-Prozesses mit Platz für n Elemente, wächst bei Bedarf"""
+        if self._segment is None:
+            self._segment = SharedSegment(n)
+        elif self._segment.capacity < n:
+            capacity = max(n, 2 * self._segment.capacity)
+            self._segment.close()
+            self._segment = SharedSegment(capacity)
+        return self._segment
+
+    @contextmanager
+    def deadline(self, timeout):
+        """Beendet den Co-Prozess, wenn der Block nicht innerhalb von timeout Sekunden fertig ist"""
+        if not timeout:
+            yield
+            return
+
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            self.process.kill()
+
+        watchdog = threading.Timer(timeout, expire)
+        watchdog.start()
+        try:
+            yield
+        except CoProcessError:
+            if timed_out.is_set():
+                raise BackendTimeoutError(f"Fortran-Aufruf nach {timeout}s abgebrochen") from None
+            raise
+        finally:
+            watchdog.cancel()
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def ping(self, timeout=None):
+        try:
+            with self.deadline(timeout):
+                return self.request('ping') == 'PONG'
+        except CalculationError:
+            return False
+
+    def age(self):
+        return time.monotonic() - self.started_at
+
+    def close(self):
+        """Beendet den Co-Prozess, zuerst regulär über EOF, danach hart"""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+
+class PoolBackend:
+    """Pool aus langlebigen Fortran-Co-Prozessen (pro Gunicorn-Worker)"""
+
+    name = 'pool'
+
+    def __init__(self, calculator_path, size=2, max_lifetime=3600.0, checkout_timeout=5.0,
+                 health_check_interval=30.0, timeout=None, batch_timeout=None, log_level='OFF', threads=None,
+                 parallel_threshold=None, transport='text', result_format='hex'):
+        self.calculator_path = calculator_path
+        self.transport = check_transport(transport)
+        self.result_format = check_result_format(result_format)
+        self.log_level = normalize_log_level(log_level)
+        self.environment = parallel_environment(threads, parallel_threshold)
+        self.environment['FORTRAN_RESULT_FORMAT'] = self.result_format
+        self.timeout = timeout
+        self.batch_timeout = batch_timeout
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._lock = threading.Lock()
+        self._reset()
+        # Beim Beenden des Workers freie Co-Prozesse und deren Shared-Memory-Segmente aufräumen
+        atexit.register(self.close)
+
+    def _reset(self):
+        # Co-Prozesse werden lazy und nur im besitzenden Prozess gestartet,
+        # damit nach einem fork() keine Pipes zwischen Workern geteilt werden.
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+
+    def calculate(self, operation, a, b, trace_id, span_id, parent_span_id):
+        line = f"{operation} {a!r} {b!r} {trace_id} {span_id}"
+
+        def request(process):
+            status, _, payload = process.request(line).partition(' ')
+            if status == 'OK':
+                return payload, None
+            # Dieselbe Zuordnung wie bei SubprocessBackend: nur fachliche Fehler sind OperationError,
+            # alle anderen (z.B. "Ungültige Anfrage") werden hier ausgelöst und beenden den Co-Prozess
+            error = _calculation_error(f"Fehler: {payload}")
+            if not isinstance(error, OperationError):
+                raise error
+            return None, error
+
+        payload, error = self._run(request, self.timeout, operation, trace_id)
+
+        with track_fortran_phase('parse', operation, self.name, trace_id):
+            if error is not None:
+                raise error
+            return parse_result(payload, self.result_format)
+
+    async def calculate_async(self, operation, a, b, trace_id, span_id, parent_span_id):
+        # Die Pipe-Kommunikation blockiert, daher in einem Thread ausführen
+        return await asyncio.to_thread(self.calculate, operation, a, b, trace_id, span_id, parent_span_id)
+
+    def calculate_batch(self, operation, a, b, trace_id, span_id, parent_span_id):
+        n = len(a)
+        if self.transport == 'shm' and n:
+            return self._calculate_batch_shm(operation, a, b, trace_id, span_id, parent_span_id)
+
+        payload = f"batch {operation} {n} {trace_id} {span_id}\n" + format_batch_input(a, b)
+
+        lines = self._run(lambda process: self._exchange(process, payload, self._response_lines(n)),
+                          self.batch_timeout, operation, trace_id)
+        with track_fortran_phase('parse', operation, self.name, trace_id):
+            return parse_batch_output(iter(lines), n, self.result_format)
+
+    def _calculate_batch_shm(self, operation, a, b, trace_id, span_id, parent_span_id):
+        n = len(a)
+
+        def run_shm(process):
+            # Das Segment gehört zum Co-Prozess und muss gelesen werden, bevor er zurück in den Pool geht
+            segment = process.shared_segment(n)
+            segment.write_operands(a, b)
+            response = process.request(f"shm {operation} {segment.name} {n} {trace_id} {span_id}")
+            if not response.startswith('OK '):
+                return response, None
+            return response, segment.read_results(n, parse_shm_response(response))
+
+        response, results = self._run(run_shm, self.batch_timeout, operation, trace_id)
+        with track_fortran_phase('parse', operation, self.name, trace_id):
+            if results is None:
+                parse_shm_response(response)
+            return results
+
+    def evaluate(self, plan, slots, n, trace_id, span_id, parent_span_id):
+        payload = (f"eval {n} {len(slots)} {len(plan.code)} {trace_id} {span_id}\n"
+                   + format_expression_input(plan, slots))
+
+        lines = self._run(lambda process: self._exchange(process, payload, self._response_lines(n)),
+                          self.batch_timeout, 'eval', trace_id)
+        with track_fortran_phase('parse', 'eval', self.name, trace_id):
+            return parse_batch_output(iter(lines), n, self.result_format)
+
+    def reduce(self, operation, sources, chunk_size, progress, trace_id, span_id, parent_span_id):
+        n = sources[0].count
+        offsets = [source.offset for source in sources] + [0] * (2 - len(sources))
+        # Die Dateipfade stehen auf eigenen Zeilen, damit sie Leerzeichen enthalten dürfen
+        payload = (f"reduce {operation} {n} {chunk_size} {offsets[0]} {offsets[1]} {trace_id} {span_id}\n"
+                   + ''.join(f"{source.path}\n" for source in sources))
+
+        def run_reduce(process):
+            process.send(payload)
+            # Fortschritt sofort melden, die Ergebniszeile erst nach der Rückgabe des Co-Prozesses parsen
+            while True:
+                line = process.read_line()
+                if not line.startswith('PROGRESS '):
+                    return line
+                if progress is not None:
+                    progress(int(line[len('PROGRESS '):]), n)
+
+        line = self._run(run_reduce, self.batch_timeout, operation, trace_id)
+        with track_fortran_phase('parse', operation, self.name, trace_id):
+            return parse_reduction_output((line,), n)
+
+    def matrix(self, operation, a, b, shape, row_major, trace_id, span_id, parent_span_id):
+        if operation not in MATRIX_OPERATIONS:
+            raise OperationError(f"Unbekannte Matrixoperation: {operation}")
+
+        # Matrizen gehen unabhängig von FORTRAN_TRANSPORT immer über das Segment des Co-Prozesses
+        m, k, n = shape
+        size_a, size_b, size_c = matrix_sizes(operation, m, k, n)
+
+        def run_matrix(process):
+            segment = process.shared_segment(matrix_capacity(size_a + size_b + size_c))
+            segment.write_values(0, a)
+            if size_b:
+                segment.write_values(size_a, b)
+            response = process.request(
+                f"matrix {operation} {segment.name} {m} {k} {n} {int(row_major)} {trace_id} {span_id}")
+            if not response.startswith('OK '):
+                return response, None
+            return response, segment.read_values(size_a + size_b, size_c)
+
+        response, result = self._run(run_matrix, self.batch_timeout, operation, trace_id)
+        with track_fortran_phase('parse', operation, self.name, trace_id):
+            info, seconds = parse_matrix_response(response)
+            return result, matrix_errors(operation, info), seconds
+
+    def _response_lines(self, n):
+        # Im Hex-Format folgen auf "OK <n>" genau zwei Zeilen (Bitmuster und Statusbytes)
+        return 2 if self.result_format == 'hex' else n
+
+    @staticmethod
+    def _exchange(process, payload, count):
+        process.send(payload)
+        header = process.read_line()
+        count = count if header.startswith('OK ') else 0
+        # Die Antwort vollständig lesen, damit der Co-Prozess synchron bleibt
+        return [header] + [process.read_line() for _ in range(count)]
+
+    def _run(self, action, timeout, operation, trace_id):
+        # Ein abgestürzter Co-Prozess wird einmal durch einen neuen ersetzt und die Anfrage wiederholt,
+        # ein Co-Prozess mit Zeitüberschreitung oder anderem Fehler wird beendet und nicht erneut versucht
+        for attempt in (1, 2):
+            with track_fortran_phase('checkout', operation, self.name, trace_id):
+                process = self.checkout()
+            try:
+                with track_fortran_execution(operation, self.name, trace_id), process.deadline(timeout):
+                    result = action(process)
+            except BackendTimeoutError:
+                self._discard(process, 'timeout')
+                raise
+            except CoProcessError as e:
+                self._discard(process, 'crash')
+                if attempt == 2:
+                    raise
+                logger.warning(f"Co-Prozess abgestürzt, starte neu: {e}")
+                continue
+            except BaseException:
+                # Unbekannter Zustand (z.B. unlesbare Antwort, Schreibfehler, Fehler im Fortschritts-Callback):
+                # der Co-Prozess wird beendet, damit sein Platz im Pool nicht verloren geht
+                self._discard(process, 'error')
+                raise
+
+            self.checkin(process)
+            return result
+
+    def checkout(self):
+        """Holt einen freien Co-Prozess aus dem Pool oder startet einen neuen"""
+        spawn = False
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+
+            try:
+                process = self._idle.get_nowait()
+            except queue.Empty:
+                process = None
+                if self._created < self.size:
+                    self._created += 1
+                    spawn = True
+
+        if spawn:
+            try:
+                process = self._spawn()
+            except CalculationError:
+                with self._lock:
+                    self._created -= 1
+                raise
+        else:
+            if process is None:
+                try:
+                    process = self._idle.get(timeout=self.checkout_timeout)
+                except queue.Empty:
+                    raise CalculationError(
+                        f"Kein Co-Prozess innerhalb von {self.checkout_timeout}s verfügbar"
+                    ) from None
+            fortran_pool_processes.labels(state='idle').dec()
+
+        fortran_pool_processes.labels(state='busy').inc()
+        return self._validate(process)
+
+    def checkin(self, process):
+        """Gibt einen Co-Prozess an den Pool zurück"""
+        if process.age() > self.max_lifetime:
+            self._discard(process, 'lifetime')
+            return
+        fortran_pool_processes.labels(state='busy').dec()
+        fortran_pool_processes.labels(state='idle').inc()
+        self._idle.put(process)
+
+    def close(self):
+        """Beendet alle freien Co-Prozesse"""
+        while True:
+            try:
+                process = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            fortran_pool_processes.labels(state='idle').dec()
+            process.close()
+            with self._lock:
+                self._created -= 1
+
+    def _validate(self, process):
+        # Health-Check bei länger unbenutzten Prozessen, Neustart bei Absturz oder Lebensdauerende
+        reason = None
+        if not process.is_alive():
+            reason = 'crash'
+        elif process.age() > self.max_lifetime:
+            reason = 'lifetime'
+        elif time.monotonic() - process.last_used_at > self.health_check_interval and not process.ping(self.timeout):
+            reason = 'health_check'
+
+        if reason is None:
+            return process
+
+        fortran_pool_restarts.labels(reason=reason).inc()
+        process.close()
+        try:
+            return self._spawn()
+        except CalculationError:
+            fortran_pool_processes.labels(state='busy').dec()
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _spawn(self):
+        try:
+            return CoProcess(self.calculator_path, self.log_level, self.environment)
+        except OSError as e:
+            raise CalculationError(f"Co-Prozess konnte nicht gestartet werden: {e}") from e
+
+    def _discard(self, process, reason):
+        # Ausgecheckten Co-Prozess beenden und seinen Platz im Pool freigeben
+        fortran_pool_processes.labels(state='busy').dec()
+        fortran_pool_restarts.labels(reason=reason).inc()
+        process.close()
+        with self._lock:
+            self._created -= 1
@@ -0,0 +1,249 @@
+# python/backend/process.py
+
+import asyncio
+import os
+import subprocess
+import threading
+
+from python.backend.base import (MATRIX_OPERATIONS, BackendTimeoutError, CalculationError, OperationError,
+                                 check_result_format, check_transport, format_batch_input, format_expression_input,
+                                 matrix_errors, matrix_sizes, parallel_environment, parse_batch_output,
+                                 parse_reduction_output, parse_result)
+from python.backend.fortran_log import forward_fortran_logs, forwarding_enabled, normalize_log_level
+from python.backend.shm import SharedSegment, matrix_capacity, parse_matrix_response, parse_shm_response
+from python.metrics import track_fortran_execution, track_fortran_phase
+
+
+class SubprocessBackend:
+    """Startet bin/calculator für jeden Aufruf als eigenen Prozess"""
+
+    name = 'subprocess'
+
+    def __init__(self, calculator_path, timeout=None, batch_timeout=None, log_level='OFF', threads=None,
+                 parallel_threshold=None, transport='text', result_format='hex'):
+        self.calculator_path = calculator_path
+        self.transport = check_transport(transport)
+        self.result_format = check_result_format(result_format)
+        self.timeout = timeout
+        self.batch_timeout = batch_timeout
+        self.log_level = normalize_log_level(log_level)
+        self.forward_logs = forwarding_enabled(self.log_level)
+        # Basis-Umgebung einmalig kopieren, pro Aufruf kommt nur der Trace-Kontext hinzu
+        self._base_env = dict(os.environ, FORTRAN_LOG_LEVEL=self.log_level, FORTRAN_RESULT_FORMAT=self.result_format)
+        self._base_env.update(parallel_environment(threads, parallel_threshold))
+
+    def calculate(self, operation, a, b, trace_id, span_id, parent_span_id):
+        # Aufruf des Fortran-Programms mit der übergebenen Operation und Trace-Kontext
+        returncode, stdout, stderr = self._run(
+            [self.calculator_path, str(a), str(b), operation], None, self.timeout,
+            operation, trace_id, span_id, parent_span_id
+        )
+
+        # Ausgabe des Fortran-Programms parsen
+        with track_fortran_phase('parse', operation, self.name, trace_id):
+            if self.forward_logs:
+                forward_fortran_logs(stderr.splitlines(), trace_id, span_id, parent_span_id)
+
+            if returncode != 0:
+                raise _calculation_error(stderr)
+
+            return parse_result(stdout.strip(), self.result_format)
+
+    async def calculate_async(self, operation, a, b, trace_id, span_id, parent_span_id):
+        # Nicht-blockierender Aufruf für den ASGI-Modus
+        with track_fortran_phase('launch', operation, self.name, trace_id):
+            process = await asyncio.create_subprocess_exec(
+                self.calculator_path, str(a), str(b), operation,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=self._environment(trace_id, span_id, parent_span_id)
+            )
+
+        with track_fortran_execution(operation, self.name, trace_id):
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), self.timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise BackendTimeoutError(f"Fortran-Aufruf nach {self.timeout}s abgebrochen") from None
+
+        with track_fortran_phase('parse', operation, self.name, trace_id):
+            stderr = stderr.decode()
+            if self.forward_logs:
+                forward_fortran_logs(stderr.splitlines(), trace_id, span_id, parent_span_id)
+
+            if process.returncode != 0:
+                raise _calculation_error(stderr)
+
+            return parse_result(stdout.decode().strip(), self.result_format)
+
+    def calculate_batch(self, operation, a, b, trace_id, span_id, parent_span_id):
+        if self.transport == 'shm' and len(a):
+            return self._calculate_batch_shm(operation, a, b, trace_id, span_id, parent_span_id)
+
+        returncode, stdout, stderr = self._run(
+            [self.calculator_path, '--batch', operation, str(len(a)), trace_id, span_id],
+            format_batch_input(a, b), self.batch_timeout, operation, trace_id, span_id, parent_span_id
+        )
+
+        with track_fortran_phase('parse', operation, self.name, trace_id):
+            if self.forward_logs:
+                forward_fortran_logs(stderr.splitlines(), trace_id, span_id, parent_span_id)
+
+            if returncode != 0:
+                raise CalculationError(stderr)
+
+            return parse_batch_output(iter(stdout.splitlines()), len(a), self.result_format)
+
+    def _calculate_batch_shm(self, operation, a, b, trace_id, span_id, parent_span_id):
+        # Ein Segment pro Aufruf, der Prozess lebt ohnehin nur für diesen Aufruf
+        n = len(a)
+        segment = SharedSegment(n)
+        try:
+            segment.write_operands(a, b)
+            returncode, stdout, stderr = self._run(
+                [self.calculator_path, '--shm', operation, segment.name, str(n), trace_id, span_id],
+                None, self.batch_timeout, operation, trace_id, span_id, parent_span_id
+            )
+
+            with track_fortran_phase('parse', operation, self.name, trace_id):
+                if self.forward_logs:
+                    forward_fortran_logs(stderr.splitlines(), trace_id, span_id, parent_span_id)
+
+                if returncode != 0:
+                    raise CalculationError(stderr)
+
+                return segment.read_results(n, parse_shm_response(stdout))
+        finally:
+            segment.close()
+
+    def evaluate(self, plan, slots, n, trace_id, span_id, parent_span_id):
+        returncode, stdout, stderr = self._run(
+            [self.calculator_path, '--eval', str(n), str(len(slots)), str(len(plan.code)), trace_id, span_id],
+            format_expression_input(plan, slots), self.batch_timeout, 'eval', trace_id, span_id, parent_span_id
+        )
+
+        with track_fortran_phase('parse', 'eval', self.name, trace_id):
+            if self.forward_logs:
+                forward_fortran_logs(stderr.splitlines(), trace_id, span_id, parent_span_id)
+
+            if returncode != 0:
+                raise CalculationError(stderr)
+
+            return parse_batch_output(iter(stdout.splitlines()), n, self.result_format)
+
+    def reduce(self, operation, sources, chunk_size, progress, trace_id, span_id, parent_span_id):
+        args = [self.calculator_path, '--reduce', operation, str(sources[0].count), str(chunk_size)]
+        for source in sources:
+            args += [str(source.offset), source.path]
+
+        with track_fortran_phase('launch', operation, self.name, trace_id):
+            process = subprocess.Popen(
+                args,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                env=self._environment(trace_id, span_id, parent_span_id)
+            )
+
+        # Die Fortschrittszeilen werden gelesen, während bin/calculator noch rechnet
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            process.kill()
+
+        watchdog = threading.Timer(self.batch_timeout, expire) if self.batch_timeout else None
+        try:
+            with track_fortran_execution(operation, self.name, trace_id):
+                if watchdog is not None:
+                    watchdog.start()
+                try:
+                    state = parse_reduction_output(process.stdout, sources[0].count, progress)
+                except CalculationError:
+                    if timed_out.is_set():
+                        raise BackendTimeoutError(f"Fortran-Aufruf nach {self.batch_timeout}s abgebrochen") from None
+                    raise
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            stderr = process.stderr.read()
+            process.stdout.close()
+            process.stderr.close()
+            process.wait()
+
+        if self.forward_logs:
+            forward_fortran_logs(stderr.splitlines(), trace_id, span_id, parent_span_id)
+        return state
+
+    def matrix(self, operation, a, b, shape, row_major, trace_id, span_id, parent_span_id):
+        if operation not in MATRIX_OPERATIONS:
+            raise OperationError(f"Unbekannte Matrixoperation: {operation}")
+
+        # Matrizen gehen unabhängig von FORTRAN_TRANSPORT immer über Shared Memory
+        m, k, n = shape
+        size_a, size_b, size_c = matrix_sizes(operation, m, k, n)
+        segment = SharedSegment(matrix_capacity(size_a + size_b + size_c))
+        try:
+            segment.write_values(0, a)
+            if size_b:
+                segment.write_values(size_a, b)
+            returncode, stdout, stderr = self._run(
+                [self.calculator_path, '--matrix', operation, segment.name, str(m), str(k), str(n),
+                 str(int(row_major)), trace_id, span_id],
+                None, self.batch_timeout, operation, trace_id, span_id, parent_span_id
+            )
+
+            with track_fortran_phase('parse', operation, self.name, trace_id):
+                if self.forward_logs:
+                    forward_fortran_logs(stderr.splitlines(), trace_id, span_id, parent_span_id)
+
+                if returncode != 0:
+                    raise CalculationError(stderr)
+
+                info, seconds = parse_matrix_response(stdout)
+                errors = matrix_errors(operation, info)
+                return segment.read_values(size_a + size_b, size_c), errors, seconds
+        finally:
+            segment.close()
+
+    def _run(self, args, input, timeout, operation, trace_id, span_id, parent_span_id):
+        """Startet bin/calculator und liefert (Exit-Code, stdout, stderr), getrennt nach Start und Ausführung"""
+        with track_fortran_phase('launch', operation, self.name, trace_id):
+            process = subprocess.Popen(
+                args,
+                stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                env=self._environment(trace_id, span_id, parent_span_id)
+            )
+
+        # Bei Zeitüberschreitung wird der Prozess beendet und die Pipes werden geleert
+        with track_fortran_execution(operation, self.name, trace_id):
+            try:
+                stdout, stderr = process.communicate(input, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise BackendTimeoutError(f"Fortran-Aufruf nach {timeout}s abgebrochen") from None
+
+        return process.returncode, stdout, stderr
+
+    def _environment(self, trace_id, span_id, parent_span_id):
+        # Umgebungsvariablen für das Fortran-Programm bereitstellen
+        env = self._base_env.copy()
+        env['TRACE_ID'] = trace_id
+        env['SPAN_ID'] = span_id
+        env['PARENT_SPAN_ID'] = parent_span_id
+        return env
+
+
+def _calculation_error(stderr):
+    # Fachliche Fehler meldet bin/calculator als Zeile "Fehler: ..." auf stderr
+    for line in reversed(stderr.splitlines()):
+        line = line.strip()
+        if line.startswith('Fehler:') and ('Division durch Null' in line or 'Unbekannte Operation' in line):
+            return OperationError(line)
+    return CalculationError(stderr)
@@ -0,0 +1,130 @@
+# python/backend/reduction.py
+
+import ast
+import os
+import struct
+import sys
+
+# Unterstützte Reduktionen; alle außer "dot" werden über die Statistik-Reduktion ("stats") berechnet
+REDUCTIONS = ('sum', 'mean', 'min', 'max', 'stats', 'dot')
+
+# Elemente pro Block: bestimmt den Speicherbedarf des Fortran-Prozesses und die Häufigkeit der Fortschrittsmeldungen
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+NPY_MAGIC = b'\x93NUMPY'
+NPY_FLOAT64 = ('<f8', '=f8', 'f8', '<d', 'float64')
+
+
+class ReductionError(ValueError):
+    """Ungültige Eingabe für eine Reduktion, status_code ist der passende HTTP-Status"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class DataSource:
+    """count float64-Werte (little-endian) ab Byte-Offset offset in der Datei path"""
+
+    def __init__(self, path, offset, count):
+        self.path = path
+        self.offset = offset
+        self.count = count
+
+    def __repr__(self):
+        return f"DataSource(path={self.path!r}, offset={self.offset}, count={self.count})"
+
+
+def open_source(path):
+    """Prüft eine Datei mit rohen float64-Werten oder im .npy-Format und liefert die Lage der Daten"""
+    if sys.byteorder != 'little':
+        raise ReductionError("Reduktionen über Dateien werden nur auf Little-Endian-Systemen unterstützt", 501)
+    if '\n' in path:
+        raise ReductionError("Ungültiger Dateiname")
+
+    try:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            magic = f.read(len(NPY_MAGIC))
+            offset, count = _npy_layout(f) if magic == NPY_MAGIC else (0, None)
+    except OSError as e:
+        raise ReductionError(f"Datei kann nicht gelesen werden: {e.strerror}", 404) from None
+
+    if count is None:
+        if size % 8 != 0:
+            raise ReductionError("Die Datei muss eine ganze Anzahl float64-Werte enthalten")
+        count = size // 8
+    elif offset + 8 * count > size:
+        raise ReductionError("Die .npy-Datei ist kürzer als im Header angegeben")
+
+    return DataSource(path, offset, count)
+
+
+def reduce_file(backend, operation, path, other=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None,
+                trace_id='unbekannt', span_id='unbekannt', parent_span_id='unset'):
+    """
+    Berechnet eine Reduktion (sum, mean, min, max, stats oder dot mit other) über die Werte der Datei path.
+    Die Daten werden blockweise verarbeitet, progress(verarbeitet, gesamt) wird nach jedem Block aufgerufen.
+    """
+    if operation not in REDUCTIONS:
+        raise ReductionError(f"Unbekannte Reduktion: {operation}", 404)
+    if chunk_size < 1:
+        raise ReductionError("Die Blockgröße muss positiv sein")
+
+    sources = [open_source(path)]
+    if operation == 'dot':
+        if other is None:
+            raise ReductionError("Das Skalarprodukt benötigt einen zweiten Operanden")
+        sources.append(open_source(other))
+        if sources[0].count != sources[1].count:
+            raise ReductionError("Beide Operanden müssen gleich viele Werte enthalten")
+
+    kind = 'dot' if operation == 'dot' else 'stats'
+    state = backend.reduce(kind, sources, chunk_size, progress, trace_id, span_id, parent_span_id)
+    return summarize(operation, state)
+
+
+def summarize(operation, state):
+    """Baut das Ergebnis aus dem Zwischenstand (count, summe, min, max) bzw. (count, skalarprodukt)"""
+    count = state[0]
+    if operation == 'dot':
+        return {'count': count, 'dot': state[1]}
+
+    _, total, minimum, maximum = state
+    result = {
+        'count': count,
+        'sum': total,
+        'mean': total / count if count else None,
+        'min': minimum if count else None,
+        'max': maximum if count else None,
+    }
+    if operation == 'stats':
+        return result
+    return {'count': count, operation: result[operation]}
+
+
+def _npy_layout(f):
+    # Aufbau: Magic, Version (2 Bytes), Header-Länge (2 bzw. 4 Bytes), Header als Python-Literal
+    version = f.read(2)
+    if len(version) != 2 or version[0] not in (1, 2, 3):
+        raise ReductionError("Ungültiger .npy-Header")
+    length_format = '<H' if version[0] == 1 else '<I'
+    length = struct.unpack(length_format, f.read(struct.calcsize(length_format)))[0]
+    offset = f.tell() + length
+
+    try:
+        header = ast.literal_eval(f.read(length).decode('latin1'))
+    except (SyntaxError, ValueError):
+        raise ReductionError("Ungültiger .npy-Header") from None
+
+    if not isinstance(header, dict) or header.get('descr') not in NPY_FLOAT64:
+        raise ReductionError(".npy-Dateien müssen float64-Werte (little-endian) enthalten")
+    shape = header.get('shape')
+    if not isinstance(shape, tuple) or not all(isinstance(dim, int) and dim >= 0 for dim in shape):
+        raise ReductionError("Ungültiger .npy-Header")
+
+    # Die Werte werden in Dateireihenfolge reduziert, die Form bestimmt nur ihre Anzahl
+    count = 1
+    for dim in shape:
+        count *= dim
+    return offset, count
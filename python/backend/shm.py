@@ -0,0 +1,88 @@
+# python/backend/shm.py
+
+from array import array
+from multiprocessing import shared_memory
+
+from python.backend.base import STATUS_OK, CalculationError
+
+# Kleinste Kapazität eines wiederverwendeten Segments in Elementen
+MIN_CAPACITY = 1024
+
+
+def segment_size(n):
+    """Bytes für n Elemente: a, b und Ergebnis als float64, dazu ein Statusbyte (siehe src/shared_segment.f90)"""
+    return 25 * n
+
+
+def matrix_capacity(count):
+    """Kapazität in Elementen, bei der ein Segment count float64-Werte (A, B und C hintereinander) fasst"""
+    return -(-8 * count // 25)
+
+
+class SharedSegment:
+    """
+    POSIX-Shared-Memory-Segment für Batch-Aufrufe von bin/calculator. Python schreibt a und b
+    direkt in das Segment, bin/calculator blendet es ein und schreibt Ergebnisse und Statusbytes
+    zurück; über die Pipes gehen nur Segmentname und Länge.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = max(capacity, MIN_CAPACITY)
+        self.memory = shared_memory.SharedMemory(create=True, size=segment_size(self.capacity))
+
+    @property
+    def name(self):
+        return self.memory.name.lstrip('/')
+
+    def write_operands(self, a, b):
+        n = len(a)
+        buffer = self.memory.buf
+        buffer[:8 * n] = memoryview(a).cast('B')
+        buffer[8 * n:16 * n] = memoryview(b).cast('B')
+
+    def read_results(self, n, errors):
+        """Liest Ergebnisse und Statusbytes, fehlerhafte Elemente werden wie im Text-Protokoll NaN"""
+        buffer = self.memory.buf
+        results = array('d')
+        results.frombytes(buffer[16 * n:24 * n])
+        statuses = array('b')
+        statuses.frombytes(buffer[24 * n:25 * n])
+
+        if errors:
+            for i, status in enumerate(statuses):
+                if status != STATUS_OK:
+                    results[i] = float('nan')
+        return results, statuses
+
+    def write_values(self, offset, values):
+        """Schreibt float64-Werte ab Element offset, für Matrixoperationen"""
+        self.memory.buf[8 * offset:8 * (offset + len(values))] = memoryview(values).cast('B')
+
+    def read_values(self, offset, count):
+        values = array('d')
+        values.frombytes(self.memory.buf[8 * offset:8 * (offset + count)])
+        return values
+
+    def close(self):
+        self.memory.close()
+        try:
+            self.memory.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def parse_shm_response(line):
+    """Parst die Antwort "OK <n> <fehler>" des Shared-Memory-Modus und liefert die Anzahl der Fehler"""
+    status, _, payload = line.strip().partition(' ')
+    if status != 'OK':
+        raise CalculationError(payload or "Leere Antwort im Shared-Memory-Modus")
+    return int(payload.split()[1])
+
+
+def parse_matrix_response(line):
+    """Parst die Antwort "OK <info> <sekunden>" einer Matrixoperation und liefert (info, sekunden)"""
+    status, _, payload = line.strip().partition(' ')
+    if status != 'OK':
+        raise CalculationError(payload or "Leere Antwort bei Matrixoperation")
+    info, seconds = payload.split()
+    return int(info), float(seconds)
@@ -0,0 +1,89 @@
+# python/backend/tracing.py
+
+from contextlib import contextmanager
+
+from opentelemetry import trace
+from opentelemetry.trace import NonRecordingSpan, SpanContext, SpanKind, Status, StatusCode, TraceFlags
+
+from python.backend.base import OperationError
+
+
+class TracingBackend:
+    """
+    Fortran-Backend mit einem OpenTelemetry-Span pro Backend-Aufruf (Attribute Operation, Backend und
+    Batch-Größe). Der Span ist Kind des aktuellen Spans der Flask-Instrumentierung; ohne diesen (ASGI)
+    wird er an den Trace-Kontext des Requests gehängt, gesampelt wie ein neuer Trace mit dessen Trace-ID.
+    An das innere Backend (und damit an die Fortran-Logs) geht die Span-ID des neuen Spans.
+    """
+
+    def __init__(self, backend, tracer=None):
+        self.backend = backend
+        self.name = backend.name
+        self.tracer = tracer or trace.get_tracer(__name__)
+
+    def calculate(self, operation, a, b, trace_id, span_id, parent_span_id):
+        with self._span('fortran.calculate', operation, 1, trace_id, span_id) as child_span_id:
+            return self.backend.calculate(operation, a, b, trace_id, child_span_id, span_id)
+
+    async def calculate_async(self, operation, a, b, trace_id, span_id, parent_span_id):
+        with self._span('fortran.calculate', operation, 1, trace_id, span_id) as child_span_id:
+            return await self.backend.calculate_async(operation, a, b, trace_id, child_span_id, span_id)
+
+    def calculate_batch(self, operation, a, b, trace_id, span_id, parent_span_id):
+        with self._span('fortran.batch', operation, len(a), trace_id, span_id) as child_span_id:
+            return self.backend.calculate_batch(operation, a, b, trace_id, child_span_id, span_id)
+
+    def evaluate(self, plan, slots, n, trace_id, span_id, parent_span_id):
+        with self._span('fortran.eval', 'eval', n, trace_id, span_id) as child_span_id:
+            return self.backend.evaluate(plan, slots, n, trace_id, child_span_id, span_id)
+
+    def reduce(self, operation, sources, chunk_size, progress, trace_id, span_id, parent_span_id):
+        size = sources[0].count if sources else 0
+        with self._span('fortran.reduce', operation, size, trace_id, span_id) as child_span_id:
+            return self.backend.reduce(operation, sources, chunk_size, progress, trace_id, child_span_id, span_id)
+
+    def matrix(self, operation, a, b, shape, row_major, trace_id, span_id, parent_span_id):
+        with self._span('fortran.matrix', operation, len(a), trace_id, span_id) as child_span_id:
+            return self.backend.matrix(operation, a, b, shape, row_major, trace_id, child_span_id, span_id)
+
+    @contextmanager
+    def _span(self, name, operation, batch_size, trace_id, span_id):
+        context = None
+        if not trace.get_current_span().get_span_context().is_valid:
+            context = self._request_context(name, trace_id, span_id)
+
+        attributes = {
+            'calculator.operation': operation,
+            'calculator.backend': self.name,
+            'calculator.batch_size': batch_size,
+        }
+        with self.tracer.start_as_current_span(name, context=context, kind=SpanKind.INTERNAL, attributes=attributes,
+                                               record_exception=False, set_status_on_exception=False) as span:
+            span_context = span.get_span_context()
+            try:
+                yield f'{span_context.span_id:016x}' if span_context.is_valid else span_id
+            except OperationError as e:
+                # Fachlicher Fehler (z.B. Division durch Null): der Aufruf selbst war erfolgreich
+                span.set_attribute('calculator.error', str(e))
+                raise
+            except Exception as e:
+                if span.is_recording():
+                    span.record_exception(e)
+                    span.set_status(Status(StatusCode.ERROR, str(e)))
+                raise
+
+    def _request_context(self, name, trace_id, span_id):
+        # Trace-Kontext des Requests als Eltern-Span, damit Span und Logs dieselbe Trace-ID tragen
+        sampler = getattr(trace.get_tracer_provider(), 'sampler', None)
+        try:
+            trace_id_value = int(trace_id, 16)
+            span_id_value = int(span_id, 16)
+        except (TypeError, ValueError):
+            return None
+        if sampler is None:
+            return None
+        # Entscheidung des konfigurierten Samplers für einen Trace ohne Eltern-Span
+        sampled = sampler.should_sample(None, trace_id_value, name).decision.is_sampled()
+        parent = SpanContext(trace_id_value, span_id_value, is_remote=True,
+                             trace_flags=TraceFlags(TraceFlags.SAMPLED if sampled else TraceFlags.DEFAULT))
+        return trace.set_span_in_context(NonRecordingSpan(parent))
@@ -8,5 +8,128 @@ class Config:
     ENABLE_PROMETHEUS = os.environ.get('ENABLE_PROMETHEUS', 'True').lower() in ('true', '1', 't')
     ENABLE_OPENTELEMETRY = os.environ.get('ENABLE_OPENTELEMETRY', 'True').lower() in ('true', '1', 't')
 
-    # Weitere Konfigurationsoptionen hier
+    # Head-Sampling: Anteil der neu begonnenen Traces, die aufgezeichnet werden (1.0 = alle);
+    # bei 'parentbased_*' folgen Requests mit traceparent der Entscheidung des Aufrufers
+    TRACE_SAMPLER = os.environ.get('TRACE_SAMPLER', 'parentbased_traceidratio').lower()
+    TRACE_SAMPLE_RATIO = float(os.environ.get('TRACE_SAMPLE_RATIO', '1.0'))
+
+    # Span-Export: 'console', 'otlp-grpc', 'otlp-http', 'file' (rotierende JSON-Zeilen) oder 'none';
+    # ohne Endpoint gelten OTEL_EXPORTER_OTLP_ENDPOINT bzw. localhost:4317 / localhost:4318
+    TRACE_EXPORTER = os.environ.get('TRACE_EXPORTER', 'console').lower()
+    TRACE_EXPORTER_ENDPOINT = os.environ.get('TRACE_EXPORTER_ENDPOINT', '')
+    TRACE_FILE_PATH = os.environ.get('TRACE_FILE_PATH', '/tmp/calculator-spans-{pid}.jsonl')
+    TRACE_FILE_MAX_BYTES = int(os.environ.get('TRACE_FILE_MAX_BYTES', str(10 * 1024 * 1024)))
+    TRACE_FILE_BACKUP_COUNT = int(os.environ.get('TRACE_FILE_BACKUP_COUNT', '3'))
+
+    # BatchSpanProcessor: Länge der Warteschlange (darüber werden Spans verworfen), Spans pro Export,
+    # Exportintervall und Zeitlimit eines Exports
+    TRACE_BATCH_MAX_QUEUE_SIZE = int(os.environ.get('TRACE_BATCH_MAX_QUEUE_SIZE', '2048'))
+    TRACE_BATCH_MAX_EXPORT_SIZE = int(os.environ.get('TRACE_BATCH_MAX_EXPORT_SIZE', '512'))
+    TRACE_BATCH_SCHEDULE_DELAY_MS = float(os.environ.get('TRACE_BATCH_SCHEDULE_DELAY_MS', '5000'))
+    TRACE_BATCH_EXPORT_TIMEOUT_MS = float(os.environ.get('TRACE_BATCH_EXPORT_TIMEOUT_MS', '30000'))
+
+    # Fortran-Backend: 'subprocess' (ein Prozess pro Aufruf), 'library' (Shared Library per ctypes)
+    # oder 'pool' (langlebige Co-Prozesse im Server-Modus)
+    CALCULATOR_BACKEND = os.environ.get('CALCULATOR_BACKEND', 'subprocess').lower()
+    FORTRAN_CALC_PATH = os.path.abspath(os.environ.get('FORTRAN_CALC_PATH', './bin/calculator'))
+    FORTRAN_LIB_PATH = os.path.abspath(os.environ.get('FORTRAN_LIB_PATH', './bin/libmath_operations.so'))
+
+    # Übertragung der Batch-Operanden an bin/calculator ('subprocess', 'pool'): 'text' über stdin/stdout
+    # oder 'shm' (Shared Memory, nur Segmentname und Länge gehen über die Pipe)
+    FORTRAN_TRANSPORT = os.environ.get('FORTRAN_TRANSPORT', 'text').lower()
+
+    # Ergebnisformat von bin/calculator ('subprocess', 'pool'): 'hex' überträgt die IEEE-754-Bitmuster
+    # ohne Rundung und wird ohne float() pro Element dekodiert, 'text' die Dezimaldarstellung
+    FORTRAN_RESULT_FORMAT = os.environ.get('FORTRAN_RESULT_FORMAT', 'hex').lower()
+
+    # Co-Prozess-Pool (pro Gunicorn-Worker)
+    FORTRAN_POOL_SIZE = int(os.environ.get('FORTRAN_POOL_SIZE', '2'))
+    FORTRAN_POOL_MAX_LIFETIME = float(os.environ.get('FORTRAN_POOL_MAX_LIFETIME', '3600'))
+    FORTRAN_POOL_CHECKOUT_TIMEOUT = float(os.environ.get('FORTRAN_POOL_CHECKOUT_TIMEOUT', '5'))
+    FORTRAN_POOL_HEALTH_CHECK_INTERVAL = float(os.environ.get('FORTRAN_POOL_HEALTH_CHECK_INTERVAL', '30'))
+
+    # Ergebnis-Cache (standardmäßig aus): lokaler LRU-Cache pro Worker, optional gemeinsamer mmap-Cache
+    # für alle Worker
+    ENABLE_RESULT_CACHE = os.environ.get('ENABLE_RESULT_CACHE', 'False').lower() in ('true', '1', 't')
+    RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', '10000'))
+    RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', '300'))
+    RESULT_CACHE_SHARED_PATH = os.environ.get('RESULT_CACHE_SHARED_PATH', '')
+    RESULT_CACHE_SHARED_SLOTS = int(os.environ.get('RESULT_CACHE_SHARED_SLOTS', '65536'))
+    # Token für DELETE /actuator/cache (Authorization: Bearer <Token>), leer = Leeren deaktiviert
+    CACHE_FLUSH_TOKEN = os.environ.get('CACHE_FLUSH_TOKEN', '')
+
+    # Gerenderte Ausgabe von /actuator/prometheus für diese Zeit in Sekunden zwischenspeichern (0 = aus)
+    METRICS_SCRAPE_CACHE_TTL = float(os.environ.get('METRICS_SCRAPE_CACHE_TTL', '1'))
+
+    # Threads der parallelen Array-Kernel pro Fortran-Prozess (nur bei Build mit make openmp).
+    # 0 = automatisch: CPU-Kerne / (WORKERS * gleichzeitige Fortran-Prozesse pro Worker), mindestens 1
+    FORTRAN_THREADS = int(os.environ.get('FORTRAN_THREADS', '0'))
+    FORTRAN_PARALLEL_THRESHOLD = int(os.environ.get('FORTRAN_PARALLEL_THRESHOLD', '65536'))
+    WORKERS = int(os.environ.get('WORKERS', '4'))
+
+    # Zeitlimits für Fortran-Aufrufe in Sekunden (der Prozess wird danach beendet)
+    FORTRAN_CALL_TIMEOUT = float(os.environ.get('FORTRAN_CALL_TIMEOUT', '5'))
+    FORTRAN_BATCH_TIMEOUT = float(os.environ.get('FORTRAN_BATCH_TIMEOUT', '60'))
+
+    # Log-Level von bin/calculator (DEBUG, INFO, WARN, ERROR, OFF); die Meldungen werden über den
+    # Python-Logger "fortran-calculator" mit dem Trace-Kontext der Anfrage ausgegeben
+    FORTRAN_LOG_LEVEL = os.environ.get('FORTRAN_LOG_LEVEL', 'ERROR')
+
+    # Admission Control und Circuit Breaker (standardmäßig aus)
+    ENABLE_ADMISSION_CONTROL = os.environ.get('ENABLE_ADMISSION_CONTROL', 'False').lower() in ('true', '1', 't')
+    ADMISSION_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', '64'))
+    ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', '1'))
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_BREAKER_FAILURE_THRESHOLD', '5'))
+    CIRCUIT_BREAKER_RESET_TIMEOUT = float(os.environ.get('CIRCUIT_BREAKER_RESET_TIMEOUT', '10'))
+
+    # Micro-Batching: gleichzeitige Einzelaufrufe pro Operation zu einem Batch-Aufruf zusammenfassen
+    ENABLE_COALESCING = os.environ.get('ENABLE_COALESCING', 'False').lower() in ('true', '1', 't')
+    COALESCE_WINDOW_MS = float(os.environ.get('COALESCE_WINDOW_MS', '2'))
+    COALESCE_MAX_BATCH = int(os.environ.get('COALESCE_MAX_BATCH', '64'))
+
+    # ASGI-Modus: maximale Anzahl gleichzeitiger Fortran-Aufrufe pro Worker
+    ASYNC_MAX_IN_FLIGHT = int(os.environ.get('ASYNC_MAX_IN_FLIGHT', '32'))
+
+    # Maximale Anzahl Elemente pro Batch-Anfrage
+    BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', '100000'))
+
+    # Reduktionen (/reduce): Verzeichnis, in dem Dateipfade erlaubt sind (leer = nur Uploads), und Blockgröße
+    REDUCE_DATA_DIR = os.environ.get('REDUCE_DATA_DIR', '')
+    REDUCE_CHUNK_SIZE = int(os.environ.get('REDUCE_CHUNK_SIZE', str(1 << 20)))
+
+    # Maximale Zeilen- bzw. Spaltenzahl der Matrizen bei /matrix
+    MATRIX_MAX_DIMENSION = int(os.environ.get('MATRIX_MAX_DIMENSION', '4096'))
+
+    # Maximale Anzahl Knoten (Variablen, Konstanten, Operationen) pro Ausdruck bei /eval
+    EVAL_MAX_NODES = int(os.environ.get('EVAL_MAX_NODES', '256'))
+
+    # Job-API (/jobs, standardmäßig aus): Spool-Verzeichnis für Eingaben, Zustand und Ergebnisse,
+    # Prozesse des Job-Pools (0 = ein Prozess pro CPU-Kern), Elemente pro Block, maximale Job-Größe,
+    # Zeitlimit pro Block und Aufbewahrungsdauer abgeschlossener Jobs in Sekunden
+    ENABLE_JOBS = os.environ.get('ENABLE_JOBS', 'False').lower() in ('true', '1', 't')
+    JOB_SPOOL_DIR = os.environ.get('JOB_SPOOL_DIR', '/tmp/calculator-jobs')
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '0'))
+    JOB_CHUNK_SIZE = int(os.environ.get('JOB_CHUNK_SIZE', str(1 << 20)))
+    JOB_MAX_SIZE = int(os.environ.get('JOB_MAX_SIZE', '100000000'))
+    JOB_CHUNK_TIMEOUT = float(os.environ.get('JOB_CHUNK_TIMEOUT', '600'))
+    JOB_RETENTION = float(os.environ.get('JOB_RETENTION', '86400'))
+    JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', '0.1'))
+
+    # Start: PRELOAD_APP lädt die Anwendung einmal im Gunicorn-Master, die Worker teilen den Speicher
+    # per Copy-on-Write (muss mit preload_app in gunicorn.conf.py übereinstimmen). ENABLE_WARMUP schickt
+    # jede Operation vor dem ersten Request durch das Backend, bis dahin meldet /actuator/health/readiness 503;
+    # ein fehlgeschlagenes Aufwärmen wird nach WARMUP_RETRY_INTERVAL Sekunden wiederholt
+    PRELOAD_APP = os.environ.get('PRELOAD_APP', 'False').lower() in ('true', '1', 't')
+    ENABLE_WARMUP = os.environ.get('ENABLE_WARMUP', 'True').lower() in ('true', '1', 't')
+    WARMUP_RETRY_INTERVAL = float(os.environ.get('WARMUP_RETRY_INTERVAL', '5'))
+
+    # Sampling-Profiler /actuator/profile: nur mit gesetztem Token (Authorization: Bearer <Token>)
+    # erreichbar; maximale Dauer, Abtastintervall, Anteil der Zeit, den das Sampling höchstens kosten
+    # darf, und Verzeichnis für im Hintergrund erstellte Profile
+    PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')
+    PROFILE_MAX_SECONDS = float(os.environ.get('PROFILE_MAX_SECONDS', '60'))
+    PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '10'))
+    PROFILE_MAX_OVERHEAD = float(os.environ.get('PROFILE_MAX_OVERHEAD', '0.02'))
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/calculator-profiles')
+
     # Weitere Konfigurationsoptionen hier
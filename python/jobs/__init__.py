@@ -0,0 +1,6 @@
+# python/jobs/__init__.py
+
+from python.jobs.runner import JobRunner, job_backend_config, job_workers
+from python.jobs.spool import JOB_STATES, JobError, JobSpool
+
+__all__ = ['JOB_STATES', 'JobError', 'JobRunner', 'JobSpool', 'job_backend_config', 'job_workers']
@@ -0,0 +1,36 @@
+# python/jobs/__main__.py
+#
+# Job-Runner als eigener Prozess neben den Gunicorn-Workern (startet gunicorn.conf.py über when_ready):
+#
+#   python -m python.jobs
+
+import os
+import signal
+
+from prometheus_client import multiprocess
+
+from python.config import Config
+from python.jobs import JobRunner, JobSpool, job_backend_config, job_workers
+from python.logging_config import setup_logger
+
+
+def main():
+    setup_logger("calculator-jobs")
+    setup_logger("calculator-app")
+
+    config = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+    runner = JobRunner(JobSpool(config['JOB_SPOOL_DIR']), job_backend_config(config), job_workers(config),
+                       config['JOB_POLL_INTERVAL'], config['JOB_RETENTION'])
+    signal.signal(signal.SIGTERM, runner.stop)
+    signal.signal(signal.SIGINT, runner.stop)
+
+    try:
+        runner.run()
+    finally:
+        # Gauges des Runners (Warteschlange, laufende Jobs) nicht über sein Ende hinaus exportieren
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            multiprocess.mark_process_dead(os.getpid())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+# python/jobs/runner.py
+
+import logging
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from python.backend import create_backend
+from python.backend.base import STATUS_OK, ExpressionPlan
+from python.jobs.spool import JobError, JobSpool
+from python.metrics import job_chunk_duration, job_duration, job_queue_depth, job_queue_wait, jobs_running
+
+logger = logging.getLogger("calculator-jobs")
+
+# Versuche pro Block, wenn ein Prozess des Pools abstürzt
+MAX_CHUNK_ATTEMPTS = 2
+
+# Abstand zwischen zwei Durchläufen der Aufräumroutine in Sekunden
+CLEANUP_INTERVAL = 60.0
+
+# Backend des Pool-Prozesses, wird einmal pro Prozess erzeugt
+_backend = None
+
+
+def _init_process(config):
+    global _backend
+    # Strg+C im Terminal trifft die ganze Prozessgruppe, beenden soll sich nur der Runner
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _backend = create_backend(config)
+
+
+def run_chunk(directory, job_id, index):
+    """Berechnet einen Block eines Jobs im Pool-Prozess, liefert (Anzahl Elemente, Anzahl Fehler)"""
+    spool = JobSpool(directory)
+    spec = spool.spec(job_id)
+    start = index * spec['chunk_size']
+    count = min(spec['size'] - start, spec['chunk_size'])
+    slots = [spool.read_input(job_id, source, start, count) for source in spec['inputs']]
+
+    if spec['kind'] == 'batch':
+        results, statuses = _backend.calculate_batch(spec['operation'], slots[0], slots[1],
+                                                     spec['trace_id'], spec['span_id'], 'unset')
+    else:
+        plan = ExpressionPlan(spec['code'], spec['variables'], spec['constants'])
+        slots += [spool.read_input(job_id, {'value': constant}, 0, 1) for constant in plan.constants]
+        results, statuses = _backend.evaluate(plan, slots, count, spec['trace_id'], spec['span_id'], 'unset')
+
+    spool.write_results(job_id, start, results, statuses)
+    return count, count - statuses.count(STATUS_OK)
+
+
+class _ActiveJob:
+    """Laufender Job im Runner: noch offene Blöcke, Blöcke im Pool und Fehlversuche"""
+
+    def __init__(self, job_id, marker, spec, state):
+        self.job_id = job_id
+        self.marker = marker
+        self.spec = spec
+        self.state = state
+        completed = set(state['completed'])
+        self.pending = deque(index for index in range(state['chunks']) if index not in completed)
+        self.in_flight = 0
+        self.attempts = {}
+        self.failed = False
+        self.started = time.monotonic()
+
+    def finished(self):
+        return self.in_flight == 0 and (self.failed or not self.pending)
+
+
+class JobRunner:
+    """
+    Arbeitet die Jobs aus dem Spool-Verzeichnis ab. Große Jobs werden in Blöcke aufgeteilt, die ein
+    begrenzter Prozess-Pool parallel berechnet; jeder Block schreibt seinen Teil direkt in die
+    Ergebnisdateien. Abgeschlossene Blöcke stehen in state.json, nach einem Neustart werden nur
+    die fehlenden Blöcke berechnet.
+    """
+
+    def __init__(self, spool, config, workers, poll_interval=0.1, retention=86400.0):
+        self.spool = spool
+        self.config = config
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retention = retention
+        # Je Prozess ein Block in Arbeit und einer wartend, damit der Pool nicht leerläuft
+        self.max_in_flight = 2 * workers
+        self._active = []
+        self._futures = {}
+        self._executor = None
+        self._stopping = threading.Event()
+
+    def stop(self, *args):
+        self._stopping.set()
+
+    def run(self):
+        """Hauptschleife bis stop(), z.B. über SIGTERM"""
+        self.spool.requeue_running()
+        self._executor = self._create_executor()
+        next_cleanup = 0.0
+        logger.info("Job-Runner gestartet mit %d Prozessen, Spool %s", self.workers, self.spool.directory)
+
+        try:
+            while not self._stopping.is_set():
+                self._schedule()
+                job_queue_depth.set(len(self.spool.queued()))
+                jobs_running.set(len(self._active))
+
+                if time.monotonic() >= next_cleanup:
+                    self._cleanup()
+                    next_cleanup = time.monotonic() + CLEANUP_INTERVAL
+
+                if not self._futures:
+                    self._stopping.wait(self.poll_interval)
+                    continue
+
+                done, _ = wait(self._futures, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._complete(future, *self._futures.pop(future))
+        finally:
+            # Unterbrochene Jobs bleiben in running/ und werden beim nächsten Start fortgesetzt
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            logger.info("Job-Runner beendet")
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(self.workers, initializer=_init_process, initargs=(self.config,))
+
+    def _schedule(self):
+        # Blöcke in Einreichungsreihenfolge vergeben, ein neuer Job startet erst, wenn die
+        # laufenden keine offenen Blöcke mehr haben
+        while len(self._futures) < self.max_in_flight:
+            job = next((job for job in self._active if job.pending and not job.failed), None)
+            if job is None:
+                job = self._activate_next()
+                if job is None:
+                    return
+                continue
+
+            index = job.pending.popleft()
+            job.in_flight += 1
+            future = self._executor.submit(run_chunk, self.spool.directory, job.job_id, index)
+            self._futures[future] = (job, index, time.monotonic(), self._executor)
+
+    def _activate_next(self):
+        for marker in self.spool.queued():
+            job_id = self.spool.claim(marker)
+            if job_id is None:
+                continue
+            try:
+                spec = self.spool.spec(job_id)
+                state = self.spool.state(job_id)
+            except JobError:
+                self.spool.release(marker)
+                continue
+            if state['status'] in ('done', 'failed'):
+                self.spool.release(marker)
+                continue
+
+            if state['started_at'] is None:
+                state['started_at'] = time.time()
+                job_queue_wait.labels(kind=spec['kind']).observe(state['started_at'] - state['submitted_at'])
+            state['status'] = 'running'
+            self.spool.prepare_results(job_id, spec['size'])
+            self.spool.write_state(job_id, state)
+
+            job = _ActiveJob(job_id, marker, spec, state)
+            self._active.append(job)
+            logger.info("Job %s gestartet: %s mit %d Elementen in %d Blöcken", job_id, spec['kind'],
+                        spec['size'], state['chunks'], extra={'trace_id': spec['trace_id'], 'span_id': spec['span_id']})
+            if job.finished():
+                self._finish(job)
+            return job
+        return None
+
+    def _complete(self, future, job, index, started, executor):
+        job.in_flight -= 1
+        try:
+            count, errors = future.result()
+        except BrokenProcessPool:
+            # Ein abgestürzter Pool-Prozess macht den ganzen Pool unbrauchbar
+            if executor is self._executor:
+                logger.warning("Prozess des Job-Pools abgestürzt, starte Pool neu")
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._create_executor()
+            job.attempts[index] = job.attempts.get(index, 0) + 1
+            if job.attempts[index] < MAX_CHUNK_ATTEMPTS:
+                job.pending.appendleft(index)
+            else:
+                self._fail(job, "Prozess des Job-Pools abgestürzt")
+        except Exception as e:
+            self._fail(job, str(e))
+        else:
+            job_chunk_duration.labels(kind=job.spec['kind']).observe(time.monotonic() - started)
+            if not job.failed:
+                job.state['completed'].append(index)
+                job.state['done'] += count
+                job.state['errors'] += errors
+                self.spool.write_state(job.job_id, job.state)
+
+        if job.finished():
+            self._finish(job)
+
+    def _fail(self, job, message):
+        if job.failed:
+            return
+        job.failed = True
+        job.state['error'] = message
+        logger.error("Job %s fehlgeschlagen: %s", job.job_id, message,
+                     extra={'trace_id': job.spec['trace_id'], 'span_id': job.spec['span_id']})
+
+    def _finish(self, job):
+        job.state['status'] = 'failed' if job.failed else 'done'
+        job.state['finished_at'] = time.time()
+        self.spool.write_state(job.job_id, job.state)
+        self.spool.release(job.marker)
+        self._active.remove(job)
+        job_duration.labels(kind=job.spec['kind'], status=job.state['status']).observe(
+            time.monotonic() - job.started)
+        logger.info("Job %s beendet: %s", job.job_id, job.state['status'],
+                    extra={'trace_id': job.spec['trace_id'], 'span_id': job.spec['span_id']})
+
+    def _cleanup(self):
+        for job_id in list(self.spool.expired(self.retention)):
+            self.spool.remove(job_id)
+
+
+def job_backend_config(config):
+    """
+    Backend-Konfiguration der Pool-Prozesse: die Parallelität entsteht über die Blöcke, daher ein
+    Thread pro Prozess, ohne Cache, Überlastschutz und Tracing, mit dem Zeitlimit für Job-Blöcke
+    """
+    config = dict(config)
+    config.update({
+        'FORTRAN_THREADS': 1,
+        'FORTRAN_BATCH_TIMEOUT': config.get('JOB_CHUNK_TIMEOUT'),
+        'ENABLE_RESULT_CACHE': False,
+        'ENABLE_COALESCING': False,
+        'ENABLE_ADMISSION_CONTROL': False,
+        'ENABLE_OPENTELEMETRY': False,
+    })
+    return config
+
+
+def job_workers(config):
+    """Anzahl der Pool-Prozesse, 0 = ein Prozess pro CPU-Kern"""
+    return config.get('JOB_WORKERS', 0) or os.cpu_count() or 1
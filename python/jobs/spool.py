@@ -0,0 +1,169 @@
+# python/jobs/spool.py
+
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from array import array
+
+# Zustände eines Jobs in state.json
+JOB_STATES = ('queued', 'running', 'done', 'failed')
+
+_JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class JobError(ValueError):
+    """Ungültige Job-Anfrage oder unbekannter Job, status_code ist der passende HTTP-Status"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class JobSpool:
+    """
+    Verzeichnis mit allen Jobs. Pro Job ein Unterverzeichnis mit job.json (Beschreibung),
+    state.json (Zustand und Fortschritt), den Eingaben als float64-Dateien sowie result.f64
+    und status.i8. Wartende Jobs stehen als leere Markierungsdateien in queue/, laufende in running/;
+    der Dateiname beginnt mit dem Einreichungszeitpunkt, die Reihenfolge ist damit FIFO.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.queue_dir = os.path.join(directory, 'queue')
+        self.running_dir = os.path.join(directory, 'running')
+        self.jobs_dir = os.path.join(directory, 'jobs')
+        for path in (self.queue_dir, self.running_dir, self.jobs_dir):
+            os.makedirs(path, exist_ok=True)
+
+    def create(self):
+        """Legt das Verzeichnis für einen neuen Job an und liefert dessen ID"""
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.job_dir(job_id))
+        return job_id
+
+    def job_dir(self, job_id):
+        if not _JOB_ID.match(job_id):
+            raise JobError(f"Unbekannter Job: {job_id}", 404)
+        return os.path.join(self.jobs_dir, job_id)
+
+    def path(self, job_id, name):
+        return os.path.join(self.job_dir(job_id), name)
+
+    def submit(self, job_id, spec, chunks):
+        """Schreibt Beschreibung und Anfangszustand und stellt den Job in die Warteschlange"""
+        _write_json(self.path(job_id, 'job.json'), spec)
+        self.write_state(job_id, {
+            'status': 'queued',
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'chunks': chunks,
+            'completed': [],
+            'done': 0,
+            'errors': 0,
+            'error': None,
+        })
+        # Die Markierung entsteht zuletzt, der Runner sieht nur vollständig geschriebene Jobs
+        with open(os.path.join(self.queue_dir, f"{time.time_ns():020d}-{job_id}"), 'w'):
+            pass
+
+    def spec(self, job_id):
+        return _read_json(self.path(job_id, 'job.json'), job_id)
+
+    def state(self, job_id):
+        return _read_json(self.path(job_id, 'state.json'), job_id)
+
+    def write_state(self, job_id, state):
+        _write_json(self.path(job_id, 'state.json'), state)
+
+    def queued(self):
+        """Markierungen der wartenden Jobs in Einreichungsreihenfolge"""
+        return sorted(os.listdir(self.queue_dir))
+
+    def claim(self, marker):
+        """Übernimmt einen wartenden Job, liefert seine ID oder None, wenn er nicht mehr wartet"""
+        try:
+            os.replace(os.path.join(self.queue_dir, marker), os.path.join(self.running_dir, marker))
+        except FileNotFoundError:
+            return None
+        return marker.partition('-')[2]
+
+    def release(self, marker):
+        try:
+            os.remove(os.path.join(self.running_dir, marker))
+        except FileNotFoundError:
+            pass
+
+    def requeue_running(self):
+        """Stellt nach einem Neustart des Runners die unterbrochenen Jobs wieder in die Warteschlange"""
+        for marker in os.listdir(self.running_dir):
+            os.replace(os.path.join(self.running_dir, marker), os.path.join(self.queue_dir, marker))
+
+    def expired(self, retention):
+        """IDs der abgeschlossenen Jobs, deren Ende länger als retention Sekunden zurückliegt"""
+        deadline = time.time() - retention
+        for job_id in os.listdir(self.jobs_dir):
+            try:
+                state = self.state(job_id)
+            except JobError:
+                continue
+            if state['status'] in ('done', 'failed') and state['finished_at'] < deadline:
+                yield job_id
+
+    def remove(self, job_id):
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+
+    def write_input(self, job_id, name, values):
+        with open(self.path(job_id, name), 'wb') as f:
+            values.tofile(f)
+
+    def read_input(self, job_id, source, start, count):
+        """Liest count Werte ab Element start einer Eingabe ({"file", "offset"}) bzw. den Skalar ({"value"})"""
+        if 'value' in source:
+            return array('d', (source['value'],))
+        values = array('d')
+        with open(self.path(job_id, source['file']), 'rb') as f:
+            f.seek(source['offset'] + 8 * start)
+            values.fromfile(f, count)
+        return values
+
+    def prepare_results(self, job_id, n):
+        """Legt result.f64 und status.i8 in voller Größe an, vorhandene Teilergebnisse bleiben erhalten"""
+        for name, size in (('result.f64', 8 * n), ('status.i8', n)):
+            path = self.path(job_id, name)
+            with open(path, 'ab'):
+                pass
+            os.truncate(path, size)
+
+    def write_results(self, job_id, start, results, statuses):
+        for name, values, width in (('result.f64', results, 8), ('status.i8', statuses, 1)):
+            with open(self.path(job_id, name), 'r+b') as f:
+                f.seek(width * start)
+                values.tofile(f)
+
+    def read_results(self, job_id, n):
+        results = array('d')
+        statuses = array('b')
+        for name, values in (('result.f64', results), ('status.i8', statuses)):
+            with open(self.path(job_id, name), 'rb') as f:
+                values.fromfile(f, n)
+        return results, statuses
+
+
+def _read_json(path, job_id):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise JobError(f"Unbekannter Job: {job_id}", 404) from None
+
+
+def _write_json(path, value):
+    # Über eine temporäre Datei ersetzen, Leser sehen immer einen vollständigen Stand
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w') as f:
+        json.dump(value, f)
+    os.replace(temporary, path)
@@ -1,19 +1,48 @@
 # python/api/logging_config.py
 
+import atexit
 import json
 import logging
+import logging.handlers
 import datetime
+import os
+import queue
+import random
 import sys
-import uuid
+import threading
+import time
 import re
 import socket
 import traceback
-from flask import request
+from flask import g, has_request_context, request
+
+# Asynchrones Logging: Records werden nur in eine Queue gestellt, formatiert und
+# geschrieben wird gesammelt in einem Hintergrund-Thread
+LOG_ASYNC = os.environ.get('LOG_ASYNC', 'False').lower() in ('true', '1', 't')
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+LOG_FLUSH_INTERVAL_MS = float(os.environ.get('LOG_FLUSH_INTERVAL_MS', '50'))
+# Sampling pro Level, z.B. "DEBUG=0.01,INFO=0.1" (nicht angegebene Level werden vollständig geloggt)
+LOG_SAMPLING = os.environ.get('LOG_SAMPLING', '')
+
 
 class SpringBootJsonFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__()
+        # Statische Felder werden nur einmal berechnet und als fertiges JSON-Fragment angehängt
+        self._static_fields = json.dumps({
+            "host": {
+                "name": socket.gethostname()
+            },
+            "service": {
+                "name": "calculator-service"
+            }
+        })[1:-1]
+        self._timestamp_second = None
+        self._timestamp_prefix = None
+
     def format(self, record):
         # Spring Boot JSON Log Format
-        timestamp = datetime.datetime.now().isoformat()
+        timestamp = self._timestamp(record.created)
 
         # Grundlegende Log-Felder nach Spring Boot-Standard
         log_record = {
@@ -25,12 +54,6 @@ class SpringBootJsonFormatter(logging.Formatter):
             "process": {
                 "pid": record.process,
                 "thread_id": record.thread
-            },
-            "host": {
-                "name": socket.gethostname()
-            },
-            "service": {
-                "name": "calculator-service"
             }
         }
 
@@ -55,7 +78,155 @@ class SpringBootJsonFormatter(logging.Formatter):
             for key, value in record.additional_fields.items():
                 log_record[key] = value
 
-        return json.dumps(log_record)
+        return f'{json.dumps(log_record)[:-1]}, {self._static_fields}}}'
+
+    def _timestamp(self, created):
+        # Zeitpunkt des Log-Aufrufs (nicht der Formatierung), Datum und Uhrzeit werden pro Sekunde gecacht
+        second = int(created)
+        if second != self._timestamp_second:
+            self._timestamp_prefix = datetime.datetime.fromtimestamp(second).strftime('%Y-%m-%dT%H:%M:%S')
+            self._timestamp_second = second
+        return f"{self._timestamp_prefix}.{int((created - second) * 1000000):06d}"
+
+
+class LevelSamplingFilter(logging.Filter):
+    """Lässt pro Level nur den konfigurierten Anteil der Records durch"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelno)
+        return rate is None or random.random() < rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler, der den Record unverändert in die Queue stellt. Die Nachricht wird erst
+    im Listener-Thread formatiert; ist die Queue voll, wird der Record verworfen statt
+    den Request-Thread zu blockieren.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_sampling(spec):
+    """Wandelt "DEBUG=0.01,INFO=0.5" in {logging.DEBUG: 0.01, logging.INFO: 0.5} um"""
+    rates = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        level, _, rate = entry.partition('=')
+        rates[logging.getLevelName(level.strip().upper())] = float(rate)
+    return rates
+
+
+class _LogWriter:
+    """
+    Hintergrund-Thread, der die Queue in Blöcken leert: anstehende Records werden
+    formatiert und mit einem einzigen write() ausgegeben, danach ruht der Thread für
+    flush_interval Sekunden. So konkurriert er nicht bei jedem Record um den GIL.
+    """
+
+    _STOP = object()
+    # Maximale Anzahl Records pro write(), begrenzt die Zeit, die der Thread den GIL hält
+    MAX_CHUNK = 32
+
+    def __init__(self, log_queue, stream, flush_interval):
+        self.queue = log_queue
+        self.stream = stream
+        self.flush_interval = flush_interval
+        self.formatter = SpringBootJsonFormatter()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # Beim Beenden auch bei voller Queue warten, bis alles geschrieben ist
+        self.queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            records = [self.queue.get()]
+            try:
+                while len(records) < self.MAX_CHUNK:
+                    records.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            stopped = self._STOP in records
+            self._write([record for record in records if record is not self._STOP])
+            if stopped:
+                return
+
+            # Nach einem vollen Block nur kurz den GIL abgeben, sonst bis zum nächsten Intervall ruhen
+            time.sleep(0 if len(records) == self.MAX_CHUNK else self.flush_interval)
+
+    def _write(self, records):
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception:
+                pass
+        if not lines:
+            return
+        try:
+            self.stream.write('\n'.join(lines) + '\n')
+            self.stream.flush()
+        except (OSError, ValueError):
+            pass
+
+
+class _AsyncLogging:
+    """Gemeinsame Queue und Schreib-Thread aller Logger dieses Prozesses"""
+
+    def __init__(self):
+        self.handlers = []
+        self.writer = None
+        self.queue = None
+        self._started_pid = None
+
+    def handler(self):
+        if self.writer is None:
+            self._start()
+        handler = NonBlockingQueueHandler(self.queue)
+        self.handlers.append(handler)
+        return handler
+
+    def stop(self):
+        if self.writer is not None and self._started_pid == os.getpid():
+            self.writer.stop()
+        self.writer = None
+
+    def _start(self):
+        self.queue = queue.Queue(LOG_QUEUE_SIZE)
+        self.writer = _LogWriter(self.queue, sys.stdout, LOG_FLUSH_INTERVAL_MS / 1000.0)
+        self._started_pid = os.getpid()
+        for handler in self.handlers:
+            handler.queue = self.queue
+
+    def after_fork(self):
+        # Der Schreib-Thread existiert im Kindprozess (Gunicorn-Worker) nicht mehr
+        if self.writer is not None:
+            self.writer = None
+            self._start()
+
+
+_async_logging = _AsyncLogging()
+os.register_at_fork(after_in_child=_async_logging.after_fork)
+atexit.register(_async_logging.stop)
+
 
 def setup_logger(logger_name="calculator-app"):
     """Richtet einen Logger mit Spring Boot JSON-Formatierung ein"""
@@ -66,81 +237,107 @@ def setup_logger(logger_name="calculator-app"):
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(SpringBootJsonFormatter())
+    if LOG_ASYNC:
+        handler = _async_logging.handler()
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(SpringBootJsonFormatter())
+
+    sampling = parse_sampling(LOG_SAMPLING)
+    if sampling:
+        handler.addFilter(LevelSamplingFilter(sampling))
+
     logger.addHandler(handler)
 
     return logger
 
-def extract_trace_context():
-    """Extrahiert Trace-Kontext aus eingehenden Headern oder erstellt neuen"""
+# Liefert den aktuellen OpenTelemetry-Span, gesetzt von configure_telemetry; ohne OpenTelemetry
+# wird das Paket nicht importiert
+_current_span = None
+
+
+def use_current_span(current_span):
+    """Trace-Kontext künftig aus dem aktuellen Span (z.B. opentelemetry.trace.get_current_span) lesen"""
+    global _current_span
+    _current_span = current_span
+
+
+# Format: 00-trace_id-span_id-flags
+_TRACEPARENT = re.compile(r'00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}')
+
+
+def new_trace_id():
+    """Zufällige Trace-ID (128 Bit, hex); random ist nach einem fork() neu initialisiert"""
+    return f'{random.getrandbits(128) or 1:032x}'
+
+
+def new_span_id():
+    """Zufällige Span-ID (64 Bit, hex)"""
+    return f'{random.getrandbits(64) or 1:016x}'
+
+
+def extract_trace_context(headers=None):
+    """
+    Extrahiert Trace-Kontext aus eingehenden Headern oder erstellt neuen.
+    Ohne headers werden die Header des aktuellen Flask-Requests verwendet; das Ergebnis wird
+    pro Request gemerkt, weitere Aufrufe liefern denselben Kontext.
+    """
+    if headers is not None:
+        return _trace_context(headers)
+    if not has_request_context():
+        return _trace_context(None)
+
+    context = g.get('_trace_context')
+    if context is None:
+        context = g._trace_context = _trace_context(request.headers)
+    return context
+
+
+def cached_trace_context():
+    """Trace-Kontext des aktuellen Requests, falls er bereits extrahiert wurde, sonst None"""
+    return g.get('_trace_context')
+
+
+def _trace_context(headers):
+    # Mit OpenTelemetry gilt der Span der Instrumentierung, damit Logs und Spans dieselben IDs tragen
+    if _current_span is not None:
+        span = _current_span()
+        span_context = span.get_span_context()
+        if span_context.is_valid:
+            parent = getattr(span, 'parent', None)
+            return (f'{span_context.trace_id:032x}', f'{span_context.span_id:016x}',
+                    f'{parent.span_id:016x}' if parent is not None else 'unset')
+
     trace_id = None
-    span_id = None
     parent_span_id = None
-    logger = logging.getLogger("calculator-app")
-
-    try:
-        # Nur Ausführen, wenn es in einem Flask-Kontext ist
-        if request:
-            # 1. W3C Trace Context prüfen (traceparent)
-            traceparent = request.headers.get('traceparent')
-            if traceparent:
-                # Format: 00-trace_id-span_id-flags
-                match = re.match(r'00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}', traceparent)
-                if match:
-                    trace_id = match.group(1)
-                    parent_span_id = match.group(2)
-                    if not parent_span_id:
-                        parent_span_id = 'unset'
-                    span_id = str(uuid.uuid4()).replace('-', '')[:16]
-                    logger.debug(f"Trace-Kontext aus W3C traceparent extrahiert",
-                              extra={'trace_id': trace_id, 'span_id': span_id, 'parent_span_id': parent_span_id})
-
-            # 2. Jaeger/OpenTracing-Header prüfen
-            elif request.headers.get('uber-trace-id'):
-                trace_header = request.headers.get('uber-trace-id')
-                parts = trace_header.split(':')
-                if len(parts) >= 2:
-                    trace_id = parts[0]
-                    parent_span_id = parts[1]
-                    if not parent_span_id:
-                        parent_span_id = 'unset'
-                    span_id = str(uuid.uuid4()).replace('-', '')[:16]
-                    logger.debug(f"Trace-Kontext aus Jaeger-Header extrahiert",
-                              extra={'trace_id': trace_id, 'span_id': span_id, 'parent_span_id': parent_span_id})
-
-            # 3. B3-Header prüfen (Zipkin/Sleuth)
-            elif request.headers.get('X-B3-TraceId'):
-                trace_id = request.headers.get('X-B3-TraceId')
-                parent_span_id = request.headers.get('X-B3-SpanId')
-                if not parent_span_id:
-                    parent_span_id = 'unset'
-                span_id = str(uuid.uuid4()).replace('-', '')[:16]
-                logger.debug(f"Trace-Kontext aus B3-Header extrahiert",
-                          extra={'trace_id': trace_id, 'span_id': span_id, 'parent_span_id': parent_span_id})
-
-            # 4. Spring Cloud Sleuth Header für Trace-ID
-            elif request.headers.get('X-Trace-Id'):
-                trace_id = request.headers.get('X-Trace-Id')
-                parent_span_id = request.headers.get('X-Span-Id')
-                if not parent_span_id:
-                    parent_span_id = 'unset'
-                span_id = str(uuid.uuid4()).replace('-', '')[:16]
-                logger.debug(f"Trace-Kontext aus Spring-Header extrahiert",
-                          extra={'trace_id': trace_id, 'span_id': span_id, 'parent_span_id': parent_span_id})
-    except Exception:
-        # Fallback, wenn wir nicht in einem Flask-Request-Kontext sind
-        pass
+    if headers:
+        # 1. W3C Trace Context prüfen (traceparent)
+        traceparent = headers.get('traceparent')
+        if traceparent:
+            match = _TRACEPARENT.match(traceparent)
+            if match:
+                trace_id, parent_span_id = match.groups()
+
+        # 2. Jaeger/OpenTracing-Header prüfen
+        elif headers.get('uber-trace-id'):
+            parts = headers.get('uber-trace-id').split(':')
+            if len(parts) >= 2:
+                trace_id, parent_span_id = parts[0], parts[1]
+
+        # 3. B3-Header prüfen (Zipkin/Sleuth)
+        elif headers.get('X-B3-TraceId'):
+            trace_id = headers.get('X-B3-TraceId')
+            parent_span_id = headers.get('X-B3-SpanId')
+
+        # 4. Spring Cloud Sleuth Header für Trace-ID
+        elif headers.get('X-Trace-Id'):
+            trace_id = headers.get('X-Trace-Id')
+            parent_span_id = headers.get('X-Span-Id')
 
     # Wenn kein Kontext gefunden wurde, neuen erstellen
     if not trace_id:
-        trace_id = str(uuid.uuid4()).replace('-', '')
-        span_id = str(uuid.uuid4()).replace('-', '')[:16]
-        parent_span_id = 'unset'
-        logger.debug("Neuer Trace-Kontext erstellt",
-                  extra={'trace_id': trace_id, 'span_id': span_id, 'parent_span_id': parent_span_id})
-
-    return trace_id, span_id, parent_span_id
+        return new_trace_id(), new_span_id(), 'unset'
+    return trace_id, new_span_id(), parent_span_id or 'unset'
 
 # Direktes Setup eines Standard-Loggers beim Import
 default_logger = setup_logger()
\ No newline at end of file
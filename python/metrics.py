@@ -1,9 +1,62 @@
-from prometheus_client import Counter, Histogram, Summary, multiprocess, CollectorRegistry
+from prometheus_client import Counter, Gauge, Histogram, Summary, multiprocess, CollectorRegistry, generate_latest
+from prometheus_client.samples import Exemplar
+from bisect import bisect_left
+from contextlib import contextmanager
 import os
+import threading
 import time
 
 metrics_registry = CollectorRegistry()
 
+# Registry für /actuator/prometheus. Im Multiprozess-Modus enthält sie nur den MultiProcessCollector
+# (die Live-Metriken stehen ohnehin in den mmap-Dateien), sonst die Live-Metriken selbst.
+scrape_registry = CollectorRegistry(auto_describe=False)
+
+
+class _RegistryCollector:
+    """Stellt eine andere Registry als Collector bereit"""
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    def collect(self):
+        return self.registry.collect()
+
+
+class ScrapeCache:
+    """Hält die gerenderte Scrape-Ausgabe pro Format für ttl Sekunden"""
+
+    def __init__(self, ttl=0.0):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def render(self, openmetrics):
+        now = time.monotonic()
+        entry = self._entries.get(openmetrics)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        # Gleichzeitige Scrapes warten auf dieselbe Berechnung statt alle Dateien mehrfach zu lesen
+        with self._lock:
+            entry = self._entries.get(openmetrics)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+            if openmetrics:
+                from prometheus_client.openmetrics import exposition
+                output = exposition.generate_latest(ExemplarRegistry(scrape_registry, exemplar_store))
+            else:
+                output = generate_latest(scrape_registry)
+
+            if self.ttl > 0:
+                self._entries[openmetrics] = (time.monotonic() + self.ttl, output)
+            return output
+
+
+scrape_cache = ScrapeCache()
+
+
 def configure_metrics(app):
     """
     Konfiguriert die Prometheus-Metriken für die Flask-Anwendung.
@@ -13,18 +66,34 @@ def configure_metrics(app):
         return app
 
     app.logger.info("Configuring Prometheus Metrics")
+    scrape_cache.ttl = app.config.get('METRICS_SCRAPE_CACHE_TTL', 0.0)
+
+    # Ohne PROMETHEUS_MULTIPROC_DIR schreibt prometheus_client keine Dateien, dann die Live-Werte exportieren
+    multiprocess_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not multiprocess_dir:
+        _register_once(_RegistryCollector(metrics_registry))
+        return app
 
     # Multiprocess-Konfiguration
-    multiprocess_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus')
     if not os.path.exists(multiprocess_dir):
         os.makedirs(multiprocess_dir)
 
-    multiprocess.MultiProcessCollector.multiprocess_dir = multiprocess_dir
-
-    multiprocess.MultiProcessCollector(metrics_registry)
+    _register_once(multiprocess.MultiProcessCollector(None, path=multiprocess_dir))
 
     return app
 
+
+_scrape_collector = None
+
+
+def _register_once(collector):
+    # create_app() kann mehrfach aufgerufen werden, die Scrape-Registry hat genau einen Collector
+    global _scrape_collector
+    if _scrape_collector is not None:
+        scrape_registry.unregister(_scrape_collector)
+    scrape_registry.register(collector)
+    _scrape_collector = collector
+
 # HTTP-Request Metriken
 http_requests_total = Counter(
     'http_requests_total',
@@ -63,38 +132,190 @@ fortran_call_errors = Counter(
     registry=metrics_registry
 )
 
+fortran_batch_size = Histogram(
+    'fortran_batch_size',
+    'Anzahl der Elemente pro Batch-Berechnung',
+    ['operation'],
+    buckets=(1, 10, 100, 1000, 10000, 100000, 1000000),
+    registry=metrics_registry
+)
+
+fortran_pool_processes = Gauge(
+    'fortran_pool_processes',
+    'Anzahl der Fortran-Co-Prozesse im Pool nach Zustand',
+    ['state'],
+    multiprocess_mode='livesum',
+    registry=metrics_registry
+)
+
+fortran_pool_restarts = Counter(
+    'fortran_pool_restarts',
+    'Anzahl der ersetzten Fortran-Co-Prozesse',
+    ['reason'],
+    registry=metrics_registry
+)
+
+# Phasen eines Fortran-Aufrufs: queue (Sammelfenster/Semaphor), launch (Prozessstart),
+# checkout (Co-Prozess aus dem Pool), execute (Berechnung inkl. Kommunikation), parse (Ausgabe auswerten)
+FORTRAN_PHASE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                         0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+fortran_phase_duration = Histogram(
+    'fortran_phase_duration_seconds',
+    'Dauer der einzelnen Phasen eines Fortran-Aufrufs in Sekunden',
+    ['operation', 'backend', 'phase'],
+    buckets=FORTRAN_PHASE_BUCKETS,
+    registry=metrics_registry
+)
+
+# Admission Control, Timeouts und Circuit Breaker
+fortran_in_flight = Gauge(
+    'fortran_in_flight',
+    'Anzahl laufender bzw. wartender Fortran-Aufrufe',
+    multiprocess_mode='livesum',
+    registry=metrics_registry
+)
+
+fortran_admission_rejections = Counter(
+    'fortran_admission_rejections',
+    'Abgelehnte Fortran-Aufrufe (Überlast bzw. offener Circuit Breaker)',
+    ['reason'],
+    registry=metrics_registry
+)
+
+fortran_call_timeouts = Counter(
+    'fortran_call_timeouts',
+    'Wegen Zeitüberschreitung abgebrochene Fortran-Aufrufe',
+    ['function'],
+    registry=metrics_registry
+)
+
+fortran_circuit_breaker_state = Gauge(
+    'fortran_circuit_breaker_state',
+    'Zustand des Circuit Breakers (0 = geschlossen, 1 = offen, 2 = halb offen)',
+    multiprocess_mode='livemax',
+    registry=metrics_registry
+)
+
+# Micro-Batching Metriken
+fortran_coalesce_fill_ratio = Histogram(
+    'fortran_coalesce_fill_ratio',
+    'Füllgrad zusammengefasster Batches (Anzahl Aufrufe / maximale Batch-Größe)',
+    ['operation'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0),
+    registry=metrics_registry
+)
+
+fortran_coalesce_wait = Histogram(
+    'fortran_coalesce_wait_seconds',
+    'Durch das Sammelfenster zusätzlich entstandene Wartezeit pro Aufruf',
+    ['operation'],
+    buckets=(0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05),
+    registry=metrics_registry
+)
+
+# Ergebnis-Cache Metriken
+fortran_cache_hits = Counter(
+    'fortran_cache_hits',
+    'Treffer im Ergebnis-Cache',
+    ['tier'],
+    registry=metrics_registry
+)
+
+fortran_cache_misses = Counter(
+    'fortran_cache_misses',
+    'Fehlversuche im Ergebnis-Cache (Aufruf des Fortran-Backends)',
+    registry=metrics_registry
+)
+
+fortran_cache_evictions = Counter(
+    'fortran_cache_evictions',
+    'Aus dem Ergebnis-Cache verdrängte Einträge',
+    ['tier', 'reason'],
+    registry=metrics_registry
+)
+
+# Job-API Metriken (Warteschlange und Laufzeit schreibt der Job-Runner, Einreichungen die Worker)
+JOB_DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0, 7200.0)
+
+job_submissions = Counter(
+    'job_submissions',
+    'Angenommene Jobs',
+    ['kind'],
+    registry=metrics_registry
+)
+
+job_queue_depth = Gauge(
+    'job_queue_depth',
+    'Anzahl wartender Jobs',
+    multiprocess_mode='livesum',
+    registry=metrics_registry
+)
+
+jobs_running = Gauge(
+    'jobs_running',
+    'Anzahl laufender Jobs',
+    multiprocess_mode='livesum',
+    registry=metrics_registry
+)
+
+job_queue_wait = Histogram(
+    'job_queue_wait_seconds',
+    'Wartezeit eines Jobs von der Einreichung bis zum Start',
+    ['kind'],
+    buckets=JOB_DURATION_BUCKETS,
+    registry=metrics_registry
+)
+
+job_duration = Histogram(
+    'job_duration_seconds',
+    'Laufzeit eines Jobs vom Start bis zum Ende',
+    ['kind', 'status'],
+    buckets=JOB_DURATION_BUCKETS,
+    registry=metrics_registry
+)
+
+job_chunk_duration = Histogram(
+    'job_chunk_duration_seconds',
+    'Laufzeit eines Job-Blocks im Prozess-Pool',
+    ['kind'],
+    buckets=JOB_DURATION_BUCKETS,
+    registry=metrics_registry
+)
+
 # Decorator für HTTP-Request-Metriken
+# Kinder der Request-Metriken pro (method, endpoint, status), spart labels() bei jedem Request
+_request_metrics = {}
+
+
+def observe_request(method, endpoint, status, duration):
+    """Zählt einen HTTP-Request und erfasst seine Dauer"""
+    children = _request_metrics.get((method, endpoint, status))
+    if children is None:
+        children = _request_metrics[method, endpoint, status] = (
+            http_requests_total.labels(method=method, endpoint=endpoint, status=status),
+            http_request_duration.labels(method=method, endpoint=endpoint),
+        )
+    children[0].inc()
+    children[1].observe(duration)
+
+
 def track_request_metrics(view_func):
     from functools import wraps
-    from flask import request, g
+    from flask import request, make_response
 
     @wraps(view_func)
     def wrapped_view(*args, **kwargs):
         # Zeitpunkt merken
         start_time = time.time()
+        status = 500
 
-        # View ausführen
+        # View ausführen (Tupel wie (response, 400) werden zu einem Response-Objekt)
         try:
-            response = view_func(*args, **kwargs)
+            response = make_response(view_func(*args, **kwargs))
             status = response.status_code
-        except Exception as e:
-            # Bei Exception
-            status = 500
-            raise e
         finally:
-            # Dauer berechnen
-            duration = time.time() - start_time
-            endpoint = request.endpoint or 'unknown'
-            http_requests_total.labels(
-                method=request.method,
-                endpoint=endpoint,
-                status=status
-            ).inc()
-
-            http_request_duration.labels(
-                method=request.method,
-                endpoint=endpoint
-            ).observe(duration)
+            observe_request(request.method, request.endpoint or 'unknown', status, time.time() - start_time)
 
         return response
 
@@ -122,3 +343,86 @@ def track_fortran_call(func):
             fortran_call_duration.labels(function=function_name).observe(duration)
 
     return wrapper
+
+
+class ExemplarStore:
+    """
+    Merkt sich pro Histogramm-Bucket die letzte Beobachtung mit ihrer trace_id.
+
+    Im Multiprozess-Modus speichert prometheus_client keine Exemplars, daher werden sie
+    prozesslokal gehalten und beim OpenMetrics-Export an die Bucket-Samples angehängt.
+    Ein Scrape liefert so die Exemplars des Workers, der ihn beantwortet.
+    """
+
+    def __init__(self):
+        self._exemplars = {}
+
+    def record(self, name, buckets, labels, value, trace_id):
+        index = bisect_left(buckets, value)
+        le = buckets[index] if index < len(buckets) else float('inf')
+        key = (name, tuple(sorted(labels.items())), float(le))
+        self._exemplars[key] = Exemplar({'trace_id': trace_id}, value, time.time())
+
+    def collect(self, registry):
+        for family in registry.collect():
+            if family.type == 'histogram':
+                family.samples = [self._attach(family.name, sample) for sample in family.samples]
+            yield family
+
+    def _attach(self, name, sample):
+        if not sample.name.endswith('_bucket') or sample.exemplar is not None:
+            return sample
+        labels = {key: value for key, value in sample.labels.items() if key != 'le'}
+        exemplar = self._exemplars.get((name, tuple(sorted(labels.items())), float(sample.labels['le'])))
+        return sample._replace(exemplar=exemplar) if exemplar is not None else sample
+
+
+exemplar_store = ExemplarStore()
+
+
+class ExemplarRegistry:
+    """Registry-Sicht für den OpenMetrics-Export, die die gespeicherten Exemplars ergänzt"""
+
+    def __init__(self, registry, store):
+        self.registry = registry
+        self.store = store
+
+    def collect(self):
+        return self.store.collect(self.registry)
+
+
+def observe_fortran_phase(phase, operation, backend, duration, trace_id=None):
+    """Erfasst die Dauer einer Phase, mit trace_id als Exemplar"""
+    labels = {'operation': operation, 'backend': backend, 'phase': phase}
+    fortran_phase_duration.labels(**labels).observe(duration)
+    if trace_id and trace_id != 'unset':
+        exemplar_store.record('fortran_phase_duration_seconds', FORTRAN_PHASE_BUCKETS, labels, duration, trace_id)
+
+
+@contextmanager
+def track_fortran_phase(phase, operation, backend, trace_id=None):
+    """Misst die Dauer des Blocks als Phase eines Fortran-Aufrufs"""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_fortran_phase(phase, operation, backend, time.perf_counter() - start_time, trace_id)
+
+
+@contextmanager
+def track_fortran_execution(operation, backend, trace_id=None):
+    """
+    Misst die eigentliche Ausführung eines Fortran-Aufrufs (Phase execute) und zählt
+    Aufrufe, Fehler und Dauer pro Operation wie track_fortran_call
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+        fortran_calls_total.labels(function=operation).inc()
+    except Exception as e:
+        fortran_call_errors.labels(function=operation, error_type=type(e).__name__).inc()
+        raise
+    finally:
+        duration = time.perf_counter() - start_time
+        fortran_call_duration.labels(function=operation).observe(duration)
+        observe_fortran_phase('execute', operation, backend, duration, trace_id)
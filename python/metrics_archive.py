@@ -0,0 +1,85 @@
+# python/metrics_archive.py
+#
+# Verdichtet die Prometheus-Multiprozess-Dateien beendeter Gunicorn-Worker in Archivdateien.
+# Wird vom Gunicorn-Master (child_exit) aufgerufen und importiert deshalb keine Metrik-Definitionen,
+# damit der Master selbst keine eigenen Multiprozess-Dateien anlegt.
+
+import glob
+import os
+
+from prometheus_client import multiprocess
+from prometheus_client.mmap_dict import MmapedDict
+
+ARCHIVE_SUFFIX = 'archive'
+
+
+def _merge_sum(old, new):
+    return old + new
+
+
+# Zusammenführung pro Dateityp (Präfix des Dateinamens); nicht aufgeführte Typen werden verworfen
+_MERGE = {
+    'counter': _merge_sum,
+    'histogram': _merge_sum,
+    'summary': _merge_sum,
+    'gauge_sum': _merge_sum,
+    'gauge_max': max,
+    'gauge_min': min,
+}
+
+
+def compact_dead_worker(pid, path=None):
+    """
+    Führt die Metrik-Dateien des beendeten Prozesses pid mit den Archivdateien zusammen
+    und löscht sie anschließend. Live-Gauges werden wie bei mark_process_dead nur entfernt,
+    ebenso pro Prozess geführte Gauges (Modus 'all'), deren pid-Label nach dem Ende des
+    Prozesses keine Bedeutung mehr hat. Liefert die Anzahl der verdichteten Dateien.
+    """
+    if path is None:
+        path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not path or not os.path.isdir(path):
+        return 0
+
+    multiprocess.mark_process_dead(pid, path)
+
+    compacted = 0
+    for filename in glob.glob(os.path.join(path, f'*_{pid}.db')):
+        prefix = os.path.basename(filename)[:-len(f'_{pid}.db')]
+        merge = _MERGE.get(prefix)
+        if merge is not None:
+            _merge_into_archive(filename, os.path.join(path, f'{prefix}_{ARCHIVE_SUFFIX}.db'), merge)
+        elif prefix == 'gauge_mostrecent':
+            _merge_most_recent(filename, os.path.join(path, f'{prefix}_{ARCHIVE_SUFFIX}.db'))
+        os.remove(filename)
+        compacted += 1
+
+    return compacted
+
+
+def _merge_into_archive(filename, archive_path, merge):
+    existing = _read_values(archive_path)
+    archive = MmapedDict(archive_path)
+    try:
+        for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(filename):
+            if key in existing:
+                value = merge(existing[key][0], value)
+            archive.write_value(key, value, timestamp)
+    finally:
+        archive.close()
+
+
+def _merge_most_recent(filename, archive_path):
+    existing = _read_values(archive_path)
+    archive = MmapedDict(archive_path)
+    try:
+        for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(filename):
+            if key not in existing or timestamp >= existing[key][1]:
+                archive.write_value(key, value, timestamp)
+    finally:
+        archive.close()
+
+
+def _read_values(filename):
+    if not os.path.exists(filename):
+        return {}
+    return {key: (value, timestamp) for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(filename)}
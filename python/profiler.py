@@ -0,0 +1,180 @@
+# python/profiler.py
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Frames aus diesem Verzeichnis gehören zum Fortran-Backend (Aufruf, Warten auf Co-Prozess/Subprozess)
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend') + os.sep
+
+# Verzeichnis-Präfixe, die in den Funktionsnamen weggelassen werden (längstes zuerst)
+_PATH_PREFIXES = sorted({os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep,
+                         *(p + os.sep for p in sys.path if p and os.path.isdir(p))}, key=len, reverse=True)
+
+
+class ProfilerBusyError(Exception):
+    """Es läuft bereits ein Profil in diesem Worker"""
+
+
+class SamplingProfiler:
+    """
+    Statistischer Profiler für einen laufenden Worker: nimmt alle interval Sekunden die Stacks der
+    Threads auf, die gerade einen Request bearbeiten (sys._current_frames), und zählt sie. Da nach
+    Wanduhrzeit und nicht nach CPU-Zeit gesampelt wird, erscheint auch das Warten auf das
+    Fortran-Backend (ctypes-Aufruf, Pipe zum Co-Prozess, Subprozess) in den Stacks.
+
+    Das Sampling selbst darf höchstens max_overhead der verstrichenen Zeit kosten; wird das
+    überschritten, verdoppelt sich das Intervall. Pro Worker läuft höchstens ein Profil.
+    """
+
+    def __init__(self, interval=0.01, max_overhead=0.02, max_depth=64):
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.max_depth = max_depth
+        self._active = {}
+        self._labels = {}
+        self._running = threading.Lock()
+
+    def request_started(self):
+        ident = threading.get_ident()
+        self._active[ident] = self._active.get(ident, 0) + 1
+
+    def request_finished(self):
+        ident = threading.get_ident()
+        count = self._active.get(ident, 0) - 1
+        if count > 0:
+            self._active[ident] = count
+        else:
+            self._active.pop(ident, None)
+
+    def profile(self, seconds, all_threads=False):
+        """Sampelt seconds Sekunden lang im aufrufenden Thread, der selbst nicht erfasst wird"""
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusyError("Es läuft bereits ein Profil in diesem Worker")
+        try:
+            return self._sample(seconds, all_threads, threading.get_ident())
+        finally:
+            self._running.release()
+
+    def start(self, seconds, path, all_threads=False):
+        """Sampelt im Hintergrund und schreibt das Ergebnis als JSON nach path"""
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusyError("Es läuft bereits ein Profil in diesem Worker")
+
+        def run():
+            try:
+                result = dict(self._sample(seconds, all_threads, threading.get_ident()), status="complete")
+            finally:
+                self._running.release()
+            _write_json(path, result)
+
+        try:
+            _write_json(path, {"status": "running", "pid": os.getpid(), "seconds": seconds})
+            threading.Thread(target=run, name='profiler', daemon=True).start()
+        except BaseException:
+            # Z.B. PROFILE_DIR nicht beschreibbar: ohne Freigabe blieben alle weiteren Profile blockiert
+            self._running.release()
+            raise
+
+    def _sample(self, seconds, all_threads, own_ident):
+        stacks = Counter()
+        interval = self.interval
+        samples = 0
+        backend_samples = 0
+        sampling_time = 0.0
+
+        start = time.perf_counter()
+        deadline = start + seconds
+        next_sample = start
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if next_sample > now:
+                time.sleep(min(next_sample - now, deadline - now))
+                continue
+
+            sample_start = time.perf_counter()
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident or (not all_threads and ident not in self._active):
+                    continue
+                stack, in_backend = self._stack(frame)
+                stacks[stack] += 1
+                samples += 1
+                backend_samples += in_backend
+            sampling_time += time.perf_counter() - sample_start
+
+            # Overhead-Budget: Intervall verdoppeln, wenn das Sampling bis zum nächsten Sample mehr als
+            # max_overhead der Zeit gekostet hätte
+            if sampling_time > self.max_overhead * (time.perf_counter() - start + interval):
+                interval = min(interval * 2, seconds)
+            next_sample = sample_start + interval
+
+        elapsed = time.perf_counter() - start
+        return {
+            "pid": os.getpid(),
+            "seconds": round(elapsed, 3),
+            "interval_ms": round(interval * 1000, 3),
+            "samples": samples,
+            "backend_share": round(backend_samples / samples, 4) if samples else 0.0,
+            "overhead": round(sampling_time / elapsed, 5) if elapsed else 0.0,
+            "top": _top_functions(stacks, samples),
+            "collapsed": collapsed(stacks),
+        }
+
+    def _stack(self, frame):
+        labels = []
+        in_backend = False
+        while frame is not None and len(labels) < self.max_depth:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = _label(code)
+            labels.append(label)
+            in_backend = in_backend or code.co_filename.startswith(BACKEND_DIR)
+            frame = frame.f_back
+        labels.reverse()
+        return ';'.join(labels), in_backend
+
+
+def collapsed(stacks):
+    """Stacks im Collapsed-Format (eine Zeile 'a;b;c Anzahl'), direkt lesbar für flamegraph.pl"""
+    return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+
+
+def _top_functions(stacks, samples, limit=20):
+    own = Counter()
+    total = Counter()
+    for stack, count in stacks.items():
+        functions = stack.split(';')
+        own[functions[-1]] += count
+        for function in set(functions):
+            total[function] += count
+
+    return [{
+        "function": function,
+        "self": count,
+        "total": total[function],
+        "self_share": round(count / samples, 4),
+        "total_share": round(total[function] / samples, 4),
+    } for function, count in own.most_common(limit)]
+
+
+def _label(code):
+    filename = code.co_filename
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    # ';' und Leerzeichen trennen im Collapsed-Format Frames bzw. die Anzahl
+    return f'{code.co_name}@{filename}:{code.co_firstlineno}'.replace(';', '_').replace(' ', '_')
+
+
+def _write_json(path, data):
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
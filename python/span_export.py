@@ -0,0 +1,71 @@
+# python/span_export.py
+
+import os
+import threading
+
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+
+class RotatingFileSpanExporter(SpanExporter):
+    """
+    Schreibt Spans als JSON-Zeilen in eine Datei, für Umgebungen ohne Collector. Überschreitet die
+    Datei max_bytes, wird sie wie bei RotatingFileHandler nach path.1 ... path.<backup_count> verschoben.
+    Mit mehreren Gunicorn-Workern sollte path den Platzhalter {pid} enthalten (eine Datei pro Worker);
+    nach einem fork() (preload_app) öffnet jeder Prozess seine eigene Datei.
+    """
+
+    def __init__(self, path, max_bytes, backup_count):
+        self.path_template = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        self._pid = os.getpid()
+        self.path = self.path_template.replace('{pid}', str(self._pid))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def export(self, spans):
+        data = ''.join(span.to_json(indent=None) + '\n' for span in spans)
+        with self._lock:
+            if self._file is None:
+                return SpanExportResult.FAILURE
+            try:
+                if self._pid != os.getpid():
+                    self._file.close()
+                    self._open()
+                if self.max_bytes > 0 and self._file.tell() + len(data) > self.max_bytes and self._file.tell() > 0:
+                    self._rotate()
+                self._file.write(data)
+                self._file.flush()
+            except OSError:
+                return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def force_flush(self, timeout_millis=30000):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+        return True
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.truncate(self.path, 0)
+        self._file = open(self.path, 'a', encoding='utf-8')
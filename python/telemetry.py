@@ -1,7 +1,13 @@
-from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
-from opentelemetry.instrumentation.flask import FlaskInstrumentor
+from python.logging_config import use_current_span
+
+# OpenTelemetry wird erst in configure_telemetry importiert: ohne ENABLE_OPENTELEMETRY bleibt der
+# Start jedes Workers frei von SDK und Flask-Instrumentierung
+
+TRACE_EXPORTERS = ('console', 'otlp-grpc', 'otlp-http', 'file', 'none')
+
+# Namen wie bei OTEL_TRACES_SAMPLER
+TRACE_SAMPLERS = ('parentbased_traceidratio', 'traceidratio', 'parentbased_always_on', 'always_on', 'always_off')
+
 
 def configure_telemetry(app):
     if not app.config.get('ENABLE_OPENTELEMETRY', True):
@@ -10,14 +16,82 @@ def configure_telemetry(app):
 
     app.logger.info("Configuring OpenTelemetry")
 
-    # Tracer Provider konfigurieren
-    trace.set_tracer_provider(TracerProvider())
+    from opentelemetry import trace
+    from opentelemetry.instrumentation.flask import FlaskInstrumentor
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    # Tracer Provider konfigurieren: standardmäßig Head-Sampling nach Anteil der Trace-IDs, eingehende
+    # Traces übernehmen die Entscheidung des Aufrufers; nicht gesampelte Spans werden nicht aufgezeichnet
+    sampler = create_sampler(app.config.get('TRACE_SAMPLER', 'parentbased_traceidratio'),
+                             app.config.get('TRACE_SAMPLE_RATIO', 1.0))
+    trace.set_tracer_provider(TracerProvider(sampler=sampler))
 
-    # Exporter konfigurieren (für Produktion OTLP-Exporter verwenden)
-    span_processor = BatchSpanProcessor(ConsoleSpanExporter())
-    trace.get_tracer_provider().add_span_processor(span_processor)
+    # Exporter konfigurieren, Spans werden gesammelt im Hintergrund-Thread exportiert
+    exporter = create_exporter(app.config)
+    if exporter is not None:
+        span_processor = BatchSpanProcessor(
+            exporter,
+            max_queue_size=app.config.get('TRACE_BATCH_MAX_QUEUE_SIZE', 2048),
+            schedule_delay_millis=app.config.get('TRACE_BATCH_SCHEDULE_DELAY_MS', 5000),
+            max_export_batch_size=app.config.get('TRACE_BATCH_MAX_EXPORT_SIZE', 512),
+            export_timeout_millis=app.config.get('TRACE_BATCH_EXPORT_TIMEOUT_MS', 30000),
+        )
+        trace.get_tracer_provider().add_span_processor(span_processor)
 
-    # Flask instrumentieren
+    # Flask instrumentieren, Logs übernehmen die IDs des Request-Spans
     FlaskInstrumentor().instrument_app(app)
+    use_current_span(trace.get_current_span)
+
+    return app
+
+
+def create_sampler(name, ratio):
+    """Sampler nach Name (wie OTEL_TRACES_SAMPLER) und Anteil für die ratio-basierten Varianten"""
+    from opentelemetry.sdk.trace.sampling import (ALWAYS_OFF, ALWAYS_ON, ParentBased, ParentBasedTraceIdRatio,
+                                                  TraceIdRatioBased)
+
+    if name == 'parentbased_traceidratio':
+        return ParentBasedTraceIdRatio(ratio)
+    if name == 'traceidratio':
+        return TraceIdRatioBased(ratio)
+    if name == 'parentbased_always_on':
+        return ParentBased(ALWAYS_ON)
+    if name == 'always_on':
+        return ALWAYS_ON
+    if name == 'always_off':
+        return ALWAYS_OFF
+    raise ValueError(f"Unbekannter Sampler: {name}, erlaubt sind {', '.join(TRACE_SAMPLERS)}")
+
+
+def create_exporter(config):
+    """
+    Span-Exporter gemäß TRACE_EXPORTER. Die OTLP-Exporter sind optionale Pakete
+    (opentelemetry-exporter-otlp-proto-grpc bzw. -http) und werden erst hier importiert.
+    """
+    name = config.get('TRACE_EXPORTER', 'console')
+    endpoint = config.get('TRACE_EXPORTER_ENDPOINT') or None
 
-    return app
\ No newline at end of file
+    if name == 'console':
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+    if name == 'none':
+        return None
+    if name == 'file':
+        from python.span_export import RotatingFileSpanExporter
+        return RotatingFileSpanExporter(config.get('TRACE_FILE_PATH', '/tmp/calculator-spans-{pid}.jsonl'),
+                                        config.get('TRACE_FILE_MAX_BYTES', 10 * 1024 * 1024),
+                                        config.get('TRACE_FILE_BACKUP_COUNT', 3))
+    if name == 'otlp-grpc':
+        try:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        except ImportError as e:
+            raise RuntimeError("TRACE_EXPORTER=otlp-grpc benötigt opentelemetry-exporter-otlp-proto-grpc") from e
+        return OTLPSpanExporter(endpoint=endpoint)
+    if name == 'otlp-http':
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError as e:
+            raise RuntimeError("TRACE_EXPORTER=otlp-http benötigt opentelemetry-exporter-otlp-proto-http") from e
+        return OTLPSpanExporter(endpoint=endpoint)
+    raise ValueError(f"Unbekannter Trace-Exporter: {name}, erlaubt sind {', '.join(TRACE_EXPORTERS)}")
@@ -0,0 +1,98 @@
+# python/warmup.py
+
+import logging
+import os
+import threading
+import time
+from array import array
+
+from python.api.expression import bind_variables, compile_expression
+from python.backend import OPERATIONS, fortran_backend
+from python.logging_config import new_span_id, new_trace_id
+
+logger = logging.getLogger("calculator-app")
+
+# Elemente des Batch- und Ausdrucks-Aufrufs beim Aufwärmen
+WARMUP_BATCH_SIZE = 1024
+
+
+class Warmup:
+    """
+    Schickt nach dem Start jede Operation einmal durch das Fortran-Backend (Einzelaufruf, Batch und
+    Ausdruck), bevor der Worker als bereit gilt: Co-Prozesse sind gestartet, Bibliothek und Programm
+    geladen und die Code-Pfade einmal durchlaufen. Schlägt das Aufwärmen fehl, wird es nach
+    retry_interval Sekunden wiederholt; bis dahin meldet /actuator/health/readiness "nicht bereit".
+    """
+
+    def __init__(self, backend, enabled=True, retry_interval=5.0):
+        self.backend = backend
+        self.retry_interval = retry_interval
+        self.ready = threading.Event()
+        self.duration = None
+        self.error = None
+        self._started_pid = None
+        self._lock = threading.Lock()
+        if not enabled:
+            self.ready.set()
+
+    def start(self):
+        """Startet das Aufwärmen im Hintergrund, höchstens einmal pro Prozess"""
+        with self._lock:
+            if self.ready.is_set() or self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+        threading.Thread(target=self._run, name='warmup', daemon=True).start()
+
+    def status(self):
+        return {
+            "ready": self.ready.is_set(),
+            "warmup_seconds": self.duration,
+            "warmup_error": self.error,
+        }
+
+    def _run(self):
+        start = time.perf_counter()
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                self.error = str(e)
+                logger.warning("Aufwärmen des Fortran-Backends fehlgeschlagen, neuer Versuch in %s s: %s",
+                               self.retry_interval, e)
+                time.sleep(self.retry_interval)
+                continue
+
+            self.duration = time.perf_counter() - start
+            self.error = None
+            self.ready.set()
+            logger.info("Fortran-Backend %s aufgewärmt in %.3f s", self.backend.name, self.duration)
+            return
+
+    def run_once(self):
+        trace_id, span_id = new_trace_id(), new_span_id()
+
+        for operation in OPERATIONS:
+            self.backend.calculate(operation, 6.0, 3.0, trace_id, span_id, 'unset')
+
+        a = array('d', (float(i) for i in range(WARMUP_BATCH_SIZE)))
+        b = array('d', (float(i + 1) for i in range(WARMUP_BATCH_SIZE)))
+        for operation in OPERATIONS:
+            self.backend.calculate_batch(operation, a, b, trace_id, span_id, 'unset')
+
+        plan = compile_expression('a * b + 1 / b - 2', 16)
+        slots, n = bind_variables(plan, {'a': a.tolist(), 'b': b.tolist()}, WARMUP_BATCH_SIZE)
+        self.backend.evaluate(plan, slots, n, trace_id, span_id, 'unset')
+
+
+def configure_warmup(app):
+    """
+    Legt das Aufwärmen für das Backend der Anwendung an. Mit PRELOAD_APP startet es erst im Worker
+    (gunicorn.conf.py, post_worker_init), damit im Master weder Co-Prozesse noch OpenMP-Threads entstehen.
+    """
+    # Direkt über das Fortran-Backend, ohne Ergebnis-Cache, Admission Control und deren Metriken
+    warmup = Warmup(fortran_backend(app.extensions['calculator_backend']), app.config.get('ENABLE_WARMUP', True),
+                    app.config.get('WARMUP_RETRY_INTERVAL', 5.0))
+    app.extensions['calculator_warmup'] = warmup
+    if not app.config.get('PRELOAD_APP', False):
+        warmup.start()
+    return app
@@ -1,9 +1,11 @@
 from flask import Flask
 from python.api.routes import register_routes
 from python.api.actuator import register_actuator
-from python.logging_config import setup_logger, extract_trace_context
+from python.api.jobs import register_jobs
+from python.logging_config import setup_logger
 from python.telemetry import configure_telemetry
 from python.metrics import configure_metrics
+from python.warmup import configure_warmup
 
 def create_app():
     app = Flask(__name__)
@@ -23,9 +25,15 @@ def create_app():
     # API-Routen registrieren
     register_routes(app)
 
+    # Job-API registrieren
+    register_jobs(app)
+
     # Actuator-Routen registrieren
     register_actuator(app)
 
+    # Fortran-Backend aufwärmen (bei PRELOAD_APP erst im Worker)
+    configure_warmup(app)
+
     return app
 
 app = create_app()
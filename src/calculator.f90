@@ -1,9 +1,19 @@
 program calculator
+    use, intrinsic :: iso_fortran_env, only: output_unit, int8, int64
+    use math_operations, only: dp, add, subtract, multiply, divide, is_zero_divisor, add_array, subtract_array, &
+                               multiply_array, divide_array, set_parallel_threshold
+    use expression_eval, only: evaluate
+    use reductions, only: STATS_STATE_SIZE, DOT_STATE_SIZE, init_stats, accumulate_stats, accumulate_dot
+    use shared_segment, only: segment, attach, detach, segment_bytes, segment_arrays, segment_values
+    use matrix_operations, only: MATRIX_MATMUL, MATRIX_TRANSPOSE, MATRIX_ADD, MATRIX_SUB, MATRIX_MUL, MATRIX_DIV, &
+                                 MATRIX_SOLVE, matrix_operation, matrix_sizes
     implicit none
 
     ! Variablen für die Berechnung
-    real :: a, b, result
+    real(dp) :: a, b, result
     character(len=10) :: operation
+    character(len=128) :: error_message
+    logical :: ok
 
     ! Variablen für Tracing
     character(len=32) :: trace_id
@@ -11,10 +21,137 @@ program calculator
 
     ! Variablen für die Kommandozeilenargumente
     character(len=128) :: arg_buffer
+    integer :: batch_size, eval_slots, eval_code
+    integer(int64) :: reduce_size, reduce_chunk, reduce_offset_a, reduce_offset_b
+    character(len=4096) :: reduce_path_a, reduce_path_b
+    character(len=256) :: shm_name
+    integer :: matrix_m, matrix_k, matrix_n, matrix_row_major
+
+    ! Eingeblendetes Shared-Memory-Segment, im Server-Modus über mehrere Anfragen wiederverwendet
+    type(segment) :: shm_segment
+
+    ! Log-Level: Meldungen unterhalb der Schwelle werden nicht ausgegeben
+    integer, parameter :: LEVEL_DEBUG = 10, LEVEL_INFO = 20, LEVEL_WARN = 30, LEVEL_ERROR = 40, LEVEL_OFF = 100
+    integer :: log_threshold
+
+    ! Ziffern für das Hex-Format der Ergebnisse
+    character(len=16), parameter :: HEX_DIGITS = "0123456789ABCDEF"
+
+    ! Ergebnisformat aus FORTRAN_RESULT_FORMAT: Text (Standard) oder IEEE-754-Bitmuster in Hex-Ziffern
+    logical :: hex_results
+
+    ! Log-Level aus FORTRAN_LOG_LEVEL (DEBUG, INFO, WARN, ERROR, OFF), Standard ist INFO
+    call init_logging()
+
+    ! Schwelle für die parallelen Array-Kernel aus FORTRAN_PARALLEL_THRESHOLD, Threads aus OMP_NUM_THREADS
+    call init_parallel()
+
+    ! Ergebnisformat aus FORTRAN_RESULT_FORMAT (text oder hex)
+    call init_result_format()
+
+    ! Server-Modus: Anfragen zeilenweise von stdin lesen
+    if (command_argument_count() >= 1) then
+        call get_command_argument(1, arg_buffer)
+        if (arg_buffer == "--server") then
+            call run_server()
+            stop
+        end if
+
+        ! Batch-Modus: calculator --batch <operation> <n>, Operanden "a b" zeilenweise auf stdin
+        if (arg_buffer == "--batch" .and. command_argument_count() >= 3) then
+            call get_command_argument(2, operation)
+            call get_command_argument(3, arg_buffer)
+            read(arg_buffer, *) batch_size
+            call default_trace_context(trace_id, span_id)
+            if (command_argument_count() >= 4) call get_command_argument(4, trace_id)
+            if (command_argument_count() >= 5) call get_command_argument(5, span_id)
+            call run_batch(operation, batch_size, trace_id, span_id)
+            stop
+        end if
+
+        ! Ausdrucks-Modus: calculator --eval <n> <slots> <befehle>, Programm und Slots auf stdin
+        if (arg_buffer == "--eval" .and. command_argument_count() >= 4) then
+            call get_command_argument(2, arg_buffer)
+            read(arg_buffer, *) batch_size
+            call get_command_argument(3, arg_buffer)
+            read(arg_buffer, *) eval_slots
+            call get_command_argument(4, arg_buffer)
+            read(arg_buffer, *) eval_code
+            call default_trace_context(trace_id, span_id)
+            if (command_argument_count() >= 5) call get_command_argument(5, trace_id)
+            if (command_argument_count() >= 6) call get_command_argument(6, span_id)
+            call run_eval(batch_size, eval_slots, eval_code, trace_id, span_id)
+            stop
+        end if
+
+        ! Shared-Memory-Modus: calculator --shm <operation> <segment> <n>, Operanden und Ergebnisse im Segment
+        if (arg_buffer == "--shm" .and. command_argument_count() >= 4) then
+            call get_command_argument(2, operation)
+            call get_command_argument(3, shm_name)
+            call get_command_argument(4, arg_buffer)
+            read(arg_buffer, *) reduce_size
+            call default_trace_context(trace_id, span_id)
+            if (command_argument_count() >= 5) call get_command_argument(5, trace_id)
+            if (command_argument_count() >= 6) call get_command_argument(6, span_id)
+            call run_shm(operation, shm_name, reduce_size, trace_id, span_id)
+            call detach(shm_segment)
+            stop
+        end if
+
+        ! Matrix-Modus: calculator --matrix <operation> <segment> <m> <k> <n> <row_major>, A, B und C im Segment
+        if (arg_buffer == "--matrix" .and. command_argument_count() >= 7) then
+            call get_command_argument(2, operation)
+            call get_command_argument(3, shm_name)
+            call get_command_argument(4, arg_buffer)
+            read(arg_buffer, *) matrix_m
+            call get_command_argument(5, arg_buffer)
+            read(arg_buffer, *) matrix_k
+            call get_command_argument(6, arg_buffer)
+            read(arg_buffer, *) matrix_n
+            call get_command_argument(7, arg_buffer)
+            read(arg_buffer, *) matrix_row_major
+            call default_trace_context(trace_id, span_id)
+            if (command_argument_count() >= 8) call get_command_argument(8, trace_id)
+            if (command_argument_count() >= 9) call get_command_argument(9, span_id)
+            call run_matrix(operation, shm_name, matrix_m, matrix_k, matrix_n, matrix_row_major /= 0, &
+                            trace_id, span_id)
+            call detach(shm_segment)
+            stop
+        end if
+
+        ! Reduktion: calculator --reduce <stats|dot> <n> <block> <offset_a> <datei_a> [<offset_b> <datei_b>]
+        if (arg_buffer == "--reduce" .and. command_argument_count() >= 6) then
+            call get_command_argument(2, operation)
+            call get_command_argument(3, arg_buffer)
+            read(arg_buffer, *) reduce_size
+            call get_command_argument(4, arg_buffer)
+            read(arg_buffer, *) reduce_chunk
+            call get_command_argument(5, arg_buffer)
+            read(arg_buffer, *) reduce_offset_a
+            call get_command_argument(6, reduce_path_a)
+            reduce_offset_b = 0
+            reduce_path_b = ""
+            if (command_argument_count() >= 8) then
+                call get_command_argument(7, arg_buffer)
+                read(arg_buffer, *) reduce_offset_b
+                call get_command_argument(8, reduce_path_b)
+            end if
+            call default_trace_context(trace_id, span_id)
+            call run_reduce(operation, reduce_size, reduce_chunk, reduce_offset_a, reduce_path_a, &
+                            reduce_offset_b, reduce_path_b, trace_id, span_id)
+            stop
+        end if
+    end if
 
     ! Überprüfen Sie, ob genug Argumente vorhanden sind
     if (command_argument_count() < 3) then
         write(0, *) "Fehler: Zu wenige Argumente. Verwendung: calculator <a> <b> <operation> [trace_id] [span_id]"
+        write(0, *) "       oder: calculator --server"
+        write(0, *) "       oder: calculator --batch <operation> <n> [trace_id] [span_id]"
+        write(0, *) "       oder: calculator --eval <n> <slots> <befehle> [trace_id] [span_id]"
+        write(0, *) "       oder: calculator --shm <operation> <segment> <n> [trace_id] [span_id]"
+        write(0, *) "       oder: calculator --matrix <operation> <segment> <m> <k> <n> <row_major> [trace_id] [span_id]"
+        write(0, *) "       oder: calculator --reduce <stats|dot> <n> <block> <offset_a> <datei_a> [<offset_b> <datei_b>]"
         stop 1
     end if
 
@@ -27,9 +164,8 @@ program calculator
 
     call get_command_argument(3, operation)
 
-    ! Lade optionale Tracing-Parameter
-    trace_id = "unbekannt"
-    span_id = "unbekannt"
+    ! Lade optionale Tracing-Parameter, ohne Argumente aus TRACE_ID/SPAN_ID
+    call default_trace_context(trace_id, span_id)
 
     if (command_argument_count() >= 4) then
         call get_command_argument(4, trace_id)
@@ -39,47 +175,668 @@ program calculator
         call get_command_argument(5, span_id)
     end if
 
-    ! Überprüfe auf Nulldivision
-    if (operation == "div" .and. abs(b) < 1.0e-10) then
-        call log_error("Division durch Null", trace_id, span_id)
-        write(0, *) "Fehler: Division durch Null nicht erlaubt"
+    ! Log-Eintrag vor der Berechnung
+    if (log_threshold <= LEVEL_INFO) then
+        write(arg_buffer, '("mit a=",G0," b=",G0)') a, b
+        call log_info("Starte Berechnung: " // trim(operation) // " " // trim(arg_buffer), trace_id, span_id)
+    end if
+
+    ! Führe die entsprechende Operation aus
+    call compute(operation, a, b, result, ok, error_message, trace_id, span_id)
+    if (.not. ok) then
+        write(0, *) "Fehler: " // trim(error_message)
         stop 1
     end if
 
-    ! Log-Eintrag vor der Berechnung
-    call log_info("Starte Berechnung: " // trim(operation) // " mit a=" // trim(arg_buffer), trace_id, span_id)
+    ! Ergebnis auf die Standardausgabe schreiben, im Hex-Format ohne Rundung
+    if (hex_results) then
+        write(*, '(A)') hex_value(result)
+    else
+        write(*, '(f0.6)') result
+    end if
 
-    ! Führe die entsprechende Operation aus
-    select case (operation)
-        case ("add")
-            result = a + b
-            call log_info("Addition ausgeführt", trace_id, span_id)
+    ! Log-Eintrag nach erfolgreicher Berechnung
+    if (log_threshold <= LEVEL_INFO) then
+        write(arg_buffer, '(G0)') result
+        call log_info("Berechnung erfolgreich abgeschlossen. Ergebnis: " // trim(arg_buffer), trace_id, span_id)
+    end if
 
-        case ("sub")
-            result = a - b
-            call log_info("Subtraktion ausgeführt", trace_id, span_id)
+contains
 
-        case ("mul")
-            result = a * b
-            call log_info("Multiplikation ausgeführt", trace_id, span_id)
+    ! Führt eine Operation aus und meldet Fehler über ok/error_message
+    subroutine compute(operation, a, b, result, ok, error_message, trace_id, span_id)
+        character(len=*), intent(in) :: operation
+        real(dp), intent(in) :: a, b
+        real(dp), intent(out) :: result
+        logical, intent(out) :: ok
+        character(len=*), intent(out) :: error_message
+        character(len=*), intent(in) :: trace_id
+        character(len=*), intent(in) :: span_id
 
-        case ("div")
-            result = a / b
-            call log_info("Division ausgeführt", trace_id, span_id)
+        ok = .true.
+        error_message = ""
+        result = 0.0_dp
 
-        case default
-            call log_error("Unbekannte Operation: " // trim(operation), trace_id, span_id)
-            write(0, *) "Fehler: Unbekannte Operation. Verwenden Sie add, sub, mul oder div."
-            stop 1
-    end select
+        ! Überprüfe auf Nulldivision, gleiche Regel wie Bibliothek und Batch-Pfad
+        if (operation == "div" .and. is_zero_divisor(b)) then
+            call log_error("Division durch Null", trace_id, span_id)
+            ok = .false.
+            error_message = "Division durch Null nicht erlaubt"
+            return
+        end if
 
-    ! Ergebnis auf die Standardausgabe schreiben
-    write(*, '(f0.6)') result
+        select case (operation)
+            case ("add")
+                result = add(a, b)
+                call log_info("Addition ausgeführt", trace_id, span_id)
 
-    ! Log-Eintrag nach erfolgreicher Berechnung
-    call log_info("Berechnung erfolgreich abgeschlossen. Ergebnis: " // trim(arg_buffer), trace_id, span_id)
+            case ("sub")
+                result = subtract(a, b)
+                call log_info("Subtraktion ausgeführt", trace_id, span_id)
 
-contains
+            case ("mul")
+                result = multiply(a, b)
+                call log_info("Multiplikation ausgeführt", trace_id, span_id)
+
+            case ("div")
+                result = divide(a, b)
+                call log_info("Division ausgeführt", trace_id, span_id)
+
+            case default
+                call log_error("Unbekannte Operation: " // trim(operation), trace_id, span_id)
+                ok = .false.
+                error_message = "Unbekannte Operation. Verwenden Sie add, sub, mul oder div."
+        end select
+    end subroutine compute
+
+    ! Batch-Verarbeitung: liest n Zeilen "a b" von stdin, rechnet elementweise auf den Arrays
+    ! und antwortet mit "OK <n>" gefolgt von n Zeilen "OK <ergebnis>" bzw. "ERR <meldung>".
+    ! Bei ungültiger Eingabe werden trotzdem alle n Zeilen gelesen und nur "ERR <meldung>" geschrieben.
+    subroutine run_batch(operation, n, trace_id, span_id)
+        character(len=*), intent(in) :: operation
+        integer, intent(in) :: n
+        character(len=*), intent(in) :: trace_id
+        character(len=*), intent(in) :: span_id
+
+        character(len=128) :: line
+        real(dp), allocatable :: batch_a(:), batch_b(:), batch_result(:)
+        integer(int8), allocatable :: failed(:)
+        integer(int64) :: errors
+        integer :: i, ios, invalid_line
+
+        allocate(batch_a(n), batch_b(n), batch_result(n), failed(n))
+
+        invalid_line = 0
+        do i = 1, n
+            read(*, '(A)', iostat=ios) line
+            if (ios /= 0) then
+                if (invalid_line == 0) invalid_line = i
+                exit
+            end if
+            read(line, *, iostat=ios) batch_a(i), batch_b(i)
+            if (ios /= 0 .and. invalid_line == 0) invalid_line = i
+        end do
+
+        if (invalid_line /= 0) then
+            write(line, '(I0)') invalid_line
+            call log_error("Ungültige Batch-Eingabe in Zeile " // trim(line), trace_id, span_id)
+            write(*, '(A)') "ERR Ungültige Batch-Eingabe in Zeile " // trim(line)
+            flush(output_unit)
+            return
+        end if
+
+        failed = 0_int8
+        select case (operation)
+            case ("add")
+                call add_array(batch_a, batch_b, batch_result)
+            case ("sub")
+                call subtract_array(batch_a, batch_b, batch_result)
+            case ("mul")
+                call multiply_array(batch_a, batch_b, batch_result)
+            case ("div")
+                errors = divide_array(batch_a, batch_b, batch_result, failed)
+            case default
+                call log_error("Unbekannte Operation: " // trim(operation), trace_id, span_id)
+                write(*, '(A)') "ERR Unbekannte Operation. Verwenden Sie add, sub, mul oder div."
+                flush(output_unit)
+                return
+        end select
+
+        write(line, '(I0)') n
+        call log_info("Batch-Berechnung ausgeführt: " // trim(operation) // " mit " // trim(line) // " Elementen", &
+                      trace_id, span_id)
+
+        call write_results(batch_result, failed)
+    end subroutine run_batch
+
+    ! Auswertung eines Ausdrucks über n Elemente (siehe expression_eval). Von stdin werden gelesen:
+    ! ncode Paare "<befehl> <argument>", die Längen der nslots Slots (1 oder n) und danach deren Werte.
+    ! Die Antwort hat dasselbe Format wie run_batch.
+    subroutine run_eval(n, nslots, ncode, trace_id, span_id)
+        integer, intent(in) :: n, nslots, ncode
+        character(len=*), intent(in) :: trace_id
+        character(len=*), intent(in) :: span_id
+
+        character(len=32) :: count_buffer
+        integer, allocatable :: ops(:), args(:), slot_offset(:), slot_len(:)
+        real(dp), allocatable :: slot_data(:), eval_result(:)
+        logical, allocatable :: failed(:)
+        logical :: eval_ok
+        integer :: i, ios
+
+        allocate(ops(ncode), args(ncode), slot_offset(nslots), slot_len(nslots))
+
+        read(*, *, iostat=ios) (ops(i), args(i), i = 1, ncode)
+        if (ios == 0) read(*, *, iostat=ios) slot_len
+        if (ios == 0 .and. any(slot_len < 1)) ios = 1
+        if (ios == 0) then
+            slot_offset(1) = 0
+            do i = 2, nslots
+                slot_offset(i) = slot_offset(i - 1) + slot_len(i - 1)
+            end do
+            allocate(slot_data(sum(slot_len)))
+            read(*, *, iostat=ios) slot_data
+        end if
+
+        if (ios /= 0) then
+            call log_error("Ungültige Eingabe für Ausdruck", trace_id, span_id)
+            write(*, '(A)') "ERR Ungültige Eingabe für Ausdruck"
+            flush(output_unit)
+            return
+        end if
+
+        allocate(eval_result(n), failed(n))
+        call evaluate(n, ncode, ops, args, nslots, slot_offset, slot_len, slot_data, eval_result, failed, eval_ok)
+        if (.not. eval_ok) then
+            call log_error("Ungültiges Programm für Ausdruck", trace_id, span_id)
+            write(*, '(A)') "ERR Ungültiges Programm für Ausdruck"
+            flush(output_unit)
+            return
+        end if
+
+        write(count_buffer, '(I0)') n
+        call log_info("Ausdruck ausgewertet mit " // trim(count_buffer) // " Elementen", trace_id, span_id)
+
+        call write_results(eval_result, merge(1_int8, 0_int8, failed))
+    end subroutine run_eval
+
+    ! Antwort von run_batch und run_eval: "OK <n>", danach im Textformat n Zeilen "OK <ergebnis>" bzw.
+    ! "ERR <meldung>". Im Hex-Format folgen stattdessen genau zwei Zeilen: die IEEE-754-Bitmuster aller
+    ! Ergebnisse (je 16 Hex-Ziffern, höchstwertiges Byte zuerst) und die Statusbytes (je 2 Hex-Ziffern).
+    subroutine write_results(values, failed)
+        real(dp), intent(in) :: values(:)
+        integer(int8), intent(in) :: failed(:)
+
+        character(len=:), allocatable :: buffer
+        integer :: i, n
+
+        n = size(values)
+        write(*, '(A,I0)') "OK ", n
+
+        if (hex_results) then
+            allocate(character(len=16 * n) :: buffer)
+            do i = 1, n
+                buffer(16 * i - 15:16 * i) = hex_value(values(i))
+            end do
+            write(*, '(A)') buffer
+            deallocate(buffer)
+
+            allocate(character(len=2 * n) :: buffer)
+            do i = 1, n
+                buffer(2 * i - 1:2 * i) = hex_byte(failed(i))
+            end do
+            write(*, '(A)') buffer
+        else
+            do i = 1, n
+                if (failed(i) /= 0) then
+                    write(*, '(A)') "ERR Division durch Null nicht erlaubt"
+                else
+                    write(*, '(A,G0)') "OK ", values(i)
+                end if
+            end do
+        end if
+        flush(output_unit)
+    end subroutine write_results
+
+    ! IEEE-754-Bitmuster eines Werts als 16 Hex-Ziffern, höchstwertiges Byte zuerst
+    pure function hex_value(x) result(digits)
+        real(dp), intent(in) :: x
+        character(len=16) :: digits
+
+        integer(int64) :: bits
+        integer :: i, nibble
+
+        bits = transfer(x, bits)
+        do i = 16, 1, -1
+            nibble = int(iand(bits, 15_int64))
+            digits(i:i) = HEX_DIGITS(nibble + 1:nibble + 1)
+            bits = ishft(bits, -4)
+        end do
+    end function hex_value
+
+    ! Ein Byte als 2 Hex-Ziffern
+    pure function hex_byte(value) result(digits)
+        integer(int8), intent(in) :: value
+        character(len=2) :: digits
+
+        integer :: bits
+
+        bits = iand(int(value), 255)
+        digits = HEX_DIGITS(bits / 16 + 1:bits / 16 + 1) // HEX_DIGITS(mod(bits, 16) + 1:mod(bits, 16) + 1)
+    end function hex_byte
+
+    ! Batch-Berechnung über ein Shared-Memory-Segment (siehe shared_segment): liest a und b aus dem
+    ! Segment, schreibt Ergebnisse und Statusbytes dorthin zurück und antwortet mit "OK <n> <fehler>"
+    ! bzw. "ERR <meldung>". Auf stdin/stdout werden keine Zahlen übertragen.
+    subroutine run_shm(operation, name, n, trace_id, span_id)
+        character(len=*), intent(in) :: operation, name
+        integer(int64), intent(in) :: n
+        character(len=*), intent(in) :: trace_id
+        character(len=*), intent(in) :: span_id
+
+        character(len=32) :: count_buffer
+        real(dp), pointer :: seg_a(:), seg_b(:), seg_result(:)
+        integer(int8), pointer :: seg_status(:)
+        integer(int64) :: errors
+        logical :: attached
+
+        if (n < 1) then
+            write(*, '(A)') "OK 0 0"
+            flush(output_unit)
+            return
+        end if
+
+        call attach(shm_segment, name, segment_bytes(n), attached)
+        if (.not. attached) then
+            call log_error("Shared-Memory-Segment nicht verfügbar: " // trim(name), trace_id, span_id)
+            write(*, '(A)') "ERR Shared-Memory-Segment nicht verfügbar: " // trim(name)
+            flush(output_unit)
+            return
+        end if
+        call segment_arrays(shm_segment, n, seg_a, seg_b, seg_result, seg_status)
+
+        errors = 0
+        seg_status = 0_int8
+        select case (operation)
+            case ("add")
+                call add_array(seg_a, seg_b, seg_result)
+            case ("sub")
+                call subtract_array(seg_a, seg_b, seg_result)
+            case ("mul")
+                call multiply_array(seg_a, seg_b, seg_result)
+            case ("div")
+                errors = divide_array(seg_a, seg_b, seg_result, seg_status)
+            case default
+                call log_error("Unbekannte Operation: " // trim(operation), trace_id, span_id)
+                write(*, '(A)') "ERR Unbekannte Operation. Verwenden Sie add, sub, mul oder div."
+                flush(output_unit)
+                return
+        end select
+
+        write(count_buffer, '(I0)') n
+        call log_info("Shared-Memory-Berechnung ausgeführt: " // trim(operation) // " mit " // &
+                      trim(count_buffer) // " Elementen", trace_id, span_id)
+
+        write(*, '(A,I0,1X,I0)') "OK ", n, errors
+        flush(output_unit)
+    end subroutine run_shm
+
+    ! Matrixoperation über ein Shared-Memory-Segment mit A, B und C direkt hintereinander (Größen siehe
+    ! matrix_sizes): rechnet C aus A und B und antwortet mit "OK <info> <sekunden>" (info wie bei
+    ! matrix_operation, Sekunden ohne Ein- und Ausgabe) bzw. "ERR <meldung>".
+    subroutine run_matrix(operation, name, m, k, n, row_major, trace_id, span_id)
+        character(len=*), intent(in) :: operation, name
+        integer, intent(in) :: m, k, n
+        logical, intent(in) :: row_major
+        character(len=*), intent(in) :: trace_id
+        character(len=*), intent(in) :: span_id
+
+        character(len=64) :: shape_buffer
+        real(dp), pointer :: values(:)
+        integer(int64) :: size_a, size_b, size_c, total, info, start, finish, rate
+        integer :: op
+        logical :: attached
+
+        select case (operation)
+            case ("matmul")
+                op = MATRIX_MATMUL
+            case ("transpose")
+                op = MATRIX_TRANSPOSE
+            case ("add")
+                op = MATRIX_ADD
+            case ("sub")
+                op = MATRIX_SUB
+            case ("mul")
+                op = MATRIX_MUL
+            case ("div")
+                op = MATRIX_DIV
+            case ("solve")
+                op = MATRIX_SOLVE
+            case default
+                call log_error("Unbekannte Matrixoperation: " // trim(operation), trace_id, span_id)
+                write(*, '(A)') "ERR Unbekannte Matrixoperation. Verwenden Sie matmul, transpose, add, sub, " // &
+                                "mul, div oder solve."
+                flush(output_unit)
+                return
+        end select
+
+        if (m < 1 .or. k < 1 .or. n < 1 .or. (op == MATRIX_SOLVE .and. m /= k)) then
+            call log_error("Ungültige Matrixform", trace_id, span_id)
+            write(*, '(A)') "ERR Ungültige Matrixform"
+            flush(output_unit)
+            return
+        end if
+
+        call matrix_sizes(op, m, k, n, size_a, size_b, size_c)
+        total = size_a + size_b + size_c
+        call attach(shm_segment, name, 8 * total, attached)
+        if (.not. attached) then
+            call log_error("Shared-Memory-Segment nicht verfügbar: " // trim(name), trace_id, span_id)
+            write(*, '(A)') "ERR Shared-Memory-Segment nicht verfügbar: " // trim(name)
+            flush(output_unit)
+            return
+        end if
+        call segment_values(shm_segment, total, values)
+
+        call system_clock(start, rate)
+        info = matrix_operation(op, m, k, n, values(1:size_a), values(size_a + 1:size_a + size_b), &
+                                values(size_a + size_b + 1:total), row_major)
+        call system_clock(finish)
+
+        write(shape_buffer, '(I0,"x",I0,"x",I0)') m, k, n
+        call log_info("Matrixoperation ausgeführt: " // trim(operation) // " mit " // trim(shape_buffer), &
+                      trace_id, span_id)
+
+        write(*, '(A,I0,1X,G0)') "OK ", info, real(finish - start, dp) / real(rate, dp)
+        flush(output_unit)
+    end subroutine run_matrix
+
+    ! Reduktion über n float64-Werte (native Byte-Reihenfolge) ab Byte-Offset offset_a in path_a, bei "dot"
+    ! zusammen mit n Werten ab offset_b in path_b. Die Dateien werden blockweise gelesen, nach jedem Block
+    ! wird "PROGRESS <verarbeitet>" geschrieben. Die Antwort ist "OK <n> <summe> <minimum> <maximum>"
+    ! bzw. "OK <n> <skalarprodukt>" oder "ERR <meldung>".
+    subroutine run_reduce(operation, n, chunk, offset_a, path_a, offset_b, path_b, trace_id, span_id)
+        character(len=*), intent(in) :: operation
+        integer(int64), intent(in) :: n, chunk, offset_a, offset_b
+        character(len=*), intent(in) :: path_a, path_b
+        character(len=*), intent(in) :: trace_id
+        character(len=*), intent(in) :: span_id
+
+        character(len=32) :: count_buffer
+        real(dp), allocatable :: block_a(:), block_b(:)
+        real(dp) :: stats_state(STATS_STATE_SIZE), dot_state(DOT_STATE_SIZE)
+        integer(int64) :: done, m
+        integer :: unit_a, unit_b, ios
+        logical :: is_dot
+
+        is_dot = operation == "dot"
+        if (.not. is_dot .and. operation /= "stats") then
+            call log_error("Unbekannte Reduktion: " // trim(operation), trace_id, span_id)
+            write(*, '(A)') "ERR Unbekannte Reduktion. Verwenden Sie stats oder dot."
+            flush(output_unit)
+            return
+        end if
+
+        unit_b = -1
+        open(newunit=unit_a, file=trim(path_a), access="stream", form="unformatted", action="read", &
+             status="old", iostat=ios)
+        if (ios == 0 .and. is_dot) then
+            open(newunit=unit_b, file=trim(path_b), access="stream", form="unformatted", action="read", &
+                 status="old", iostat=ios)
+        end if
+        if (ios /= 0 .or. n < 0 .or. chunk < 1) then
+            call log_error("Ungültige Eingabe für Reduktion", trace_id, span_id)
+            write(*, '(A)') "ERR Ungültige Eingabe für Reduktion"
+            flush(output_unit)
+            call close_reduce_units(unit_a, unit_b)
+            return
+        end if
+
+        allocate(block_a(min(chunk, max(n, 1_int64))))
+        if (is_dot) allocate(block_b(size(block_a)))
+        call init_stats(stats_state)
+        dot_state = 0.0_dp
+
+        done = 0
+        do while (done < n)
+            m = min(int(size(block_a), int64), n - done)
+            read(unit_a, pos=offset_a + 8 * done + 1, iostat=ios) block_a(1:m)
+            if (ios == 0 .and. is_dot) read(unit_b, pos=offset_b + 8 * done + 1, iostat=ios) block_b(1:m)
+            if (ios /= 0) then
+                write(count_buffer, '(I0)') done
+                call log_error("Lesefehler bei Reduktion nach " // trim(count_buffer) // " Elementen", &
+                               trace_id, span_id)
+                write(*, '(A)') "ERR Lesefehler nach " // trim(count_buffer) // " Elementen"
+                flush(output_unit)
+                call close_reduce_units(unit_a, unit_b)
+                return
+            end if
+
+            if (is_dot) then
+                call accumulate_dot(block_a(1:m), block_b(1:m), dot_state)
+            else
+                call accumulate_stats(block_a(1:m), stats_state)
+            end if
+            done = done + m
+            write(*, '(A,I0)') "PROGRESS ", done
+            flush(output_unit)
+        end do
+        call close_reduce_units(unit_a, unit_b)
+
+        write(count_buffer, '(I0)') n
+        call log_info("Reduktion ausgeführt: " // trim(operation) // " über " // trim(count_buffer) // " Elemente", &
+                      trace_id, span_id)
+
+        if (is_dot) then
+            write(*, '(A,I0,1X,G0)') "OK ", n, dot_state(1) + dot_state(2)
+        else
+            write(*, '(A,I0,3(1X,G0))') "OK ", n, stats_state(1) + stats_state(2), stats_state(3), stats_state(4)
+        end if
+        flush(output_unit)
+    end subroutine run_reduce
+
+    subroutine close_reduce_units(unit_a, unit_b)
+        integer, intent(in) :: unit_a, unit_b
+        integer :: ios
+
+        close(unit_a, iostat=ios)
+        if (unit_b /= -1) close(unit_b, iostat=ios)
+    end subroutine close_reduce_units
+
+    ! Server-Modus: liest pro Zeile eine Anfrage "<operation> <a> <b> [trace_id] [span_id]"
+    ! und schreibt pro Anfrage genau eine Antwortzeile "OK <ergebnis>" bzw. "ERR <meldung>".
+    ! "batch <operation> <n> [trace_id] [span_id]" startet eine Batch-Verarbeitung (siehe run_batch),
+    ! "eval <n> <slots> <befehle> [trace_id] [span_id]" die Auswertung eines Ausdrucks (siehe run_eval),
+    ! "reduce <stats|dot> <n> <block> <offset_a> <offset_b> [trace_id] [span_id]" eine Reduktion über die
+    ! Dateien aus den folgenden ein bzw. zwei Zeilen (siehe run_reduce),
+    ! "shm <operation> <segment> <n> [trace_id] [span_id]" eine Batch-Berechnung im Shared Memory (siehe run_shm),
+    ! "matrix <operation> <segment> <m> <k> <n> <row_major> [trace_id] [span_id]" eine Matrixoperation im
+    ! Shared Memory (siehe run_matrix).
+    ! "ping" wird mit "PONG" beantwortet, "quit" oder EOF beenden den Server.
+    subroutine run_server()
+        character(len=512) :: line
+        character(len=10) :: req_operation
+        character(len=32) :: req_trace_id
+        character(len=16) :: req_span_id
+        real(dp) :: req_a, req_b, req_result
+        integer :: ios, req_size, req_slots, req_code
+        integer(int64) :: req_n, req_chunk, req_offset_a, req_offset_b
+        character(len=4096) :: req_path_a, req_path_b
+        character(len=256) :: req_segment
+        integer :: req_m, req_k, req_order
+
+        do
+            read(*, '(A)', iostat=ios) line
+            if (ios /= 0) exit
+
+            if (len_trim(line) == 0) cycle
+            if (line == "quit") exit
+
+            if (line == "ping") then
+                write(*, '(A)') "PONG"
+                flush(output_unit)
+                cycle
+            end if
+
+            if (line(1:6) == "batch ") then
+                req_trace_id = "unbekannt"
+                req_span_id = "unbekannt"
+                read(line(7:), *, iostat=ios) req_operation, req_size
+                if (ios /= 0) then
+                    write(*, '(A)') "ERR Ungültige Anfrage: " // trim(line)
+                    flush(output_unit)
+                    cycle
+                end if
+                read(line(7:), *, iostat=ios) req_operation, req_size, req_trace_id, req_span_id
+                call run_batch(req_operation, req_size, req_trace_id, req_span_id)
+                cycle
+            end if
+
+            if (line(1:5) == "eval ") then
+                req_trace_id = "unbekannt"
+                req_span_id = "unbekannt"
+                read(line(6:), *, iostat=ios) req_size, req_slots, req_code
+                if (ios /= 0) then
+                    write(*, '(A)') "ERR Ungültige Anfrage: " // trim(line)
+                    flush(output_unit)
+                    cycle
+                end if
+                read(line(6:), *, iostat=ios) req_size, req_slots, req_code, req_trace_id, req_span_id
+                call run_eval(req_size, req_slots, req_code, req_trace_id, req_span_id)
+                cycle
+            end if
+
+            if (line(1:4) == "shm ") then
+                req_trace_id = "unbekannt"
+                req_span_id = "unbekannt"
+                read(line(5:), *, iostat=ios) req_operation, req_segment, req_n
+                if (ios /= 0) then
+                    write(*, '(A)') "ERR Ungültige Anfrage: " // trim(line)
+                    flush(output_unit)
+                    cycle
+                end if
+                read(line(5:), *, iostat=ios) req_operation, req_segment, req_n, req_trace_id, req_span_id
+                call run_shm(req_operation, req_segment, req_n, req_trace_id, req_span_id)
+                cycle
+            end if
+
+            if (line(1:7) == "matrix ") then
+                req_trace_id = "unbekannt"
+                req_span_id = "unbekannt"
+                read(line(8:), *, iostat=ios) req_operation, req_segment, req_m, req_k, req_size, req_order
+                if (ios /= 0) then
+                    write(*, '(A)') "ERR Ungültige Anfrage: " // trim(line)
+                    flush(output_unit)
+                    cycle
+                end if
+                read(line(8:), *, iostat=ios) req_operation, req_segment, req_m, req_k, req_size, req_order, &
+                    req_trace_id, req_span_id
+                call run_matrix(req_operation, req_segment, req_m, req_k, req_size, req_order /= 0, &
+                                req_trace_id, req_span_id)
+                cycle
+            end if
+
+            if (line(1:7) == "reduce ") then
+                req_trace_id = "unbekannt"
+                req_span_id = "unbekannt"
+                read(line(8:), *, iostat=ios) req_operation, req_n, req_chunk, req_offset_a, req_offset_b
+                ! Die Dateipfade folgen auf eigenen Zeilen, damit sie Leerzeichen enthalten dürfen
+                req_path_b = ""
+                if (ios == 0) read(*, '(A)', iostat=ios) req_path_a
+                if (ios == 0 .and. req_operation == "dot") read(*, '(A)', iostat=ios) req_path_b
+                if (ios /= 0) then
+                    write(*, '(A)') "ERR Ungültige Anfrage: " // trim(line)
+                    flush(output_unit)
+                    cycle
+                end if
+                read(line(8:), *, iostat=ios) req_operation, req_n, req_chunk, req_offset_a, req_offset_b, &
+                    req_trace_id, req_span_id
+                call run_reduce(req_operation, req_n, req_chunk, req_offset_a, req_path_a, req_offset_b, &
+                                req_path_b, req_trace_id, req_span_id)
+                cycle
+            end if
+
+            read(line, *, iostat=ios) req_operation, req_a, req_b
+            if (ios /= 0) then
+                write(*, '(A)') "ERR Ungültige Anfrage: " // trim(line)
+                flush(output_unit)
+                cycle
+            end if
+
+            ! Optionaler Trace-Kontext
+            req_trace_id = "unbekannt"
+            req_span_id = "unbekannt"
+            read(line, *, iostat=ios) req_operation, req_a, req_b, req_trace_id, req_span_id
+
+            call compute(req_operation, req_a, req_b, req_result, ok, error_message, req_trace_id, req_span_id)
+            if (ok .and. hex_results) then
+                write(*, '(A)') "OK " // hex_value(req_result)
+            else if (ok) then
+                write(*, '(A,G0)') "OK ", req_result
+            else
+                write(*, '(A)') "ERR " // trim(error_message)
+            end if
+            flush(output_unit)
+        end do
+    end subroutine run_server
+
+    ! Liest die Log-Schwelle aus der Umgebungsvariable FORTRAN_LOG_LEVEL
+    subroutine init_logging()
+        character(len=16) :: level
+        integer :: status
+
+        log_threshold = LEVEL_INFO
+        call get_environment_variable("FORTRAN_LOG_LEVEL", level, status=status)
+        if (status /= 0) return
+
+        select case (trim(level))
+            case ("DEBUG", "debug")
+                log_threshold = LEVEL_DEBUG
+            case ("INFO", "info")
+                log_threshold = LEVEL_INFO
+            case ("WARN", "warn", "WARNING", "warning")
+                log_threshold = LEVEL_WARN
+            case ("ERROR", "error")
+                log_threshold = LEVEL_ERROR
+            case ("OFF", "off", "NONE", "none")
+                log_threshold = LEVEL_OFF
+        end select
+    end subroutine init_logging
+
+    ! Schwelle der parallelen Array-Kernel aus FORTRAN_PARALLEL_THRESHOLD, sonst der Standardwert
+    subroutine init_parallel()
+        character(len=32) :: buffer
+        integer(int64) :: threshold
+        integer :: status
+
+        call get_environment_variable("FORTRAN_PARALLEL_THRESHOLD", buffer, status=status)
+        if (status /= 0) return
+        read(buffer, *, iostat=status) threshold
+        if (status == 0) call set_parallel_threshold(threshold)
+    end subroutine init_parallel
+
+    ! Ergebnisformat aus der Umgebungsvariable FORTRAN_RESULT_FORMAT, Standard ist das Textformat
+    subroutine init_result_format()
+        character(len=16) :: format_name
+        integer :: status
+
+        hex_results = .false.
+        call get_environment_variable("FORTRAN_RESULT_FORMAT", format_name, status=status)
+        if (status /= 0) return
+        hex_results = format_name == "hex" .or. format_name == "HEX"
+    end subroutine init_result_format
+
+    ! Trace-Kontext aus den Umgebungsvariablen TRACE_ID/SPAN_ID, sonst "unbekannt"
+    subroutine default_trace_context(trace_id, span_id)
+        character(len=*), intent(out) :: trace_id
+        character(len=*), intent(out) :: span_id
+        integer :: status
+
+        call get_environment_variable("TRACE_ID", trace_id, status=status)
+        if (status /= 0 .or. len_trim(trace_id) == 0) trace_id = "unbekannt"
+        call get_environment_variable("SPAN_ID", span_id, status=status)
+        if (status /= 0 .or. len_trim(span_id) == 0) span_id = "unbekannt"
+    end subroutine default_trace_context
 
     ! Hilfsfunktion für JSON-Logging (INFO Level)
     subroutine log_info(message, trace_id, span_id)
@@ -87,6 +844,7 @@ contains
         character(len=*), intent(in) :: trace_id
         character(len=*), intent(in) :: span_id
 
+        if (log_threshold > LEVEL_INFO) return
         call log_message("INFO", message, trace_id, span_id)
     end subroutine log_info
 
@@ -96,6 +854,7 @@ contains
         character(len=*), intent(in) :: trace_id
         character(len=*), intent(in) :: span_id
 
+        if (log_threshold > LEVEL_ERROR) return
         call log_message("ERROR", message, trace_id, span_id)
     end subroutine log_error
 
@@ -127,4 +886,4 @@ contains
                         '"service":{"name":"calculator-fortran"}}'
     end subroutine log_message
 
-end program calculator
\ No newline at end of file
+end program calculator
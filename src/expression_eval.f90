@@ -0,0 +1,111 @@
+! expression_eval.f90
+! Stack-basierter Auswerter für zusammengesetzte Ausdrücke über die Operationen aus math_operations.
+!
+! Ein Ausdruck wird als Programm in umgekehrter polnischer Notation übergeben: OP_PUSH legt einen
+! Slot (Variable oder Konstante) auf den Stack, die Rechenoperationen verknüpfen die beiden obersten
+! Einträge. Jeder Stack-Eintrag ist ein Vektor der Länge n, Slots der Länge 1 werden auf n erweitert.
+! Zwischenergebnisse bleiben so vollständig im Fortran-Speicher.
+
+module expression_eval
+  use math_operations, only: dp, add, subtract, multiply, divide, is_zero_divisor
+  implicit none
+  private
+
+  ! Befehlscodes des Programms
+  integer, parameter, public :: OP_PUSH = 0
+  integer, parameter, public :: OP_ADD = 1
+  integer, parameter, public :: OP_SUB = 2
+  integer, parameter, public :: OP_MUL = 3
+  integer, parameter, public :: OP_DIV = 4
+
+  ! Öffentliche Schnittstellen
+  public :: evaluate, stack_depth
+
+contains
+  ! Benötigte Stack-Tiefe eines Programms, 0 bei ungültigem Programm
+  integer function stack_depth(ncode, ops, args, nslots)
+    integer, intent(in) :: ncode, nslots
+    integer, intent(in) :: ops(ncode), args(ncode)
+    integer :: i, sp
+
+    stack_depth = 0
+    sp = 0
+    do i = 1, ncode
+      select case (ops(i))
+        case (OP_PUSH)
+          if (args(i) < 1 .or. args(i) > nslots) then
+            stack_depth = 0
+            return
+          end if
+          sp = sp + 1
+          stack_depth = max(stack_depth, sp)
+        case (OP_ADD, OP_SUB, OP_MUL, OP_DIV)
+          if (sp < 2) then
+            stack_depth = 0
+            return
+          end if
+          sp = sp - 1
+        case default
+          stack_depth = 0
+          return
+      end select
+    end do
+
+    ! Am Ende muss genau das Ergebnis auf dem Stack liegen
+    if (sp /= 1) stack_depth = 0
+  end function stack_depth
+
+  ! Wertet das Programm elementweise über n Elemente aus.
+  ! Slot k liegt in slot_data(slot_offset(k)+1 : slot_offset(k)+slot_len(k)), slot_len(k) ist 1 oder n.
+  ! failed(i) markiert Elemente mit einer Division durch Null in irgendeinem Zwischenschritt.
+  subroutine evaluate(n, ncode, ops, args, nslots, slot_offset, slot_len, slot_data, res, failed, ok)
+    integer, intent(in) :: n, ncode, nslots
+    integer, intent(in) :: ops(ncode), args(ncode)
+    integer, intent(in) :: slot_offset(nslots), slot_len(nslots)
+    real(dp), intent(in) :: slot_data(:)
+    real(dp), intent(out) :: res(n)
+    logical, intent(out) :: failed(n)
+    logical, intent(out) :: ok
+
+    real(dp), allocatable :: stack(:, :)
+    integer :: i, sp, depth, first
+
+    failed = .false.
+    res = 0.0_dp
+
+    depth = stack_depth(ncode, ops, args, nslots)
+    ok = depth > 0 .and. all(slot_len == 1 .or. slot_len == n)
+    if (.not. ok) return
+
+    allocate(stack(n, depth))
+    sp = 0
+    do i = 1, ncode
+      select case (ops(i))
+        case (OP_PUSH)
+          sp = sp + 1
+          first = slot_offset(args(i)) + 1
+          if (slot_len(args(i)) == 1) then
+            stack(:, sp) = slot_data(first)
+          else
+            stack(:, sp) = slot_data(first:first + n - 1)
+          end if
+        case (OP_ADD)
+          stack(:, sp - 1) = add(stack(:, sp - 1), stack(:, sp))
+          sp = sp - 1
+        case (OP_SUB)
+          stack(:, sp - 1) = subtract(stack(:, sp - 1), stack(:, sp))
+          sp = sp - 1
+        case (OP_MUL)
+          stack(:, sp - 1) = multiply(stack(:, sp - 1), stack(:, sp))
+          sp = sp - 1
+        case (OP_DIV)
+          failed = failed .or. is_zero_divisor(stack(:, sp))
+          stack(:, sp - 1) = divide(stack(:, sp - 1), stack(:, sp))
+          sp = sp - 1
+      end select
+    end do
+
+    res = stack(:, 1)
+  end subroutine evaluate
+
+end module expression_eval
@@ -0,0 +1,220 @@
+! math_bindings.f90
+! C-Schnittstelle (bind(C)) für das Modul math_operations.
+! Wird als Shared Library gebaut und von Python aus per ctypes aufgerufen.
+
+module math_bindings
+  use, intrinsic :: iso_c_binding, only: c_double, c_int, c_int8_t, c_int64_t
+  use math_operations, only: add, subtract, multiply, divide, is_zero_divisor, add_array, subtract_array, &
+                             multiply_array, divide_array, set_parallel_threshold, set_num_threads, max_threads
+  use expression_eval, only: evaluate
+  use reductions, only: STATS_STATE_SIZE, DOT_STATE_SIZE, init_stats, accumulate_stats, accumulate_dot
+  use matrix_operations, only: matrix_operation
+  implicit none
+  private
+
+  ! Statuscodes der C-Schnittstelle
+  integer(c_int), parameter, public :: CALC_OK = 0
+  integer(c_int), parameter, public :: CALC_DIVISION_BY_ZERO = 1
+
+  ! Öffentliche Schnittstellen
+  public :: calc_add, calc_sub, calc_mul, calc_div
+  public :: calc_add_array, calc_sub_array, calc_mul_array, calc_div_array
+  public :: calc_eval
+  public :: calc_set_num_threads, calc_set_parallel_threshold, calc_max_threads
+  public :: calc_init_stats, calc_stats_chunk, calc_dot_chunk
+  public :: calc_matrix
+
+contains
+  ! Addition zweier Zahlen
+  function calc_add(a, b, res) result(status) bind(C, name="calc_add")
+    real(c_double), value, intent(in) :: a, b
+    real(c_double), intent(out) :: res
+    integer(c_int) :: status
+
+    res = add(a, b)
+    status = CALC_OK
+  end function calc_add
+
+  ! Subtraktion zweier Zahlen
+  function calc_sub(a, b, res) result(status) bind(C, name="calc_sub")
+    real(c_double), value, intent(in) :: a, b
+    real(c_double), intent(out) :: res
+    integer(c_int) :: status
+
+    res = subtract(a, b)
+    status = CALC_OK
+  end function calc_sub
+
+  ! Multiplikation zweier Zahlen
+  function calc_mul(a, b, res) result(status) bind(C, name="calc_mul")
+    real(c_double), value, intent(in) :: a, b
+    real(c_double), intent(out) :: res
+    integer(c_int) :: status
+
+    res = multiply(a, b)
+    status = CALC_OK
+  end function calc_mul
+
+  ! Division zweier Zahlen, Nulldivision wird über den Statuscode gemeldet
+  function calc_div(a, b, res) result(status) bind(C, name="calc_div")
+    real(c_double), value, intent(in) :: a, b
+    real(c_double), intent(out) :: res
+    integer(c_int) :: status
+
+    if (is_zero_divisor(b)) then
+      res = 0.0_c_double
+      status = CALC_DIVISION_BY_ZERO
+    else
+      res = divide(a, b)
+      status = CALC_OK
+    end if
+  end function calc_div
+
+  ! Elementweise Addition zweier Arrays, liefert die Anzahl fehlerhafter Elemente
+  function calc_add_array(n, a, b, res, status) result(errors) bind(C, name="calc_add_array")
+    integer(c_int64_t), value, intent(in) :: n
+    real(c_double), intent(in) :: a(n), b(n)
+    real(c_double), intent(out) :: res(n)
+    integer(c_int8_t), intent(out) :: status(n)
+    integer(c_int64_t) :: errors
+
+    call add_array(a, b, res)
+    status = int(CALC_OK, c_int8_t)
+    errors = 0
+  end function calc_add_array
+
+  ! Elementweise Subtraktion zweier Arrays
+  function calc_sub_array(n, a, b, res, status) result(errors) bind(C, name="calc_sub_array")
+    integer(c_int64_t), value, intent(in) :: n
+    real(c_double), intent(in) :: a(n), b(n)
+    real(c_double), intent(out) :: res(n)
+    integer(c_int8_t), intent(out) :: status(n)
+    integer(c_int64_t) :: errors
+
+    call subtract_array(a, b, res)
+    status = int(CALC_OK, c_int8_t)
+    errors = 0
+  end function calc_sub_array
+
+  ! Elementweise Multiplikation zweier Arrays
+  function calc_mul_array(n, a, b, res, status) result(errors) bind(C, name="calc_mul_array")
+    integer(c_int64_t), value, intent(in) :: n
+    real(c_double), intent(in) :: a(n), b(n)
+    real(c_double), intent(out) :: res(n)
+    integer(c_int8_t), intent(out) :: status(n)
+    integer(c_int64_t) :: errors
+
+    call multiply_array(a, b, res)
+    status = int(CALC_OK, c_int8_t)
+    errors = 0
+  end function calc_mul_array
+
+  ! Elementweise Division zweier Arrays, Nulldivision wird pro Element gemeldet
+  function calc_div_array(n, a, b, res, status) result(errors) bind(C, name="calc_div_array")
+    integer(c_int64_t), value, intent(in) :: n
+    real(c_double), intent(in) :: a(n), b(n)
+    real(c_double), intent(out) :: res(n)
+    integer(c_int8_t), intent(out) :: status(n)
+    integer(c_int64_t) :: errors
+
+    ! divide_array markiert Nulldivisionen mit 1 = CALC_DIVISION_BY_ZERO
+    errors = divide_array(a, b, res, status)
+  end function calc_div_array
+
+  ! Auswertung eines Ausdrucks (siehe expression_eval), liefert die Anzahl fehlerhafter
+  ! Elemente oder -1 bei einem ungültigen Programm
+  function calc_eval(n, ncode, ops, args, nslots, slot_offset, slot_len, ndata, slot_data, res, status) &
+      result(errors) bind(C, name="calc_eval")
+    integer(c_int64_t), value, intent(in) :: n, ndata
+    integer(c_int), value, intent(in) :: ncode, nslots
+    integer(c_int), intent(in) :: ops(ncode), args(ncode), slot_offset(nslots), slot_len(nslots)
+    real(c_double), intent(in) :: slot_data(ndata)
+    real(c_double), intent(out) :: res(n)
+    integer(c_int8_t), intent(out) :: status(n)
+    integer(c_int64_t) :: errors
+
+    logical, allocatable :: failed(:)
+    logical :: ok
+
+    allocate(failed(n))
+    call evaluate(int(n), ncode, ops, args, nslots, slot_offset, slot_len, slot_data, res, failed, ok)
+    if (.not. ok) then
+      status = int(CALC_OK, c_int8_t)
+      errors = -1
+      return
+    end if
+
+    where (failed)
+      res = 0.0_c_double
+      status = int(CALC_DIVISION_BY_ZERO, c_int8_t)
+    elsewhere
+      status = int(CALC_OK, c_int8_t)
+    end where
+    errors = count(failed, kind=c_int64_t)
+  end function calc_eval
+
+  ! Startwert des Zwischenstands für calc_stats_chunk (Summe, Kompensation, Minimum, Maximum)
+  subroutine calc_init_stats(state) bind(C, name="calc_init_stats")
+    real(c_double), intent(out) :: state(STATS_STATE_SIZE)
+
+    call init_stats(state)
+  end subroutine calc_init_stats
+
+  ! Nimmt einen Block von n Werten in Summe, Minimum und Maximum auf (siehe reductions)
+  subroutine calc_stats_chunk(n, x, state) bind(C, name="calc_stats_chunk")
+    integer(c_int64_t), value, intent(in) :: n
+    real(c_double), intent(in) :: x(n)
+    real(c_double), intent(inout) :: state(STATS_STATE_SIZE)
+
+    call accumulate_stats(x, state)
+  end subroutine calc_stats_chunk
+
+  ! Nimmt einen Block von n Wertepaaren in das Skalarprodukt auf (Summe, Kompensation)
+  subroutine calc_dot_chunk(n, x, y, state) bind(C, name="calc_dot_chunk")
+    integer(c_int64_t), value, intent(in) :: n
+    real(c_double), intent(in) :: x(n), y(n)
+    real(c_double), intent(inout) :: state(DOT_STATE_SIZE)
+
+    call accumulate_dot(x, y, state)
+  end subroutine calc_dot_chunk
+
+  ! Matrixoperation op (siehe matrix_operations) auf A, B mit Ergebnis in C; row_major /= 0 für Matrizen
+  ! in Zeilenreihenfolge. seconds ist die Rechenzeit ohne Aufruf-Overhead. Rückgabe wie matrix_operation:
+  ! Anzahl der Nulldivisionen, Spalte des Nullpivots beim Lösen oder -1 bei unbekanntem Befehl.
+  function calc_matrix(op, m, k, n, row_major, a, b, c, seconds) result(info) bind(C, name="calc_matrix")
+    integer(c_int), value, intent(in) :: op, m, k, n, row_major
+    real(c_double), intent(in) :: a(*), b(*)
+    real(c_double), intent(out) :: c(*)
+    real(c_double), intent(out) :: seconds
+    integer(c_int64_t) :: info
+
+    integer(c_int64_t) :: start, finish, rate
+
+    call system_clock(start, rate)
+    info = matrix_operation(int(op), int(m), int(k), int(n), a, b, c, row_major /= 0)
+    call system_clock(finish)
+    seconds = real(finish - start, c_double) / real(rate, c_double)
+  end function calc_matrix
+
+  ! Anzahl der OpenMP-Threads für die Array-Kernel (ohne OpenMP wirkungslos)
+  subroutine calc_set_num_threads(threads) bind(C, name="calc_set_num_threads")
+    integer(c_int), value, intent(in) :: threads
+
+    call set_num_threads(int(threads))
+  end subroutine calc_set_num_threads
+
+  ! Array-Länge, ab der die Array-Kernel parallel rechnen
+  subroutine calc_set_parallel_threshold(threshold) bind(C, name="calc_set_parallel_threshold")
+    integer(c_int64_t), value, intent(in) :: threshold
+
+    call set_parallel_threshold(threshold)
+  end subroutine calc_set_parallel_threshold
+
+  ! Maximale Anzahl Threads der Array-Kernel, 1 ohne OpenMP
+  function calc_max_threads() result(threads) bind(C, name="calc_max_threads")
+    integer(c_int) :: threads
+
+    threads = int(max_threads(), c_int)
+  end function calc_max_threads
+
+end module math_bindings
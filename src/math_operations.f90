@@ -1,49 +1,164 @@
 ! math_operations.f90
-! Eine einfache Fortran-Bibliothek für arithmetische Operationen
+! Eine einfache Fortran-Bibliothek für arithmetische Operationen.
+! Alle Operationen sind elemental und arbeiten damit auch auf real(dp)-Arrays.
+!
+! Für große Arrays gibt es zusätzlich die Kernel add_array, subtract_array, multiply_array und
+! divide_array. Mit -fopenmp übersetzt verteilen sie die Schleife oberhalb von parallel_threshold
+! Elementen auf mehrere Threads, darunter (und ohne OpenMP) laufen sie vektorisiert in einem Thread.
 
 module math_operations
+  use, intrinsic :: iso_fortran_env, only: int8, int64
   implicit none
   private
 
+  ! Gleitkomma-Genauigkeit (entspricht Python float bzw. C double)
+  integer, parameter, public :: dp = kind(1.0d0)
+
+  ! Ab dieser Array-Länge rechnen die Kernel parallel; kleinere Arrays lohnen den Thread-Start nicht
+  integer(int64), parameter, public :: DEFAULT_PARALLEL_THRESHOLD = 65536_int64
+  integer(int64) :: parallel_threshold = DEFAULT_PARALLEL_THRESHOLD
+
   ! Öffentliche Schnittstellen
-  public :: add, subtract, multiply, divide
+  public :: add, subtract, multiply, divide, is_zero_divisor
+  public :: add_array, subtract_array, multiply_array, divide_array
+  public :: set_parallel_threshold, set_num_threads, max_threads
 
 contains
   ! Addition zweier Zahlen
-  function add(a, b) result(res)
-    real, intent(in) :: a, b
-    real :: res
+  elemental function add(a, b) result(res)
+    real(dp), intent(in) :: a, b
+    real(dp) :: res
 
     res = a + b
   end function add
 
   ! Subtraktion zweier Zahlen
-  function subtract(a, b) result(res)
-    real, intent(in) :: a, b
-    real :: res
+  elemental function subtract(a, b) result(res)
+    real(dp), intent(in) :: a, b
+    real(dp) :: res
 
     res = a - b
   end function subtract
 
   ! Multiplikation zweier Zahlen
-  function multiply(a, b) result(res)
-    real, intent(in) :: a, b
-    real :: res
+  elemental function multiply(a, b) result(res)
+    real(dp), intent(in) :: a, b
+    real(dp) :: res
 
     res = a * b
   end function multiply
 
   ! Division zweier Zahlen
-  function divide(a, b) result(res)
-    real, intent(in) :: a, b
-    real :: res
+  elemental function divide(a, b) result(res)
+    real(dp), intent(in) :: a, b
+    real(dp) :: res
 
-    if (abs(b) < tiny(b)) then
-      print *, "Warnung: Division durch Null oder sehr kleine Zahl"
+    ! Nulldivision liefert huge(), Aufrufer prüfen vorher mit is_zero_divisor()
+    if (is_zero_divisor(b)) then
       res = huge(res)
     else
       res = a / b
     end if
   end function divide
 
-end module math_operations
\ No newline at end of file
+  ! Prüft, ob ein Divisor als Null behandelt werden muss (|b| kleiner als die kleinste normale Zahl).
+  ! Einzige Regel für Einzelaufrufe, Batches, Ausdrücke und Matrizen, damit alle Backends und
+  ! zusammengefasste Aufrufe dieselben Ergebnisse liefern
+  elemental logical function is_zero_divisor(b)
+    real(dp), intent(in) :: b
+
+    is_zero_divisor = abs(b) < tiny(b)
+  end function is_zero_divisor
+
+  ! Elementweise Addition zweier Arrays
+  subroutine add_array(a, b, res)
+    real(dp), contiguous, intent(in) :: a(:), b(:)
+    real(dp), contiguous, intent(out) :: res(:)
+    integer(int64) :: i, n
+
+    n = size(a, kind=int64)
+    !$omp parallel do simd if(n >= parallel_threshold) schedule(static)
+    do i = 1, n
+      res(i) = add(a(i), b(i))
+    end do
+    !$omp end parallel do simd
+  end subroutine add_array
+
+  ! Elementweise Subtraktion zweier Arrays
+  subroutine subtract_array(a, b, res)
+    real(dp), contiguous, intent(in) :: a(:), b(:)
+    real(dp), contiguous, intent(out) :: res(:)
+    integer(int64) :: i, n
+
+    n = size(a, kind=int64)
+    !$omp parallel do simd if(n >= parallel_threshold) schedule(static)
+    do i = 1, n
+      res(i) = subtract(a(i), b(i))
+    end do
+    !$omp end parallel do simd
+  end subroutine subtract_array
+
+  ! Elementweise Multiplikation zweier Arrays
+  subroutine multiply_array(a, b, res)
+    real(dp), contiguous, intent(in) :: a(:), b(:)
+    real(dp), contiguous, intent(out) :: res(:)
+    integer(int64) :: i, n
+
+    n = size(a, kind=int64)
+    !$omp parallel do simd if(n >= parallel_threshold) schedule(static)
+    do i = 1, n
+      res(i) = multiply(a(i), b(i))
+    end do
+    !$omp end parallel do simd
+  end subroutine multiply_array
+
+  ! Elementweise Division zweier Arrays, liefert die Anzahl der Nulldivisionen.
+  ! Elemente mit Nulldivision erhalten res = 0 und failed = 1, alle anderen failed = 0.
+  function divide_array(a, b, res, failed) result(errors)
+    real(dp), contiguous, intent(in) :: a(:), b(:)
+    real(dp), contiguous, intent(out) :: res(:)
+    integer(int8), contiguous, intent(out) :: failed(:)
+    integer(int64) :: errors
+    integer(int64) :: i, n
+
+    n = size(a, kind=int64)
+    errors = 0
+    !$omp parallel do simd if(n >= parallel_threshold) schedule(static) reduction(+:errors)
+    do i = 1, n
+      if (is_zero_divisor(b(i))) then
+        res(i) = 0.0_dp
+        failed(i) = 1_int8
+        errors = errors + 1
+      else
+        res(i) = a(i) / b(i)
+        failed(i) = 0_int8
+      end if
+    end do
+    !$omp end parallel do simd
+  end function divide_array
+
+  ! Setzt die Array-Länge, ab der die Kernel parallel rechnen
+  subroutine set_parallel_threshold(threshold)
+    integer(int64), intent(in) :: threshold
+
+    parallel_threshold = max(threshold, 1_int64)
+  end subroutine set_parallel_threshold
+
+  ! Setzt die Anzahl der OpenMP-Threads (ohne OpenMP wirkungslos)
+  subroutine set_num_threads(threads)
+    !$ use omp_lib, only: omp_set_num_threads
+    integer, intent(in) :: threads
+
+    if (threads < 1) return
+    !$ call omp_set_num_threads(threads)
+  end subroutine set_num_threads
+
+  ! Maximale Anzahl Threads eines parallelen Kernels, 1 ohne OpenMP
+  integer function max_threads()
+    !$ use omp_lib, only: omp_get_max_threads
+
+    max_threads = 1
+    !$ max_threads = omp_get_max_threads()
+  end function max_threads
+
+end module math_operations
@@ -0,0 +1,350 @@
+! matrix_operations.f90
+! Dichte Matrixoperationen auf real(dp)-Matrizen: Produkt, Transponierte, elementweise Operationen
+! und Lösen linearer Gleichungssysteme über eine LU-Zerlegung mit Spaltenpivotsuche.
+!
+! Die Routinen arbeiten in Spaltenreihenfolge (column-major, wie Fortran). Matrizen in
+! Zeilenreihenfolge (row-major, wie C und NumPy) werden nicht umkopiert: ihre Bytes sind die
+! Transponierte in Spaltenreihenfolge, das Produkt C = A * B wird dafür als C^T = B^T * A^T berechnet.
+!
+! Produkte rechnet matmul aus libgfortran, das selbst in Cache-Blöcken arbeitet. Mit -fopenmp und
+! mehreren Threads werden große Produkte in Blöcke zerlegt, deren Spaltenblöcke parallel rechnen;
+! jeder Block ist wieder ein Aufruf von matmul auf Teilmatrizen.
+
+module matrix_operations
+  use, intrinsic :: iso_fortran_env, only: int64
+  use, intrinsic :: ieee_arithmetic, only: ieee_value, ieee_quiet_nan
+  use math_operations, only: dp, is_zero_divisor, add_array, subtract_array, multiply_array, max_threads
+  implicit none
+  private
+
+  ! Befehlscodes (siehe MATRIX_OPCODES in python/backend/base.py)
+  integer, parameter, public :: MATRIX_MATMUL = 1
+  integer, parameter, public :: MATRIX_TRANSPOSE = 2
+  integer, parameter, public :: MATRIX_ADD = 3
+  integer, parameter, public :: MATRIX_SUB = 4
+  integer, parameter, public :: MATRIX_MUL = 5
+  integer, parameter, public :: MATRIX_DIV = 6
+  integer, parameter, public :: MATRIX_SOLVE = 7
+
+  ! Rückgabewert von matrix_operation bei unbekanntem Befehl
+  integer(int64), parameter, public :: MATRIX_INVALID = -1_int64
+
+  ! Kantenlänge der Blöcke des parallelen Produkts: drei Blöcke (1,5 MiB) passen in L2/L3
+  integer, parameter :: BLOCK_SIZE = 256
+  ! Bis zu dieser Anzahl Multiplikationen (m * k * n) wird matmul auch parallel direkt aufgerufen
+  integer(int64), parameter :: BLOCKED_THRESHOLD = 128_int64 ** 3
+  ! Breite der Spaltenblöcke (Panels) der LU-Zerlegung
+  integer, parameter :: LU_BLOCK = 64
+  ! Kantenlänge der Kacheln beim Transponieren
+  integer, parameter :: TRANSPOSE_TILE = 32
+
+  ! Öffentliche Schnittstellen
+  public :: matrix_operation, matrix_flops, matrix_sizes
+  public :: multiply_matrices, transpose_matrix, lu_factor, lu_solve
+
+contains
+  ! Führt den Befehl op aus. Die Form ergibt sich aus m, k und n:
+  !   MATRIX_MATMUL     A (m x k) * B (k x n)          -> C (m x n)
+  !   MATRIX_TRANSPOSE  A (m x k)                      -> C (k x m)
+  !   MATRIX_ADD ... DIV  A (m x k) op B (m x k)       -> C (m x k)
+  !   MATRIX_SOLVE      A (m x m) * X = B (m x n)      -> C = X (m x n)
+  ! row_major gibt die Reihenfolge aller drei Matrizen an. Rückgabe: bei MATRIX_DIV die Anzahl der
+  ! Nulldivisionen (Elemente NaN), bei MATRIX_SOLVE 0 oder die Spalte des Nullpivots (singulär),
+  ! sonst 0; MATRIX_INVALID bei unbekanntem Befehl.
+  function matrix_operation(op, m, k, n, a, b, c, row_major) result(info)
+    integer, intent(in) :: op, m, k, n
+    real(dp), intent(in) :: a(*), b(*)
+    real(dp), intent(out) :: c(*)
+    logical, intent(in) :: row_major
+    integer(int64) :: info
+
+    integer(int64) :: count
+
+    info = 0
+    count = int(m, int64) * k
+    select case (op)
+      case (MATRIX_MATMUL)
+        if (row_major) then
+          call multiply_matrices(n, k, m, b, a, c)
+        else
+          call multiply_matrices(m, k, n, a, b, c)
+        end if
+      case (MATRIX_TRANSPOSE)
+        if (row_major) then
+          call transpose_matrix(k, m, a, c)
+        else
+          call transpose_matrix(m, k, a, c)
+        end if
+      case (MATRIX_ADD)
+        call add_array(a(1:count), b(1:count), c(1:count))
+      case (MATRIX_SUB)
+        call subtract_array(a(1:count), b(1:count), c(1:count))
+      case (MATRIX_MUL)
+        call multiply_array(a(1:count), b(1:count), c(1:count))
+      case (MATRIX_DIV)
+        info = divide_elements(count, a, b, c)
+      case (MATRIX_SOLVE)
+        info = solve(m, n, a, b, c, row_major)
+      case default
+        info = MATRIX_INVALID
+    end select
+  end function matrix_operation
+
+  ! Anzahl der Elemente von A, B und C für den Befehl op (siehe matrix_operation), 0 für unbenutzte
+  ! Operanden; bei unbekanntem Befehl alle 0
+  pure subroutine matrix_sizes(op, m, k, n, size_a, size_b, size_c)
+    integer, intent(in) :: op, m, k, n
+    integer(int64), intent(out) :: size_a, size_b, size_c
+
+    size_a = int(m, int64) * k
+    select case (op)
+      case (MATRIX_MATMUL)
+        size_b = int(k, int64) * n
+        size_c = int(m, int64) * n
+      case (MATRIX_TRANSPOSE)
+        size_b = 0
+        size_c = size_a
+      case (MATRIX_ADD, MATRIX_SUB, MATRIX_MUL, MATRIX_DIV)
+        size_b = size_a
+        size_c = size_a
+      case (MATRIX_SOLVE)
+        size_b = int(m, int64) * n
+        size_c = size_b
+      case default
+        size_a = 0
+        size_b = 0
+        size_c = 0
+    end select
+  end subroutine matrix_sizes
+
+  ! Anzahl der Gleitkommaoperationen eines Befehls (für die FLOP/s-Angabe)
+  pure real(dp) function matrix_flops(op, m, k, n)
+    integer, intent(in) :: op, m, k, n
+
+    select case (op)
+      case (MATRIX_MATMUL)
+        matrix_flops = 2.0_dp * m * k * n
+      case (MATRIX_ADD, MATRIX_SUB, MATRIX_MUL, MATRIX_DIV)
+        matrix_flops = real(m, dp) * k
+      case (MATRIX_SOLVE)
+        matrix_flops = 2.0_dp / 3.0_dp * real(m, dp) ** 3 + 2.0_dp * real(m, dp) ** 2 * n
+      case default
+        matrix_flops = 0.0_dp
+    end select
+  end function matrix_flops
+
+  ! Produkt C = A * B
+  subroutine multiply_matrices(m, k, n, a, b, c)
+    integer, intent(in) :: m, k, n
+    real(dp), intent(in) :: a(m, k), b(k, n)
+    real(dp), intent(out) :: c(m, n)
+
+    if (max_threads() == 1 .or. int(m, int64) * k * n <= BLOCKED_THRESHOLD) then
+      c = matmul(a, b)
+    else
+      c = 0.0_dp
+      call multiply_add(a, b, c, 1.0_dp)
+    end if
+  end subroutine multiply_matrices
+
+  ! C = C + sign * A * B; mit mehreren Threads in Blöcken, jeder Thread berechnet eigene Spaltenblöcke von C
+  subroutine multiply_add(a, b, c, sign)
+    real(dp), intent(in) :: a(:, :), b(:, :)
+    real(dp), intent(inout) :: c(:, :)
+    real(dp), intent(in) :: sign
+    integer :: m, k, n, ii, jj, kk, i2, j2, k2
+
+    m = size(c, 1)
+    n = size(c, 2)
+    k = size(a, 2)
+
+    ! Ein Thread: matmul aus libgfortran ist schneller als die Zerlegung in Blöcke
+    if (max_threads() == 1 .or. int(m, int64) * k * n <= BLOCKED_THRESHOLD) then
+      c = c + sign * matmul(a, b)
+      return
+    end if
+
+    !$omp parallel do schedule(dynamic) private(ii, kk, i2, j2, k2)
+    do jj = 1, n, BLOCK_SIZE
+      j2 = min(jj + BLOCK_SIZE - 1, n)
+      do kk = 1, k, BLOCK_SIZE
+        k2 = min(kk + BLOCK_SIZE - 1, k)
+        do ii = 1, m, BLOCK_SIZE
+          i2 = min(ii + BLOCK_SIZE - 1, m)
+          c(ii:i2, jj:j2) = c(ii:i2, jj:j2) + sign * matmul(a(ii:i2, kk:k2), b(kk:k2, jj:j2))
+        end do
+      end do
+    end do
+    !$omp end parallel do
+  end subroutine multiply_add
+
+  ! Transponierte C = A^T in Kacheln, damit Lesen und Schreiben im Cache bleiben
+  subroutine transpose_matrix(m, n, a, c)
+    integer, intent(in) :: m, n
+    real(dp), intent(in) :: a(m, n)
+    real(dp), intent(out) :: c(n, m)
+    integer :: ii, jj, i, j
+
+    !$omp parallel do private(ii, i, j) if(int(m, int64) * n > BLOCKED_THRESHOLD)
+    do jj = 1, n, TRANSPOSE_TILE
+      do ii = 1, m, TRANSPOSE_TILE
+        do i = ii, min(ii + TRANSPOSE_TILE - 1, m)
+          do j = jj, min(jj + TRANSPOSE_TILE - 1, n)
+            c(j, i) = a(i, j)
+          end do
+        end do
+      end do
+    end do
+    !$omp end parallel do
+  end subroutine transpose_matrix
+
+  ! Elementweise Division, Nulldivisionen ergeben NaN und werden gezählt
+  function divide_elements(count, a, b, c) result(errors)
+    integer(int64), intent(in) :: count
+    real(dp), intent(in) :: a(count), b(count)
+    real(dp), intent(out) :: c(count)
+    integer(int64) :: errors
+    integer(int64) :: i
+    real(dp) :: nan
+
+    nan = ieee_value(nan, ieee_quiet_nan)
+    errors = 0
+    do i = 1, count
+      if (is_zero_divisor(b(i))) then
+        c(i) = nan
+        errors = errors + 1
+      else
+        c(i) = a(i) / b(i)
+      end if
+    end do
+  end function divide_elements
+
+  ! Löst A * X = B für A (m x m) und B (m x n), Rückgabe 0 oder Spalte des Nullpivots
+  function solve(m, n, a, b, x, row_major) result(info)
+    integer, intent(in) :: m, n
+    real(dp), intent(in) :: a(m, m), b(*)
+    real(dp), intent(out) :: x(m, n)
+    logical, intent(in) :: row_major
+    integer(int64) :: info
+
+    real(dp), allocatable :: lu(:, :), rhs(:, :)
+    integer, allocatable :: pivots(:)
+
+    ! Die Zerlegung überschreibt ihre Eingabe, A bleibt unverändert
+    allocate(lu(m, m), pivots(m))
+    if (row_major) then
+      call transpose_matrix(m, m, a, lu)
+    else
+      lu = a
+    end if
+
+    call lu_factor(m, lu, pivots, info)
+    if (info /= 0) return
+
+    if (row_major .and. n > 1) then
+      allocate(rhs(m, n))
+      call transpose_matrix(n, m, b, rhs)
+      call lu_solve(m, n, lu, pivots, rhs)
+      call transpose_matrix(m, n, rhs, x)
+    else
+      x = reshape(b(1:int(m, int64) * n), [m, n])
+      call lu_solve(m, n, lu, pivots, x)
+    end if
+  end function solve
+
+  ! LU-Zerlegung P * A = L * U mit Spaltenpivotsuche, in Panels von LU_BLOCK Spalten: das Panel wird
+  ! ungeblockt zerlegt, der Rest der Matrix mit einem blockweisen Produkt aktualisiert. L (mit
+  ! Einheitsdiagonale) und U stehen danach in a, pivots(j) ist die mit Zeile j getauschte Zeile.
+  ! info ist 0 oder die erste Spalte mit Nullpivot (Matrix singulär).
+  subroutine lu_factor(n, a, pivots, info)
+    integer, intent(in) :: n
+    real(dp), intent(inout) :: a(n, n)
+    integer, intent(out) :: pivots(n)
+    integer(int64), intent(out) :: info
+    integer :: kb, ke, j, jj, p
+    real(dp) :: row(n)
+
+    info = 0
+    do kb = 1, n, LU_BLOCK
+      ke = min(kb + LU_BLOCK - 1, n)
+
+      ! Panel zerlegen, Zeilentausch über die ganze Breite
+      do j = kb, ke
+        p = j - 1 + maxloc(abs(a(j:n, j)), dim=1)
+        pivots(j) = p
+        if (a(p, j) == 0.0_dp) then
+          info = j
+          return
+        end if
+        if (p /= j) then
+          row = a(j, :)
+          a(j, :) = a(p, :)
+          a(p, :) = row
+        end if
+
+        a(j + 1:n, j) = a(j + 1:n, j) / a(j, j)
+        do jj = j + 1, ke
+          a(j + 1:n, jj) = a(j + 1:n, jj) - a(j + 1:n, j) * a(j, jj)
+        end do
+      end do
+
+      if (ke == n) exit
+
+      ! U12 = L11^-1 * A12 (Vorwärtseinsetzen, Einheitsdiagonale)
+      !$omp parallel do private(j) if(n - ke > BLOCK_SIZE)
+      do jj = ke + 1, n
+        do j = kb, ke - 1
+          a(j + 1:ke, jj) = a(j + 1:ke, jj) - a(j + 1:ke, j) * a(j, jj)
+        end do
+      end do
+      !$omp end parallel do
+
+      ! A22 = A22 - L21 * U12
+      call multiply_add(a(ke + 1:n, kb:ke), a(kb:ke, ke + 1:n), a(ke + 1:n, ke + 1:n), -1.0_dp)
+    end do
+  end subroutine lu_factor
+
+  ! Löst A * X = B mit der Zerlegung aus lu_factor, X überschreibt B (n x nrhs). Vorwärts- und
+  ! Rückwärtseinsetzen laufen in Blöcken von LU_BLOCK Zeilen: der Diagonalblock wird direkt gelöst,
+  ! die übrigen Zeilen mit einem blockweisen Produkt aktualisiert.
+  subroutine lu_solve(n, nrhs, lu, pivots, b)
+    integer, intent(in) :: n, nrhs
+    real(dp), intent(in) :: lu(n, n)
+    integer, intent(in) :: pivots(n)
+    real(dp), intent(inout) :: b(n, nrhs)
+    integer :: j, col, kb, ke
+    real(dp) :: row(nrhs)
+
+    do j = 1, n
+      if (pivots(j) /= j) then
+        row = b(j, :)
+        b(j, :) = b(pivots(j), :)
+        b(pivots(j), :) = row
+      end if
+    end do
+
+    ! Vorwärtseinsetzen mit L (Einheitsdiagonale)
+    do kb = 1, n, LU_BLOCK
+      ke = min(kb + LU_BLOCK - 1, n)
+      do col = 1, nrhs
+        do j = kb, ke - 1
+          b(j + 1:ke, col) = b(j + 1:ke, col) - lu(j + 1:ke, j) * b(j, col)
+        end do
+      end do
+      if (ke < n) call multiply_add(lu(ke + 1:n, kb:ke), b(kb:ke, :), b(ke + 1:n, :), -1.0_dp)
+    end do
+
+    ! Rückwärtseinsetzen mit U, von unten nach oben
+    do ke = n, 1, -LU_BLOCK
+      kb = max(ke - LU_BLOCK + 1, 1)
+      do col = 1, nrhs
+        do j = ke, kb, -1
+          b(j, col) = b(j, col) / lu(j, j)
+          b(kb:j - 1, col) = b(kb:j - 1, col) - lu(kb:j - 1, j) * b(j, col)
+        end do
+      end do
+      if (kb > 1) call multiply_add(lu(1:kb - 1, kb:ke), b(kb:ke, :), b(1:kb - 1, :), -1.0_dp)
+    end do
+  end subroutine lu_solve
+
+end module matrix_operations
@@ -0,0 +1,111 @@
+! reductions.f90
+! Reduktionen (Summe, Minimum, Maximum, Skalarprodukt) über große Arrays in Blöcken.
+!
+! Ein Aufrufer verarbeitet die Daten blockweise und führt den Zwischenstand in einem kleinen
+! state-Array mit, der Speicherbedarf ist damit unabhängig von der Gesamtgröße. Innerhalb eines
+! Blocks wird paarweise summiert, die Blocksummen werden kompensiert (Kahan-Babuška/Neumaier)
+! aufaddiert. Der Rundungsfehler wächst so nur logarithmisch mit der Blockgröße und bleibt über
+! beliebig viele Blöcke beschränkt.
+
+module reductions
+  use, intrinsic :: iso_fortran_env, only: int64
+  use, intrinsic :: ieee_arithmetic, only: ieee_value, ieee_positive_inf, ieee_negative_inf
+  use math_operations, only: dp
+  implicit none
+  private
+
+  ! Bis zu dieser Länge wird direkt summiert, längere Bereiche werden halbiert
+  integer(int64), parameter :: PAIRWISE_BLOCK = 128_int64
+
+  ! Aufbau des Zwischenstands: Summe, Kompensation, Minimum, Maximum
+  integer, parameter, public :: STATS_STATE_SIZE = 4
+  ! Aufbau des Zwischenstands beim Skalarprodukt: Summe, Kompensation
+  integer, parameter, public :: DOT_STATE_SIZE = 2
+
+  ! Öffentliche Schnittstellen
+  public :: pairwise_sum, pairwise_dot, compensated_add
+  public :: init_stats, accumulate_stats, accumulate_dot
+
+contains
+  ! Paarweise Summe eines Arrays
+  recursive function pairwise_sum(x) result(s)
+    real(dp), contiguous, intent(in) :: x(:)
+    real(dp) :: s
+    integer(int64) :: i, n, half
+
+    n = size(x, kind=int64)
+    if (n <= PAIRWISE_BLOCK) then
+      s = 0.0_dp
+      do i = 1, n
+        s = s + x(i)
+      end do
+    else
+      half = n / 2
+      s = pairwise_sum(x(1:half)) + pairwise_sum(x(half + 1:n))
+    end if
+  end function pairwise_sum
+
+  ! Paarweise Summe der elementweisen Produkte zweier gleich langer Arrays
+  recursive function pairwise_dot(x, y) result(s)
+    real(dp), contiguous, intent(in) :: x(:), y(:)
+    real(dp) :: s
+    integer(int64) :: i, n, half
+
+    n = size(x, kind=int64)
+    if (n <= PAIRWISE_BLOCK) then
+      s = 0.0_dp
+      do i = 1, n
+        s = s + x(i) * y(i)
+      end do
+    else
+      half = n / 2
+      s = pairwise_dot(x(1:half), y(1:half)) + pairwise_dot(x(half + 1:n), y(half + 1:n))
+    end if
+  end function pairwise_dot
+
+  ! Kompensierte Addition (Neumaier): total + compensation ist die genaue Summe
+  subroutine compensated_add(total, compensation, value)
+    real(dp), intent(inout) :: total, compensation
+    real(dp), intent(in) :: value
+    real(dp) :: t
+
+    t = total + value
+    if (abs(total) >= abs(value)) then
+      compensation = compensation + ((total - t) + value)
+    else
+      compensation = compensation + ((value - t) + total)
+    end if
+    total = t
+  end subroutine compensated_add
+
+  ! Startwert des Zwischenstands für accumulate_stats
+  subroutine init_stats(state)
+    real(dp), intent(out) :: state(STATS_STATE_SIZE)
+
+    state(1) = 0.0_dp
+    state(2) = 0.0_dp
+    state(3) = ieee_value(state(3), ieee_positive_inf)
+    state(4) = ieee_value(state(4), ieee_negative_inf)
+  end subroutine init_stats
+
+  ! Nimmt einen Block in Summe, Minimum und Maximum auf
+  subroutine accumulate_stats(x, state)
+    real(dp), contiguous, intent(in) :: x(:)
+    real(dp), intent(inout) :: state(STATS_STATE_SIZE)
+
+    if (size(x) == 0) return
+    call compensated_add(state(1), state(2), pairwise_sum(x))
+    state(3) = min(state(3), minval(x))
+    state(4) = max(state(4), maxval(x))
+  end subroutine accumulate_stats
+
+  ! Nimmt einen Block in das Skalarprodukt auf
+  subroutine accumulate_dot(x, y, state)
+    real(dp), contiguous, intent(in) :: x(:), y(:)
+    real(dp), intent(inout) :: state(DOT_STATE_SIZE)
+
+    if (size(x) == 0) return
+    call compensated_add(state(1), state(2), pairwise_dot(x, y))
+  end subroutine accumulate_dot
+
+end module reductions
@@ -0,0 +1,146 @@
+! shared_segment.f90
+! Einblenden eines POSIX-Shared-Memory-Segments (shm_open/mmap), das Python über
+! multiprocessing.shared_memory angelegt hat. Operanden und Ergebnisse werden so ohne
+! Formatierung und ohne Kopie über Pipes zwischen Python und bin/calculator ausgetauscht.
+!
+! Aufbau eines Segments für n Elemente (Byte-Offsets):
+!   0     a      (n float64)
+!   8n    b      (n float64)
+!   16n   res    (n float64)
+!   24n   status (n int8, 0 = ok, 1 = Division durch Null)
+!
+! Für Matrixoperationen liegen A, B und C direkt hintereinander (float64, Größen siehe matrix_sizes).
+!
+! Die Konstanten für shm_open und mmap entsprechen Linux.
+
+module shared_segment
+  use, intrinsic :: iso_c_binding, only: c_ptr, c_null_ptr, c_int, c_char, c_null_char, c_size_t, &
+                                         c_int64_t, c_intptr_t, c_associated, c_f_pointer
+  use, intrinsic :: iso_fortran_env, only: int8, int64
+  use math_operations, only: dp
+  implicit none
+  private
+
+  integer(c_int), parameter :: O_RDWR = 2
+  integer(c_int), parameter :: PROT_READ_WRITE = 3
+  integer(c_int), parameter :: MAP_SHARED = 1
+
+  ! Eingeblendetes Segment; ein Segment mit gleichem Namen und ausreichender Länge wird wiederverwendet
+  type, public :: segment
+    type(c_ptr) :: base = c_null_ptr
+    integer(c_size_t) :: length = 0
+    character(len=256) :: name = ""
+  end type segment
+
+  ! Öffentliche Schnittstellen
+  public :: attach, detach, segment_bytes, segment_arrays, segment_values
+
+  interface
+    function c_shm_open(name, oflag, mode) bind(C, name="shm_open") result(fd)
+      import :: c_char, c_int
+      character(kind=c_char), intent(in) :: name(*)
+      integer(c_int), value :: oflag, mode
+      integer(c_int) :: fd
+    end function c_shm_open
+
+    function c_mmap(addr, length, prot, flags, fd, offset) bind(C, name="mmap") result(ptr)
+      import :: c_ptr, c_size_t, c_int, c_int64_t
+      type(c_ptr), value :: addr
+      integer(c_size_t), value :: length
+      integer(c_int), value :: prot, flags, fd
+      integer(c_int64_t), value :: offset
+      type(c_ptr) :: ptr
+    end function c_mmap
+
+    function c_munmap(addr, length) bind(C, name="munmap") result(rc)
+      import :: c_ptr, c_size_t, c_int
+      type(c_ptr), value :: addr
+      integer(c_size_t), value :: length
+      integer(c_int) :: rc
+    end function c_munmap
+
+    function c_close(fd) bind(C, name="close") result(rc)
+      import :: c_int
+      integer(c_int), value :: fd
+      integer(c_int) :: rc
+    end function c_close
+  end interface
+
+contains
+  ! Benötigte Segmentgröße in Bytes für n Elemente
+  pure integer(int64) function segment_bytes(n)
+    integer(int64), intent(in) :: n
+
+    segment_bytes = 25_int64 * n
+  end function segment_bytes
+
+  ! Blendet das Segment name (ohne führenden "/") mit mindestens length Bytes ein
+  subroutine attach(seg, name, length, ok)
+    type(segment), intent(inout) :: seg
+    character(len=*), intent(in) :: name
+    integer(int64), intent(in) :: length
+    logical, intent(out) :: ok
+
+    integer(c_int) :: fd, rc
+    type(c_ptr) :: ptr
+
+    ok = .true.
+    if (c_associated(seg%base) .and. seg%name == name .and. seg%length >= length) return
+
+    call detach(seg)
+    ok = .false.
+    fd = c_shm_open("/" // trim(name) // c_null_char, O_RDWR, 0_c_int)
+    if (fd < 0) return
+
+    ptr = c_mmap(c_null_ptr, int(max(length, 1_int64), c_size_t), PROT_READ_WRITE, MAP_SHARED, fd, 0_c_int64_t)
+    rc = c_close(fd)
+    ! MAP_FAILED ist (void *) -1
+    if (transfer(ptr, 0_c_intptr_t) == -1_c_intptr_t) return
+
+    seg%base = ptr
+    seg%length = int(max(length, 1_int64), c_size_t)
+    seg%name = name
+    ok = .true.
+  end subroutine attach
+
+  ! Gibt die Einblendung wieder frei
+  subroutine detach(seg)
+    type(segment), intent(inout) :: seg
+    integer(c_int) :: rc
+
+    if (c_associated(seg%base)) rc = c_munmap(seg%base, seg%length)
+    seg%base = c_null_ptr
+    seg%length = 0
+    seg%name = ""
+  end subroutine detach
+
+  ! Zeiger auf die Bereiche a, b, res und status eines eingeblendeten Segments für n Elemente
+  subroutine segment_arrays(seg, n, a, b, res, status)
+    type(segment), intent(in) :: seg
+    integer(int64), intent(in) :: n
+    real(dp), pointer, intent(out) :: a(:), b(:), res(:)
+    integer(int8), pointer, intent(out) :: status(:)
+
+    real(dp), pointer :: values(:)
+    type(c_ptr) :: status_base
+
+    call c_f_pointer(seg%base, values, [3 * n])
+    a => values(1:n)
+    b => values(n + 1:2 * n)
+    res => values(2 * n + 1:3 * n)
+
+    ! Die Statusbytes folgen direkt auf die drei float64-Bereiche
+    status_base = transfer(transfer(seg%base, 0_c_intptr_t) + 24_c_intptr_t * n, status_base)
+    call c_f_pointer(status_base, status, [n])
+  end subroutine segment_arrays
+
+  ! Zeiger auf die ersten count float64-Werte eines eingeblendeten Segments
+  subroutine segment_values(seg, count, values)
+    type(segment), intent(in) :: seg
+    integer(int64), intent(in) :: count
+    real(dp), pointer, intent(out) :: values(:)
+
+    call c_f_pointer(seg%base, values, [count])
+  end subroutine segment_values
+
+end module shared_segment
@@ -0,0 +1,42 @@
+# tests/test_batch.py
+
+import struct
+
+import pytest
+from flask import Flask, request
+
+from python.api.batch import BINARY_CONTENT_TYPE, BatchRequestError, parse_batch_request
+
+app = Flask(__name__)
+
+
+def parse(max_size=10, **kwargs):
+    with app.test_request_context('/batch/add', method='POST', **kwargs):
+        return parse_batch_request(request, max_size)
+
+
+def test_json_operands():
+    a, b = parse(json={'a': [1, 2.5], 'b': [3, 4]})
+    assert list(a) == [1.0, 2.5]
+    assert list(b) == [3.0, 4.0]
+
+
+def test_binary_operands():
+    a, b = parse(data=struct.pack('<4d', 1, 2, 3, 4), content_type=BINARY_CONTENT_TYPE)
+    assert list(a) == [1.0, 2.0]
+    assert list(b) == [3.0, 4.0]
+
+
+@pytest.mark.parametrize('kwargs, status_code', [
+    ({'json': {'a': [1, 2], 'b': [1]}}, 400),
+    ({'json': {'a': [1], 'b': 'x'}}, 400),
+    ({'json': {'a': [1, 'x'], 'b': [1, 2]}}, 400),
+    ({'json': {'a': [10 ** 400], 'b': [1]}}, 400),
+    ({'json': {'a': [1] * 11, 'b': [1] * 11}}, 413),
+    ({'data': b'\0' * 24, 'content_type': BINARY_CONTENT_TYPE}, 400),
+    ({'data': 'kein json', 'content_type': 'text/plain'}, 400),
+])
+def test_invalid_requests(kwargs, status_code):
+    with pytest.raises(BatchRequestError) as error:
+        parse(**kwargs)
+    assert error.value.status_code == status_code
@@ -0,0 +1,145 @@
+# tests/test_cache.py
+
+from types import SimpleNamespace
+
+import pytest
+
+from python.backend import cache as cache_module
+from python.backend.base import OperationError
+from python.backend.cache import ERROR, RESULT, CachingBackend, LocalCache, ResultCache, SharedCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Steuerbare Uhr für monotonic() (lokaler Cache) und time() (gemeinsamer Cache)"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, 'time', SimpleNamespace(monotonic=lambda: now[0], time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def shared_path(tmp_path):
+    return str(tmp_path / 'cache')
+
+
+class CountingBackend:
+    """Backend-Attrappe, zählt die Aufrufe und meldet Division durch Null als fachlichen Fehler"""
+
+    name = 'fake'
+
+    def __init__(self):
+        self.calls = 0
+
+    def calculate(self, operation, a, b, trace_id, span_id, parent_span_id):
+        self.calls += 1
+        if operation == 'div' and b == 0:
+            raise OperationError("Fehler: Division durch Null nicht erlaubt")
+        return a + b
+
+
+def test_local_lru_eviction():
+    cache = LocalCache(2, 60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    # 'b' wurde am längsten nicht benutzt
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['entries'] == 2
+
+
+def test_local_ttl_expiry(clock):
+    cache = LocalCache(10, 5)
+    cache.put('a', 1)
+    clock[0] += 4.9
+    assert cache.get('a') == 1
+    clock[0] += 0.2
+    assert cache.get('a') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_shared_roundtrip_and_negative_entries(shared_path):
+    cache = SharedCache(shared_path, 64, 60)
+    cache.put(('add', 1.0, 2.0), (RESULT, 3.0))
+    cache.put(('div', 1.0, 0.0), (ERROR, "Fehler: Division durch Null nicht erlaubt"))
+
+    assert cache.get(('add', 1.0, 2.0)) == (RESULT, 3.0)
+    assert cache.get(('div', 1.0, 0.0)) == (ERROR, "Fehler: Division durch Null nicht erlaubt")
+    assert cache.get(('sub', 1.0, 2.0)) is None
+    assert cache.get(('add', 2.0, 1.0)) is None
+
+
+def test_shared_visible_to_other_instances(shared_path):
+    SharedCache(shared_path, 64, 60).put(('mul', 2.0, 3.0), (RESULT, 6.0))
+    assert SharedCache(shared_path, 64, 60).get(('mul', 2.0, 3.0)) == (RESULT, 6.0)
+
+
+def test_shared_ttl_expiry(clock, shared_path):
+    cache = SharedCache(shared_path, 64, 5)
+    cache.put(('add', 1.0, 2.0), (RESULT, 3.0))
+    clock[0] += 5
+    assert cache.get(('add', 1.0, 2.0)) is None
+    assert cache.stats()['used'] == 0
+
+
+def test_shared_slot_collision_replaces_entry(shared_path):
+    cache = SharedCache(shared_path, 1, 60)
+    cache.put(('add', 1.0, 2.0), (RESULT, 3.0))
+    cache.put(('add', 5.0, 6.0), (RESULT, 11.0))
+    assert cache.get(('add', 1.0, 2.0)) is None
+    assert cache.get(('add', 5.0, 6.0)) == (RESULT, 11.0)
+
+
+def test_flush_in_other_worker_clears_local_tier(shared_path):
+    worker_1 = ResultCache(LocalCache(10, 60), SharedCache(shared_path, 64, 60))
+    worker_2 = ResultCache(LocalCache(10, 60), SharedCache(shared_path, 64, 60))
+    worker_1.put('add', 1.0, 2.0, (RESULT, 3.0))
+    worker_2.put('add', 1.0, 2.0, (RESULT, 3.0))
+    assert worker_2.local.get(('add', 1.0, 2.0)) is not None
+
+    generation = worker_1.shared.generation()
+    worker_1.flush()
+    assert worker_1.shared.generation() == generation + 1
+
+    # Worker 2 erkennt die neue Generation und verwirft seinen lokalen Eintrag
+    assert worker_2.get('add', 1.0, 2.0) is None
+    assert worker_2.local.stats()['entries'] == 0
+
+
+def test_shared_hit_is_copied_to_local_tier(shared_path):
+    SharedCache(shared_path, 64, 60).put(('add', 1.0, 2.0), (RESULT, 3.0))
+    cache = ResultCache(LocalCache(10, 60), SharedCache(shared_path, 64, 60))
+    assert cache.get('add', 1.0, 2.0) == (RESULT, 3.0)
+    assert cache.local.get(('add', 1.0, 2.0)) == (RESULT, 3.0)
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_caching_backend_results_and_negative_entries():
+    backend = CountingBackend()
+    caching = CachingBackend(backend, ResultCache(LocalCache(10, 60)))
+
+    assert caching.calculate('add', 1.0, 2.0, 't', 's', 'unset') == 3.0
+    assert caching.calculate('add', 1.0, 2.0, 't', 's', 'unset') == 3.0
+    for _ in range(2):
+        with pytest.raises(OperationError, match="Division durch Null"):
+            caching.calculate('div', 1.0, 0.0, 't', 's', 'unset')
+
+    assert backend.calls == 2
+    assert (caching.cache.hits, caching.cache.misses) == (2, 2)
+
+
+def test_caching_backend_does_not_cache_technical_errors():
+    class FailingBackend(CountingBackend):
+        def calculate(self, *args):
+            self.calls += 1
+            raise RuntimeError("Co-Prozess abgestürzt")
+
+    backend = FailingBackend()
+    caching = CachingBackend(backend, ResultCache(LocalCache(10, 60)))
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            caching.calculate('add', 1.0, 2.0, 't', 's', 'unset')
+    assert backend.calls == 2
@@ -0,0 +1,103 @@
+# tests/test_coalesce.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from python.backend.base import STATUS_DIVISION_BY_ZERO, STATUS_OK, OperationError
+from python.backend.coalesce import CoalescingBackend
+
+
+class BatchBackend:
+    """Backend-Attrappe: addiert elementweise und meldet b == 0 als Division durch Null"""
+
+    name = 'fake'
+
+    def __init__(self, error=None):
+        self.error = error
+        self.batches = []
+
+    def calculate(self, operation, a, b, trace_id, span_id, parent_span_id):
+        self.batches.append([(a, b)])
+        if self.error is not None:
+            raise self.error
+        if b == 0:
+            raise OperationError("Fehler: Division durch Null nicht erlaubt")
+        return a + b
+
+    def calculate_batch(self, operation, a, b, trace_id, span_id, parent_span_id):
+        self.batches.append(list(zip(a, b)))
+        if self.error is not None:
+            raise self.error
+        values = [x + y for x, y in zip(a, b)]
+        statuses = [STATUS_DIVISION_BY_ZERO if y == 0 else STATUS_OK for y in b]
+        return values, statuses
+
+
+def calculate_concurrently(coalescing, operands):
+    """Startet einen Einzelaufruf pro Operandenpaar und liefert pro Aufrufer (Ergebnis, Fehler)"""
+
+    def call(pair):
+        try:
+            return coalescing.calculate('div', pair[0], pair[1], 't', 's', 'unset'), None
+        except Exception as e:
+            return None, e
+
+    with ThreadPoolExecutor(len(operands)) as executor:
+        return list(executor.map(call, operands))
+
+
+def test_each_waiter_gets_its_own_result():
+    backend = BatchBackend()
+    # Ein langes Zeitfenster: der Batch wird ausgeführt, sobald max_batch Aufrufe da sind
+    coalescing = CoalescingBackend(backend, 5, 3)
+    results = calculate_concurrently(coalescing, [(1.0, 1.0), (2.0, 2.0), (3.0, 3.0)])
+
+    assert [result for result, _ in results] == [2.0, 4.0, 6.0]
+    assert len(backend.batches) == 1
+    assert sorted(backend.batches[0]) == [(1.0, 1.0), (2.0, 2.0), (3.0, 3.0)]
+
+
+def test_division_error_only_hits_its_waiter():
+    backend = BatchBackend()
+    coalescing = CoalescingBackend(backend, 5, 3)
+    results = calculate_concurrently(coalescing, [(1.0, 1.0), (2.0, 0.0), (3.0, 3.0)])
+
+    assert results[0] == (2.0, None)
+    assert results[2] == (6.0, None)
+    assert isinstance(results[1][1], OperationError)
+    assert len(backend.batches) == 1
+
+
+def test_backend_error_reaches_every_waiter():
+    backend = BatchBackend(RuntimeError("Co-Prozess abgestürzt"))
+    coalescing = CoalescingBackend(backend, 5, 3)
+    results = calculate_concurrently(coalescing, [(1.0, 1.0), (2.0, 2.0), (3.0, 3.0)])
+
+    assert all(result is None and isinstance(error, RuntimeError) for result, error in results)
+    assert len(backend.batches) == 1
+
+
+def test_single_call_after_window_uses_calculate():
+    backend = BatchBackend()
+    coalescing = CoalescingBackend(backend, 0.01, 10)
+    assert coalescing.calculate('add', 1.0, 2.0, 't', 's', 'unset') == 3.0
+    with pytest.raises(OperationError):
+        coalescing.calculate('div', 1.0, 0.0, 't', 's', 'unset')
+    assert backend.batches == [[(1.0, 2.0)], [(1.0, 0.0)]]
+
+
+def test_async_waiters_get_their_own_results():
+    backend = BatchBackend()
+    coalescing = CoalescingBackend(backend, 5, 3)
+
+    async def main():
+        calls = [coalescing.calculate_async('div', a, b, 't', 's', 'unset')
+                 for a, b in [(1.0, 1.0), (2.0, 0.0), (3.0, 3.0)]]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    first, second, third = asyncio.run(main())
+    assert (first, third) == (2.0, 6.0)
+    assert isinstance(second, OperationError)
+    assert backend.batches == [[(1.0, 1.0), (2.0, 0.0), (3.0, 3.0)]]
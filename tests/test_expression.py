@@ -0,0 +1,177 @@
+# tests/test_expression.py
+
+import pytest
+
+from python.api.expression import MAX_DEPTH, ExpressionError, bind_variables, compile_expression
+from python.backend.base import OP_PUSH
+
+MAX_NODES = 256
+
+OPERATIONS = {
+    1: lambda x, y: x + y,
+    2: lambda x, y: x - y,
+    3: lambda x, y: x * y,
+    4: lambda x, y: x / y,
+}
+
+
+def evaluate(expression, **variables):
+    """Wertet den Plan in Python aus, wie es src/expression_eval.f90 für ein Element tut"""
+    plan = compile_expression(expression, MAX_NODES)
+    slots, _ = bind_variables(plan, variables, 100)
+    stack = []
+    for op, arg in plan.code:
+        if op == OP_PUSH:
+            stack.append(slots[arg - 1][0])
+        else:
+            right = stack.pop()
+            stack.append(OPERATIONS[op](stack.pop(), right))
+    assert len(stack) == 1
+    return stack[0]
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ('a + b * c', 2 + 3 * 4),
+    ('a * b + c', 2 * 3 + 4),
+    ('(a + b) * c', (2 + 3) * 4),
+    ('a - b - c', 2 - 3 - 4),
+    ('a / b / c', 2 / 3 / 4),
+    ('a - (b - c)', 2 - (3 - 4)),
+    ('2 * a + .5e1', 2 * 2 + 5.0),
+])
+def test_infix_precedence(expression, expected):
+    assert evaluate(expression, a=2, b=3, c=4) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ('-a', -2),
+    ('--a', 2),
+    ('-a * b', -6),
+    ('b - -a', 5),
+    ('-(a + b)', -5),
+    ('-3', -3),
+])
+def test_infix_unary_minus(expression, expected):
+    assert evaluate(expression, a=2, b=3) == pytest.approx(expected)
+
+
+def test_unary_minus_on_constant_is_folded():
+    plan = compile_expression('-3', MAX_NODES)
+    assert plan.constants == (-3.0,)
+    assert plan.code == ((OP_PUSH, 1),)
+
+
+def test_identical_leaves_share_a_slot():
+    plan = compile_expression('a * a + 2 * a + 2', MAX_NODES)
+    assert plan.variables == ('a',)
+    assert plan.constants == (2.0,)
+
+
+@pytest.mark.parametrize('expression', ['', '   ', 'a +', 'a b', '(a + b', 'a + b)', '* a', '()'])
+def test_infix_syntax_errors(expression):
+    with pytest.raises(ExpressionError) as error:
+        compile_expression(expression, MAX_NODES)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize('expression', ['a ^ b', 'a % b', 'sqrt(a)', 'a; b', 'a = 1'])
+def test_infix_bad_tokens(expression):
+    with pytest.raises(ExpressionError):
+        compile_expression(expression, MAX_NODES)
+
+
+def test_tree_matches_infix():
+    tree = {'op': 'add', 'args': ['a', {'op': '*', 'args': [{'var': 'b'}, {'const': 4}]}]}
+    plan, expected = compile_expression(tree, MAX_NODES), compile_expression('a + b * 4', MAX_NODES)
+    assert (plan.code, plan.variables, plan.constants) == (expected.code, expected.variables, expected.constants)
+
+
+@pytest.mark.parametrize('tree', [
+    {'op': 'pow', 'args': ['a', 'b']},
+    {'op': 'add', 'args': ['a']},
+    {'op': 'add', 'args': 'a'},
+    {'op': 'add', 'args': ['a', True]},
+    {'op': 'add', 'args': ['a', None]},
+    {'const': 'x'},
+])
+def test_tree_invalid_nodes(tree):
+    with pytest.raises(ExpressionError) as error:
+        compile_expression(tree, MAX_NODES)
+    assert error.value.status_code == 400
+
+
+def test_tree_constant_out_of_float_range():
+    with pytest.raises(ExpressionError) as error:
+        compile_expression({'op': 'add', 'args': ['a', 10 ** 400]}, MAX_NODES)
+    assert error.value.status_code == 400
+
+
+def test_expression_must_be_string_or_tree():
+    with pytest.raises(ExpressionError):
+        compile_expression(['a'], MAX_NODES)
+
+
+@pytest.mark.parametrize('expression', [
+    '(' * 1500 + 'a' + ')' * 1500,
+    '-' * 5000 + 'a',
+    '(' * (MAX_DEPTH + 1) + 'a' + ')' * (MAX_DEPTH + 1),
+])
+def test_infix_nesting_limit(expression):
+    with pytest.raises(ExpressionError) as error:
+        compile_expression(expression, MAX_NODES)
+    assert error.value.status_code == 413
+
+
+def test_infix_nesting_within_limit():
+    depth = MAX_DEPTH
+    assert evaluate('(' * depth + 'a' + ')' * depth, a=2) == 2
+    assert evaluate('-' * depth + 'a', a=2) == 2
+
+
+@pytest.mark.parametrize('depth', [MAX_DEPTH + 1, 3000])
+def test_tree_nesting_limit(depth):
+    tree = 'a'
+    for _ in range(depth):
+        tree = {'op': 'add', 'args': [tree, 1]}
+    with pytest.raises(ExpressionError) as error:
+        compile_expression(tree, 10 * depth)
+    assert error.value.status_code == 413
+
+
+def test_long_chain_hits_node_limit():
+    with pytest.raises(ExpressionError) as error:
+        compile_expression(' + '.join(['a'] * 3000), MAX_NODES)
+    assert error.value.status_code == 413
+
+
+def test_bind_variables_arrays_and_scalars():
+    plan = compile_expression('a * b + c', MAX_NODES)
+    slots, n = bind_variables(plan, {'a': [1, 2, 3], 'b': 2, 'c': [4.0, 5.0, 6.0]}, 10)
+    assert n == 3
+    assert [list(slot) for slot in slots] == [[1.0, 2.0, 3.0], [2.0], [4.0, 5.0, 6.0]]
+
+
+def test_bind_variables_scalars_only():
+    plan = compile_expression('a + 1', MAX_NODES)
+    slots, n = bind_variables(plan, {'a': 2}, 10)
+    assert n is None
+    assert [list(slot) for slot in slots] == [[2.0], [1.0]]
+
+
+@pytest.mark.parametrize('variables, status_code', [
+    ({'a': [1, 2], 'b': [1, 2, 3]}, 400),
+    ({'a': [], 'b': 1}, 400),
+    ({'a': [1] * 11, 'b': 1}, 413),
+    ({'a': 1}, 400),
+    ({'a': 'x', 'b': 1}, 400),
+    ({'a': True, 'b': 1}, 400),
+    ({'a': [1, 'x'], 'b': 1}, 400),
+    ({'a': [10 ** 400], 'b': 1}, 400),
+    ({'a': 10 ** 400, 'b': 1}, 400),
+    ([1, 2], 400),
+])
+def test_bind_variables_errors(variables, status_code):
+    plan = compile_expression('a + b', MAX_NODES)
+    with pytest.raises(ExpressionError) as error:
+        bind_variables(plan, variables, 10)
+    assert error.value.status_code == status_code
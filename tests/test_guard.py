@@ -0,0 +1,145 @@
+# tests/test_guard.py
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from python.api.pipeline import error_response
+from python.backend import guard as guard_module
+from python.backend.base import BackendTimeoutError, CalculationError, OperationError, RejectedError
+from python.backend.guard import AdmissionController, CircuitBreaker, GuardedBackend
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(guard_module, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+class ScriptedBackend:
+    """Backend-Attrappe: wirft den nächsten Fehler aus errors bzw. liefert a + b"""
+
+    name = 'fake'
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def calculate(self, operation, a, b, trace_id, span_id, parent_span_id):
+        self.calls += 1
+        if self.errors:
+            error = self.errors.pop(0)
+            if error is not None:
+                raise error
+        return a + b
+
+
+def call(backend):
+    return backend.calculate('add', 1.0, 2.0, 't', 's', 'unset')
+
+
+def test_admission_rejects_with_429_and_retry_after():
+    admission = AdmissionController(2, 3)
+    admission.acquire()
+    admission.acquire()
+    with pytest.raises(RejectedError) as error:
+        admission.acquire()
+    assert (error.value.status_code, error.value.retry_after) == (429, 3)
+
+    admission.release()
+    admission.acquire()
+    assert admission.in_flight == 2
+
+
+def test_rejection_response_carries_retry_after():
+    error = RejectedError("Überlast", 429, 3)
+    with Flask(__name__).test_request_context():
+        response = error_response({}, str(error), error.status_code, error.retry_after)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '3'
+
+
+def test_guarded_backend_limits_concurrent_calls():
+    started, release = threading.Event(), threading.Event()
+
+    class BlockingBackend(ScriptedBackend):
+        def calculate(self, *args):
+            started.set()
+            release.wait(5)
+            return 0.0
+
+    guarded = GuardedBackend(BlockingBackend(), AdmissionController(1, 1), CircuitBreaker(5, 10))
+    thread = threading.Thread(target=call, args=(guarded,))
+    thread.start()
+    try:
+        assert started.wait(5)
+        with pytest.raises(RejectedError) as error:
+            call(guarded)
+        assert error.value.status_code == 429
+    finally:
+        release.set()
+        thread.join()
+    assert guarded.admission.in_flight == 0
+
+
+def test_circuit_breaker_transitions(clock):
+    breaker = CircuitBreaker(2, 10)
+    guarded = GuardedBackend(ScriptedBackend([CalculationError("x"), BackendTimeoutError("y"), None]),
+                             AdmissionController(10, 1), breaker)
+
+    # closed -> open nach zwei technischen Fehlern
+    for _ in range(2):
+        with pytest.raises(CalculationError):
+            call(guarded)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Offen: sofort 503 mit der verbleibenden Zeit als Retry-After
+    clock[0] += 4
+    with pytest.raises(RejectedError) as error:
+        call(guarded)
+    assert (error.value.status_code, error.value.retry_after) == (503, 6)
+    assert guarded.backend.calls == 2
+
+    # Nach reset_timeout half-open, der erfolgreiche Probeaufruf schließt den Breaker
+    clock[0] += 6
+    assert call(guarded) == 3.0
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert guarded.admission.in_flight == 0
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(1, 10)
+    guarded = GuardedBackend(ScriptedBackend([CalculationError("x"), CalculationError("y")]),
+                             AdmissionController(10, 1), breaker)
+    with pytest.raises(CalculationError):
+        call(guarded)
+    clock[0] += 10
+    with pytest.raises(CalculationError):
+        call(guarded)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_at == clock[0]
+
+
+def test_only_one_probe_while_half_open(clock):
+    breaker = CircuitBreaker(1, 10)
+    breaker.on_failure()
+    clock[0] += 10
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(RejectedError) as error:
+        breaker.before_call()
+    assert error.value.status_code == 503
+
+
+def test_operation_errors_do_not_trip_the_breaker():
+    breaker = CircuitBreaker(2, 10)
+    errors = [OperationError("Fehler: Division durch Null nicht erlaubt")] * 5
+    guarded = GuardedBackend(ScriptedBackend(errors), AdmissionController(10, 1), breaker)
+    for _ in range(5):
+        with pytest.raises(OperationError):
+            call(guarded)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
@@ -0,0 +1,169 @@
+# tests/test_jobs.py
+
+import os
+import time
+from array import array
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from python.backend.base import STATUS_DIVISION_BY_ZERO, STATUS_OK
+from python.jobs import JobRunner, JobSpool
+from python.jobs import runner as runner_module
+
+
+class BatchBackend:
+    """Backend-Attrappe des Pool-Prozesses, merkt sich die berechneten Operanden"""
+
+    def __init__(self):
+        self.calls = []
+
+    def calculate_batch(self, operation, a, b, trace_id, span_id, parent_span_id):
+        self.calls.append(list(a))
+        statuses = array('b', (STATUS_DIVISION_BY_ZERO if y == 0 else STATUS_OK for y in b))
+        return array('d', (x + y for x, y in zip(a, b))), statuses
+
+
+class InlineExecutor:
+    """Führt Blöcke sofort im Testprozess aus; für Indizes in crashes stürzt der "Prozess" ab"""
+
+    def __init__(self, crashes):
+        self.crashes = crashes
+
+    def submit(self, fn, directory, job_id, index):
+        future = Future()
+        if self.crashes.get(index, 0) > 0:
+            self.crashes[index] -= 1
+            future.set_exception(BrokenProcessPool("Prozess abgestürzt"))
+        else:
+            future.set_result(fn(directory, job_id, index))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = BatchBackend()
+    monkeypatch.setattr(runner_module, '_backend', backend)
+    return backend
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return JobSpool(str(tmp_path))
+
+
+def make_runner(spool, crashes=None):
+    runner = JobRunner(spool, {}, 1)
+    runner.executors = []
+
+    def create_executor():
+        runner.executors.append(InlineExecutor(crashes if crashes is not None else {}))
+        return runner.executors[-1]
+
+    runner._create_executor = create_executor
+    return runner
+
+
+def drive(runner):
+    """Ein Durchlauf der Hauptschleife von JobRunner.run, bis keine Blöcke mehr offen sind"""
+    runner._executor = runner._create_executor()
+    runner._schedule()
+    while runner._futures:
+        future = next(iter(runner._futures))
+        runner._complete(future, *runner._futures.pop(future))
+        runner._schedule()
+
+
+def submit_batch(spool, a, b, chunk_size=2):
+    job_id = spool.create()
+    spool.write_input(job_id, 'a.f64', array('d', a))
+    spool.write_input(job_id, 'b.f64', array('d', b))
+    spec = {'chunk_size': chunk_size, 'kind': 'batch', 'operation': 'add', 'size': len(a),
+            'inputs': [{'file': 'a.f64', 'offset': 0}, {'file': 'b.f64', 'offset': 0}],
+            'trace_id': 't', 'span_id': 's'}
+    spool.submit(job_id, spec, -(-len(a) // chunk_size))
+    return job_id
+
+
+def test_job_runs_in_chunks(spool, backend):
+    job_id = submit_batch(spool, [1, 2, 3, 4, 5], [1, 1, 1, 0, 1])
+    drive(make_runner(spool))
+
+    state = spool.state(job_id)
+    assert (state['status'], state['done'], state['errors']) == ('done', 5, 1)
+    assert sorted(state['completed']) == [0, 1, 2]
+    results, statuses = spool.read_results(job_id, 5)
+    assert list(results) == [2.0, 3.0, 4.0, 4.0, 6.0]
+    assert list(statuses) == [0, 0, 0, STATUS_DIVISION_BY_ZERO, 0]
+    assert backend.calls == [[1.0, 2.0], [3.0, 4.0], [5.0]]
+    assert spool.queued() == [] and os.listdir(spool.running_dir) == []
+
+
+def test_interrupted_job_resumes_with_missing_chunks(spool, backend):
+    job_id = submit_batch(spool, [1, 2, 3, 4, 5, 6], [1, 1, 1, 1, 1, 1])
+
+    # Ein früherer Runner hat den Job übernommen und Block 0 geschrieben, bevor er beendet wurde
+    marker = spool.queued()[0]
+    spool.claim(marker)
+    state = spool.state(job_id)
+    state.update(status='running', started_at=time.time(), completed=[0], done=2)
+    spool.write_state(job_id, state)
+    spool.prepare_results(job_id, 6)
+    spool.write_results(job_id, 0, array('d', [-1.0, -1.0]), array('b', [STATUS_OK, STATUS_OK]))
+
+    spool.requeue_running()
+    assert spool.queued() == [marker]
+    assert os.listdir(spool.running_dir) == []
+
+    drive(make_runner(spool))
+
+    state = spool.state(job_id)
+    assert (state['status'], state['done']) == ('done', 6)
+    assert backend.calls == [[3.0, 4.0], [5.0, 6.0]]
+    results, _ = spool.read_results(job_id, 6)
+    assert list(results) == [-1.0, -1.0, 4.0, 5.0, 6.0, 7.0]
+
+
+def test_chunk_is_retried_after_broken_process_pool(spool, backend):
+    job_id = submit_batch(spool, [1, 2, 3, 4], [1, 1, 1, 1])
+    runner = make_runner(spool, crashes={1: 1})
+    drive(runner)
+
+    state = spool.state(job_id)
+    assert (state['status'], state['done'], state['error']) == ('done', 4, None)
+    # Der abgestürzte Pool wurde durch einen neuen ersetzt
+    assert len(runner.executors) == 2
+    results, _ = spool.read_results(job_id, 4)
+    assert list(results) == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_job_fails_after_repeated_crashes(spool, backend):
+    job_id = submit_batch(spool, [1, 2, 3, 4], [1, 1, 1, 1])
+    drive(make_runner(spool, crashes={1: runner_module.MAX_CHUNK_ATTEMPTS}))
+
+    state = spool.state(job_id)
+    assert state['status'] == 'failed'
+    assert state['error'] == "Prozess des Job-Pools abgestürzt"
+    assert state['finished_at'] is not None
+    assert os.listdir(spool.running_dir) == []
+
+
+def test_cleanup_removes_expired_jobs(spool):
+    now = time.time()
+    jobs = {}
+    for name, status, finished_at in [('old_done', 'done', now - 100), ('old_failed', 'failed', now - 100),
+                                      ('new_done', 'done', now - 10), ('running', 'running', None)]:
+        job_id = jobs[name] = spool.create()
+        spool.write_state(job_id, {'status': status, 'finished_at': finished_at})
+    # Fremde Einträge im Spool werden übergangen
+    os.makedirs(os.path.join(spool.jobs_dir, 'lost+found'))
+
+    assert sorted(spool.expired(50)) == sorted([jobs['old_done'], jobs['old_failed']])
+
+    runner = JobRunner(spool, {}, 1, retention=50)
+    runner._cleanup()
+    assert sorted(os.listdir(spool.jobs_dir)) == sorted([jobs['new_done'], jobs['running'], 'lost+found'])
@@ -0,0 +1,57 @@
+# tests/test_matrix.py
+
+import struct
+
+import pytest
+from flask import Flask, request
+
+from python.api.batch import BINARY_CONTENT_TYPE
+from python.api.matrix import MatrixRequestError, parse_matrix_request
+
+app = Flask(__name__)
+
+
+def parse(operation, query='', max_dimension=8, **kwargs):
+    with app.test_request_context(f'/matrix/{operation}?{query}', method='POST', **kwargs):
+        return parse_matrix_request(request, operation, max_dimension)
+
+
+def test_json_matmul():
+    matrix = parse('matmul', json={'a': [[1, 2, 3], [4, 5, 6]], 'b': [[1], [2], [3]]})
+    assert list(matrix.a) == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    assert matrix.dimensions == (2, 3, 1)
+    assert matrix.result_shape == (2, 1)
+    assert matrix.row_major and not matrix.binary
+
+
+def test_json_transpose_ignores_b():
+    matrix = parse('transpose', json={'a': [[1, 2, 3], [4, 5, 6]]})
+    assert matrix.b is None
+    assert matrix.result_shape == (3, 2)
+
+
+def test_binary_column_major():
+    matrix = parse('add', query='a=2x2&b=2x2&order=col', data=struct.pack('<8d', *range(8)),
+                   content_type=BINARY_CONTENT_TYPE)
+    assert list(matrix.b) == [4.0, 5.0, 6.0, 7.0]
+    assert not matrix.row_major and matrix.binary
+
+
+@pytest.mark.parametrize('operation, kwargs, status_code', [
+    ('pow', {'json': {'a': [[1]], 'b': [[1]]}}, 404),
+    ('matmul', {'json': {'a': [[1, 2]], 'b': [[1, 2]]}}, 400),
+    ('solve', {'json': {'a': [[1, 2]], 'b': [[1]]}}, 400),
+    ('add', {'json': {'a': [[1, 2]], 'b': [[1], [2]]}}, 400),
+    ('add', {'json': {'a': [[1, 2], [3]], 'b': [[1, 2], [3, 4]]}}, 400),
+    ('add', {'json': {'a': [[1, 'x']], 'b': [[1, 2]]}}, 400),
+    ('add', {'json': {'a': [[10 ** 400]], 'b': [[1]]}}, 400),
+    ('add', {'json': {'a': [], 'b': []}}, 400),
+    ('transpose', {'json': {'a': [[1] * 9]}}, 413),
+    ('transpose', {'query': 'a=2x2', 'data': b'\0' * 24, 'content_type': BINARY_CONTENT_TYPE}, 400),
+    ('transpose', {'query': 'a=2x', 'data': b'', 'content_type': BINARY_CONTENT_TYPE}, 400),
+    ('transpose', {'query': 'a=1x1&order=diag', 'data': b'\0' * 8, 'content_type': BINARY_CONTENT_TYPE}, 400),
+])
+def test_invalid_requests(operation, kwargs, status_code):
+    with pytest.raises(MatrixRequestError) as error:
+        parse(operation, **kwargs)
+    assert error.value.status_code == status_code